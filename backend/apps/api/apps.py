@@ -8,4 +8,10 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.api'
-    verbose_name = 'API'
\ No newline at end of file
+    verbose_name = 'API'
+
+    def ready(self):
+        from .change_feed import connect_change_signals
+        from .dashboard_store import connect_dashboard_signals
+        connect_change_signals()
+        connect_dashboard_signals()
\ No newline at end of file
@@ -0,0 +1,263 @@
+"""
+Change feed for polling clients.
+
+Every topic a client polls has a version counter in the cache (Redis in
+production): per user for ``documents``, ``tasks`` and ``notifications``,
+system-wide for ``dashboard`` and ``scheduler``. Model signals bump the
+counters after the writing transaction commits.
+
+Polled endpoints decorated with ``conditional_on_changes`` send an ETag
+derived from the counters and answer ``304 Not Modified`` to a matching
+``If-None-Match`` without running their queries, so an idle poll costs one
+cache read. ``GET /api/v1/changes/`` returns the counters themselves and,
+with ``?wait=<seconds>``, holds the request until one of them moves.
+
+A random epoch stored next to the counters is part of every ETag, so a
+flushed or restarted cache cannot make an old ETag match again.
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+logger = logging.getLogger(__name__)
+
+EPOCH_KEY = 'changes:epoch'
+USER_TOPICS = ('documents', 'tasks', 'notifications')
+GLOBAL_TOPICS = ('dashboard', 'scheduler')
+TOPICS = USER_TOPICS + GLOBAL_TOPICS
+
+DEFAULTS = {
+    'MAX_WAIT_SECONDS': 25,
+    'POLL_INTERVAL_SECONDS': 1.0,
+    'MAX_WAITERS': 4,  # Long-polls held at once per process
+}
+
+
+def change_feed_setting(name):
+    return getattr(settings, 'CHANGE_FEED', {}).get(name, DEFAULTS[name])
+
+
+class ChangeFeedService:
+    """Version counters per topic, bumped on commit and read with one cache round trip."""
+
+    def __init__(self):
+        self._waiters = threading.BoundedSemaphore(change_feed_setting('MAX_WAITERS'))
+
+    @staticmethod
+    def _key(topic, user_id=None):
+        return f'changes:{topic}' if topic in GLOBAL_TOPICS else f'changes:{topic}:{user_id}'
+
+    def touch(self, topic, users=()):
+        """Bump a topic once the current transaction commits (per user for user topics)."""
+        if topic in GLOBAL_TOPICS:
+            keys = [self._key(topic)]
+        else:
+            keys = [self._key(topic, user_id) for user_id in set(users) if user_id]
+        if keys:
+            transaction.on_commit(lambda: self._bump(keys))
+
+    def _bump(self, keys):
+        try:
+            for key in keys:
+                try:
+                    cache.incr(key)
+                except ValueError:  # First change of this topic
+                    if not cache.add(key, 1, timeout=None):
+                        cache.incr(key)
+        except Exception as e:
+            # Pollers fall back to the next topic change or ETag time bucket
+            logger.warning(f"Change feed bump failed for {keys}: {e}")
+
+    def versions(self, user, topics=TOPICS):
+        """Current counters of ``topics`` for ``user`` plus the epoch."""
+        keys = {topic: self._key(topic, user.pk) for topic in topics}
+        values = cache.get_many([EPOCH_KEY, *keys.values()])
+        epoch = values.get(EPOCH_KEY)
+        if epoch is None:
+            cache.add(EPOCH_KEY, uuid.uuid4().hex[:12], timeout=None)
+            epoch = cache.get(EPOCH_KEY)
+        versions = {topic: values.get(key, 0) for topic, key in keys.items()}
+        versions['epoch'] = epoch
+        return versions
+
+    @staticmethod
+    def etag(user, versions, topics, ttl=None):
+        """
+        Quoted ETag over the versions of ``topics``.
+
+        ``ttl`` adds a time bucket for responses that also change with the
+        clock alone (e.g. counts over the last 24 hours).
+        """
+        parts = [str(versions['epoch']), str(user.pk)]
+        parts += [f'{topic}:{versions[topic]}' for topic in topics]
+        if ttl:
+            parts.append(f'@{int(time.time() // ttl)}')
+        return '"%s"' % hashlib.sha1('|'.join(parts).encode()).hexdigest()[:20]
+
+    def wait(self, user, topics, etag, timeout, ttl=None):
+        """
+        Block until the ETag of ``topics`` differs from ``etag`` or ``timeout`` passes.
+
+        Returns the versions seen last, or None when too many requests of
+        this process are already waiting.
+        """
+        if not self._waiters.acquire(blocking=False):
+            return None
+        try:
+            interval = change_feed_setting('POLL_INTERVAL_SECONDS')
+            deadline = time.monotonic() + timeout
+            while True:
+                versions = self.versions(user, topics)
+                if self.etag(user, versions, topics, ttl) != etag or time.monotonic() >= deadline:
+                    return versions
+                time.sleep(min(interval, max(deadline - time.monotonic(), 0)))
+        finally:
+            self._waiters.release()
+
+
+# Service instance
+change_feed = ChangeFeedService()
+
+
+def _client_etags(request):
+    # Weak comparison: proxies that compress responses (nginx gzip) weaken ETags
+    return {tag[2:] if tag.startswith('W/') else tag for tag in parse_etags(request.headers.get('If-None-Match', ''))}
+
+
+def conditional_on_changes(*topics, ttl=None):
+    """
+    Serve a polled GET view conditionally on change feed topics.
+
+    The ETag is computed before the view runs, so a change committed while
+    the response is built yields a newer ETag on the next poll.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                versions = change_feed.versions(request.user, topics)
+                etag = change_feed.etag(request.user, versions, topics, ttl)
+            except Exception as e:
+                logger.warning(f"Change feed unavailable, serving {request.path} unconditionally: {e}")
+                return view(request, *args, **kwargs)
+
+            if etag in _client_etags(request):
+                response = HttpResponseNotModified()
+            else:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            response['ETag'] = etag
+            response['Cache-Control'] = 'private, no-cache'
+            return response
+        return wrapper
+    return decorator
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def changes(request):
+    """
+    Change feed versions for the current user.
+
+    Query parameters:
+        topics: comma separated subset of TOPICS (default: all)
+        wait: seconds to hold the request while the ETag still matches
+              ``If-None-Match`` (long-poll, capped by MAX_WAIT_SECONDS)
+    """
+    requested = [t for t in request.query_params.get('topics', '').split(',') if t]
+    unknown = set(requested) - set(TOPICS)
+    if unknown:
+        return Response({'error': f"Unknown topics: {', '.join(sorted(unknown))}"}, status=400)
+    topics = tuple(requested) or TOPICS
+    try:
+        wait = min(max(float(request.query_params.get('wait', 0)), 0), change_feed_setting('MAX_WAIT_SECONDS'))
+    except ValueError:
+        return Response({'error': 'wait must be a number of seconds'}, status=400)
+
+    user = request.user
+    versions = change_feed.versions(user, topics)
+    etag = change_feed.etag(user, versions, topics)
+    client_etags = _client_etags(request)
+
+    if etag in client_etags and wait:
+        versions = change_feed.wait(user, topics, etag, wait)
+        if versions is None:
+            response = HttpResponseNotModified()
+            response['ETag'] = etag
+            response['Retry-After'] = str(int(change_feed_setting('MAX_WAIT_SECONDS')))
+            return response
+        etag = change_feed.etag(user, versions, topics)
+
+    if etag in client_etags:
+        response = HttpResponseNotModified()
+    else:
+        response = Response({
+            'versions': {topic: versions[topic] for topic in topics},
+            'etag': etag,
+        })
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+# ============================================================================
+# Signal receivers
+# ============================================================================
+
+def _document_changed(sender, instance, **kwargs):
+    change_feed.touch('documents', [instance.author_id, instance.reviewer_id, instance.approver_id])
+    change_feed.touch('dashboard')
+
+
+def _workflow_changed(sender, instance, **kwargs):
+    # Task lists also show the workflows of the user's own documents
+    document = instance.document
+    change_feed.touch('tasks', [
+        instance.current_assignee_id, document.author_id, document.reviewer_id, document.approver_id,
+    ])
+    change_feed.touch('dashboard')
+
+
+def _notification_changed(sender, instance, **kwargs):
+    change_feed.touch('notifications', [instance.recipient_id])
+
+
+def _dashboard_changed(sender, **kwargs):
+    change_feed.touch('dashboard')
+
+
+def _task_finished(sender=None, **kwargs):
+    change_feed.touch('scheduler')
+
+
+def connect_change_signals():
+    from celery.signals import task_postrun
+    from django.contrib.auth import get_user_model
+    from django.db.models.signals import post_delete, post_save
+
+    from apps.audit.models import AuditTrail, LoginAudit
+    from apps.documents.models import Document
+    from apps.workflows.models import DocumentWorkflow, WorkflowNotification
+
+    for signal in (post_save, post_delete):
+        signal.connect(_document_changed, sender=Document, dispatch_uid=f'change_feed_document_{signal is post_save}')
+        signal.connect(_workflow_changed, sender=DocumentWorkflow, dispatch_uid=f'change_feed_workflow_{signal is post_save}')
+        signal.connect(_dashboard_changed, sender=get_user_model(), dispatch_uid=f'change_feed_user_{signal is post_save}')
+    post_save.connect(_notification_changed, sender=WorkflowNotification, dispatch_uid='change_feed_notification')
+    post_save.connect(_dashboard_changed, sender=AuditTrail, dispatch_uid='change_feed_audit')
+    post_save.connect(_dashboard_changed, sender=LoginAudit, dispatch_uid='change_feed_login')
+    task_postrun.connect(_task_finished, weak=False, dispatch_uid='change_feed_task_postrun')
@@ -9,8 +9,11 @@ from rest_framework.response import Response
 from rest_framework import permissions, status
 from rest_framework.throttling import UserRateThrottle
 from django.utils import timezone
-from datetime import timedelta
 from django.db import connection
+from django.utils.decorators import method_decorator
+
+from .change_feed import conditional_on_changes
+from .dashboard_store import dashboard_store
 
 
 class DashboardStatsView(APIView):
@@ -20,71 +23,36 @@ class DashboardStatsView(APIView):
     throttle_classes = [UserRateThrottle]
     
     def get(self, request):
-        """Get real-time dashboard statistics."""
+        """
+        Get dashboard statistics.
+
+        Counters are served from the materialized store; ``?fresh=1``
+        recomputes them exactly from the database instead.
+        """
+        if request.query_params.get('fresh') in ('1', 'true'):
+            return self._respond(dashboard_store.compute, source='fresh')
+        return self._materialized(request)
+
+    # Reconciliation bumps the dashboard topic when the 24-hour counts move
+    @method_decorator(conditional_on_changes('dashboard'))
+    def _materialized(self, request):
+        return self._respond(dashboard_store.snapshot, source='materialized')
+
+    def _respond(self, load_stats, source):
         try:
-            # Get statistics using direct database queries to avoid serializer dependencies
+            stats = load_stats()
+            
+            # Recent activity (last 5 audit entries)
             with connection.cursor() as cursor:
-                # Active users count
-                cursor.execute("SELECT COUNT(*) FROM users WHERE is_active = true")
-                active_users_count = cursor.fetchone()[0]
-                
-                # Active workflows count - FIXED: use correct table name
-                cursor.execute("""
-                    SELECT COUNT(*) FROM document_workflows 
-                    WHERE is_terminated = false
-                """)
-                active_workflows_count = cursor.fetchone()[0]
-                
-                # Placeholders count - FIXED: use correct table name for production
-                cursor.execute("SELECT COUNT(*) FROM placeholder_definitions")
-                placeholders_count = cursor.fetchone()[0]
-                
-                # Audit entries in last 24 hours
-                twenty_four_hours_ago = timezone.now() - timedelta(hours=24)
-                cursor.execute(
-                    "SELECT COUNT(*) FROM audit_trail WHERE timestamp >= %s",
-                    [twenty_four_hours_ago]
-                )
-                audit_entries_24h = cursor.fetchone()[0]
-                
-                # Total documents count
-                cursor.execute("SELECT COUNT(*) FROM documents")
-                total_documents_count = cursor.fetchone()[0]
-                
-                # Pending reviews count (documents in review state)
-                cursor.execute("""
-                    SELECT COUNT(*) FROM documents 
-                    WHERE status IN ('PENDING_REVIEW', 'UNDER_REVIEW')
-                """)
-                pending_reviews_count = cursor.fetchone()[0]
-                
-                # Recent activity (last 5 audit entries)
                 cursor.execute("""
                     SELECT uuid, action, object_representation, description, timestamp, user_display_name 
                     FROM audit_trail 
                     ORDER BY timestamp DESC 
                     LIMIT 5
                 """)
-                
                 recent_activities = cursor.fetchall()
                 
-                # Calculate stat cards data INSIDE the with block
-                # 1. Total Documents - already have it
-                # 2. Documents Needing Action
-                cursor.execute("""
-                    SELECT COUNT(*) FROM documents 
-                    WHERE status IN ('PENDING_REVIEW', 'PENDING_APPROVAL', 'UNDER_REVIEW')
-                """)
-                documents_needing_action = cursor.fetchone()[0]
-                
-                # 3. Active Users (24h) - users who logged in within last 24 hours
-                cursor.execute("""
-                    SELECT COUNT(DISTINCT user_id) FROM login_audit 
-                    WHERE timestamp >= %s AND success = true
-                """, [twenty_four_hours_ago])
-                active_users_24h = cursor.fetchone()[0]
-                
-            # 4. System Health (outside cursor block is fine)
+            # System Health
             system_health = 'healthy'  # If we got here, system is operational
             
             activity_list = []
@@ -102,20 +70,22 @@ class DashboardStatsView(APIView):
                 activity_list.append(activity_item)
             
             return Response({
-                'total_documents': total_documents_count,
-                'pending_reviews': pending_reviews_count,
-                'active_workflows': active_workflows_count,
-                'active_users': active_users_count,
-                'placeholders': placeholders_count,
-                'audit_entries_24h': audit_entries_24h,
+                'total_documents': stats['total_documents'],
+                'pending_reviews': stats['pending_reviews'],
+                'active_workflows': stats['active_workflows'],
+                'active_users': stats['active_users'],
+                'placeholders': stats['placeholders'],
+                'audit_entries_24h': stats['audit_entries_24h'],
                 'recent_activity': activity_list,
                 # New stat cards
                 'stat_cards': {
-                    'total_documents': total_documents_count,
-                    'documents_needing_action': documents_needing_action,
-                    'active_users_24h': active_users_24h,
+                    'total_documents': stats['total_documents'],
+                    'documents_needing_action': stats['documents_needing_action'],
+                    'active_users_24h': stats['active_users_24h'],
                     'system_health': system_health
                 },
+                'source': source,
+                'reconciled_at': stats.get('reconciled_at'),
                 'timestamp': timezone.now().isoformat(),
                 'cache_duration': 300  # 5 minutes cache suggestion
             })
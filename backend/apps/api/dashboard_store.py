@@ -0,0 +1,208 @@
+"""
+Materialized dashboard statistics.
+
+The dashboard counters live in the cache (Redis in production) under
+``dashboard:stats:<name>``. Counts of current state (documents, documents
+awaiting review or approval, active workflows and users, placeholders) are
+adjusted by model signals after the writing transaction commits. Counts over
+the last 24 hours cannot be maintained incrementally and are recomputed by
+``reconcile``, which the ``reconcile_dashboard_stats`` Celery task runs every
+five minutes; it also corrects drift from bulk ``update()`` calls that send
+no signals.
+
+``snapshot`` answers the dashboard with one cache read. A missing counter
+(cache flush, first request) triggers a reconciliation instead of serving
+partial numbers, and ``compute`` gives the exact values for ``?fresh=1``.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .change_feed import change_feed
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'dashboard:stats:'
+RECONCILED_AT_KEY = f'{KEY_PREFIX}reconciled_at'
+
+REVIEW_STATUSES = frozenset({'PENDING_REVIEW', 'UNDER_REVIEW'})
+ACTION_STATUSES = REVIEW_STATUSES | {'PENDING_APPROVAL'}
+
+# Maintained from signals
+COUNTERS = (
+    'total_documents',
+    'pending_reviews',
+    'documents_needing_action',
+    'active_workflows',
+    'active_users',
+    'placeholders',
+)
+# Recomputed on reconciliation only
+WINDOWED = ('audit_entries_24h', 'active_users_24h')
+STATS = COUNTERS + WINDOWED
+
+
+def _status_deltas(status, sign):
+    deltas = {}
+    if status in REVIEW_STATUSES:
+        deltas['pending_reviews'] = sign
+    if status in ACTION_STATUSES:
+        deltas['documents_needing_action'] = sign
+    return deltas
+
+
+class DashboardStatsStore:
+    """Dashboard counters kept in the cache and reconciled periodically."""
+
+    @staticmethod
+    def _key(name):
+        return f'{KEY_PREFIX}{name}'
+
+    def compute(self):
+        """Exact statistics from the database."""
+        from django.contrib.auth import get_user_model
+
+        from apps.audit.models import AuditTrail, LoginAudit
+        from apps.documents.models import Document
+        from apps.placeholders.models import PlaceholderDefinition
+        from apps.workflows.models import DocumentWorkflow
+
+        since = timezone.now() - timedelta(hours=24)
+        stats = Document.objects.aggregate(
+            total_documents=Count('id'),
+            pending_reviews=Count('id', filter=Q(status__in=REVIEW_STATUSES)),
+            documents_needing_action=Count('id', filter=Q(status__in=ACTION_STATUSES)),
+        )
+        stats['active_workflows'] = DocumentWorkflow.objects.filter(is_terminated=False).count()
+        stats['active_users'] = get_user_model().objects.filter(is_active=True).count()
+        stats['placeholders'] = PlaceholderDefinition.objects.count()
+        stats['audit_entries_24h'] = AuditTrail.objects.filter(timestamp__gte=since).count()
+        stats['active_users_24h'] = LoginAudit.objects.filter(
+            timestamp__gte=since, success=True
+        ).values('user').distinct().count()
+        return stats
+
+    def reconcile(self):
+        """Overwrite the stored counters with exact values; returns them."""
+        stats = self.compute()
+        stored = cache.get_many([self._key(name) for name in STATS])
+        reconciled_at = timezone.now().isoformat()
+        cache.set_many({self._key(name): value for name, value in stats.items()}, timeout=None)
+        cache.set(RECONCILED_AT_KEY, reconciled_at, timeout=None)
+
+        changed = {name for name, value in stats.items() if stored.get(self._key(name)) != value}
+        if changed:
+            drift = {
+                name: stats[name] - stored[self._key(name)]
+                for name in changed - set(WINDOWED) if self._key(name) in stored
+            }
+            if drift:
+                logger.info(f"Dashboard counters corrected: {drift}")
+            change_feed.touch('dashboard')
+        return dict(stats, reconciled_at=reconciled_at)
+
+    def snapshot(self):
+        """Stored statistics with their last reconciliation time."""
+        keys = [self._key(name) for name in STATS] + [RECONCILED_AT_KEY]
+        values = cache.get_many(keys)
+        if len(values) < len(keys):
+            return self.reconcile()
+        stats = {name: values[self._key(name)] for name in STATS}
+        stats['reconciled_at'] = values[RECONCILED_AT_KEY]
+        return stats
+
+    def adjust(self, **deltas):
+        """Apply counter deltas once the current transaction commits."""
+        deltas = {name: delta for name, delta in deltas.items() if delta}
+        if deltas:
+            transaction.on_commit(lambda: self._apply(deltas))
+
+    def _apply(self, deltas):
+        for name, delta in deltas.items():
+            try:
+                cache.incr(self._key(name), delta)
+            except ValueError:
+                pass  # Not materialized yet; the next snapshot reconciles
+            except Exception as e:
+                logger.warning(f"Dashboard counter {name} not updated, left for reconciliation: {e}")
+
+
+# Service instance
+dashboard_store = DashboardStatsStore()
+
+
+# ============================================================================
+# Signal receivers
+# ============================================================================
+
+def _document_saved(sender, instance, created, **kwargs):
+    if created:
+        dashboard_store.adjust(total_documents=1, **_status_deltas(instance.status, 1))
+        return
+    change = instance.field_changes.get('status')
+    if change:
+        deltas = _status_deltas(change[0], -1)
+        for name, delta in _status_deltas(change[1], 1).items():
+            deltas[name] = deltas.get(name, 0) + delta
+        dashboard_store.adjust(**deltas)
+
+
+def _document_deleted(sender, instance, **kwargs):
+    dashboard_store.adjust(total_documents=-1, **_status_deltas(instance.status, -1))
+
+
+def _user_saved(sender, instance, created, **kwargs):
+    if created:
+        dashboard_store.adjust(active_users=1 if instance.is_active else 0)
+    elif 'is_active' in instance.field_changes:
+        dashboard_store.adjust(active_users=1 if instance.is_active else -1)
+
+
+def _user_deleted(sender, instance, **kwargs):
+    dashboard_store.adjust(active_users=-1 if instance.is_active else 0)
+
+
+def _workflow_saved(sender, instance, created, **kwargs):
+    # Counted while not terminated
+    if created:
+        dashboard_store.adjust(active_workflows=0 if instance.is_terminated else 1)
+    elif 'is_terminated' in instance.field_changes:
+        dashboard_store.adjust(active_workflows=-1 if instance.is_terminated else 1)
+
+
+def _workflow_deleted(sender, instance, **kwargs):
+    dashboard_store.adjust(active_workflows=0 if instance.is_terminated else -1)
+
+
+def _placeholder_saved(sender, instance, created, **kwargs):
+    if created:
+        dashboard_store.adjust(placeholders=1)
+
+
+def _placeholder_deleted(sender, instance, **kwargs):
+    dashboard_store.adjust(placeholders=-1)
+
+
+def connect_dashboard_signals():
+    from django.contrib.auth import get_user_model
+    from django.db.models.signals import post_delete, post_save
+
+    from apps.documents.models import Document
+    from apps.placeholders.models import PlaceholderDefinition
+    from apps.workflows.models import DocumentWorkflow
+
+    receivers = [
+        (Document, _document_saved, _document_deleted),
+        (DocumentWorkflow, _workflow_saved, _workflow_deleted),
+        (get_user_model(), _user_saved, _user_deleted),
+        (PlaceholderDefinition, _placeholder_saved, _placeholder_deleted),
+    ]
+    for model, saved, deleted in receivers:
+        name = model._meta.model_name
+        post_save.connect(saved, sender=model, dispatch_uid=f'dashboard_stats_{name}_saved')
+        post_delete.connect(deleted, sender=model, dispatch_uid=f'dashboard_stats_{name}_deleted')
@@ -0,0 +1,66 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:25
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APIKey',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('name', models.CharField(max_length=200)),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('permissions', models.JSONField(default=list, help_text='List of permissions for this API key')),
+                ('allowed_endpoints', models.JSONField(blank=True, default=list, help_text='Specific endpoints this key can access')),
+                ('is_active', models.BooleanField(default=True)),
+                ('rate_limit', models.PositiveIntegerField(default=1000, help_text='Requests per hour limit')),
+                ('usage_count', models.PositiveIntegerField(default=0)),
+                ('last_used', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='created_api_keys', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'API Key',
+                'verbose_name_plural': 'API Keys',
+                'db_table': 'api_keys',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='APIUsageLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('endpoint', models.CharField(max_length=500)),
+                ('method', models.CharField(max_length=10)),
+                ('status_code', models.PositiveIntegerField()),
+                ('response_time', models.FloatField(help_text='Response time in seconds')),
+                ('ip_address', models.GenericIPAddressField()),
+                ('user_agent', models.TextField(blank=True)),
+                ('request_id', models.CharField(blank=True, max_length=36)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('api_key', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='usage_logs', to='api.apikey')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='api_usage_logs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'API Usage Log',
+                'verbose_name_plural': 'API Usage Logs',
+                'db_table': 'api_usage_logs',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['endpoint', 'created_at'], name='api_usage_l_endpoin_06771f_idx'), models.Index(fields=['user', 'created_at'], name='api_usage_l_user_id_ec87c0_idx'), models.Index(fields=['api_key', 'created_at'], name='api_usage_l_api_key_288890_idx'), models.Index(fields=['ip_address'], name='api_usage_l_ip_addr_bfb878_idx')],
+            },
+        ),
+    ]
@@ -5,17 +5,28 @@ Quick implementation of missing endpoints for the news feed.
 """
 
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db import models
 from django.utils import timezone
 from datetime import timedelta
 
+from .change_feed import conditional_on_changes
+
+
+class NewsFeedPagination(PageNumberPagination):
+    """Pagination for news feed lists."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_on_changes('documents')
 def my_documents(request):
-    """Get user's documents for news feed."""
+    """Get user's documents for news feed (paginated, most recently updated first)."""
     try:
         from apps.documents.models import Document
         user = request.user
@@ -25,11 +36,14 @@ def my_documents(request):
             models.Q(author=user) | 
             models.Q(reviewer=user) | 
             models.Q(approver=user)
-        ).distinct()
+        ).select_related('author', 'reviewer', 'approver').order_by('-updated_at', '-id')
+        
+        paginator = NewsFeedPagination()
+        page = paginator.paginate_queryset(docs, request)
         
         # Convert to list format expected by news feed
         doc_list = []
-        for doc in docs:
+        for doc in page:
             doc_list.append({
                 'id': doc.id,
                 'document_number': doc.document_number,
@@ -42,7 +56,7 @@ def my_documents(request):
                 'approver': {'id': doc.approver.id, 'username': doc.approver.username} if doc.approver else None
             })
         
-        return Response(doc_list)
+        return paginator.get_paginated_response(doc_list)
         
     except Exception as e:
         return Response({'error': str(e)}, status=500)
@@ -50,6 +64,7 @@ def my_documents(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_on_changes('tasks')
 def my_tasks(request):
     """Get user's workflow tasks for news feed."""
     try:
@@ -121,6 +136,7 @@ def recent_notifications(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_on_changes('dashboard', 'scheduler', ttl=300)
 def system_status(request):
     """Get system status for news feed."""
     try:
@@ -0,0 +1,26 @@
+"""
+Celery tasks for the API app.
+
+Tasks are automatically discovered by Celery's autodiscover_tasks().
+"""
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+
+@shared_task
+def reconcile_dashboard_stats():
+    """
+    Recompute the materialized dashboard statistics and correct drift.
+
+    Runs every five minutes via Celery Beat.
+    """
+    from .dashboard_store import dashboard_store
+
+    try:
+        return dashboard_store.reconcile()
+    except Exception as e:
+        logger.error(f"Dashboard statistics reconciliation failed: {str(e)}")
+        raise
@@ -0,0 +1,131 @@
+"""
+Change feed tests
+
+Version counters bumped on commit, conditional GETs answered from the
+cache alone, and long-polls on the change feed endpoint.
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient, APIRequestFactory, force_authenticate
+
+from apps.api import change_feed as change_feed_module
+from apps.api.change_feed import ChangeFeedService, change_feed
+from apps.api.news_feed_views import my_tasks
+from apps.documents.models import Document, DocumentSource, DocumentType
+from apps.workflows.models import DocumentState, DocumentWorkflow
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestChangeFeed:
+    """Conditional polling against the change feed counters"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='poller', password='test123')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_touch_bumps_after_commit_only(self, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            change_feed.touch('tasks', [self.user.pk])
+            assert change_feed.versions(self.user, ['tasks'])['tasks'] == 0
+
+        assert len(callbacks) == 1
+        assert change_feed.versions(self.user, ['tasks'])['tasks'] == 1
+
+    def test_unchanged_poll_is_304_without_queries(self, django_assert_num_queries):
+        first = self.client.get('/api/v1/workflows/tasks/summary/')
+        etag = first['ETag']
+        assert first.status_code == 200
+
+        with django_assert_num_queries(0):
+            again = self.client.get('/api/v1/workflows/tasks/summary/', HTTP_IF_NONE_MATCH=f'W/{etag}')
+        assert again.status_code == 304
+
+        change_feed._bump([change_feed._key('tasks', self.user.pk)])
+        changed = self.client.get('/api/v1/workflows/tasks/summary/', HTTP_IF_NONE_MATCH=etag)
+        assert changed.status_code == 200
+        assert changed['ETag'] != etag
+
+    def test_cache_flush_invalidates_etags(self):
+        etag = self.client.get('/api/v1/changes/')['ETag']
+        cache.clear()
+
+        response = self.client.get('/api/v1/changes/', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.data['versions']['tasks'] == 0
+
+    def test_long_poll_returns_when_topic_changes(self, monkeypatch):
+        etag = self.client.get('/api/v1/changes/?topics=tasks')['ETag']
+        sleeps = []
+
+        def sleep(seconds):
+            # Another process commits a change while the request waits
+            sleeps.append(seconds)
+            change_feed._bump([change_feed._key('tasks', self.user.pk)])
+
+        monkeypatch.setattr(change_feed_module.time, 'sleep', sleep)
+        response = self.client.get('/api/v1/changes/?topics=tasks&wait=20', HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert response.data['versions'] == {'tasks': 1}
+        assert len(sleeps) == 1
+
+    def test_long_poll_times_out_and_respects_waiter_limit(self, settings, monkeypatch):
+        settings.CHANGE_FEED = {'POLL_INTERVAL_SECONDS': 0.01}
+        etag = self.client.get('/api/v1/changes/')['ETag']
+
+        timed_out = self.client.get('/api/v1/changes/?wait=0.05', HTTP_IF_NONE_MATCH=etag)
+        assert timed_out.status_code == 304
+
+        busy = ChangeFeedService()
+        while busy._waiters.acquire(blocking=False):  # Every long-poll slot taken
+            pass
+        monkeypatch.setattr(change_feed_module, 'change_feed', busy)
+        rejected = self.client.get('/api/v1/changes/?wait=20', HTTP_IF_NONE_MATCH=etag)
+
+        assert rejected.status_code == 304
+        assert rejected['Retry-After'] == '25'
+
+    def test_unknown_topic_is_rejected(self):
+        assert self.client.get('/api/v1/changes/?topics=tasks,everything').status_code == 400
+
+    def test_task_feed_revalidates_on_workflows_of_own_documents(self, django_capture_on_commit_callbacks):
+        factory = APIRequestFactory()
+
+        def poll(**headers):
+            request = factory.get('/news-feed/my-tasks/', **headers)
+            force_authenticate(request, user=self.user)
+            return my_tasks(request)
+
+        etag = poll()['ETag']
+        assert poll(HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        assignee = User.objects.create_user(username='assignee', password='test123')
+        document = Document.objects.create(
+            title='Polled Procedure',
+            document_type=DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.user),
+            document_source=DocumentSource.objects.create(name='Digital', source_type='original_digital'),
+            author=self.user,
+        )
+        with django_capture_on_commit_callbacks(execute=True):
+            DocumentWorkflow.objects.create(
+                document=document,
+                current_state=DocumentState.objects.create(code='PENDING_REVIEW', name='Pending Review'),
+                initiated_by=self.user,
+                current_assignee=assignee,
+            )
+
+        response = poll(HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert [task['document']['title'] for task in response.data] == ['Polled Procedure']
@@ -0,0 +1,99 @@
+"""
+Materialized dashboard statistics tests
+
+Counters follow document, workflow and user changes on commit, the
+dashboard answers from the store, and reconciliation corrects drift.
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from apps.api.dashboard_store import COUNTERS, dashboard_store
+from apps.api.tasks import reconcile_dashboard_stats
+from apps.documents.models import Document, DocumentSource, DocumentType
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    cache.clear()
+
+
+def _counters(stats):
+    return {name: stats[name] for name in COUNTERS}
+
+
+@pytest.mark.django_db
+class TestDashboardStore:
+    """Dashboard counters maintained incrementally"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='dashboard_user', password='test123')
+        self.doc_type = DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.user)
+        self.doc_source = DocumentSource.objects.create(name='Digital', source_type='original_digital')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _create_document(self, status='DRAFT'):
+        return Document.objects.create(
+            title='Dashboard Procedure',
+            document_type=self.doc_type,
+            document_source=self.doc_source,
+            author=self.user,
+            status=status,
+        )
+
+    def test_counters_follow_committed_changes(self, django_capture_on_commit_callbacks):
+        self._create_document()
+        dashboard_store.reconcile()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            document = self._create_document()
+            document.status = 'PENDING_REVIEW'
+            document.save()
+            self._create_document(status='PENDING_APPROVAL').delete()
+            User.objects.create_user(username='inactive_user', password='test123', is_active=False)
+            self.user.is_active = False
+            self.user.save()
+
+        stored = dashboard_store.snapshot()
+        assert _counters(stored) == _counters(dashboard_store.compute())
+        assert stored['total_documents'] == 2
+        assert stored['pending_reviews'] == 1
+        assert stored['active_users'] == 0
+
+    def test_dashboard_answers_from_store(self, django_assert_num_queries):
+        self._create_document(status='UNDER_REVIEW')
+        self.client.get('/api/v1/dashboard/stats/')  # Materializes the counters
+
+        with django_assert_num_queries(1):  # Recent activity only
+            response = self.client.get('/api/v1/dashboard/stats/')
+
+        assert response.status_code == 200
+        assert response.data['source'] == 'materialized'
+        assert response.data['pending_reviews'] == 1
+        assert response.data['stat_cards']['documents_needing_action'] == 1
+
+    def test_reconciliation_corrects_bulk_updates(self):
+        document = self._create_document()
+        dashboard_store.reconcile()
+        Document.objects.filter(pk=document.pk).update(status='PENDING_APPROVAL')  # No signals
+
+        assert dashboard_store.snapshot()['documents_needing_action'] == 0
+        fresh = self.client.get('/api/v1/dashboard/stats/?fresh=1')
+        assert fresh.data['source'] == 'fresh'
+        assert fresh.data['stat_cards']['documents_needing_action'] == 1
+
+        reconcile_dashboard_stats()
+        assert dashboard_store.snapshot()['documents_needing_action'] == 1
+
+    def test_cache_flush_recomputes(self):
+        self._create_document()
+        dashboard_store.reconcile()
+        cache.clear()
+
+        assert dashboard_store.snapshot()['total_documents'] == 1
@@ -83,15 +83,21 @@ def run_daily_integrity_check():
         checksum_mismatches = 0
         verified = 0
         
+        # Documents sharing a content blob share a file; hash each file once
+        checksums_by_path = {}
+        
         for doc in documents[:100]:  # Check first 100 for performance
             if doc.file_path:
                 import os
-                if not os.path.exists(doc.file_path):
+                full_path = doc.full_file_path
+                if not full_path or not os.path.exists(full_path):
                     missing_files += 1
                 elif doc.file_checksum:
                     # Actually verify checksum
                     try:
-                        if doc.verify_file_integrity():
+                        if doc.file_path not in checksums_by_path:
+                            checksums_by_path[doc.file_path] = doc.calculate_file_checksum()
+                        if checksums_by_path[doc.file_path] == doc.file_checksum:
                             verified += 1
                         else:
                             checksum_mismatches += 1
@@ -103,6 +109,7 @@ def run_daily_integrity_check():
         doc_check.findings = {
             'total_documents': total_docs,
             'checked_documents': min(100, total_docs),
+            'distinct_files_hashed': len(checksums_by_path),
             'verified': verified,
             'missing_files': missing_files,
             'checksum_mismatches': checksum_mismatches
@@ -6,7 +6,7 @@ for compliance with 21 CFR Part 11 requirements.
 """
 
 import json
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models.signals import post_save, post_delete
 from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
@@ -15,34 +15,16 @@ from django.forms.models import model_to_dict
 
 from .services import audit_service
 from .middleware import get_current_audit_context
-from apps.documents.models import Document, DocumentVersion
+from apps.documents.models import Document
 # from apps.security.models import ElectronicSignature  # TODO: Check if this model exists
 # from apps.workflows.models import WorkflowInstance, WorkflowTransition, WorkflowTask  # Disabled temporarily
-from apps.users.models import UserRole, Role
+from apps.users.models import UserRole
 
 User = get_user_model()
 
 
-# Store original values for comparison in post_save
-_pre_save_instances = {}
-
-
-@receiver(pre_save)
-def store_original_instance(sender, instance, **kwargs):
-    """Store original instance values before save for audit comparison."""
-    # Only track specific models that require audit trail
-    audit_models = [
-        Document, DocumentVersion,
-        # ElectronicSignature, WorkflowInstance, WorkflowTransition, WorkflowTask,  # Disabled
-        User, UserRole, Role
-    ]
-    
-    if sender in audit_models and instance.pk:
-        try:
-            original = sender.objects.get(pk=instance.pk)
-            _pre_save_instances[f"{sender.__name__}_{instance.pk}"] = model_to_dict(original)
-        except sender.DoesNotExist:
-            pass  # New instance
+# Original values come from the snapshot taken when the instance was loaded
+# (apps.core.change_capture.ChangeCaptureMixin), not from a pre_save re-fetch.
 
 
 @receiver(post_save, sender=Document)
@@ -67,19 +49,21 @@ def audit_document_changes(sender, instance, created, **kwargs):
             }
         )
     else:
-        # Get original values for comparison
-        key = f"Document_{instance.pk}"
-        old_values = _pre_save_instances.get(key, {})
+        # Compare against the values the document was loaded with
+        changes = instance.field_changes
+        if not changes:
+            return
         new_values = model_to_dict(instance)
-        
-        # Find changed fields
+        old_values = dict(new_values)
         changed_fields = {}
-        for field, new_value in new_values.items():
-            old_value = old_values.get(field)
-            if old_value != new_value:
+        names = {field.attname: field.name for field in Document._meta.concrete_fields}
+        for attname, (old_value, new_value) in changes.items():
+            field = names[attname]
+            if field in new_values:
+                old_values[field] = old_value
                 changed_fields[field] = {
                     'old': old_value,
-                    'new': new_value
+                    'new': new_values[field]
                 }
         
         if changed_fields:
@@ -103,10 +87,6 @@ def audit_document_changes(sender, instance, created, **kwargs):
                 old_values=old_values,
                 new_values=new_values
             )
-        
-        # Clean up stored values
-        if key in _pre_save_instances:
-            del _pre_save_instances[key]
 
 
 @receiver(post_delete, sender=Document)
@@ -174,10 +154,9 @@ def audit_workflow_changes(sender, instance, created, **kwargs):
         )
     else:
         # Check for state changes
-        key = f"WorkflowInstance_{instance.pk}"
-        old_values = _pre_save_instances.get(key, {})
+        old_values = {name: old for name, (old, new) in getattr(instance, 'field_changes', {}).items()}
         
-        if old_values.get('state') != str(instance.state):
+        if 'state' in old_values:
             audit_service.log_workflow_event(
                 workflow_instance=instance,
                 event_type='WORKFLOW_TRANSITION',
@@ -189,10 +168,6 @@ def audit_workflow_changes(sender, instance, created, **kwargs):
                     'current_assignee': instance.current_assignee.username if instance.current_assignee else None
                 }
             )
-        
-        # Clean up stored values
-        if key in _pre_save_instances:
-            del _pre_save_instances[key]
 
 
 #@receiver(post_save, sender=WorkflowTransition) # Disabled
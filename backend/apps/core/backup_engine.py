@@ -0,0 +1,535 @@
+"""
+Incremental, content-addressed backup engine for EDMS storage.
+
+Files under the storage root are split into fixed-size chunks, each stored
+once in the repository under the SHA-256 of its content. Every run writes a
+snapshot manifest listing each file's checksum, size and chunk list, so a
+snapshot can be restored on its own even though it only uploaded what was
+new since the previous one.
+
+Unchanged files are detected without reading them: document files whose
+SHA-256 is already tracked by the database (content blobs, documents and
+versions) and files whose size and modification time match the previous
+snapshot reuse that snapshot's chunk list.
+
+Repository layout (local directory target)::
+
+    repository/
+        config.json
+        objects/ab/cd/<chunk sha256>
+        snapshots/<snapshot id>.json
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+REPOSITORY_VERSION = 1
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024  # 4MB
+DEFAULT_WORKERS = 4
+DEFAULT_COMPRESSION_LEVEL = 6
+
+# One-byte object header: compressed or stored as-is (already compressed
+# formats such as PDF and DOCX rarely shrink further)
+CODEC_ZLIB = b'Z'
+CODEC_RAW = b'R'
+
+
+class BackupError(Exception):
+    """Raised when a backup repository is missing, corrupt or inconsistent."""
+
+
+def backup_setting(key, default=None):
+    return getattr(settings, 'INCREMENTAL_BACKUP', {}).get(key, default)
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class LocalRepository:
+    """Backup repository stored in a local (or mounted) directory."""
+
+    def __init__(self, root):
+        self.root = os.fspath(root)
+        self.objects_dir = os.path.join(self.root, 'objects')
+        self.snapshots_dir = os.path.join(self.root, 'snapshots')
+
+    @property
+    def config_path(self):
+        return os.path.join(self.root, 'config.json')
+
+    def exists(self):
+        return os.path.exists(self.config_path)
+
+    def init(self, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Create the repository if needed and return its configuration."""
+        if self.exists():
+            return self.config()
+        config = {
+            'version': REPOSITORY_VERSION,
+            'chunk_size': chunk_size,
+            'created_at': timezone.now().isoformat(),
+        }
+        _write_atomic(self.config_path, json.dumps(config, indent=2).encode())
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.snapshots_dir, exist_ok=True)
+        return config
+
+    def config(self):
+        if not self.exists():
+            raise BackupError(f'No backup repository at {self.root}')
+        with open(self.config_path) as f:
+            config = json.load(f)
+        if config.get('version') != REPOSITORY_VERSION:
+            raise BackupError(f"Unsupported repository version: {config.get('version')}")
+        return config
+
+    # Objects
+
+    def object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest[2:4], digest)
+
+    def has_object(self, digest):
+        return os.path.exists(self.object_path(digest))
+
+    def put_object(self, digest, payload):
+        _write_atomic(self.object_path(digest), payload)
+
+    def get_object(self, digest):
+        try:
+            with open(self.object_path(digest), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            raise BackupError(f'Missing object {digest}')
+
+    def object_digests(self):
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            for name in filenames:
+                if not name.startswith('.tmp-'):
+                    yield name
+
+    def delete_object(self, digest):
+        os.remove(self.object_path(digest))
+
+    # Snapshots
+
+    def write_snapshot(self, manifest):
+        path = os.path.join(self.snapshots_dir, f"{manifest['id']}.json")
+        _write_atomic(path, json.dumps(manifest, indent=1, sort_keys=True).encode())
+
+    def read_snapshot(self, snapshot_id):
+        path = os.path.join(self.snapshots_dir, f'{snapshot_id}.json')
+        if not os.path.exists(path):
+            raise BackupError(f'Snapshot not found: {snapshot_id}')
+        with open(path) as f:
+            return json.load(f)
+
+    def snapshot_ids(self):
+        """Snapshot ids, oldest first (ids sort chronologically)."""
+        if not os.path.isdir(self.snapshots_dir):
+            return []
+        return sorted(
+            name[:-len('.json')] for name in os.listdir(self.snapshots_dir)
+            if name.endswith('.json')
+        )
+
+
+def encode_chunk(data, level=DEFAULT_COMPRESSION_LEVEL):
+    compressed = zlib.compress(data, level)
+    if len(compressed) < len(data):
+        return CODEC_ZLIB + compressed
+    return CODEC_RAW + data
+
+
+def decode_chunk(payload):
+    codec, body = payload[:1], payload[1:]
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(body)
+    if codec == CODEC_RAW:
+        return body
+    raise BackupError(f'Unknown chunk codec {codec!r}')
+
+
+def tracked_checksums():
+    """
+    SHA-256 checksums the database already holds for stored files.
+
+    Returns:
+        Dict mapping absolute file path to hex digest
+    """
+    from apps.documents.models import ContentBlob, Document, DocumentVersion
+
+    checksums = {}
+    for path, digest in DocumentVersion.objects.exclude(file_checksum='').values_list('file_path', 'file_checksum'):
+        if path:
+            checksums[os.path.join(settings.MEDIA_ROOT, path)] = digest
+    for document in Document.objects.exclude(file_checksum='').only('file_path', 'file_checksum'):
+        if document.file_path:
+            checksums[document.full_file_path] = document.file_checksum
+    for blob in ContentBlob.objects.only('storage_path', 'sha256'):
+        # Blob rows are authoritative: their path is derived from the content
+        checksums[blob.full_file_path] = blob.sha256
+    return {os.path.normpath(path): digest for path, digest in checksums.items()}
+
+
+class BackupEngine:
+    """
+    Create, verify and restore incremental snapshots of a directory tree.
+
+    Args:
+        repository: LocalRepository holding objects and snapshots
+        workers: Number of threads compressing and writing chunks
+        compression_level: zlib level used for new chunks
+    """
+
+    def __init__(self, repository, workers=None, compression_level=None):
+        self.repository = repository
+        self.workers = workers or backup_setting('WORKERS', DEFAULT_WORKERS)
+        self.compression_level = (
+            compression_level if compression_level is not None
+            else backup_setting('COMPRESSION_LEVEL', DEFAULT_COMPRESSION_LEVEL)
+        )
+
+    # ------------------------------------------------------------------
+    # Backup
+    # ------------------------------------------------------------------
+
+    def backup(self, source_root, known_checksums=None, extra_files=None,
+               exclude=None, label='', rehash=False):
+        """
+        Back up ``source_root`` and write a snapshot manifest.
+
+        Args:
+            source_root: Directory to back up (paths are stored relative to it)
+            known_checksums: Optional mapping of absolute path to SHA-256 for
+                files whose content is already known (see ``tracked_checksums``)
+            extra_files: Optional mapping of manifest name to absolute path for
+                files outside the tree, such as a database dump
+            exclude: Directory names to skip anywhere in the tree
+            label: Free-text label stored in the manifest
+            rehash: Read every file instead of reusing unchanged entries
+
+        Returns:
+            The snapshot manifest
+        """
+        source_root = os.path.abspath(os.fspath(source_root))
+        if not os.path.isdir(source_root):
+            raise BackupError(f'Source directory not found: {source_root}')
+
+        config = self.repository.init(backup_setting('CHUNK_SIZE', DEFAULT_CHUNK_SIZE))
+        chunk_size = config['chunk_size']
+        known_checksums = known_checksums or {}
+        exclude = set(exclude or ())
+
+        parent = self._latest_manifest()
+        previous_files = parent['files'] if parent else {}
+        previous_by_checksum = {entry['sha256']: entry for entry in previous_files.values()}
+
+        stats = {
+            'files': 0, 'files_unchanged': 0, 'files_read': 0,
+            'bytes_total': 0, 'bytes_read': 0, 'chunks_new': 0, 'bytes_stored': 0,
+        }
+        files = {}
+        with _ChunkWriter(self.repository, self.workers, self.compression_level, stats) as writer:
+            for name, path in self._iter_files(source_root, exclude, extra_files):
+                stat = os.stat(path)
+                entry = None if rehash else self._unchanged_entry(
+                    name, path, stat, previous_files, previous_by_checksum, known_checksums
+                )
+                if entry is None:
+                    entry = self._read_file(path, stat, chunk_size, writer)
+                    stats['files_read'] += 1
+                    stats['bytes_read'] += entry['size']
+                else:
+                    stats['files_unchanged'] += 1
+                files[name] = entry
+                stats['files'] += 1
+                stats['bytes_total'] += entry['size']
+
+        created_at = timezone.now()
+        manifest = {
+            'id': created_at.strftime('%Y%m%dT%H%M%S.%fZ'),
+            'created_at': created_at.isoformat(),
+            'parent': parent['id'] if parent else None,
+            'label': label,
+            'source_root': source_root,
+            'chunk_size': chunk_size,
+            'files': files,
+            'stats': stats,
+        }
+        self.repository.write_snapshot(manifest)
+        logger.info(
+            f"Backup snapshot {manifest['id']}: {stats['files']} files, "
+            f"{stats['files_read']} read, {stats['chunks_new']} new chunks "
+            f"({stats['bytes_stored']} bytes stored)"
+        )
+        return manifest
+
+    def _latest_manifest(self):
+        snapshot_ids = self.repository.snapshot_ids()
+        return self.repository.read_snapshot(snapshot_ids[-1]) if snapshot_ids else None
+
+    @staticmethod
+    def _iter_files(source_root, exclude, extra_files):
+        for dirpath, dirnames, filenames in os.walk(source_root):
+            dirnames[:] = sorted(d for d in dirnames if d not in exclude)
+            for filename in sorted(filenames):
+                path = os.path.join(dirpath, filename)
+                if os.path.isfile(path) and not os.path.islink(path):
+                    yield os.path.relpath(path, source_root).replace(os.sep, '/'), path
+        for name, path in sorted((extra_files or {}).items()):
+            yield name, os.path.abspath(path)
+
+    @staticmethod
+    def _unchanged_entry(name, path, stat, previous_files, previous_by_checksum, known_checksums):
+        """Previous manifest entry for a file that needs no reading, if any."""
+        known = known_checksums.get(os.path.normpath(path))
+        if known:
+            previous = previous_by_checksum.get(known)
+            if previous and previous['size'] == stat.st_size:
+                return dict(previous, mtime_ns=stat.st_mtime_ns)
+            return None
+
+        previous = previous_files.get(name)
+        if previous and previous['size'] == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns:
+            return previous
+        return None
+
+    @staticmethod
+    def _read_file(path, stat, chunk_size, writer):
+        digest = hashlib.sha256()
+        chunks = []
+        size = 0
+        with open(path, 'rb') as f:
+            for data in iter(lambda: f.read(chunk_size), b''):
+                digest.update(data)
+                size += len(data)
+                chunks.append(writer.add(data))
+        return {
+            'sha256': digest.hexdigest(),
+            'size': size,
+            'mtime_ns': stat.st_mtime_ns,
+            'chunks': chunks,
+        }
+
+    # ------------------------------------------------------------------
+    # Verify / restore
+    # ------------------------------------------------------------------
+
+    def resolve_snapshot(self, snapshot_id=None, at=None):
+        """
+        Find a snapshot by id, or the latest one taken at or before ``at``.
+
+        Returns:
+            The snapshot manifest
+        """
+        if snapshot_id:
+            return self.repository.read_snapshot(snapshot_id)
+
+        manifest = None
+        for candidate_id in self.repository.snapshot_ids():
+            candidate = self.repository.read_snapshot(candidate_id)
+            if at is not None and datetime.fromisoformat(candidate['created_at']) > at:
+                break
+            manifest = candidate
+        if manifest is None:
+            raise BackupError('No snapshot matches the requested point in time')
+        return manifest
+
+    def verify(self, snapshot_id=None, read_data=True):
+        """
+        Check that every chunk a snapshot references is present and intact.
+
+        Args:
+            snapshot_id: Snapshot to verify (defaults to all snapshots)
+            read_data: Decompress and hash chunks instead of checking presence
+
+        Returns:
+            Dict with counts and the lists of missing and corrupt chunks
+        """
+        snapshot_ids = [snapshot_id] if snapshot_id else self.repository.snapshot_ids()
+        digests = set()
+        for sid in snapshot_ids:
+            for entry in self.repository.read_snapshot(sid)['files'].values():
+                digests.update(entry['chunks'])
+
+        missing, corrupt = [], []
+
+        def check(digest):
+            if not self.repository.has_object(digest):
+                missing.append(digest)
+            elif read_data:
+                try:
+                    data = decode_chunk(self.repository.get_object(digest))
+                except (BackupError, zlib.error):
+                    corrupt.append(digest)
+                    return
+                if hashlib.sha256(data).hexdigest() != digest:
+                    corrupt.append(digest)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            list(executor.map(check, sorted(digests)))
+
+        return {
+            'snapshots': len(snapshot_ids),
+            'chunks_checked': len(digests),
+            'missing': sorted(missing),
+            'corrupt': sorted(corrupt),
+            'ok': not missing and not corrupt,
+        }
+
+    def restore(self, target_root, snapshot_id=None, at=None, paths=None):
+        """
+        Restore a snapshot into ``target_root``.
+
+        Each restored file is checked against the SHA-256 in the manifest.
+
+        Args:
+            target_root: Directory to restore into
+            snapshot_id: Snapshot to restore
+            at: Restore the latest snapshot taken at or before this datetime
+            paths: Optional manifest names (or directory prefixes) to restore
+
+        Returns:
+            Dict with the snapshot id and restored file and byte counts
+        """
+        manifest = self.resolve_snapshot(snapshot_id, at)
+        target_root = os.path.abspath(os.fspath(target_root))
+
+        restored_files = restored_bytes = 0
+        for name, entry in sorted(manifest['files'].items()):
+            if paths and not any(name == p or name.startswith(p.rstrip('/') + '/') for p in paths):
+                continue
+            destination = os.path.abspath(os.path.join(target_root, name))
+            if os.path.commonpath([destination, target_root]) != target_root:
+                raise BackupError(f'Refusing to restore outside the target directory: {name}')
+            self._restore_file(destination, entry)
+            restored_files += 1
+            restored_bytes += entry['size']
+
+        return {
+            'snapshot': manifest['id'],
+            'files': restored_files,
+            'bytes': restored_bytes,
+        }
+
+    def _restore_file(self, destination, entry):
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(destination), prefix='.restore-')
+        digest = hashlib.sha256()
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk_digest in entry['chunks']:
+                    data = decode_chunk(self.repository.get_object(chunk_digest))
+                    digest.update(data)
+                    f.write(data)
+            if digest.hexdigest() != entry['sha256']:
+                raise BackupError(f'Checksum mismatch restoring {destination}')
+            os.replace(tmp_path, destination)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # ------------------------------------------------------------------
+    # Retention
+    # ------------------------------------------------------------------
+
+    def forget(self, keep_last):
+        """
+        Delete all but the newest ``keep_last`` snapshots and unreferenced chunks.
+
+        Returns:
+            Dict with the number of snapshots and chunks removed
+        """
+        snapshot_ids = self.repository.snapshot_ids()
+        if keep_last < 1:
+            raise BackupError('keep_last must be at least 1')
+
+        removed = snapshot_ids[:-keep_last]
+        for sid in removed:
+            os.remove(os.path.join(self.repository.snapshots_dir, f'{sid}.json'))
+
+        referenced = set()
+        for sid in snapshot_ids[-keep_last:]:
+            for entry in self.repository.read_snapshot(sid)['files'].values():
+                referenced.update(entry['chunks'])
+
+        chunks_removed = 0
+        for digest in list(self.repository.object_digests()):
+            if digest not in referenced:
+                self.repository.delete_object(digest)
+                chunks_removed += 1
+
+        return {'snapshots_removed': len(removed), 'chunks_removed': chunks_removed}
+
+
+class _ChunkWriter:
+    """
+    Deduplicate chunks and compress/write new ones on a thread pool.
+
+    zlib releases the GIL, so compression runs in parallel with hashing and
+    reading the next chunk. At most ``2 * workers`` chunks are in flight.
+    """
+
+    def __init__(self, repository, workers, compression_level, stats):
+        self.repository = repository
+        self.workers = workers
+        self.compression_level = compression_level
+        self.stats = stats
+        self._seen = set()
+        self._pending = []
+
+    def __enter__(self):
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                while self._pending:
+                    self._collect()
+        finally:
+            self._executor.shutdown(wait=True, cancel_futures=exc_type is not None)
+
+    def add(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self._seen:
+            return digest
+        self._seen.add(digest)
+        if self.repository.has_object(digest):
+            return digest
+
+        while len(self._pending) >= 2 * self.workers:
+            self._collect()
+        self._pending.append(self._executor.submit(self._store, digest, data))
+        self.stats['chunks_new'] += 1
+        return digest
+
+    def _collect(self):
+        self.stats['bytes_stored'] += self._pending.pop(0).result()
+
+    def _store(self, digest, data):
+        payload = encode_chunk(data, self.compression_level)
+        self.repository.put_object(digest, payload)
+        return len(payload)
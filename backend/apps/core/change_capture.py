@@ -0,0 +1,93 @@
+"""
+Change capture for model instances.
+
+``ChangeCaptureMixin`` keeps a snapshot of the concrete field values an
+instance was loaded with (``from_db``) and refreshes it after every save and
+``refresh_from_db()``. Signal handlers read what a save changes from the
+snapshot instead of re-selecting the row in ``pre_save``.
+
+During the pre_save/post_save handlers of a save, ``instance.field_changes``
+maps the attnames that save changes to ``(old, new)``, limited to
+``update_fields`` when given. A save nested in a post_save handler sees only
+its own fields, and the outer save's view is restored when it returns.
+Outside a save it reports everything changed since the instance was loaded.
+"""
+
+import copy
+
+__all__ = ['ChangeCaptureMixin']
+
+
+def _frozen(value):
+    # JSON fields are mutated in place; keep the snapshot independent
+    return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+
+class ChangeCaptureMixin:
+    """Model mixin recording loaded field values for change detection."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = {name: _frozen(value) for name, value in zip(field_names, values)}
+        return instance
+
+    @property
+    def field_changes(self):
+        """``{attname: (old, new)}`` for the save in progress (or since loading)."""
+        snapshot = self.__dict__.get('_loaded_values')
+        if self._state.adding or snapshot is None:
+            return {}
+        fields = self.__dict__.get('_saving_fields')
+        changes = {}
+        for field in self._meta.concrete_fields:
+            name = field.attname
+            if (fields is not None and name not in fields) or name not in snapshot or name not in self.__dict__:
+                continue  # Not part of this save, or deferred and never loaded
+            old, new = snapshot[name], self.__dict__[name]
+            if old != new:
+                changes[name] = (old, new)
+        return changes
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        fields = None if update_fields is None else {
+            self._meta.get_field(name).attname for name in update_fields
+        }
+        if not self._state.adding and self.pk is not None:
+            self._load_missing_snapshot(fields, kwargs.get('using'))
+
+        outer = self.__dict__.get('_saving_fields')
+        self._saving_fields = fields
+        try:
+            super().save(*args, **kwargs)
+        finally:
+            self._saving_fields = outer
+        self._capture(fields)
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._capture(None if fields is None else {self._meta.get_field(name).attname for name in fields})
+
+    def _capture(self, fields):
+        snapshot = self.__dict__.get('_loaded_values') or {}
+        for field in self._meta.concrete_fields:
+            name = field.attname
+            if (fields is None or name in fields) and name in self.__dict__:
+                snapshot[name] = _frozen(self.__dict__[name])
+        self._loaded_values = snapshot
+
+    def _load_missing_snapshot(self, fields, using):
+        """Read old values the snapshot lacks (instances not loaded by a query, deferred fields)."""
+        snapshot = self.__dict__.get('_loaded_values') or {}
+        missing = [
+            field.attname for field in self._meta.concrete_fields
+            if (fields is None or field.attname in fields)
+            and field.attname not in snapshot and field.attname in self.__dict__
+        ]
+        if missing:
+            rows = type(self)._base_manager.using(using or self._state.db).filter(
+                pk=self.pk
+            ).values(*missing).order_by()
+            snapshot.update(next(iter(rows), {}))
+        self._loaded_values = snapshot
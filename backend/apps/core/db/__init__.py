@@ -0,0 +1 @@
+# Pooled PostgreSQL database backend (ENGINE = 'apps.core.db')
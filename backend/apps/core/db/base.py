@@ -0,0 +1,98 @@
+"""
+PostgreSQL backend with connection pooling and per-transaction statement timeouts.
+
+Used as ``ENGINE = 'apps.core.db'``. Extra keys of the database settings:
+
+* ``POOL``: options of the process-wide ``ConnectionPool`` (``MIN_SIZE``,
+  ``MAX_SIZE``, ``TIMEOUT``, ``MAX_LIFETIME``, ``MAX_IDLE``, ``CHECK_IDLE``).
+  Django closing a connection (end of request, ``close_old_connections``
+  after a Celery task) returns it to the pool; closing it inside an atomic
+  block closes it for good. Leave ``POOL`` out when
+  connecting through pgbouncer, which does the pooling itself.
+* ``STATEMENT_TIMEOUT``: milliseconds, applied with ``SET LOCAL`` at the
+  start of every transaction. It ends with the transaction and is never
+  passed as a startup option, so it works through a transaction-mode
+  pgbouncer and nothing lingers on a pooled connection.
+
+Statements run in autocommit, outside any transaction, fall back to the
+session default. With ``POOL`` that is the ``-c statement_timeout`` startup
+option. Through pgbouncer a session ``SET`` would land on an arbitrary
+server connection, so the default must be set on the database role
+(``ALTER ROLE ... SET statement_timeout``); the first connection of each
+process checks it and logs an error when it is missing.
+"""
+
+import logging
+
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgreSQLDatabaseWrapper
+
+from .pool import get_pool
+
+logger = logging.getLogger(__name__)
+
+# Aliases whose session statement timeout this process has checked
+_checked_session_timeouts = set()
+
+
+class DatabaseWrapper(PostgreSQLDatabaseWrapper):
+
+    @property
+    def pool(self):
+        options = self.settings_dict.get('POOL')
+        return get_pool(self.alias, options) if options else None
+
+    @property
+    def statement_timeout(self):
+        return self.settings_dict.get('STATEMENT_TIMEOUT')
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        def connect():
+            connection = super(DatabaseWrapper, self).get_new_connection(conn_params)
+            pool.isolation_level = self.isolation_level
+            return connection
+
+        connection = pool.getconn(connect)
+        # Set by the wrapper that opened the connection
+        self.isolation_level = pool.isolation_level
+        return connection
+
+    def init_connection_state(self):
+        super().init_connection_state()
+        if self.pool is None and self.statement_timeout and self.alias not in _checked_session_timeouts:
+            _checked_session_timeouts.add(self.alias)
+            self._check_session_statement_timeout()
+
+    def _check_session_statement_timeout(self):
+        with self.wrap_database_errors, self.connection.cursor() as cursor:
+            cursor.execute('SHOW statement_timeout')
+            (session_timeout,) = cursor.fetchone()
+        if session_timeout == '0':
+            logger.error(
+                f"Database '{self.alias}' has no session statement timeout; statements run outside "
+                f"transactions are unbounded. Set it on the role: "
+                f"ALTER ROLE {self.settings_dict['USER']} SET statement_timeout = {int(self.statement_timeout)}"
+            )
+
+    def _close(self):
+        pool = self.pool
+        if pool is None or self.connection is None:
+            return super()._close()
+        with self.wrap_database_errors:
+            if self.in_atomic_block:
+                # Django keeps using the connection until the atomic block
+                # exits, so it must not be handed to another thread
+                pool.discard(self.connection)
+            else:
+                pool.putconn(self.connection)
+
+    def _set_autocommit(self, autocommit):
+        super()._set_autocommit(autocommit)
+        timeout = self.statement_timeout
+        if not autocommit and timeout:
+            # Opens the transaction; the setting ends with it
+            with self.wrap_database_errors, self.connection.cursor() as cursor:
+                cursor.execute('SET LOCAL statement_timeout = %s', [int(timeout)])
@@ -0,0 +1,305 @@
+"""
+Process-wide PostgreSQL connection pool.
+
+Each web worker thread and Celery worker process used to hold its own
+persistent connection (``CONN_MAX_AGE``), so the number of server
+connections grew with threads x processes and idle ones stayed open until
+they aged out. ``ConnectionPool`` caps the connections of one process at
+``MAX_SIZE``; threads beyond that wait up to ``TIMEOUT`` seconds for a
+connection to be returned instead of opening another.
+
+Connections are checked before they are handed out: closed or broken ones
+and ones past ``MAX_LIFETIME`` are replaced, and ones idle for longer than
+``CHECK_IDLE`` seconds answer a ``SELECT 1`` first. Returned connections are
+rolled back if a transaction was left open and put back in autocommit, the
+state Django expects of a new connection. Idle connections above
+``MIN_SIZE`` are closed after ``MAX_IDLE`` seconds, so a spike does not
+leave its connections behind.
+
+``stats()`` reports size, use, waiters and checkout latency; every process
+includes it in its performance metrics report.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from psycopg2 import extensions
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'MIN_SIZE': 1,
+    'MAX_SIZE': 10,
+    'TIMEOUT': 10,
+    'MAX_LIFETIME': 30 * 60,
+    'MAX_IDLE': 5 * 60,
+    'CHECK_IDLE': 30,
+}
+
+
+class PoolTimeout(Exception):
+    """No connection became available within the pool timeout."""
+    pass
+
+
+class _Entry:
+    __slots__ = ('connection', 'created_at', 'returned_at')
+
+    def __init__(self, connection, created_at):
+        self.connection = connection
+        self.created_at = created_at
+        self.returned_at = created_at
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of psycopg2 connections for one database alias."""
+
+    def __init__(self, alias, options=None):
+        options = {**DEFAULTS, **(options or {})}
+        self.alias = alias
+        self.min_size = options['MIN_SIZE']
+        self.max_size = options['MAX_SIZE']
+        self.timeout = options['TIMEOUT']
+        self.max_lifetime = options['MAX_LIFETIME']
+        self.max_idle = options['MAX_IDLE']
+        self.check_idle = options['CHECK_IDLE']
+        self.pid = os.getpid()
+        # Set from the first connection opened (DatabaseWrapper.isolation_level)
+        self.isolation_level = None
+
+        self._idle = deque()
+        self._in_use = {}
+        self._size = 0
+        self._waiting = 0
+        self._closed = False
+        self._condition = threading.Condition()
+        self._counters = {
+            'checkouts': 0,
+            'checkout_seconds': 0.0,
+            'checkout_max_seconds': 0.0,
+            'timeouts': 0,
+            'health_check_failures': 0,
+            'opened': 0,
+            'closed': 0,
+        }
+
+    def getconn(self, connect):
+        """
+        Check out a healthy connection, opening one while below ``MAX_SIZE``.
+
+        Args:
+            connect: Callable opening a new connection when the pool grows
+
+        Raises:
+            PoolTimeout: If no connection is returned within ``TIMEOUT`` seconds
+        """
+        start = time.monotonic()
+        deadline = start + self.timeout
+        while True:
+            entry = self._reserve(deadline)
+            if entry is None:
+                entry = self._open(connect)
+            elif not self._healthy(entry):
+                self._discard(entry)
+                continue
+            break
+
+        waited = time.monotonic() - start
+        with self._condition:
+            self._in_use[id(entry.connection)] = entry
+            self._counters['checkouts'] += 1
+            self._counters['checkout_seconds'] += waited
+            self._counters['checkout_max_seconds'] = max(self._counters['checkout_max_seconds'], waited)
+        return entry.connection
+
+    def _reserve(self, deadline):
+        """An idle entry, or None after reserving a slot for a new connection."""
+        with self._condition:
+            while True:
+                if self._idle:
+                    # Most recently returned first, so surplus connections go idle and age out
+                    return self._idle.pop()
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._counters['timeouts'] += 1
+                    raise PoolTimeout(
+                        f"No database connection available for '{self.alias}' "
+                        f"within {self.timeout}s (pool size {self.max_size})"
+                    )
+                self._waiting += 1
+                try:
+                    self._condition.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+    def _open(self, connect):
+        try:
+            connection = connect()
+        except Exception:
+            with self._condition:
+                self._size -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._counters['opened'] += 1
+        return _Entry(connection, time.monotonic())
+
+    def _healthy(self, entry):
+        connection = entry.connection
+        now = time.monotonic()
+        if now - entry.created_at >= self.max_lifetime:
+            return False
+        if connection.closed or connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+            healthy = False
+        elif now - entry.returned_at < self.check_idle:
+            return True
+        else:
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                # Outside autocommit the probe opened a transaction
+                connection.rollback()
+                healthy = True
+            except Exception as e:
+                logger.warning(f"Pooled connection for '{self.alias}' failed its health check: {e}")
+                healthy = False
+        if not healthy:
+            with self._condition:
+                self._counters['health_check_failures'] += 1
+        return healthy
+
+    def putconn(self, connection):
+        """Return a connection, rolling back an open transaction and restoring autocommit."""
+        with self._condition:
+            entry = self._in_use.pop(id(connection), None)
+        if entry is None:
+            self._close_connection(connection)
+            return
+
+        usable = not connection.closed and not self._closed
+        if usable:
+            try:
+                if connection.get_transaction_status() != extensions.TRANSACTION_STATUS_IDLE:
+                    connection.rollback()
+                # Django's connect() sets autocommit, which fails inside a transaction
+                connection.autocommit = True
+            except Exception:
+                usable = False
+        if usable and time.monotonic() - entry.created_at >= self.max_lifetime:
+            usable = False
+
+        if not usable:
+            self._discard(entry)
+            return
+
+        entry.returned_at = time.monotonic()
+        with self._condition:
+            self._idle.append(entry)
+            expired = self._expire_idle(entry.returned_at)
+            self._condition.notify()
+        for stale in expired:
+            self._close_connection(stale.connection)
+
+    def discard(self, connection):
+        """Close a checked-out connection instead of returning it."""
+        with self._condition:
+            entry = self._in_use.pop(id(connection), None)
+        if entry is None:
+            self._close_connection(connection)
+        else:
+            self._discard(entry)
+
+    def _expire_idle(self, now):
+        """Remove idle entries past MAX_IDLE above MIN_SIZE (caller holds the lock)."""
+        expired = []
+        # The oldest returned entries sit at the left
+        while self._idle and self._size > self.min_size and now - self._idle[0].returned_at >= self.max_idle:
+            expired.append(self._idle.popleft())
+            self._size -= 1
+            self._counters['closed'] += 1
+        return expired
+
+    def _discard(self, entry):
+        self._close_connection(entry.connection)
+        with self._condition:
+            self._size -= 1
+            self._counters['closed'] += 1
+            self._condition.notify()
+
+    @staticmethod
+    def _close_connection(connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Close idle connections; checked-out ones are closed when returned."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._counters['closed'] += len(idle)
+            self._condition.notify_all()
+        for entry in idle:
+            self._close_connection(entry.connection)
+
+    def stats(self):
+        """Size, use, waiters and checkout latency of this pool."""
+        with self._condition:
+            counters = dict(self._counters)
+            size, idle, in_use, waiting = self._size, len(self._idle), len(self._in_use), self._waiting
+        checkouts = counters['checkouts']
+        return {
+            'alias': self.alias,
+            'size': size,
+            'idle': idle,
+            'in_use': in_use,
+            'waiters': waiting,
+            'min_size': self.min_size,
+            'max_size': self.max_size,
+            'checkouts': checkouts,
+            'checkout_seconds': round(counters['checkout_seconds'], 6),
+            'checkout_avg_ms': round(counters['checkout_seconds'] / checkouts * 1000, 3) if checkouts else 0.0,
+            'checkout_max_ms': round(counters['checkout_max_seconds'] * 1000, 3),
+            'timeouts': counters['timeouts'],
+            'health_check_failures': counters['health_check_failures'],
+            'connections_opened': counters['opened'],
+            'connections_closed': counters['closed'],
+        }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options=None):
+    """The pool of ``alias`` in this process, created on first use."""
+    with _pools_lock:
+        pool = _pools.get(alias)
+        if pool is None or pool.pid != os.getpid():
+            # A pool inherited across fork() shares its sockets with the
+            # parent; drop it without closing them and start a fresh one
+            pool = _pools[alias] = ConnectionPool(alias, options)
+        return pool
+
+
+def pool_stats():
+    """Stats of every pool this process opened."""
+    pid = os.getpid()
+    with _pools_lock:
+        pools = [pool for pool in _pools.values() if pool.pid == pid]
+    return [pool.stats() for pool in pools]
+
+
+def close_pools():
+    with _pools_lock:
+        pools = [pool for pool in _pools.values() if pool.pid == os.getpid()]
+    for pool in pools:
+        pool.close()
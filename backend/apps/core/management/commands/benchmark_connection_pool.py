@@ -0,0 +1,154 @@
+"""
+Management command load-testing database connections with and without the
+connection pool.
+
+Many threads run short request-sized queries against the configured
+PostgreSQL database, first with one persistent connection per thread (the
+``CONN_MAX_AGE`` setup) and then through the ``apps.core.db`` pool, where
+each request checks a connection out and returns it. A monitor counts the
+server connections of each run in ``pg_stat_activity`` (by
+``application_name``) while it is under load.
+"""
+
+import copy
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.utils import load_backend
+
+from apps.core.db.pool import get_pool
+
+MONITOR_INTERVAL = 0.1
+
+
+def database_settings(mode, pool_size, statement_timeout):
+    settings_dict = copy.deepcopy(connections.settings[DEFAULT_DB_ALIAS])
+    settings_dict.pop('POOL', None)
+    settings_dict['OPTIONS'] = {
+        key: value for key, value in settings_dict['OPTIONS'].items() if key != 'options'
+    }
+    settings_dict['OPTIONS']['application_name'] = f'edms-loadtest-{mode}'
+    if mode == 'pool':
+        settings_dict.update({
+            'ENGINE': 'apps.core.db',
+            'CONN_MAX_AGE': 0,
+            'STATEMENT_TIMEOUT': statement_timeout,
+            'POOL': {'MIN_SIZE': 1, 'MAX_SIZE': pool_size, 'TIMEOUT': 30},
+        })
+    else:
+        settings_dict.update({'ENGINE': 'django.db.backends.postgresql', 'CONN_MAX_AGE': None})
+    return settings_dict
+
+
+class Command(BaseCommand):
+    help = 'Load-test PostgreSQL connection counts with persistent connections and with the connection pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=64, help='Concurrent request threads')
+        parser.add_argument('--seconds', type=float, default=10, help='Duration of each run')
+        parser.add_argument('--pool-size', type=int, default=10, help='Connection pool size')
+        parser.add_argument('--query-ms', type=float, default=5, help='Server time per request (pg_sleep)')
+
+    def handle(self, *args, **options):
+        if connections[DEFAULT_DB_ALIAS].vendor != 'postgresql':
+            raise CommandError('The connection load test needs a PostgreSQL default database')
+
+        results = {}
+        for mode in ('persistent', 'pool'):
+            settings_dict = database_settings(mode, options['pool_size'], 30000)
+            results[mode] = self.run(mode, settings_dict, options)
+            result = results[mode]
+            self.stdout.write(
+                f"{mode:>10}: {result['requests'] / options['seconds']:.0f} req/s, "
+                f"p95 {result['p95_ms']:.1f} ms, connections peak {result['peak']} "
+                f"(mean {result['mean']:.1f}, stdev {result['stdev']:.1f}), errors {result['errors']}"
+            )
+            if result.get('pool'):
+                pool = result['pool']
+                self.stdout.write(
+                    f"{'':>10}  pool: {pool['checkouts']} checkouts, avg wait {pool['checkout_avg_ms']:.2f} ms, "
+                    f"max wait {pool['checkout_max_ms']:.1f} ms, timeouts {pool['timeouts']}, "
+                    f"opened {pool['connections_opened']}"
+                )
+
+        pooled = results['pool']
+        if pooled['peak'] > options['pool_size'] or pooled['errors']:
+            raise CommandError(
+                f"Pooled run used {pooled['peak']} connections (pool size {options['pool_size']}) "
+                f"with {pooled['errors']} errors"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"{options['threads']} threads held {results['persistent']['peak']} connections persistently "
+            f"and at most {pooled['peak']} through the pool"
+        ))
+
+    def run(self, mode, settings_dict, options):
+        backend = load_backend(settings_dict['ENGINE'])
+        alias = f'loadtest_{mode}'
+        application_name = settings_dict['OPTIONS']['application_name']
+        stop = threading.Event()
+        latencies, errors, counts = [], [], []
+        lock = threading.Lock()
+
+        def request_loop():
+            wrapper = backend.DatabaseWrapper(copy.deepcopy(settings_dict), alias)
+            local = []
+            try:
+                while not stop.is_set():
+                    started = time.perf_counter()
+                    try:
+                        with wrapper.cursor() as cursor:
+                            cursor.execute('SELECT pg_sleep(%s)', [options['query_ms'] / 1000])
+                        if mode == 'pool':
+                            wrapper.close()  # End of request
+                    except Exception as e:
+                        with lock:
+                            errors.append(str(e))
+                        wrapper.close()
+                        continue
+                    local.append(time.perf_counter() - started)
+            finally:
+                wrapper.close()
+                with lock:
+                    latencies.extend(local)
+
+        def monitor_loop():
+            monitor_settings = database_settings('monitor', 0, None)
+            monitor = load_backend(monitor_settings['ENGINE']).DatabaseWrapper(monitor_settings, 'loadtest_monitor')
+            try:
+                while not stop.is_set():
+                    with monitor.cursor() as cursor:
+                        cursor.execute(
+                            'SELECT COUNT(*) FROM pg_stat_activity WHERE application_name = %s', [application_name]
+                        )
+                        counts.append(cursor.fetchone()[0])
+                    stop.wait(MONITOR_INTERVAL)
+            finally:
+                monitor.close()
+
+        threads = [threading.Thread(target=request_loop) for _ in range(options['threads'])]
+        monitor_thread = threading.Thread(target=monitor_loop)
+        for thread in threads:
+            thread.start()
+        monitor_thread.start()
+        time.sleep(options['seconds'])
+        stop.set()
+        for thread in threads + [monitor_thread]:
+            thread.join()
+
+        result = {
+            'requests': len(latencies),
+            'errors': len(errors),
+            'p95_ms': statistics.quantiles(latencies, n=20)[-1] * 1000 if len(latencies) > 1 else 0.0,
+            'peak': max(counts, default=0),
+            'mean': statistics.fmean(counts) if counts else 0.0,
+            'stdev': statistics.pstdev(counts) if counts else 0.0,
+        }
+        if mode == 'pool':
+            pool = get_pool(alias, settings_dict['POOL'])
+            result['pool'] = pool.stats()
+            pool.close()
+        return result
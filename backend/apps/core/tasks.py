@@ -66,3 +66,38 @@ def run_hybrid_backup():
             'success': False,
             'error': str(e)
         }
+
+
+@shared_task(name='apps.core.tasks.run_incremental_backup')
+def run_incremental_backup(label='scheduled'):
+    """
+    Take an incremental snapshot of document storage.
+
+    Only files that are new or changed since the previous snapshot are read
+    and uploaded to the repository configured in INCREMENTAL_BACKUP. The
+    database itself is still dumped by the host-level hybrid backup.
+    """
+    from apps.core.backup_engine import (
+        BackupEngine, LocalRepository, backup_setting, tracked_checksums
+    )
+
+    try:
+        engine = BackupEngine(LocalRepository(backup_setting('REPOSITORY')))
+        manifest = engine.backup(
+            backup_setting('SOURCE_ROOT'),
+            known_checksums=tracked_checksums(),
+            exclude=backup_setting('EXCLUDE', []),
+            label=label,
+        )
+        logger.info(f"Incremental backup snapshot {manifest['id']} completed")
+        return {
+            'success': True,
+            'snapshot': manifest['id'],
+            'stats': manifest['stats'],
+        }
+    except Exception as e:
+        logger.error(f"Incremental backup failed: {str(e)}")
+        return {
+            'success': False,
+            'error': str(e)
+        }
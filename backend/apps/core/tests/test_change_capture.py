@@ -0,0 +1,98 @@
+"""
+Tests for snapshot-based change capture
+"""
+import pytest
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test.utils import CaptureQueriesContext
+
+from apps.audit.models import AuditTrail
+from apps.documents.models import Document, DocumentSource, DocumentType
+from apps.users.models import User
+
+
+def _selects_from(queries, table):
+    return [q['sql'] for q in queries if q['sql'].startswith('SELECT') and f'FROM "{table}"' in q['sql']]
+
+
+@pytest.mark.django_db
+class TestChangeCapture:
+    """Field changes come from the loaded snapshot, not a re-fetch"""
+
+    def setup_method(self):
+        self.author = User.objects.create_user(username='capture_author', password='test123')
+        self.reviewer = User.objects.create_user(username='capture_reviewer', password='test123')
+        document = Document.objects.create(
+            title='Captured Procedure',
+            document_type=DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.author),
+            document_source=DocumentSource.objects.create(name='Digital', source_type='original_digital'),
+            author=self.author,
+            status='DRAFT',
+            version_major=1,
+            version_minor=0
+        )
+        self.document = Document.objects.get(pk=document.pk)
+
+    def _audit_changes(self):
+        return AuditTrail.objects.filter(
+            content_type=ContentType.objects.get_for_model(Document),
+            object_id=str(self.document.pk),
+            action='UPDATE'
+        ).latest('timestamp').field_changes
+
+    def test_save_does_not_reselect_the_row(self):
+        self.document.status = 'PENDING_REVIEW'
+        self.document.reviewer = self.reviewer
+
+        with CaptureQueriesContext(connection) as queries:
+            self.document.save()
+
+        assert _selects_from(queries.captured_queries, 'documents') == []
+        assert self._audit_changes() == {
+            'status': {'old': 'DRAFT', 'new': 'PENDING_REVIEW'},
+            'reviewer': {'old': None, 'new': 'capture_reviewer'},
+        }
+
+    def test_snapshot_follows_saves_and_update_fields(self):
+        self.document.title = 'Renamed'
+        self.document.description = 'Not saved yet'
+        self.document.save(update_fields=['title'])
+
+        assert self.document.field_changes == {'description': ('', 'Not saved yet')}
+
+        self.document.metadata['reviewed'] = True  # In-place JSON change
+        assert set(self.document.field_changes) == {'description', 'metadata'}
+
+        self.document.save()
+        assert self.document.field_changes == {}
+
+    def test_nested_save_in_post_save_keeps_outer_changes(self):
+        self.document.status = 'EFFECTIVE'
+        self.document.file_path = 'documents/new.docx'
+        self.document.save()
+
+        # handle_status_changes saved effective_date from inside post_save
+        self.document.refresh_from_db()
+        assert self.document.effective_date is not None
+        assert self.document.field_changes == {}
+
+    def test_deferred_field_falls_back_to_one_select(self):
+        seen = []
+
+        def record(sender, instance, **kwargs):
+            seen.append(instance.field_changes)
+
+        user = User.objects.only('username').get(pk=self.author.pk)
+        user.email = 'new@example.com'
+
+        post_save.connect(record, sender=User)
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                user.save(update_fields=['email'])
+        finally:
+            post_save.disconnect(record, sender=User)
+
+        # The old value of the deferred field is read once
+        assert len([sql for sql in _selects_from(queries.captured_queries, 'users') if '"users"."email"' in sql]) == 1
+        assert seen == [{'email': ('', 'new@example.com')}]
@@ -0,0 +1,355 @@
+"""
+Tests for the process-wide database connection pool and the pooled backend
+"""
+import copy
+import threading
+import time
+from types import SimpleNamespace
+
+import psycopg2.extras
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.utils import load_backend
+from psycopg2 import extensions
+
+from apps.core.db import base as base_module
+from apps.core.db import pool as pool_module
+from apps.core.db.pool import ConnectionPool, PoolTimeout
+
+
+class StubConnection:
+    """Stands in for a psycopg2 connection; the pool and backend only use these members."""
+
+    def __init__(self):
+        self.closed = 0
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+        self._autocommit = True
+        self.isolation_level = None
+        self.info = SimpleNamespace(server_version=150000, parameter_status=lambda name: 'UTC')
+        self.rollbacks = 0
+        self.queries = 0
+        self.executed = []
+        self.fail_queries = False
+        self.session_statement_timeout = '30s'  # Set on the role
+
+    @property
+    def autocommit(self):
+        return self._autocommit
+
+    @autocommit.setter
+    def autocommit(self, value):
+        if self.status != extensions.TRANSACTION_STATUS_IDLE:
+            raise psycopg2.ProgrammingError('set_session cannot be used inside a transaction')
+        self._autocommit = value
+
+    def get_transaction_status(self):
+        return self.status
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def commit(self):
+        self.status = extensions.TRANSACTION_STATUS_IDLE
+
+    def close(self):
+        self.closed = 1
+
+    def cursor(self):
+        return StubCursor(self)
+
+
+class StubCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def fetchone(self):
+        return (self.connection.session_statement_timeout,)
+
+    def close(self):
+        pass
+
+    def execute(self, sql, params=None):
+        if self.connection.fail_queries:
+            raise RuntimeError('server closed the connection unexpectedly')
+        self.connection.queries += 1
+        self.connection.executed.append((sql, params))
+        if not self.connection.autocommit:
+            self.connection.status = extensions.TRANSACTION_STATUS_INTRANS
+
+
+class TestConnectionPool:
+    """Bounded checkout, health checks and stats"""
+
+    def setup_method(self):
+        self.opened = []
+
+    def connect(self):
+        connection = StubConnection()
+        self.opened.append(connection)
+        return connection
+
+    def pool(self, **options):
+        return ConnectionPool('default', {'MIN_SIZE': 0, 'TIMEOUT': 1, **options})
+
+    def test_reuses_returned_connections(self):
+        pool = self.pool(MAX_SIZE=2)
+
+        first = pool.getconn(self.connect)
+        pool.putconn(first)
+        second = pool.getconn(self.connect)
+
+        assert second is first
+        assert len(self.opened) == 1
+        stats = pool.stats()
+        assert (stats['size'], stats['in_use'], stats['idle'], stats['checkouts']) == (1, 1, 0, 2)
+
+    def test_waits_for_a_connection_at_max_size(self):
+        pool = self.pool(MAX_SIZE=1)
+        held = pool.getconn(self.connect)
+        checked_out = []
+
+        waiter = threading.Thread(target=lambda: checked_out.append(pool.getconn(self.connect)))
+        waiter.start()
+        deadline = time.monotonic() + 1
+        while pool.stats()['waiters'] == 0 and time.monotonic() < deadline:
+            time.sleep(0.005)
+        assert pool.stats()['waiters'] == 1
+
+        pool.putconn(held)
+        waiter.join(timeout=1)
+
+        assert checked_out == [held]
+        assert len(self.opened) == 1
+        assert pool.stats()['checkout_max_ms'] > 0
+
+    def test_times_out_when_exhausted(self):
+        pool = self.pool(MAX_SIZE=1, TIMEOUT=0.05)
+        pool.getconn(self.connect)
+
+        with pytest.raises(PoolTimeout):
+            pool.getconn(self.connect)
+
+        assert pool.stats()['timeouts'] == 1
+
+    def test_rolls_back_transactions_left_open(self):
+        pool = self.pool()
+        connection = pool.getconn(self.connect)
+        connection.status = extensions.TRANSACTION_STATUS_INTRANS
+
+        pool.putconn(connection)
+
+        assert connection.rollbacks == 1
+        assert pool.getconn(self.connect) is connection
+
+    def test_returned_connections_are_idle_in_autocommit(self):
+        pool = self.pool(CHECK_IDLE=0)
+        connection = pool.getconn(self.connect)
+        connection.autocommit = False
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+
+        pool.putconn(connection)
+        assert pool.getconn(self.connect) is connection  # Probed
+
+        assert connection.autocommit is True
+        assert connection.get_transaction_status() == extensions.TRANSACTION_STATUS_IDLE
+        assert connection.queries == 2
+
+    def test_replaces_connections_failing_health_check(self):
+        pool = self.pool(CHECK_IDLE=0)
+        broken = pool.getconn(self.connect)
+        pool.putconn(broken)
+        broken.fail_queries = True
+
+        replacement = pool.getconn(self.connect)
+
+        assert replacement is not broken
+        assert broken.closed
+        stats = pool.stats()
+        assert (stats['size'], stats['health_check_failures']) == (1, 1)
+
+    def test_recently_returned_connections_skip_the_probe(self):
+        pool = self.pool(CHECK_IDLE=60)
+        connection = pool.getconn(self.connect)
+        pool.putconn(connection)
+
+        pool.getconn(self.connect)
+
+        assert connection.queries == 0
+
+    def test_closes_expired_connections(self):
+        pool = self.pool(MAX_LIFETIME=0)
+        connection = pool.getconn(self.connect)
+
+        pool.putconn(connection)
+
+        assert connection.closed
+        assert pool.stats()['size'] == 0
+
+    def test_closes_surplus_idle_connections(self):
+        pool = self.pool(MIN_SIZE=1, MAX_IDLE=0)
+        first, second = pool.getconn(self.connect), pool.getconn(self.connect)
+
+        pool.putconn(first)
+        pool.putconn(second)
+
+        assert first.closed and not second.closed
+        assert pool.stats()['size'] == 1
+
+    def test_connection_count_stays_bounded_under_concurrency(self):
+        pool = self.pool(MAX_SIZE=4, TIMEOUT=5)
+        peak = []
+
+        def work():
+            for _ in range(20):
+                connection = pool.getconn(self.connect)
+                peak.append(pool.stats()['size'])
+                time.sleep(0.001)
+                pool.putconn(connection)
+
+        threads = [threading.Thread(target=work) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = pool.stats()
+        assert max(peak) <= 4
+        assert len(self.opened) <= 4
+        assert stats['checkouts'] == 320
+        assert (stats['in_use'], stats['waiters'], stats['timeouts']) == (0, 0, 0)
+
+
+@pytest.mark.django_db
+class TestPooledDatabaseWrapper:
+    """apps.core.db.DatabaseWrapper on stub psycopg2 connections"""
+
+    alias = 'pooled_test'
+
+    @pytest.fixture(autouse=True)
+    def stub_psycopg2(self, monkeypatch):
+        self.opened = []
+
+        def connect(**params):
+            connection = StubConnection()
+            self.opened.append(connection)
+            return connection
+
+        monkeypatch.setattr(psycopg2, 'connect', connect)
+        monkeypatch.setattr(psycopg2.extras, 'register_default_jsonb', lambda **kwargs: None)
+        monkeypatch.setattr(pool_module, '_pools', {})
+        monkeypatch.setattr(base_module, '_checked_session_timeouts', set())
+
+    def wrapper(self, pool=True, **options):
+        settings_dict = copy.deepcopy(connections.settings[DEFAULT_DB_ALIAS])
+        settings_dict.update({
+            'ENGINE': 'apps.core.db',
+            'NAME': 'edms',
+            'OPTIONS': options,
+            'CONN_MAX_AGE': 0,
+            'STATEMENT_TIMEOUT': 5000,
+        })
+        if pool:
+            settings_dict['POOL'] = {'MIN_SIZE': 0, 'TIMEOUT': 1, 'CHECK_IDLE': 0}
+        return load_backend('apps.core.db').DatabaseWrapper(settings_dict, self.alias)
+
+    def test_close_returns_the_connection_to_the_pool(self):
+        first = self.wrapper()
+        first.ensure_connection()
+        connection = first.connection
+
+        first.close()
+        second = self.wrapper()
+        second.ensure_connection()
+
+        assert first.connection is None
+        assert second.connection is connection
+        assert not connection.closed
+        assert len(self.opened) == 1
+        assert second.pool.stats()['checkouts'] == 2
+
+    def test_reused_connections_keep_the_isolation_level(self):
+        first = self.wrapper(isolation_level=extensions.ISOLATION_LEVEL_REPEATABLE_READ)
+        first.ensure_connection()
+        first.close()
+
+        # Reusing the connection skips the PostgreSQL backend's get_new_connection()
+        second = self.wrapper()
+        second.ensure_connection()
+
+        assert second.isolation_level == extensions.ISOLATION_LEVEL_REPEATABLE_READ
+
+    def test_transactions_start_with_a_local_statement_timeout(self):
+        wrapper = self.wrapper()
+        wrapper.ensure_connection()
+        connection = wrapper.connection
+
+        wrapper.set_autocommit(False)
+        wrapper.commit()
+        wrapper.set_autocommit(True)
+
+        assert connection.executed == [('SET LOCAL statement_timeout = %s', [5000])]
+
+    def test_close_inside_atomic_block_discards_the_connection(self):
+        wrapper = self.wrapper()
+        connections[self.alias] = wrapper
+        try:
+            with transaction.atomic(using=self.alias):
+                wrapper.ensure_connection()
+                connection = wrapper.connection
+                wrapper.close()
+                assert wrapper.connection is connection  # Still held until the block exits
+        finally:
+            del connections[self.alias]
+
+        assert connection.closed
+        assert wrapper.connection is None
+        stats = wrapper.pool.stats()
+        assert (stats['size'], stats['idle'], stats['in_use']) == (0, 0, 0)
+
+    def test_connection_returned_mid_transaction_is_reusable(self):
+        first = self.wrapper()
+        first.ensure_connection()
+        first.set_autocommit(False)  # SET LOCAL opens the transaction
+        connection = first.connection
+        first.close()
+
+        second = self.wrapper()
+        second.ensure_connection()  # Probed, then switched to autocommit by Django
+
+        assert second.connection is connection
+        assert second.get_autocommit() is True
+
+    def test_pgbouncer_mode_reports_a_missing_role_statement_timeout(self, monkeypatch, caplog):
+        original_connect = psycopg2.connect
+
+        def connect(**params):
+            connection = original_connect(**params)
+            connection.session_statement_timeout = '0'
+            return connection
+
+        monkeypatch.setattr(psycopg2, 'connect', connect)
+        for _ in range(2):
+            wrapper = self.wrapper(pool=False)
+            wrapper.ensure_connection()
+            wrapper.close()
+
+        errors = [record for record in caplog.records if record.name == 'apps.core.db.base']
+        assert len(errors) == 1  # Checked once per process
+        assert 'SET statement_timeout = 5000' in errors[0].getMessage()
+        assert self.opened[0].executed == [('SHOW statement_timeout', None)]
+        assert self.opened[1].executed == []
+
+    def test_pgbouncer_mode_accepts_a_role_statement_timeout(self, caplog):
+        wrapper = self.wrapper(pool=False)
+        wrapper.ensure_connection()
+        wrapper.close()
+
+        assert not [record for record in caplog.records if record.name == 'apps.core.db.base']
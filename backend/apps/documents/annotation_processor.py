@@ -8,9 +8,11 @@ from datetime import datetime, date
 from typing import Dict, Any
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import Q
 from django.utils import timezone
 import pytz
 from .models import Document
+from .metadata_cache import base_number, metadata_cache
 from apps.placeholders.models import PlaceholderDefinition
 
 User = get_user_model()
@@ -27,7 +29,40 @@ class DocumentAnnotationProcessor:
     def get_document_metadata(self, document: Document, user: User = None) -> Dict[str, Any]:
         """
         Extract metadata from document for placeholder replacement
+        
+        The document part is served from ``metadata_cache``; download date and
+        time are added on every call.
         """
+        if getattr(document, 'pk', None) is None:
+            # Unsaved or sample document: nothing to cache it under
+            metadata = self._build_document_metadata(document, self._get_document_family(document))
+        else:
+            metadata = metadata_cache.get(document, self._load_document_metadata)
+        self._add_download_metadata(metadata)
+        return metadata
+    
+    def _load_document_metadata(self, document: Document) -> Dict[str, Any]:
+        """Build the metadata from one document query and one family query."""
+        document = Document.objects.select_related(
+            'document_type', 'document_source', 'author', 'reviewer', 'approver',
+            'sensitivity_set_by', 'supersedes', 'workflow__current_state'
+        ).get(pk=document.pk)
+        return self._build_document_metadata(document, self._get_document_family(document))
+    
+    def _get_document_family(self, document) -> list:
+        """All versions sharing the document's base number, ready for the version history."""
+        base = base_number(document.document_number)
+        if not base:
+            return []
+        return list(
+            # Not a bare prefix: PROC-2025-0001 must not match PROC-2025-00010
+            Document.objects.filter(Q(document_number=base) | Q(document_number__startswith=f'{base}-v'))
+            .select_related('author', 'workflow')
+            .prefetch_related('workflow__transitions')
+        )
+    
+    def _build_document_metadata(self, document: Document, family: list) -> Dict[str, Any]:
+        """Metadata that depends on the document and its family only."""
         metadata = {}
         
         # Core document information
@@ -54,7 +89,7 @@ class DocumentAnnotationProcessor:
         
         # Version history table
         # Create table data - let DOCX processor handle the table creation
-        table_data = self._create_version_history_docx_table(document)
+        table_data = self._create_version_history_docx_table(document, family)
         metadata['VERSION_HISTORY_TABLE_DATA'] = table_data
         # Provide placeholder that DOCX processor can detect and replace
         metadata['VERSION_HISTORY'] = "VERSION_HISTORY_CREATE_TABLE"
@@ -108,45 +143,16 @@ class DocumentAnnotationProcessor:
             metadata['EFFECTIVE_DATE'] = 'Not Set'
             metadata['EFFECTIVE_DATE_LONG'] = 'Not Set'
         
-        # Current date/time information (for download) - Using UTC timezone-aware datetime
-        now_utc = timezone.now()  # UTC timezone-aware datetime
-        today_utc = now_utc.date()    # UTC date
-        
-        # Get display timezone (Singapore)
-        display_tz = pytz.timezone(getattr(settings, 'DISPLAY_TIMEZONE', 'Asia/Singapore'))
-        now_local = now_utc.astimezone(display_tz)
-        today_local = now_local.date()
-        
-        # Get timezone abbreviations
-        utc_name = 'UTC'
-        local_name = 'SGT'  # Singapore Standard Time  # 'SGT' for Singapore Time
-        
-        metadata['DOWNLOAD_DATE'] = today_utc.strftime('%Y-%m-%d')
-        metadata['DOWNLOAD_DATE_LONG'] = today_utc.strftime('%B %d, %Y')
-        metadata['DOWNLOAD_TIME'] = f"{now_utc.strftime('%H:%M:%S')} UTC ({now_local.strftime('%H:%M:%S')} {local_name})"
-        metadata['DOWNLOAD_DATETIME'] = f"{now_utc.strftime('%Y-%m-%d %H:%M:%S')} UTC ({now_local.strftime('%Y-%m-%d %H:%M:%S')} {local_name})"
-        metadata['DOWNLOAD_DATETIME_ISO'] = now_utc.isoformat()  # ISO 8601 format with timezone
-        metadata['CURRENT_DATE'] = today_utc.strftime('%Y-%m-%d')
-        metadata['CURRENT_DATE_LONG'] = today_utc.strftime('%B %d, %Y')
-        metadata['CURRENT_TIME'] = f"{now_utc.strftime('%H:%M:%S')} UTC ({now_local.strftime('%H:%M:%S')} {local_name})"
-        metadata['CURRENT_DATETIME'] = f"{now_utc.strftime('%Y-%m-%d %H:%M:%S')} UTC ({now_local.strftime('%Y-%m-%d %H:%M:%S')} {local_name})"
-        metadata['CURRENT_DATETIME_ISO'] = now_utc.isoformat()  # ISO 8601 format with timezone
-        metadata['CURRENT_YEAR'] = str(today_utc.year)
-        metadata['TIMEZONE'] = f"{utc_name} / {local_name}"  # Show both timezones
-        
         # Status information
         metadata['DOC_STATUS'] = document.status.replace('_', ' ').title()
         metadata['DOC_STATUS_SHORT'] = document.status
         
         # Workflow status information
         try:
-            from apps.workflows.models import DocumentWorkflow
-            
             # Get active (non-terminated) workflow for this document
-            active_workflow = DocumentWorkflow.objects.filter(
-                document=document,
-                is_terminated=False
-            ).first()
+            active_workflow = getattr(document, 'workflow', None)
+            if active_workflow and active_workflow.is_terminated:
+                active_workflow = None
             
             if active_workflow and hasattr(active_workflow, 'current_state') and active_workflow.current_state:
                 # Get the current workflow state name
@@ -241,9 +247,6 @@ class DocumentAnnotationProcessor:
         else:
             metadata['DIGITAL_SIGNATURE'] = 'Pending approval'
         
-        # DOWNLOADED_DATE - Alias for DOWNLOAD_DATE (already exists)
-        metadata['DOWNLOADED_DATE'] = metadata['DOWNLOAD_DATE']
-        
         # PREVIOUS_VERSION - Previous version number
         if document.supersedes:
             metadata['PREVIOUS_VERSION'] = document.supersedes.version_string or 'N/A'
@@ -252,19 +255,7 @@ class DocumentAnnotationProcessor:
         
         # REVISION_COUNT - Total number of revisions
         # Count all documents in the same family
-        try:
-            import re
-            base_number = re.sub(r'-v\d+\.\d+$', '', document.document_number) if document.document_number else ''
-            if base_number:
-                from .models import Document as DocumentModel
-                revision_count = DocumentModel.objects.filter(
-                    document_number__startswith=base_number
-                ).count()
-                metadata['REVISION_COUNT'] = str(revision_count)
-            else:
-                metadata['REVISION_COUNT'] = '1'
-        except Exception:
-            metadata['REVISION_COUNT'] = '1'
+        metadata['REVISION_COUNT'] = str(len(family)) if base_number(document.document_number) else '1'
         
         # Common alternative placeholder names for backward compatibility with existing templates
         metadata.update({
@@ -286,14 +277,42 @@ class DocumentAnnotationProcessor:
         
         return metadata
 
+    def _add_download_metadata(self, metadata: Dict[str, Any]) -> None:
+        """Add the download date and time, which are never cached."""
+        # Current date/time information (for download) - Using UTC timezone-aware datetime
+        now_utc = timezone.now()  # UTC timezone-aware datetime
+        today_utc = now_utc.date()    # UTC date
+        
+        # Get display timezone (Singapore)
+        display_tz = pytz.timezone(getattr(settings, 'DISPLAY_TIMEZONE', 'Asia/Singapore'))
+        now_local = now_utc.astimezone(display_tz)
+        
+        # Get timezone abbreviations
+        utc_name = 'UTC'
+        local_name = 'SGT'  # Singapore Standard Time  # 'SGT' for Singapore Time
+        
+        metadata['DOWNLOAD_DATE'] = today_utc.strftime('%Y-%m-%d')
+        metadata['DOWNLOAD_DATE_LONG'] = today_utc.strftime('%B %d, %Y')
+        metadata['DOWNLOAD_TIME'] = f"{now_utc.strftime('%H:%M:%S')} UTC ({now_local.strftime('%H:%M:%S')} {local_name})"
+        metadata['DOWNLOAD_DATETIME'] = f"{now_utc.strftime('%Y-%m-%d %H:%M:%S')} UTC ({now_local.strftime('%Y-%m-%d %H:%M:%S')} {local_name})"
+        metadata['DOWNLOAD_DATETIME_ISO'] = now_utc.isoformat()  # ISO 8601 format with timezone
+        metadata['CURRENT_DATE'] = today_utc.strftime('%Y-%m-%d')
+        metadata['CURRENT_DATE_LONG'] = today_utc.strftime('%B %d, %Y')
+        metadata['CURRENT_TIME'] = f"{now_utc.strftime('%H:%M:%S')} UTC ({now_local.strftime('%H:%M:%S')} {local_name})"
+        metadata['CURRENT_DATETIME'] = f"{now_utc.strftime('%Y-%m-%d %H:%M:%S')} UTC ({now_local.strftime('%Y-%m-%d %H:%M:%S')} {local_name})"
+        metadata['CURRENT_DATETIME_ISO'] = now_utc.isoformat()  # ISO 8601 format with timezone
+        metadata['CURRENT_YEAR'] = str(today_utc.year)
+        metadata['TIMEZONE'] = f"{utc_name} / {local_name}"  # Show both timezones
+        
+        # DOWNLOADED_DATE - Alias for DOWNLOAD_DATE
+        metadata['DOWNLOADED_DATE'] = metadata['DOWNLOAD_DATE']
 
-
-    def _create_version_history_docx_table(self, document):
+    def _create_version_history_docx_table(self, document, family=None):
         """Create version history data for DOCX table using python-docx-template syntax."""
         try:
             # Get structured data
             from apps.placeholders.services import placeholder_service
-            data = placeholder_service._get_version_history_data(document)
+            data = placeholder_service._get_version_history_data(document, family)
             
             if 'error' in data:
                 return []
@@ -0,0 +1,412 @@
+"""
+Content-addressed blob store for Document Management (O1).
+
+Files are stored once per distinct SHA-256 under
+``blobs/<aa>/<bb>/<sha256><ext>`` and shared by every document, document
+version and attachment with identical content. Reference counts are kept
+on ``ContentBlob`` rows by the document signals; unreferenced blobs are
+removed by ``collect_garbage`` once a grace period has passed.
+"""
+
+import hashlib
+import logging
+import os
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .uploads import stream_to_storage
+
+logger = logging.getLogger(__name__)
+
+BLOB_ROOT = 'blobs'
+DEFAULT_GC_GRACE_HOURS = 24
+
+# Models whose ``file_path`` may reference a blob: (app_label, model_name)
+REFERENCING_MODELS = [
+    ('documents', 'Document'),
+    ('documents', 'DocumentVersion'),
+    ('documents', 'DocumentAttachment'),
+]
+
+
+def blob_path(sha256, extension=''):
+    """Storage path of the blob with the given checksum."""
+    return f"{BLOB_ROOT}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extension.lower()}"
+
+
+def is_blob_path(path):
+    return bool(path) and path.startswith(f"{BLOB_ROOT}/") and not path.startswith(f"{BLOB_ROOT}/tmp/")
+
+
+def _blob_model():
+    from .models import ContentBlob
+    return ContentBlob
+
+
+def _referencing_models():
+    from django.apps import apps
+    return [apps.get_model(app_label, name) for app_label, name in REFERENCING_MODELS]
+
+
+def _promote(storage, tmp_path, final_path):
+    """Move a temporary upload to its content-addressed location."""
+    if storage.exists(final_path):
+        # Same checksum means same bytes; keep the existing copy
+        storage.delete(tmp_path)
+        return final_path
+
+    try:
+        source, target = storage.path(tmp_path), storage.path(final_path)
+    except NotImplementedError:
+        with storage.open(tmp_path, 'rb') as f:
+            saved_path = storage.save(final_path, f)
+        storage.delete(tmp_path)
+    else:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(source, target)
+        saved_path = final_path
+
+    if saved_path != final_path:
+        # Lost a race with a concurrent upload of the same content
+        storage.delete(saved_path)
+    return final_path
+
+
+def _existing_blob(sha256):
+    """
+    Return the blob row for a checksum, if any.
+
+    Resets the garbage collection clock of an unreferenced blob so it is
+    not collected before the new reference is saved.
+    """
+    ContentBlob = _blob_model()
+    with transaction.atomic():
+        blob = ContentBlob.objects.select_for_update().filter(sha256=sha256).first()
+        if blob is not None and blob.ref_count == 0:
+            blob.unreferenced_at = timezone.now()
+            blob.save(update_fields=['unreferenced_at'])
+    return blob
+
+
+def _register(sha256, storage_path, size):
+    ContentBlob = _blob_model()
+    try:
+        with transaction.atomic():
+            return ContentBlob.objects.create(
+                sha256=sha256,
+                storage_path=storage_path,
+                size=size,
+                # Not referenced until a document row points at it
+                unreferenced_at=timezone.now(),
+            )
+    except IntegrityError:
+        blob = ContentBlob.objects.get(sha256=sha256)
+        if blob.storage_path != storage_path:
+            # A concurrent upload registered the same content under another extension
+            default_storage.delete(storage_path)
+        return blob
+
+
+def _finish(tmp_path, checksum, size, extension):
+    """Turn a hashed temporary file into a blob, deduplicating against existing ones."""
+    storage = default_storage
+    blob = _existing_blob(checksum)
+    if blob is None:
+        return _register(checksum, _promote(storage, tmp_path, blob_path(checksum, extension)), size)
+
+    if storage.exists(blob.storage_path):
+        storage.delete(tmp_path)
+    else:
+        logger.warning(f"Blob {checksum} was missing from storage; restoring it from the new upload")
+        _promote(storage, tmp_path, blob.storage_path)
+    return blob
+
+
+def store(source, name, expected_size=None, expected_checksum=None):
+    """
+    Store file content, reusing an existing blob when the content is known.
+
+    Sources received through the checksum upload handlers carry their
+    SHA-256 already, so duplicates are detected without writing anything.
+    Other sources are streamed to a temporary location while hashing and
+    then moved into place (or discarded if the blob already exists).
+
+    Args:
+        source: File-like object or uploaded file
+        name: Original file name (its extension is kept on the blob path)
+        expected_size: Optional size the content must have
+        expected_checksum: Optional SHA-256 the content must have
+
+    Returns:
+        ContentBlob
+
+    Raises:
+        ValidationError: if the content does not match the expectations
+    """
+    extension = os.path.splitext(name)[1]
+
+    precomputed = getattr(source, 'sha256', None)
+    if precomputed and hasattr(source, 'chunks'):
+        _check_expectations(source.size, precomputed, expected_size, expected_checksum)
+        blob = _existing_blob(precomputed)
+        if blob is not None and default_storage.exists(blob.storage_path):
+            return blob
+
+    tmp_path, size, checksum = stream_to_storage(f"{BLOB_ROOT}/tmp/{uuid.uuid4().hex}", source)
+    try:
+        _check_expectations(size, checksum, expected_size, expected_checksum)
+    except ValidationError:
+        default_storage.delete(tmp_path)
+        raise
+    return _finish(tmp_path, checksum, size, extension)
+
+
+def _check_expectations(size, checksum, expected_size, expected_checksum):
+    if expected_size is not None and size != expected_size:
+        raise ValidationError(f'Expected {expected_size} bytes, received {size}')
+    if expected_checksum and checksum != expected_checksum.lower():
+        raise ValidationError('Checksum mismatch')
+
+
+# ============================================================================
+# Reference counting
+# ============================================================================
+
+def acquire(path):
+    """Record a new reference to the blob stored at ``path``."""
+    if not is_blob_path(path):
+        return
+    _blob_model().objects.filter(storage_path=path).update(
+        ref_count=F('ref_count') + 1,
+        unreferenced_at=None,
+    )
+
+
+def release(path):
+    """Drop a reference to the blob stored at ``path``."""
+    if not is_blob_path(path):
+        return
+    ContentBlob = _blob_model()
+    ContentBlob.objects.filter(storage_path=path).update(
+        ref_count=Greatest(F('ref_count') - 1, 0)
+    )
+    ContentBlob.objects.filter(
+        storage_path=path, ref_count=0, unreferenced_at__isnull=True
+    ).update(unreferenced_at=timezone.now())
+
+
+def replace_reference(old_path, new_path):
+    """Move a reference from one blob to another (no-op if unchanged)."""
+    if old_path == new_path:
+        return
+    acquire(new_path)
+    release(old_path)
+
+
+def _count_references(path, referencing_models=None):
+    return sum(
+        model.objects.filter(file_path=path).count()
+        for model in (referencing_models or _referencing_models())
+    )
+
+
+def recount_references():
+    """
+    Recompute every blob's reference count from the referencing tables.
+
+    Returns:
+        Number of blobs whose count was corrected
+    """
+    ContentBlob = _blob_model()
+    referencing_models = _referencing_models()
+    corrected = 0
+    for blob in ContentBlob.objects.iterator():
+        actual = _count_references(blob.storage_path, referencing_models)
+        if actual != blob.ref_count:
+            ContentBlob.objects.filter(pk=blob.pk).update(
+                ref_count=actual,
+                unreferenced_at=None if actual else (blob.unreferenced_at or timezone.now()),
+            )
+            corrected += 1
+    return corrected
+
+
+# ============================================================================
+# Garbage collection and verification
+# ============================================================================
+
+def collect_garbage(grace_period=None, dry_run=False, batch_size=500):
+    """
+    Delete blobs that have been unreferenced for longer than the grace period.
+
+    Each candidate is locked and its references re-counted before deletion,
+    so a blob picked up by a concurrent upload is never removed. Storage
+    files are deleted only after the row deletion commits.
+
+    Returns:
+        Dict with counts of deleted blobs and reclaimed bytes
+    """
+    ContentBlob = _blob_model()
+    if grace_period is None:
+        grace_period = timedelta(
+            hours=getattr(settings, 'DOCUMENT_PROCESSING', {}).get('BLOB_GC_GRACE_HOURS', DEFAULT_GC_GRACE_HOURS)
+        )
+    cutoff = timezone.now() - grace_period
+    referencing_models = _referencing_models()
+
+    deleted = 0
+    reclaimed = 0
+    skipped = 0
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            candidates = list(
+                ContentBlob.objects.select_for_update(skip_locked=True)
+                .filter(pk__gt=last_pk, ref_count=0, unreferenced_at__lte=cutoff)
+                .order_by('pk')[:batch_size]
+            )
+            if not candidates:
+                break
+            last_pk = candidates[-1].pk
+
+            for blob in candidates:
+                actual = _count_references(blob.storage_path, referencing_models)
+                if actual:
+                    # Counter drifted; repair instead of deleting
+                    ContentBlob.objects.filter(pk=blob.pk).update(ref_count=actual, unreferenced_at=None)
+                    skipped += 1
+                    continue
+
+                deleted += 1
+                reclaimed += blob.size
+                if dry_run:
+                    continue
+                path = blob.storage_path
+                blob.delete()
+                transaction.on_commit(lambda p=path: _delete_file(p))
+
+    return {'deleted': deleted, 'reclaimed_bytes': reclaimed, 'repaired': skipped, 'dry_run': dry_run}
+
+
+def _delete_file(path):
+    try:
+        default_storage.delete(path)
+    except Exception as e:
+        logger.warning(f"Could not delete blob file {path}: {e}")
+
+
+def hash_file(path, chunk_size=64 * 1024):
+    sha256_hash = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            sha256_hash.update(chunk)
+    return sha256_hash.hexdigest()
+
+
+def verify_blobs(limit=None):
+    """
+    Re-hash stored blobs, oldest verification first.
+
+    Every distinct file is hashed once no matter how many documents share it.
+
+    Returns:
+        Dict with verified, corrupted and missing counts and the corrupted checksums
+    """
+    ContentBlob = _blob_model()
+    queryset = ContentBlob.objects.order_by(F('verified_at').asc(nulls_first=True))
+    if limit:
+        queryset = queryset[:limit]
+
+    results = {'verified': 0, 'corrupted': [], 'missing': []}
+    for blob in queryset:
+        if not os.path.exists(blob.full_file_path):
+            results['missing'].append(blob.sha256)
+        elif hash_file(blob.full_file_path) != blob.sha256:
+            results['corrupted'].append(blob.sha256)
+        else:
+            results['verified'] += 1
+            ContentBlob.objects.filter(pk=blob.pk).update(verified_at=timezone.now())
+    return results
+
+
+# ============================================================================
+# Backfill of existing files
+# ============================================================================
+
+def _resolve_legacy_path(path):
+    """Absolute path of a pre-blob ``file_path`` (see Document.full_file_path)."""
+    if path.startswith('storage/documents/'):
+        return os.path.join(settings.BASE_DIR, path)
+    return os.path.join(settings.MEDIA_ROOT, path)
+
+
+def backfill(blob_model=None, referencing_models=None, stdout=None):
+    """
+    Move existing document files into the blob store.
+
+    Every distinct non-blob ``file_path`` is hashed once, stored (or matched
+    to an existing blob), and all rows pointing at it are repointed to the
+    blob. Originals are removed after the transaction commits. Usable from
+    data migrations by passing historical models.
+
+    Returns:
+        Dict with counts of migrated paths, created blobs and missing files
+    """
+    blob_model = blob_model or _blob_model()
+    referencing_models = referencing_models or _referencing_models()
+    storage = default_storage
+
+    paths = set()
+    for model in referencing_models:
+        paths.update(
+            model.objects.exclude(file_path='').exclude(file_path__startswith=f"{BLOB_ROOT}/")
+            .values_list('file_path', flat=True).distinct()
+        )
+
+    results = {'migrated_paths': 0, 'created_blobs': 0, 'missing_files': 0}
+    for path in sorted(paths):
+        source = _resolve_legacy_path(path)
+        if not os.path.exists(source):
+            results['missing_files'] += 1
+            continue
+
+        checksum = hash_file(source)
+        blob = blob_model.objects.filter(sha256=checksum).first()
+        if blob is None:
+            target_path = blob_path(checksum, os.path.splitext(path)[1])
+            target = storage.path(target_path)
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(source, 'rb') as src, open(target, 'wb') as dst:
+                    for chunk in iter(lambda: src.read(64 * 1024), b""):
+                        dst.write(chunk)
+            blob = blob_model.objects.create(
+                sha256=checksum,
+                storage_path=target_path,
+                size=os.path.getsize(target),
+                ref_count=0,
+            )
+            results['created_blobs'] += 1
+
+        references = 0
+        for model in referencing_models:
+            references += model.objects.filter(file_path=path).update(file_path=blob.storage_path)
+        blob_model.objects.filter(pk=blob.pk).update(
+            ref_count=F('ref_count') + references,
+            unreferenced_at=None,
+        )
+        transaction.on_commit(lambda p=source: os.path.exists(p) and os.remove(p))
+        results['migrated_paths'] += 1
+
+        if stdout:
+            stdout.write(f"  {path} -> {blob.storage_path} ({references} references)")
+
+    return results
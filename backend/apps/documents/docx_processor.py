@@ -1,10 +1,20 @@
 """
 DOCX Document Processing with Placeholder Replacement
 Handles .docx template processing using python-docx-template
+
+Templates are rendered and post-processed on one in-memory document and
+written once. Parsed template packages and the Jinja templates compiled
+from their parts are cached per file checksum, so repeated downloads of the
+same version skip unzipping, XML parsing and template compilation.
 """
 
+import copy
+import io
 import os
+import re
 import tempfile
+import threading
+from collections import OrderedDict
 from typing import Dict, Any, Optional
 from django.conf import settings
 from django.contrib.auth import get_user_model
@@ -20,6 +30,103 @@ except ImportError:
     DOCX_TEMPLATE_AVAILABLE = False
     DocxTemplate = None
 
+DEFAULT_TEMPLATE_CACHE_SIZE = 16
+
+
+class TemplateSkeleton:
+    """Parsed template package plus the Jinja templates compiled from its parts (by part name)."""
+
+    def __init__(self, file_path):
+        from docx import Document as DocxDocument
+
+        self.file_path = file_path
+        with open(file_path, 'rb') as f:
+            self.docx = DocxDocument(io.BytesIO(f.read()))
+        self.compiled = {}
+        self.encodings = {}
+
+
+class TemplateSkeletonCache:
+    """Least recently used skeletons keyed by file checksum, shared by request threads."""
+
+    def __init__(self, max_size=None):
+        self.max_size = max_size
+        self._skeletons = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, checksum, file_path):
+        max_size = self.max_size or getattr(settings, 'DOCX_TEMPLATE_CACHE_SIZE', DEFAULT_TEMPLATE_CACHE_SIZE)
+        with self._lock:
+            skeleton = self._skeletons.get(checksum)
+            if skeleton is not None:
+                self._skeletons.move_to_end(checksum)
+                return skeleton
+
+        skeleton = TemplateSkeleton(file_path)
+        with self._lock:
+            skeleton = self._skeletons.setdefault(checksum, skeleton)
+            self._skeletons.move_to_end(checksum)
+            while len(self._skeletons) > max_size:
+                self._skeletons.popitem(last=False)
+        return skeleton
+
+    def __contains__(self, checksum):
+        return checksum in self._skeletons
+
+    def clear(self):
+        with self._lock:
+            self._skeletons.clear()
+
+
+if DOCX_TEMPLATE_AVAILABLE:
+    from jinja2 import Template
+
+    class SkeletonDocxTemplate(DocxTemplate):
+        """
+        DocxTemplate rendering a private copy of a cached skeleton.
+
+        Body, header and footer templates are compiled once per skeleton;
+        later renders only evaluate them. The skeleton itself is never
+        modified (its document body must not be accessed through
+        python-docx, which would cache the pre-render body on the copies).
+        """
+
+        def __init__(self, skeleton):
+            super().__init__(skeleton.file_path)
+            self.skeleton = skeleton
+            self.docx = copy.deepcopy(skeleton.docx)
+
+        def build_xml(self, context, jinja_env=None):
+            return self._render_cached(self.docx._part, lambda: self.patch_xml(self.get_xml()), context)
+
+        def build_headers_footers_xml(self, context, uri, jinja_env=None):
+            for relKey, part in self.get_headers_footers(uri):
+                xml = self._render_cached(part, lambda: self._patched_part_xml(part), context)
+                yield relKey, xml.encode(self.skeleton.encodings.get(str(part.partname), 'utf-8'))
+
+        def _patched_part_xml(self, part):
+            xml = self.get_part_xml(part)
+            self.skeleton.encodings[str(part.partname)] = self.get_headers_footers_encoding(xml)
+            return self.patch_xml(xml)
+
+        def _render_cached(self, part, patched_xml, context):
+            # Same steps as DocxTemplate.render_xml_part, with the compiled template reused
+            key = str(part.partname)
+            template = self.skeleton.compiled.get(key)
+            if template is None:
+                template = Template(re.sub(r"<w:p([ >])", r"\n<w:p\1", patched_xml()))
+                self.skeleton.compiled[key] = template
+            self.current_rendering_part = part
+            dst_xml = template.render(context)
+            dst_xml = re.sub(r"\n<w:p([ >])", r"<w:p\1", dst_xml)
+            dst_xml = (
+                dst_xml.replace("{_{", "{{")
+                .replace("}_}", "}}")
+                .replace("{_%", "{%")
+                .replace("%_}", "%}")
+            )
+            return self.resolve_listing(dst_xml)
+
 
 class DocxTemplateProcessor:
     """
@@ -28,6 +135,7 @@ class DocxTemplateProcessor:
     
     def __init__(self):
         self.template_available = DOCX_TEMPLATE_AVAILABLE
+        self.skeletons = TemplateSkeletonCache()
         
     def is_available(self) -> bool:
         """Check if docx template processing is available"""
@@ -36,7 +144,17 @@ class DocxTemplateProcessor:
     def process_docx_template(self, document: Document, user: User = None) -> Optional[str]:
         """
         Process .docx file and replace placeholders with actual document metadata
-        Returns path to processed file or None if processing fails
+        Returns path to processed file (for converters that need a file on disk)
+        """
+        content = self.render_docx(document, user)
+        with tempfile.NamedTemporaryFile(suffix='_processed.docx', delete=False) as temp_file:
+            temp_file.write(content)
+        return temp_file.name
+    
+    def render_docx(self, document: Document, user: User = None) -> bytes:
+        """
+        Process .docx file and replace placeholders with actual document metadata
+        Returns the processed file content
         """
         if not self.template_available:
             raise ImportError("python-docx-template is not installed. Run: pip install python-docx-template")
@@ -52,80 +170,43 @@ class DocxTemplateProcessor:
             raise ValueError("File is not a .docx document")
         
         try:
-            # Load the template
-            doc_template = DocxTemplate(document.full_file_path)
-            
             # Get metadata for placeholder replacement
             metadata = annotation_processor.get_document_metadata(document, user)
             
             # Add some additional formatting options
             context = self._prepare_template_context(metadata, document, user)
             
-            # Render the template first to process all placeholders
-            doc_template.render(context)
-            
-            # Create temporary file for the fully processed template
-            with tempfile.NamedTemporaryFile(suffix='_processed.docx', delete=False) as temp_template_file:
-                temp_template_path = temp_template_file.name
-            
-            # Save the fully processed template first
-            doc_template.save(temp_template_path)
-            
-            # Now handle VERSION_HISTORY table creation on the saved, fully-processed document
-            table_created = False
-            try:
-                # Load the processed document and add tables
-                from docx import Document as DocxDocument
-                processed_doc = DocxDocument(temp_template_path)
-                table_created = self._process_version_history_tables_post_render(processed_doc, context)
-                
-                if table_created:
-                    # Save the document with table modifications
-                    processed_doc.save(temp_template_path)
-                    print("✅ Added VERSION_HISTORY table to fully processed document")
-                else:
-                    print("✅ No VERSION_HISTORY tables needed")
-            except Exception as table_error:
-                print(f"⚠️ Table creation failed: {table_error}, continuing with template-only version")
-            
-            # FIXED: Create final output file
-            with tempfile.NamedTemporaryFile(
-                suffix='_processed.docx',
-                delete=False
-            ) as temp_file:
-                temp_file_path = temp_file.name
-            
-            try:
-                # Copy the processed file to the final output location
-                import shutil
-                shutil.copy2(temp_template_path, temp_file_path)
-                
-                # Clean up intermediate file
-                os.unlink(temp_template_path)
-                
-                # Verify the file was created and has content
-                if not os.path.exists(temp_file_path):
-                    raise RuntimeError("Failed to create processed DOCX file")
-                
-                file_size = os.path.getsize(temp_file_path)
-                if file_size == 0:
-                    raise RuntimeError("Generated DOCX file is empty")
-                
-                print(f"✅ DOCX processing successful: {temp_file_path} ({file_size} bytes)")
-                return temp_file_path
-                
-            except Exception as save_error:
-                # Clean up failed file
-                if os.path.exists(temp_file_path):
-                    try:
-                        os.unlink(temp_file_path)
-                    except:
-                        pass
-                raise RuntimeError(f"Failed to save processed DOCX: {save_error}")
+            checksum = document.file_checksum or self._file_checksum(document.full_file_path)
+            content = self.render_template(document.full_file_path, checksum, context)
+            if not content:
+                raise RuntimeError("Generated DOCX file is empty")
+            return content
             
         except Exception as e:
             raise RuntimeError(f"Failed to process .docx template: {str(e)}")
     
+    def render_template(self, file_path: str, checksum: str, context: Dict[str, Any]) -> bytes:
+        """Render a template file with ``context`` and post-process it in memory."""
+        doc_template = SkeletonDocxTemplate(self.skeletons.get(checksum, file_path))
+        
+        # Render the template first to process all placeholders
+        doc_template.render(context)
+        
+        # Then handle VERSION_HISTORY table creation on the same rendered document
+        try:
+            self._process_version_history_tables_post_render(doc_template.docx, context)
+        except Exception as table_error:
+            print(f"⚠️ Table creation failed: {table_error}, continuing with template-only version")
+        
+        output = io.BytesIO()
+        doc_template.save(output)
+        return output.getvalue()
+    
+    @staticmethod
+    def _file_checksum(file_path):
+        from .blob_store import hash_file
+        return hash_file(file_path)
+    
     def _prepare_template_context(self, metadata: Dict[str, Any], document: Document, user: User = None) -> Dict[str, Any]:
         """
         Prepare template context with additional formatting and helper functions
@@ -157,8 +238,8 @@ class DocxTemplateProcessor:
         context['is_under_review'] = 'REVIEW' in document.status
         
         # Add workflow status helpers
-        context['has_reviewer'] = document.reviewer is not None
-        context['has_approver'] = document.approver is not None
+        context['has_reviewer'] = document.reviewer_id is not None
+        context['has_approver'] = document.approver_id is not None
         context['has_effective_date'] = document.effective_date is not None
         context['has_approval_date'] = document.approval_date is not None
         
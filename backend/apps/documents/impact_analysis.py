@@ -0,0 +1,184 @@
+"""
+Transitive impact analysis over document dependencies.
+
+Up-versioning a document affects every document that depends on it, and
+every document depending on those in turn. ``DocumentImpactAnalysis`` walks
+``DocumentDependency`` with one recursive CTE, starting from the edges into
+any version of the changed document's family:
+
+* each dependent is kept at its shortest depth; the walk stops at
+  ``max_depth`` and the ``UNION`` keeps one row per document and depth, so
+  the working set stays bounded by documents x depth even on dense graphs,
+* superseded, obsolete, terminated and inactive documents are dropped and
+  only the latest remaining version of each dependent family is reported,
+* the author and approver of each reported document are joined in, so the
+  notification recipients come back in the same round trip.
+
+Results are capped at ``limit`` documents, nearest first; ``truncated`` says
+whether more were found.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+
+from .models import Document, DocumentDependency
+
+# Dependency hops followed from the changed document
+DEFAULT_MAX_DEPTH = 10
+
+# Affected documents returned
+DEFAULT_LIMIT = 500
+
+# Versions that no longer need to react to a change
+INACTIVE_STATUSES = ('SUPERSEDED', 'OBSOLETE', 'TERMINATED')
+
+# Version suffix of document numbers: -vMM.mm (versions are 1-99 / 0-99)
+VERSION_SUFFIX_LENGTH = 7
+VERSION_SUFFIX_PATTERN = '-v__.__'
+
+UUID_FIELD = Document._meta.get_field('uuid')
+
+
+def family_number(document_number):
+    """Base document number shared by every version of a family."""
+    if len(document_number) > VERSION_SUFFIX_LENGTH and document_number[-VERSION_SUFFIX_LENGTH:-5] == '-v':
+        return document_number[:-VERSION_SUFFIX_LENGTH]
+    return document_number
+
+
+def _family_sql(column):
+    return (
+        f"CASE WHEN {column} LIKE '%%{VERSION_SUFFIX_PATTERN}' "
+        f"THEN SUBSTR({column}, 1, LENGTH({column}) - {VERSION_SUFFIX_LENGTH}) ELSE {column} END"
+    )
+
+
+def _impact_sql():
+    qn = connection.ops.quote_name
+    documents = qn(Document._meta.db_table)
+    dependencies = qn(DocumentDependency._meta.db_table)
+    users = qn(get_user_model()._meta.db_table)
+    statuses = ', '.join(['%s'] * len(INACTIVE_STATUSES))
+    return f"""
+        WITH RECURSIVE impacted (document_id, depth) AS (
+            SELECT dep.document_id, 1
+            FROM {dependencies} dep
+            JOIN {documents} source ON source.id = dep.depends_on_id
+            WHERE dep.is_active = %s
+              AND (source.document_number = %s OR source.document_number LIKE %s)
+            UNION
+            SELECT dep.document_id, impacted.depth + 1
+            FROM {dependencies} dep
+            JOIN impacted ON dep.depends_on_id = impacted.document_id
+            WHERE dep.is_active = %s AND impacted.depth < %s
+        ),
+        nearest AS (
+            SELECT document_id, MIN(depth) AS depth FROM impacted GROUP BY document_id
+        ),
+        ranked AS (
+            SELECT d.id, d.uuid, d.document_number, d.title, d.status, d.author_id, d.approver_id,
+                   nearest.depth, {_family_sql('d.document_number')} AS family,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY {_family_sql('d.document_number')}
+                       ORDER BY d.version_major DESC, d.version_minor DESC
+                   ) AS family_rank
+            FROM nearest
+            JOIN {documents} d ON d.id = nearest.document_id
+            WHERE d.is_active = %s AND d.status NOT IN ({statuses})
+        )
+        SELECT ranked.id, ranked.uuid, ranked.document_number, ranked.title, ranked.status, ranked.depth,
+               author.id, author.username, author.email, author.first_name, author.last_name,
+               approver.id, approver.username, approver.email, approver.first_name, approver.last_name
+        FROM ranked
+        JOIN {users} author ON author.id = ranked.author_id
+        LEFT JOIN {users} approver ON approver.id = ranked.approver_id
+        WHERE ranked.family_rank = 1 AND ranked.family <> %s
+        ORDER BY ranked.depth, ranked.document_number
+        LIMIT %s
+    """
+
+
+def _user(row):
+    user_id, username, email, first_name, last_name = row
+    if user_id is None:
+        return None
+    return {
+        'id': user_id,
+        'username': username,
+        'email': email,
+        'full_name': f"{first_name} {last_name}".strip() or username,
+    }
+
+
+class DocumentImpactAnalysis:
+    """Transitive dependents of a document and who to notify about them."""
+
+    @property
+    def max_depth(self):
+        return getattr(settings, 'IMPACT_ANALYSIS_MAX_DEPTH', DEFAULT_MAX_DEPTH)
+
+    @property
+    def limit(self):
+        return getattr(settings, 'IMPACT_ANALYSIS_LIMIT', DEFAULT_LIMIT)
+
+    def analyze(self, document, max_depth=None, limit=None):
+        """
+        Documents affected by a change to ``document``'s family (one query).
+
+        Args:
+            document: Document being changed
+            max_depth: Dependency hops to follow (default IMPACT_ANALYSIS_MAX_DEPTH)
+            limit: Affected documents to return (default IMPACT_ANALYSIS_LIMIT)
+
+        Returns:
+            dict: {
+                'affected_documents': [{'uuid', 'document_number', 'title', 'status', 'depth', 'author', 'approver'}],
+                'notification_recipients': [{'id', 'username', 'email', 'full_name', 'documents'}],
+                'max_depth': int,
+                'truncated': bool
+            }
+        """
+        max_depth = max_depth or self.max_depth
+        limit = limit or self.limit
+        family = family_number(document.document_number)
+        params = [
+            True, family, family + VERSION_SUFFIX_PATTERN,
+            True, max_depth,
+            True, *INACTIVE_STATUSES,
+            family, limit + 1,
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(_impact_sql(), params)
+            rows = cursor.fetchall()
+
+        affected = []
+        recipients = {}
+        for row in rows[:limit]:
+            author, approver = _user(row[6:11]), _user(row[11:16])
+            affected.append({
+                'uuid': str(UUID_FIELD.to_python(row[1])),
+                'document_number': row[2],
+                'title': row[3],
+                'status': row[4],
+                'depth': row[5],
+                'author': author['username'],
+                'approver': approver['username'] if approver else None,
+            })
+            for user in (author, approver):
+                if user is None:
+                    continue
+                recipient = recipients.setdefault(user['id'], {**user, 'documents': []})
+                if row[2] not in recipient['documents']:
+                    recipient['documents'].append(row[2])
+
+        return {
+            'affected_documents': affected,
+            'notification_recipients': sorted(recipients.values(), key=lambda user: user['username']),
+            'max_depth': max_depth,
+            'truncated': len(rows) > limit,
+        }
+
+
+# Service instance
+impact_analysis = DocumentImpactAnalysis()
@@ -0,0 +1,118 @@
+"""
+Management command comparing the legacy and in-memory DOCX render paths.
+
+Builds a multi-page template with body, header and table placeholders and
+renders it repeatedly through the old pipeline (render, save to a temporary
+file, reload with python-docx, save again, copy) and through
+``docx_processor.render_template``.
+"""
+
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.documents.docx_processor import DOCX_TEMPLATE_AVAILABLE, docx_processor
+
+
+def build_fixture(path, pages):
+    """Write a template of ``pages`` pages using the placeholders of real EDMS templates."""
+    from docx import Document as DocxDocument
+
+    fixture = DocxDocument()
+    fixture.sections[0].header.paragraphs[0].text = '{{DOC_NUMBER}} - {{DOC_TITLE}} (v{{DOC_VERSION}})'
+    for page in range(pages):
+        fixture.add_heading(f'Section {page + 1}: {{{{DOC_TITLE}}}}', level=1)
+        for line in range(12):
+            fixture.add_paragraph(
+                f'Step {line + 1} of section {page + 1}, owned by {{{{AUTHOR_NAME}}}} and approved by '
+                '{{APPROVER_NAME}} on {{APPROVAL_DATE}}. Operators follow this step exactly as written.'
+            )
+        table = fixture.add_table(rows=4, cols=3)
+        for row in table.rows:
+            row.cells[0].text = '{{DOC_NUMBER}}'
+            row.cells[1].text = '{{DOC_STATUS}}'
+            row.cells[2].text = '{{EFFECTIVE_DATE}}'
+        fixture.add_page_break()
+    fixture.add_paragraph('{{VERSION_HISTORY}}')
+    fixture.save(path)
+
+
+def fixture_context():
+    rows = [
+        {'version': f'{major:02d}.00', 'date': '01/02/2026', 'author': 'Author One',
+         'status': 'SUPERSEDED', 'comments': 'Periodic review update'}
+        for major in range(1, 6)
+    ]
+    return {
+        'DOC_NUMBER': 'SOP-2026-0001', 'DOC_TITLE': 'Cleanroom Gowning', 'DOC_VERSION': '05.00',
+        'DOC_STATUS': 'EFFECTIVE', 'AUTHOR_NAME': 'Author One', 'APPROVER_NAME': 'Approver One',
+        'APPROVAL_DATE': '01/02/2026', 'EFFECTIVE_DATE': '01/03/2026',
+        'VERSION_HISTORY': '{{VERSION_HISTORY}}', 'VERSION_HISTORY_TABLE_ROWS': rows,
+    }
+
+
+def render_legacy(path, context):
+    """The pipeline ``process_docx_template`` used before rendering in memory."""
+    from docx import Document as DocxDocument
+    from docxtpl import DocxTemplate
+
+    doc_template = DocxTemplate(path)
+    doc_template.render(context)
+    with tempfile.NamedTemporaryFile(suffix='_processed.docx', delete=False) as temp_template_file:
+        temp_template_path = temp_template_file.name
+    doc_template.save(temp_template_path)
+
+    processed_doc = DocxDocument(temp_template_path)
+    if docx_processor._process_version_history_tables_post_render(processed_doc, context):
+        processed_doc.save(temp_template_path)
+
+    with tempfile.NamedTemporaryFile(suffix='_processed.docx', delete=False) as temp_file:
+        temp_file_path = temp_file.name
+    shutil.copy2(temp_template_path, temp_file_path)
+    os.unlink(temp_template_path)
+    with open(temp_file_path, 'rb') as f:
+        content = f.read()
+    os.unlink(temp_file_path)
+    return content
+
+
+class Command(BaseCommand):
+    help = 'Benchmark legacy vs in-memory DOCX template rendering on a multi-page fixture'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=20, help='Pages in the generated template')
+        parser.add_argument('--iterations', type=int, default=20, help='Renders per path')
+
+    def handle(self, *args, **options):
+        if not DOCX_TEMPLATE_AVAILABLE:
+            raise CommandError('python-docx-template is not installed')
+
+        context = fixture_context()
+        with tempfile.TemporaryDirectory() as workdir:
+            path = os.path.join(workdir, 'fixture.docx')
+            build_fixture(path, options['pages'])
+            checksum = docx_processor._file_checksum(path)
+            docx_processor.skeletons.clear()
+
+            timings = {}
+            for name, render in [
+                ('legacy', lambda: render_legacy(path, context)),
+                ('in-memory', lambda: docx_processor.render_template(path, checksum, context)),
+            ]:
+                samples = []
+                for _ in range(options['iterations']):
+                    started = time.perf_counter()
+                    render()
+                    samples.append((time.perf_counter() - started) * 1000)
+                timings[name] = samples
+                self.stdout.write(
+                    f"{name:>10}: first {samples[0]:.1f} ms, median {statistics.median(samples):.1f} ms "
+                    f"over {len(samples)} renders"
+                )
+
+        speedup = statistics.median(timings['legacy']) / statistics.median(timings['in-memory'])
+        self.stdout.write(self.style.SUCCESS(f"In-memory rendering is {speedup:.1f}x faster (median)"))
@@ -0,0 +1,78 @@
+"""
+Management command for the content-addressed document blob store.
+
+Backfills existing document files into the store, collects unreferenced
+blobs, re-verifies stored content and repairs reference counts.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.documents import blob_store
+
+
+class Command(BaseCommand):
+    help = 'Maintain the content-addressed document blob store'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'operation',
+            choices=['backfill', 'gc', 'verify', 'recount'],
+            help='backfill: move existing files into the store; gc: delete unreferenced blobs; '
+                 'verify: re-hash stored blobs; recount: repair reference counts',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what garbage collection would delete without deleting',
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=int,
+            default=None,
+            help='Only collect blobs unreferenced for at least this many hours',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Maximum number of blobs to verify',
+        )
+
+    def handle(self, *args, **options):
+        operation = options['operation']
+
+        if operation == 'backfill':
+            with transaction.atomic():
+                results = blob_store.backfill(stdout=self.stdout)
+            self.stdout.write(self.style.SUCCESS(
+                f"Backfilled {results['migrated_paths']} file(s) into {results['created_blobs']} new blob(s); "
+                f"{results['missing_files']} file(s) missing"
+            ))
+
+        elif operation == 'gc':
+            grace_period = None
+            if options['grace_hours'] is not None:
+                grace_period = timedelta(hours=options['grace_hours'])
+            results = blob_store.collect_garbage(grace_period=grace_period, dry_run=options['dry_run'])
+            prefix = 'Would delete' if results['dry_run'] else 'Deleted'
+            self.stdout.write(self.style.SUCCESS(
+                f"{prefix} {results['deleted']} blob(s), {results['reclaimed_bytes']} bytes; "
+                f"repaired {results['repaired']} drifted reference count(s)"
+            ))
+
+        elif operation == 'verify':
+            results = blob_store.verify_blobs(limit=options['limit'])
+            self.stdout.write(f"Verified {results['verified']} blob(s)")
+            for sha256 in results['missing']:
+                self.stdout.write(self.style.ERROR(f"Missing: {sha256}"))
+            for sha256 in results['corrupted']:
+                self.stdout.write(self.style.ERROR(f"Corrupted: {sha256}"))
+            if results['missing'] or results['corrupted']:
+                raise CommandError('Blob store verification failed')
+
+        elif operation == 'recount':
+            corrected = blob_store.recount_references()
+            self.stdout.write(self.style.SUCCESS(f"Corrected {corrected} reference count(s)"))
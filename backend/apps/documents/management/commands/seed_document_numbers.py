@@ -0,0 +1,20 @@
+"""
+Management command to seed document number sequences from existing numbers.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.documents import numbering
+
+
+class Command(BaseCommand):
+    help = 'Seed per-type, per-year document number counters from existing document numbers'
+
+    def handle(self, *args, **options):
+        stdout = self.stdout if options['verbosity'] >= 2 else None
+        with transaction.atomic():
+            results = numbering.seed(stdout=stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {results['created']} and raised {results['raised']} document number counter(s)"
+        ))
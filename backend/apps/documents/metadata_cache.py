@@ -0,0 +1,92 @@
+"""
+Cached document metadata context.
+
+The placeholder context of a document (people, dates, workflow state,
+revision count and version history) only changes when the document, another
+version of it, a workflow or a dependency changes, yet every annotated or
+processed download rebuilt it from the database. ``metadata_cache`` keeps
+that context under ``documents:metadata:<id>:<updated_at>``; each entry
+records the token of the document's family (all versions sharing the base
+number) it was built under. The signal receivers in ``signals`` drop the
+family token when the transaction that changed the family commits, so every
+entry of the family misses on its next read and is rebuilt. Values computed
+at download time (download date, current time) are never cached.
+"""
+
+import logging
+import re
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'documents:metadata:'
+FAMILY_PREFIX = f'{KEY_PREFIX}family:'
+
+# Seconds an entry is kept; also bounds staleness from changes no signal sees
+# (user renames, bulk ``update()`` calls)
+DEFAULT_TIMEOUT = 60 * 60
+
+
+def base_number(document_number):
+    """Document number without its version suffix (PROC-2025-0001-v01.00 -> PROC-2025-0001)."""
+    return re.sub(r'-v\d+\.\d+$', '', document_number) if document_number else ''
+
+
+class DocumentMetadataCache:
+    """Metadata contexts cached per document version, invalidated per family."""
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'DOCUMENT_METADATA_CACHE_TIMEOUT', DEFAULT_TIMEOUT)
+
+    @staticmethod
+    def _entry_key(document):
+        stamp = document.updated_at.timestamp() if document.updated_at else 0
+        return f'{KEY_PREFIX}{document.pk}:{stamp}'
+
+    @staticmethod
+    def _family_key(document_number):
+        return f'{FAMILY_PREFIX}{base_number(document_number)}'
+
+    def get(self, document, build):
+        """Cached context of ``document``, or ``build(document)`` stored for the next call."""
+        entry_key = self._entry_key(document)
+        family_key = self._family_key(document.document_number)
+        try:
+            values = cache.get_many([entry_key, family_key])
+        except Exception as e:
+            logger.warning(f"Document metadata cache unavailable, building context: {e}")
+            return build(document)
+
+        token = values.get(family_key)
+        entry = values.get(entry_key)
+        if token and entry and entry['token'] == token:
+            return entry['metadata']
+
+        if not token:
+            # Set before building: an invalidation committing meanwhile drops it
+            token = uuid.uuid4().hex
+            cache.set(family_key, token, timeout=None)
+        metadata = build(document)
+        cache.set(entry_key, {'token': token, 'metadata': metadata}, timeout=self.timeout)
+        return metadata
+
+    def invalidate(self, document_number):
+        """Drop the cached contexts of a document family once the transaction commits."""
+        if document_number:
+            family_key = self._family_key(document_number)
+            transaction.on_commit(lambda: self._drop(family_key))
+
+    def _drop(self, family_key):
+        try:
+            cache.delete(family_key)
+        except Exception as e:
+            logger.warning(f"Document metadata family {family_key} not invalidated: {e}")
+
+
+# Service instance
+metadata_cache = DocumentMetadataCache()
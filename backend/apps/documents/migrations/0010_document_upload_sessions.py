@@ -0,0 +1,47 @@
+# Generated by Django 4.2.16 on 2026-10-18 21:35
+
+from django.conf import settings
+import django.core.validators
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('documents', '0006_add_system_configuration'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentUploadSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(db_index=True, default=uuid.uuid4, editable=False, unique=True)),
+                ('file_name', models.CharField(max_length=255)),
+                ('file_size', models.BigIntegerField(validators=[django.core.validators.MinValueValidator(1)])),
+                ('chunk_size', models.PositiveIntegerField()),
+                ('expected_checksum', models.CharField(blank=True, max_length=64)),
+                ('received_parts', models.JSONField(blank=True, default=dict)),
+                ('status', models.CharField(choices=[('ACTIVE', 'Active'), ('COMPLETED', 'Completed'), ('ABORTED', 'Aborted')], db_index=True, default='ACTIVE', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='document_upload_sessions', to=settings.AUTH_USER_MODEL)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='documents.document')),
+            ],
+            options={
+                'verbose_name': 'Document Upload Session',
+                'verbose_name_plural': 'Document Upload Sessions',
+                'db_table': 'document_upload_sessions',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='documentuploadsession',
+            index=models.Index(fields=['document', 'status'], name='document_up_documen_1a93f1_idx'),
+        ),
+    ]
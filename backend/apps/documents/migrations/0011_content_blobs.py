@@ -0,0 +1,50 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:10
+
+from django.db import migrations, models
+
+
+def backfill_content_blobs(apps, schema_editor):
+    """Move existing document, version and attachment files into the blob store."""
+    from apps.documents.blob_store import backfill
+
+    backfill(
+        blob_model=apps.get_model('documents', 'ContentBlob'),
+        referencing_models=[
+            apps.get_model('documents', 'Document'),
+            apps.get_model('documents', 'DocumentVersion'),
+            apps.get_model('documents', 'DocumentAttachment'),
+        ],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0010_document_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('storage_path', models.CharField(max_length=500, unique=True)),
+                ('size', models.BigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('unreferenced_at', models.DateTimeField(blank=True, db_index=True, help_text='When the blob last dropped to zero references (garbage collection grace period)', null=True)),
+                ('verified_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Content Blob',
+                'verbose_name_plural': 'Content Blobs',
+                'db_table': 'document_content_blobs',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='contentblob',
+            index=models.Index(fields=['ref_count', 'unreferenced_at'], name='document_co_ref_cou_23b508_idx'),
+        ),
+        migrations.RunPython(backfill_content_blobs, migrations.RunPython.noop),
+    ]
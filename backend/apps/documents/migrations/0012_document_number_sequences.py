@@ -0,0 +1,44 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:21
+
+from django.db import migrations, models
+
+
+def seed_document_number_sequences(apps, schema_editor):
+    """Start every counter at the highest document number already in use."""
+    from apps.documents.numbering import seed
+
+    seed(
+        document_model=apps.get_model('documents', 'Document'),
+        sequence_model=apps.get_model('documents', 'DocumentNumberSequence'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0011_content_blobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentNumberSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=10)),
+                ('year', models.PositiveIntegerField()),
+                ('last_value', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Document Number Sequence',
+                'verbose_name_plural': 'Document Number Sequences',
+                'db_table': 'document_number_sequences',
+                'ordering': ['prefix', '-year'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='documentnumbersequence',
+            constraint=models.UniqueConstraint(fields=('prefix', 'year'), name='unique_document_number_sequence'),
+        ),
+        migrations.RunPython(seed_document_number_sequences, migrations.RunPython.noop),
+    ]
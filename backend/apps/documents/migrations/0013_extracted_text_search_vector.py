@@ -0,0 +1,66 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:43
+
+import django.contrib.postgres.search
+from django.db import migrations, models
+
+
+def backfill_search_vectors(apps, schema_editor):
+    """Index the metadata of existing documents; body text follows as files are extracted."""
+    from apps.documents.search_vectors import document_vector
+
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    apps.get_model('documents', 'Document').objects.update(
+        search_vector=document_vector(apps.get_model('documents', 'ExtractedText'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0012_document_number_sequences'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractedText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('text', models.TextField(blank=True)),
+                ('method', models.CharField(choices=[('TEXT', 'Plain text'), ('DOCX', 'Word document'), ('PDF', 'PDF text layer'), ('PDF_OCR', 'PDF text layer and OCR'), ('OCR', 'OCR'), ('NONE', 'No extractable text')], max_length=10)),
+                ('page_count', models.PositiveIntegerField(default=0)),
+                ('ocr_page_count', models.PositiveIntegerField(default=0, help_text='Pages without a text layer that were passed to OCR')),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Extracted Text',
+                'verbose_name_plural': 'Extracted Texts',
+                'db_table': 'document_extracted_texts',
+            },
+        ),
+        # The text column never held data; retype it in place, discarding it
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AlterField(
+                    model_name='document',
+                    name='search_vector',
+                    field=django.contrib.postgres.search.SearchVectorField(blank=True, editable=False, null=True),
+                ),
+            ],
+            database_operations=[
+                migrations.RunSQL(
+                    "ALTER TABLE documents ALTER COLUMN search_vector DROP NOT NULL, "
+                    "ALTER COLUMN search_vector TYPE tsvector USING NULL;",
+                    reverse_sql="ALTER TABLE documents ALTER COLUMN search_vector TYPE text USING '', "
+                                "ALTER COLUMN search_vector SET NOT NULL;"
+                ),
+            ],
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS documents_search_vector_gin ON documents USING gin (search_vector);",
+            reverse_sql="DROP INDEX IF EXISTS documents_search_vector_gin;"
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.16 on 2026-10-18 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0013_extracted_text_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=100, unique=True)),
+                ('frequency', models.PositiveIntegerField(default=1)),
+                ('last_searched', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Search Term',
+                'verbose_name_plural': 'Search Terms',
+                'db_table': 'document_search_terms',
+                'ordering': ['-frequency'],
+            },
+        ),
+        # Substring autocomplete: icontains compares UPPER(column) LIKE UPPER('%text%')
+        migrations.RunSQL(
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm;",
+            reverse_sql=migrations.RunSQL.noop
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS documents_title_trgm_idx "
+            "ON documents USING gin (UPPER(title) gin_trgm_ops);",
+            reverse_sql="DROP INDEX IF EXISTS documents_title_trgm_idx;"
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS documents_number_trgm_idx "
+            "ON documents USING gin (UPPER(document_number) gin_trgm_ops);",
+            reverse_sql="DROP INDEX IF EXISTS documents_number_trgm_idx;"
+        ),
+    ]
@@ -8,12 +8,15 @@ including documents, versions, dependencies, and file storage with 21 CFR Part 1
 import uuid
 import os
 import hashlib
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import RegexValidator, MinValueValidator, MaxValueValidator
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.core.exceptions import ValidationError
+
+from apps.core.change_capture import ChangeCaptureMixin
 from .sensitivity_labels import SENSITIVITY_CHOICES
 
 
@@ -168,7 +171,7 @@ class DocumentManager(models.Manager):
         return self.filter(status__in=['PENDING_REVIEW', 'PENDING_APPROVAL'])
 
 
-class Document(models.Model):
+class Document(ChangeCaptureMixin, models.Model):
     """
     Main Document model for the EDMS system.
     
@@ -383,8 +386,9 @@ class Document(models.Model):
     requires_training = models.BooleanField(default=False)
     is_controlled = models.BooleanField(default=True)
     
-    # Search and indexing
-    search_vector = models.TextField(blank=True)  # For PostgreSQL full-text search
+    # Search and indexing: metadata plus extracted body text, maintained by
+    # apps.documents.search_vectors (never written by save())
+    search_vector = SearchVectorField(null=True, blank=True, editable=False)
     
     # Additional metadata
     metadata = models.JSONField(default=dict, blank=True)
@@ -460,66 +464,53 @@ class Document(models.Model):
     
     def save(self, *args, **kwargs):
         """Override save to handle auto-generation and validation."""
-        # Auto-generate document number if not set
-        if not self.document_number:
-            base_number = self.generate_document_number()
-            # Always use zero-padded version suffix for consistency
-            self.document_number = f"{base_number}-v{self.version_major:02d}.{self.version_minor:02d}"
-        
         # Calculate file checksum if file exists
         if self.file_path and not self.file_checksum:
             self.file_checksum = self.calculate_file_checksum()
         
-        super().save(*args, **kwargs)
+        # Leave the search vector alone: the loaded value may predate a refresh
+        if (not self._state.adding and self.pk is not None
+                and kwargs.get('update_fields') is None and not kwargs.get('force_insert')):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'search_vector'
+            ]
+        
+        if self.document_number:
+            super().save(*args, **kwargs)
+            return
+        
+        # Auto-generate document number if not set. The sequence increment
+        # commits or rolls back together with the insert, keeping numbers gap-free.
+        with transaction.atomic(using=kwargs.get('using')):
+            base_number = self.generate_document_number()
+            # Always use zero-padded version suffix for consistency
+            self.document_number = f"{base_number}-v{self.version_major:02d}.{self.version_minor:02d}"
+            try:
+                super().save(*args, **kwargs)
+            except Exception:
+                self.document_number = ''
+                raise
     
     def generate_document_number(self, document_type=None):
-        """Generate unique document number based on document type."""
+        """Allocate the next document number for the document type and current year."""
         from django.utils import timezone
+        from .numbering import allocate
         
         # Use provided document_type or fall back to instance document_type
         doc_type = document_type or self.document_type
+        year = timezone.now().year
         if not doc_type:
             # Fallback numbering if no type specified
-            year = timezone.now().year
-            count = Document.objects.filter(created_at__year=year).count() + 1
-            return f"DOC-{year}-{count:04d}"
+            return f"DOC-{year}-{allocate('DOC', year):04d}"
         
-        year = timezone.now().year
         prefix = doc_type.numbering_prefix or doc_type.code
         
-        # Find the next sequence number for this type and year
-        # Look for documents with the pattern {prefix}-{year}-{sequence} (ignoring version suffixes)
-        existing_docs = Document.objects.filter(
-            document_type=doc_type,
-            document_number__startswith=f"{prefix}-{year}-"
-        ).values_list('document_number', flat=True)
-        
-        # Extract sequence numbers from existing documents
-        sequence_numbers = []
-        for doc_number in existing_docs:
-            try:
-                # Remove version suffix if present (e.g., "MAN-2025-0001-v1.0" -> "MAN-2025-0001")
-                base_number = doc_number.split('-v')[0] if '-v' in doc_number else doc_number
-                # Extract the sequence part (last segment after splitting by '-')
-                parts = base_number.split('-')
-                if len(parts) >= 3:
-                    seq_str = parts[-1]
-                    if seq_str.isdigit():
-                        sequence_numbers.append(int(seq_str))
-            except (ValueError, IndexError):
-                continue
-        
-        # Find the next available sequence number
-        if sequence_numbers:
-            next_seq = max(sequence_numbers) + 1
-        else:
-            next_seq = 1
-        
         # Format using document type's numbering format
         return doc_type.numbering_format.format(
             prefix=prefix,
             year=year,
-            sequence=next_seq
+            sequence=allocate(prefix, year)
         )
     
     def calculate_file_checksum(self):
@@ -826,9 +817,14 @@ class Document(models.Model):
         
         # Clean up pending workflow tasks for terminated document
         from ..workflows.models import WorkflowInstance
-        # WorkflowTask removed - using document filters instead
+        from ..workflows.task_inbox import task_inbox
         from django.contrib.contenttypes.models import ContentType
         
+        # Cancel all pending inbox tasks for this document
+        cancelled_tasks_count = task_inbox.cancel_document_tasks(
+            self, f'Task cancelled due to document termination: {reason}'
+        )
+        
         # Get all active workflow instances for this document
         content_type = ContentType.objects.get_for_model(self)
         workflow_instances = WorkflowInstance.objects.filter(
@@ -836,18 +832,7 @@ class Document(models.Model):
             object_id=str(self.id),
             is_active=True
         )
-        
-        # Cancel all pending tasks for this document
-        cancelled_tasks_count = 0
         for instance in workflow_instances:
-            pending_tasks = instance.tasks.filter(status__in=['PENDING', 'IN_PROGRESS'])
-            for task in pending_tasks:
-                task.status = 'CANCELLED'
-                task.completed_at = tz.now()
-                task.completion_note = f'Task cancelled due to document termination: {reason}'
-                task.save()
-                cancelled_tasks_count += 1
-            
             # Mark workflow instances as completed
             instance.complete_workflow(f'Document terminated: {reason}')
         
@@ -888,7 +873,7 @@ class Document(models.Model):
         return True
 
 
-class DocumentVersion(models.Model):
+class DocumentVersion(ChangeCaptureMixin, models.Model):
     """
     Document Version History model.
     
@@ -1572,7 +1557,7 @@ class DocumentComment(models.Model):
         return f"Comment on {self.document.document_number} by {self.author.username}"
 
 
-class DocumentAttachment(models.Model):
+class DocumentAttachment(ChangeCaptureMixin, models.Model):
     """
     Document Attachment model for supporting files.
     
@@ -1670,6 +1655,226 @@ class DocumentAttachment(models.Model):
         return sha256_hash.hexdigest() == self.file_checksum
 
 
+class ContentBlob(models.Model):
+    """
+    Content-addressed file stored once per distinct SHA-256.
+
+    Documents, document versions and attachments point at a blob through
+    their ``file_path``; ``ref_count`` tracks how many rows do so, and
+    unreferenced blobs are removed by the blob store garbage collector
+    after a grace period.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    storage_path = models.CharField(max_length=500, unique=True)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    unreferenced_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        db_index=True,
+        help_text='When the blob last dropped to zero references (garbage collection grace period)'
+    )
+    verified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        app_label = "documents"
+        db_table = 'document_content_blobs'
+        verbose_name = _('Content Blob')
+        verbose_name_plural = _('Content Blobs')
+        indexes = [
+            models.Index(fields=['ref_count', 'unreferenced_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+    @property
+    def full_file_path(self):
+        """Return the full file path."""
+        return os.path.join(settings.MEDIA_ROOT, self.storage_path)
+
+
+class ExtractedText(models.Model):
+    """
+    Body text extracted from a file, stored once per distinct SHA-256.
+
+    Documents reach their text through ``file_checksum``, so re-uploading an
+    identical file reuses the extraction. Filled by
+    ``apps.documents.text_extraction`` and folded into the document search
+    vector with the lowest weight.
+    """
+
+    METHOD_CHOICES = [
+        ('TEXT', 'Plain text'),
+        ('DOCX', 'Word document'),
+        ('PDF', 'PDF text layer'),
+        ('PDF_OCR', 'PDF text layer and OCR'),
+        ('OCR', 'OCR'),
+        ('NONE', 'No extractable text'),
+    ]
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    text = models.TextField(blank=True)
+    method = models.CharField(max_length=10, choices=METHOD_CHOICES)
+    page_count = models.PositiveIntegerField(default=0)
+    ocr_page_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Pages without a text layer that were passed to OCR'
+    )
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        app_label = "documents"
+        db_table = 'document_extracted_texts'
+        verbose_name = _('Extracted Text')
+        verbose_name_plural = _('Extracted Texts')
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.method}, {len(self.text)} chars)"
+
+
+class SearchTerm(models.Model):
+    """
+    Normalized search query and how often it returned results.
+
+    Harvested from document searches and served as autocomplete
+    suggestions by prefix; ``apps.documents.suggestions`` prunes the table
+    to the most popular terms.
+    """
+
+    term = models.CharField(max_length=100, unique=True)
+    frequency = models.PositiveIntegerField(default=1)
+    last_searched = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "documents"
+        db_table = 'document_search_terms'
+        verbose_name = _('Search Term')
+        verbose_name_plural = _('Search Terms')
+        ordering = ['-frequency']
+
+    def __str__(self):
+        return f"{self.term} ({self.frequency})"
+
+
+class DocumentNumberSequence(models.Model):
+    """
+    Last document number sequence allocated per numbering prefix and year.
+
+    The prefix identifies the document type (its ``numbering_prefix`` or
+    ``code``; ``DOC`` for documents without a type). Rows are incremented in
+    place by ``apps.documents.numbering.allocate`` under the row lock of the
+    inserting transaction, so numbers are unique and gap-free.
+    """
+
+    prefix = models.CharField(max_length=10)
+    year = models.PositiveIntegerField()
+    last_value = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = "documents"
+        db_table = 'document_number_sequences'
+        verbose_name = _('Document Number Sequence')
+        verbose_name_plural = _('Document Number Sequences')
+        ordering = ['prefix', '-year']
+        constraints = [
+            models.UniqueConstraint(fields=['prefix', 'year'], name='unique_document_number_sequence'),
+        ]
+
+    def __str__(self):
+        return f"{self.prefix}-{self.year}: {self.last_value}"
+
+
+class DocumentUploadSession(models.Model):
+    """
+    Resumable chunked upload of a document file.
+
+    Parts are stored individually under ``uploads/<session uuid>/`` and
+    assembled into the document's storage path when the client completes
+    the session. Received parts and their checksums are tracked so an
+    interrupted upload can be resumed without resending finished parts.
+    """
+
+    STATUS_CHOICES = [
+        ('ACTIVE', 'Active'),
+        ('COMPLETED', 'Completed'),
+        ('ABORTED', 'Aborted'),
+    ]
+
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True, db_index=True)
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.CASCADE,
+        related_name='upload_sessions'
+    )
+    created_by = models.ForeignKey(User, on_delete=models.PROTECT, related_name='document_upload_sessions')
+
+    # Declared file information
+    file_name = models.CharField(max_length=255)
+    file_size = models.BigIntegerField(validators=[MinValueValidator(1)])
+    chunk_size = models.PositiveIntegerField()
+    expected_checksum = models.CharField(max_length=64, blank=True)
+
+    # Progress: {"<part number>": {"size": int, "checksum": str}}
+    received_parts = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='ACTIVE', db_index=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField(db_index=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        app_label = "documents"
+        db_table = 'document_upload_sessions'
+        verbose_name = _('Document Upload Session')
+        verbose_name_plural = _('Document Upload Sessions')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['document', 'status']),
+        ]
+
+    def __str__(self):
+        return f"Upload {self.uuid} for {self.document.document_number} ({self.status})"
+
+    @property
+    def total_parts(self):
+        """Number of parts the declared file size splits into."""
+        return (self.file_size + self.chunk_size - 1) // self.chunk_size
+
+    @property
+    def storage_prefix(self):
+        """Storage directory holding the uploaded parts."""
+        return f"uploads/{self.uuid}"
+
+    def part_path(self, part_number):
+        """Storage path of a single part."""
+        return f"{self.storage_prefix}/{part_number:05d}.part"
+
+    def expected_part_size(self, part_number):
+        """Size in bytes the given 1-based part must have."""
+        if part_number < self.total_parts:
+            return self.chunk_size
+        return self.file_size - self.chunk_size * (self.total_parts - 1)
+
+    def missing_parts(self):
+        """Part numbers that have not been received yet."""
+        return [
+            n for n in range(1, self.total_parts + 1)
+            if str(n) not in self.received_parts
+        ]
+
+    @property
+    def is_expired(self):
+        from django.utils import timezone
+        return self.expires_at <= timezone.now()
+
+
 # ============================================================================
 # SYSTEM CONFIGURATION
 # ============================================================================
@@ -0,0 +1,110 @@
+"""
+Document number allocation.
+
+Sequences live in ``DocumentNumberSequence`` rows, one per numbering prefix
+and year. ``allocate`` increments the row in place, so the row lock is held
+until the inserting transaction ends: concurrent creates of the same type
+queue on that single row instead of scanning existing numbers, and a rolled
+back insert releases its number to the next document.
+
+A year's counter is seeded from the highest existing number the first time
+it is used; ``seed`` (``manage.py seed_document_numbers``) does the same for
+every prefix and year at once.
+"""
+
+import re
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+# "<prefix>-<year>-<sequence>" with an optional "-vMM.mm" version suffix
+NUMBER_PATTERN = re.compile(r'^(?P<prefix>.+)-(?P<year>\d{4})-(?P<sequence>\d+)(?:-v\d+\.\d+)?$')
+
+
+def _sequence_model():
+    from .models import DocumentNumberSequence
+    return DocumentNumberSequence
+
+
+def _document_model():
+    from .models import Document
+    return Document
+
+
+def parse_number(document_number):
+    """Return ``(prefix, year, sequence)`` of a document number, or None if it has another format."""
+    match = NUMBER_PATTERN.match(document_number or '')
+    if not match:
+        return None
+    return match['prefix'], int(match['year']), int(match['sequence'])
+
+
+def highest_sequence(prefix, year, document_model=None):
+    """Highest sequence already used by documents numbered ``<prefix>-<year>-...``."""
+    document_model = document_model or _document_model()
+    numbers = document_model.objects.filter(
+        document_number__startswith=f"{prefix}-{year}-"
+    ).values_list('document_number', flat=True)
+    sequences = [parsed[2] for parsed in map(parse_number, numbers) if parsed and parsed[:2] == (prefix, year)]
+    return max(sequences, default=0)
+
+
+def allocate(prefix, year):
+    """
+    Allocate the next sequence number for ``prefix`` in ``year``.
+
+    Must run in the transaction that inserts the document: the counter row
+    stays locked until it commits, and a rollback returns the number.
+    """
+    sequence_model = _sequence_model()
+    counter = sequence_model.objects.filter(prefix=prefix, year=year)
+    with transaction.atomic():
+        if not counter.update(last_value=F('last_value') + 1):
+            try:
+                with transaction.atomic():
+                    sequence_model.objects.create(
+                        prefix=prefix, year=year, last_value=highest_sequence(prefix, year)
+                    )
+            except IntegrityError:
+                pass  # Created by a concurrent first allocation; queue on its row lock
+            counter.update(last_value=F('last_value') + 1)
+        return counter.values_list('last_value', flat=True).get()
+
+
+def seed(document_model=None, sequence_model=None, stdout=None):
+    """
+    Raise every counter to the highest number already used for its prefix and year.
+
+    Counters are never lowered, so seeding is safe to repeat while documents
+    are being created. Usable from data migrations by passing historical
+    models.
+
+    Returns:
+        Dict with counts of created and raised counters
+    """
+    document_model = document_model or _document_model()
+    sequence_model = sequence_model or _sequence_model()
+
+    max_prefix_length = sequence_model._meta.get_field('prefix').max_length
+    highest = {}
+    for number in document_model.objects.values_list('document_number', flat=True).iterator():
+        parsed = parse_number(number)
+        if parsed and len(parsed[0]) <= max_prefix_length:
+            key = parsed[:2]
+            highest[key] = max(highest.get(key, 0), parsed[2])
+
+    results = {'created': 0, 'raised': 0}
+    for (prefix, year), value in sorted(highest.items()):
+        counter = sequence_model.objects.filter(prefix=prefix, year=year)
+        if counter.filter(last_value__lt=value).update(last_value=value):
+            results['raised'] += 1
+        elif not counter.exists():
+            sequence_model.objects.create(prefix=prefix, year=year, last_value=value)
+            results['created'] += 1
+        else:
+            continue
+
+        if stdout:
+            stdout.write(f"  {prefix}-{year}: {value}")
+
+    return results
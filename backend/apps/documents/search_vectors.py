@@ -0,0 +1,59 @@
+"""
+Stored full-text search vectors for documents.
+
+``Document.search_vector`` combines the metadata with the extracted body
+text of the document's file:
+
+- A: document number and title
+- B: description and keywords
+- D: body text (``ExtractedText``, matched on the file checksum)
+
+Vectors are computed by PostgreSQL in a single ``UPDATE`` and indexed with
+GIN, so searches no longer build a vector per row. Other databases keep
+the column empty.
+"""
+
+from django.contrib.postgres.search import SearchVector
+from django.db import connections, transaction
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Substr
+
+SEARCH_CONFIG = 'english'
+
+# to_tsvector input is capped at 1MB; the body text keeps to well below it
+MAX_BODY_CHARS = 200_000
+
+
+def document_vector(extracted_text_model):
+    """
+    Expression computing a document's search vector.
+
+    Takes the ``ExtractedText`` model so migrations can pass their
+    historical model.
+    """
+    body = Subquery(
+        extracted_text_model.objects.filter(sha256=OuterRef('file_checksum')).values('text')[:1]
+    )
+    return (
+        SearchVector('document_number', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('title', weight='A', config=SEARCH_CONFIG)
+        + SearchVector('description', weight='B', config=SEARCH_CONFIG)
+        + SearchVector('keywords', weight='B', config=SEARCH_CONFIG)
+        + SearchVector(
+            Substr(Coalesce(body, Value('')), 1, MAX_BODY_CHARS), weight='D', config=SEARCH_CONFIG
+        )
+    )
+
+
+def refresh(queryset):
+    """Recompute the search vectors of the documents in ``queryset``."""
+    if connections[queryset.db].vendor != 'postgresql':
+        return 0
+    from .models import ExtractedText
+    return queryset.update(search_vector=document_vector(ExtractedText))
+
+
+def refresh_on_commit(document_id):
+    """Recompute one document's search vector once the current transaction commits."""
+    from .models import Document
+    transaction.on_commit(lambda: refresh(Document.objects.filter(pk=document_id)))
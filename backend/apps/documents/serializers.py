@@ -496,11 +496,6 @@ class DocumentCreateSerializer(serializers.ModelSerializer):
     
     def create(self, validated_data):
         """Create new document with proper defaults and file handling."""
-        import os
-        import hashlib
-        import mimetypes
-        from django.conf import settings
-        
         # Get user from context with fallback
         user = self.context['request'].user
         if user.is_anonymous:
@@ -515,37 +510,9 @@ class DocumentCreateSerializer(serializers.ModelSerializer):
         document = super().create(validated_data)
         
         if uploaded_file:
-            # Create storage directory if it doesn't exist
-            storage_dir = os.path.join(settings.BASE_DIR, 'storage', 'documents')
-            os.makedirs(storage_dir, exist_ok=True)
-            
-            # Generate unique filename
-            file_extension = os.path.splitext(uploaded_file.name)[1]
-            filename = f"{document.uuid}{file_extension}"
-            file_path = os.path.join(storage_dir, filename)
-            
-            # Save file to disk
-            with open(file_path, 'wb') as f:
-                for chunk in uploaded_file.chunks():
-                    f.write(chunk)
-            
-            # Calculate file metadata
-            file_size = os.path.getsize(file_path)
-            mime_type, _ = mimetypes.guess_type(uploaded_file.name)
-            
-            # Calculate checksum
-            with open(file_path, 'rb') as f:
-                file_hash = hashlib.sha256()
-                for chunk in iter(lambda: f.read(4096), b""):
-                    file_hash.update(chunk)
-                checksum = file_hash.hexdigest()
-            
-            # Update document with file information
-            document.file_name = uploaded_file.name
-            document.file_path = os.path.relpath(file_path, settings.BASE_DIR)
-            document.file_size = file_size
-            document.file_checksum = checksum
-            document.mime_type = mime_type or 'application/octet-stream'
+            # Store content in the deduplicated blob store and record it on the document
+            from .uploads import save_document_file
+            save_document_file(document, uploaded_file)
             document.save()
         
         return document
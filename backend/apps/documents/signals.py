@@ -5,7 +5,7 @@ Handles automatic audit logging, file integrity checks,
 and document lifecycle events for compliance.
 """
 
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 
@@ -14,6 +14,46 @@ from .models import (
     DocumentAccessLog, DocumentComment, DocumentAttachment
 )
 
+# Document fields recorded in audit trail field changes
+TRACKED_FIELDS = [
+    'title', 'description', 'status', 'version_major', 'version_minor',
+    'reviewer', 'approver', 'effective_date', 'obsolete_date',
+    'file_path', 'file_checksum', 'is_active'
+]
+
+
+def document_field_changes(instance):
+    """
+    Tracked field changes of the save in progress, for the audit trail.
+    
+    Computed from the snapshot taken when the document was loaded
+    (ChangeCaptureMixin); only a changed reviewer/approver costs a query,
+    to record usernames.
+    """
+    changes = instance.field_changes
+    usernames = {}
+    user_ids = [
+        value for name in ('reviewer_id', 'approver_id') if name in changes
+        for value in changes[name] if value
+    ]
+    if user_ids:
+        from django.contrib.auth import get_user_model
+        usernames = dict(get_user_model().objects.filter(pk__in=user_ids).values_list('pk', 'username'))
+    
+    field_changes = {}
+    for field in TRACKED_FIELDS:
+        attname = Document._meta.get_field(field).attname
+        if attname not in changes:
+            continue
+        old_value, new_value = changes[attname]
+        if field in ['reviewer', 'approver']:
+            old_value, new_value = usernames.get(old_value), usernames.get(new_value)
+        field_changes[field] = {
+            'old': str(old_value) if old_value else None,
+            'new': str(new_value) if new_value else None
+        }
+    return field_changes
+
 
 @receiver(post_save, sender=Document)
 def create_document_audit_record(sender, instance, created, **kwargs):
@@ -31,7 +71,7 @@ def create_document_audit_record(sender, instance, created, **kwargs):
         user_display_name=current_user.get_full_name() if current_user else 'System',
         ip_address=get_current_ip_address(),
         object_representation=str(instance),
-        field_changes=getattr(instance, '_field_changes', {}),
+        field_changes={} if created else document_field_changes(instance),
         description=f"Document {action.lower()}: {instance.document_number}",
         module='O1',
         metadata={
@@ -170,45 +210,6 @@ def create_comment_audit_record(sender, instance, created, **kwargs):
         )
 
 
-@receiver(pre_save, sender=Document)
-def track_document_field_changes(sender, instance, **kwargs):
-    """Track field changes for audit purposes."""
-    if instance.pk:
-        try:
-            old_instance = Document.objects.get(pk=instance.pk)
-            changes = {}
-            
-            # Track specific field changes
-            tracked_fields = [
-                'title', 'description', 'status', 'version_major', 'version_minor',
-                'reviewer', 'approver', 'effective_date', 'obsolete_date',
-                'file_path', 'file_checksum', 'is_active'
-            ]
-            
-            for field in tracked_fields:
-                old_value = getattr(old_instance, field, None)
-                new_value = getattr(instance, field, None)
-                
-                # Handle foreign key fields
-                if field in ['reviewer', 'approver'] and old_value:
-                    old_value = old_value.username
-                if field in ['reviewer', 'approver'] and new_value:
-                    new_value = new_value.username
-                
-                if old_value != new_value:
-                    changes[field] = {
-                        'old': str(old_value) if old_value else None,
-                        'new': str(new_value) if new_value else None
-                    }
-            
-            # Store changes on instance for use in post_save signal
-            instance._field_changes = changes
-            
-        except Document.DoesNotExist:
-            # New document, no changes to track
-            instance._field_changes = {}
-
-
 @receiver(post_save, sender=DocumentAttachment)
 def create_attachment_audit_record(sender, instance, created, **kwargs):
     """Create audit record for document attachments."""
@@ -262,13 +263,12 @@ def create_attachment_removal_audit(sender, instance, **kwargs):
 @receiver(post_save, sender=Document)
 def handle_status_changes(sender, instance, created, **kwargs):
     """Handle document status changes and notifications."""
-    if not created and hasattr(instance, '_field_changes'):
-        changes = instance._field_changes
+    if not created:
+        changes = instance.field_changes
         
         # Check if status changed
         if 'status' in changes:
-            old_status = changes['status']['old']
-            new_status = changes['status']['new']
+            old_status, new_status = changes['status']
             
             # Handle specific status transitions
             if new_status == 'EFFECTIVE':
@@ -287,4 +287,102 @@ def handle_status_changes(sender, instance, created, **kwargs):
             elif new_status == 'OBSOLETE':
                 # Document became obsolete
                 instance.obsolete_date = timezone.now().date()
-                instance.save(update_fields=['obsolete_date'])
\ No newline at end of file
+                instance.save(update_fields=['obsolete_date'])
+
+# Content blob reference counting
+@receiver(post_save, sender=Document)
+def track_document_blob_reference(sender, instance, created, **kwargs):
+    """Keep content blob reference counts in step with the document's file."""
+    from . import blob_store
+    
+    if created:
+        blob_store.acquire(instance.file_path)
+        return
+    
+    change = instance.field_changes.get('file_path')
+    if change:
+        blob_store.replace_reference(change[0] or '', change[1] or '')
+
+
+@receiver(post_save, sender=DocumentVersion)
+@receiver(post_save, sender=DocumentAttachment)
+def track_file_blob_reference(sender, instance, created, **kwargs):
+    """Keep content blob reference counts in step with version and attachment files."""
+    from . import blob_store
+    
+    if created:
+        blob_store.acquire(instance.file_path)
+        return
+    
+    change = instance.field_changes.get('file_path')
+    if change:
+        blob_store.replace_reference(change[0] or '', change[1] or '')
+
+
+@receiver(post_delete, sender=Document)
+@receiver(post_delete, sender=DocumentVersion)
+@receiver(post_delete, sender=DocumentAttachment)
+def release_file_blob_reference(sender, instance, **kwargs):
+    """Release the content blob reference of a deleted row."""
+    from . import blob_store
+    
+    blob_store.release(instance.file_path)
+
+
+# Metadata context cache invalidation
+@receiver(post_save, sender=Document)
+@receiver(post_delete, sender=Document)
+def invalidate_document_metadata(sender, instance, **kwargs):
+    """Drop the cached metadata contexts of the document's family."""
+    from .metadata_cache import metadata_cache
+    
+    metadata_cache.invalidate(instance.document_number)
+    change = instance.field_changes.get('document_number')
+    if change:
+        metadata_cache.invalidate(change[0])
+
+
+@receiver(post_save, sender=DocumentDependency)
+@receiver(post_delete, sender=DocumentDependency)
+@receiver(post_save, sender='workflows.DocumentWorkflow')
+@receiver(post_delete, sender='workflows.DocumentWorkflow')
+def invalidate_related_document_metadata(sender, instance, **kwargs):
+    """Drop the cached metadata contexts when a dependency or workflow changes."""
+    from .metadata_cache import metadata_cache
+    
+    metadata_cache.invalidate(instance.document.document_number)
+
+
+@receiver(post_save, sender='workflows.DocumentTransition')
+def invalidate_transition_document_metadata(sender, instance, created, **kwargs):
+    """Drop the cached metadata contexts when a workflow transitions."""
+    from .metadata_cache import metadata_cache
+    
+    if created:
+        metadata_cache.invalidate(instance.workflow.document.document_number)
+
+
+# Body text extraction and search vectors
+SEARCH_VECTOR_FIELDS = ('document_number', 'title', 'description', 'keywords')
+
+
+@receiver(post_save, sender=Document)
+def update_document_search_index(sender, instance, created, **kwargs):
+    """Extract a replaced file, or refresh the vector when searchable metadata changes."""
+    from . import search_vectors, text_extraction
+    
+    # New documents are extracted from their initial version record
+    changes = instance.field_changes
+    if instance.file_checksum and 'file_checksum' in changes:
+        text_extraction.schedule(instance.pk)  # Refreshes the vector when done
+    elif created or any(field in changes for field in SEARCH_VECTOR_FIELDS):
+        search_vectors.refresh_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=DocumentVersion)
+def extract_version_text(sender, instance, created, **kwargs):
+    """Extract the text of the document's file when a new version is recorded."""
+    from . import text_extraction
+    
+    if created and instance.document.file_checksum:
+        text_extraction.schedule(instance.document_id)
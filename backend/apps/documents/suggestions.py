@@ -0,0 +1,138 @@
+"""
+Autocomplete suggestions for document search.
+
+Suggestions come from two index-backed sources:
+
+- Popular terms: ``SearchTerm`` rows starting with the typed text. Terms
+  are harvested from searches that found documents, and the table is
+  pruned to the most popular ``SEARCH_SUGGESTION_MAX_TERMS``. PostgreSQL
+  answers ``LIKE 'prefix%'`` from the ``varchar_pattern_ops`` index Django
+  adds to the unique ``term`` column. Terms are shared by all users, so a
+  term is only suggested when the title or number of a document the user
+  can read contains it.
+- Documents: titles and numbers containing the typed text. The ``pg_trgm``
+  GIN indexes on ``UPPER(title)`` and ``UPPER(document_number)`` match the
+  expressions ``icontains`` compares.
+
+Candidate documents are filtered by the user's read access and read
+without ``ORDER BY``, so PostgreSQL stops after a fixed window of readable
+index hits however many documents match. The window is then ranked.
+"""
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.utils import timezone
+
+from .models import Document, SearchTerm
+
+MIN_QUERY_LENGTH = 2
+DEFAULT_LIMIT = 10
+DEFAULT_MAX_TERMS = 10000
+
+# Terms searched fewer times are not suggested to anyone
+DEFAULT_MIN_FREQUENCY = 2
+
+# Documents read per suggestion slot before ranking
+CANDIDATE_FACTOR = 5
+
+MAX_TERM_LENGTH = SearchTerm._meta.get_field('term').max_length
+
+
+def normalize(query):
+    """Lowercased query with whitespace collapsed, as stored in ``SearchTerm``."""
+    return ' '.join(query.lower().split())[:MAX_TERM_LENGTH]
+
+
+def record_search(query):
+    """Count a search that returned documents towards its term's popularity."""
+    term = normalize(query)
+    if len(term) < MIN_QUERY_LENGTH:
+        return
+
+    def increment():
+        return SearchTerm.objects.filter(term=term).update(
+            frequency=F('frequency') + 1, last_searched=timezone.now()
+        )
+
+    if increment():
+        return
+    try:
+        with transaction.atomic():
+            SearchTerm.objects.create(term=term)
+    except IntegrityError:
+        increment()  # Created concurrently
+
+
+def prune_terms(max_terms=None):
+    """
+    Keep the most popular terms, deleting the rest.
+
+    Returns:
+        Number of terms deleted
+    """
+    if max_terms is None:
+        max_terms = getattr(settings, 'SEARCH_SUGGESTION_MAX_TERMS', DEFAULT_MAX_TERMS)
+    kept = list(
+        SearchTerm.objects.order_by('-frequency', '-last_searched').values_list('pk', flat=True)[:max_terms]
+    )
+    deleted, _ = SearchTerm.objects.exclude(pk__in=kept).delete()
+    return deleted
+
+
+def readable_documents(user):
+    """Active documents the user can read, as in document search: own documents, or effective ones."""
+    documents = Document.objects.filter(is_active=True)
+    if user.is_superuser:
+        return documents
+    return documents.filter(
+        Q(author=user) | Q(reviewer=user) | Q(approver=user) | Q(status='EFFECTIVE')
+    )
+
+
+def _match_rank(document, text):
+    title = document['title'].lower()
+    number = document['document_number'].lower()
+    prefix = title.startswith(text) or number.startswith(text)
+    position = title.find(text)
+    return (not prefix, position if position >= 0 else len(title), len(title))
+
+
+def term_suggestions(query, user, limit=DEFAULT_LIMIT):
+    """Popular search terms starting with ``query`` that match a document the user can read."""
+    min_frequency = getattr(settings, 'SEARCH_SUGGESTION_MIN_FREQUENCY', DEFAULT_MIN_FREQUENCY)
+    matching = readable_documents(user).filter(
+        Q(title__icontains=OuterRef('term')) | Q(document_number__icontains=OuterRef('term'))
+    )
+    terms = SearchTerm.objects.filter(
+        term__startswith=normalize(query), frequency__gte=min_frequency
+    ).filter(Exists(matching)).order_by('-frequency', 'term').values_list('term', 'frequency')[:limit]
+    return [{'text': term, 'type': 'term', 'frequency': frequency} for term, frequency in terms]
+
+
+def document_suggestions(query, user, limit=DEFAULT_LIMIT):
+    """Documents the user can read whose title or number contains ``query``."""
+    text = ' '.join(query.split())
+    candidates = readable_documents(user).filter(
+        Q(title__icontains=text) | Q(document_number__icontains=text)
+    ).order_by().values('uuid', 'document_number', 'title')[:limit * CANDIDATE_FACTOR]
+
+    text = text.lower()
+    readable = sorted(candidates, key=lambda document: _match_rank(document, text))
+    return [
+        {
+            'text': document['title'],
+            'type': 'document',
+            'document_number': document['document_number'],
+            'uuid': str(document['uuid']),
+        }
+        for document in readable[:limit]
+    ]
+
+
+def suggest(query, user, limit=DEFAULT_LIMIT):
+    """Popular terms first, then matching documents, ``limit`` in total."""
+    if len(query.strip()) < MIN_QUERY_LENGTH:
+        return []
+    terms = term_suggestions(query, user, max(limit // 2, 1))
+    return terms + document_suggestions(query, user, limit - len(terms))
@@ -0,0 +1,145 @@
+"""
+Celery tasks for Document Management (O1).
+
+Tasks are automatically discovered by Celery's autodiscover_tasks() and
+routed to the ``documents`` queue.
+"""
+
+from celery import shared_task
+from celery.utils.log import get_task_logger
+
+logger = get_task_logger(__name__)
+
+
+@shared_task
+def cleanup_expired_upload_sessions():
+    """
+    Abort expired resumable uploads and delete their stored parts.
+
+    Runs hourly via Celery Beat.
+    """
+    from .uploads import cleanup_expired_upload_sessions as cleanup
+
+    try:
+        count = cleanup()
+        logger.info(f"Cleaned up {count} expired upload sessions")
+        return {'cleaned_up': count}
+    except Exception as e:
+        logger.error(f"Upload session cleanup failed: {str(e)}")
+        raise
+
+
+@shared_task
+def collect_blob_garbage():
+    """
+    Delete content blobs that no document, version or attachment references.
+
+    Runs daily via Celery Beat.
+    """
+    from . import blob_store
+
+    try:
+        results = blob_store.collect_garbage()
+        logger.info(
+            f"Blob garbage collection deleted {results['deleted']} blobs "
+            f"({results['reclaimed_bytes']} bytes)"
+        )
+        return results
+    except Exception as e:
+        logger.error(f"Blob garbage collection failed: {str(e)}")
+        raise
+
+
+@shared_task
+def extract_document_text(document_id):
+    """
+    Extract the body text of a document's file and refresh the search vectors.
+
+    Every document sharing the file checksum gets the refreshed vector; a
+    checksum extracted before is not read again.
+    """
+    from . import search_vectors, text_extraction
+    from .models import Document
+
+    try:
+        document = Document.objects.filter(pk=document_id).first()
+        if document is None or not document.file_checksum:
+            return {'extracted': False}
+
+        extracted, created = text_extraction.extract_document(document)
+        refreshed = search_vectors.refresh(Document.objects.filter(file_checksum=document.file_checksum))
+        logger.info(
+            f"Text of {document.document_number} {'extracted' if created else 'reused'} "
+            f"({extracted.method}, {len(extracted.text)} chars), {refreshed} search vectors refreshed"
+        )
+        return {'extracted': created, 'method': extracted.method, 'refreshed': refreshed}
+    except Exception as e:
+        logger.error(f"Text extraction for document {document_id} failed: {str(e)}")
+        raise
+
+
+@shared_task
+def sign_official_pdfs(items, user_id):
+    """
+    Sign a batch of PDFs in storage for one user.
+
+    ``items`` are ``{'document_id', 'source', 'destination'}`` dictionaries
+    of storage paths. The signing certificate is looked up, validated and
+    its key loaded once for the whole batch.
+    """
+    from django.contrib.auth import get_user_model
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import default_storage
+    from apps.security.services.pdf_signer import PDFDigitalSigner
+    from .models import Document
+
+    try:
+        user = get_user_model().objects.get(pk=user_id)
+        documents = Document.objects.in_bulk([item['document_id'] for item in items])
+
+        def pdfs():
+            for item in items:
+                document = documents.get(item['document_id'])
+                if document is None:
+                    logger.warning(f"Document {item['document_id']} not found, PDF not signed")
+                    continue
+                with default_storage.open(item['source'], 'rb') as source:
+                    yield source.read(), document
+
+        destinations = {item['document_id']: item['destination'] for item in items}
+        signed = 0
+        failed = []
+        for result in PDFDigitalSigner().sign_many(pdfs(), user):
+            document = result['document']
+            if result['content'] is None:
+                failed.append(document.pk)
+                continue
+            destination = destinations[document.pk]
+            if default_storage.exists(destination):
+                default_storage.delete(destination)
+            default_storage.save(destination, ContentFile(result['content']))
+            signed += 1
+
+        logger.info(f"Signed {signed} of {len(items)} PDFs")
+        return {'signed': signed, 'failed': failed}
+    except Exception as e:
+        logger.error(f"Batch PDF signing failed: {str(e)}")
+        raise
+
+
+@shared_task
+def prune_search_terms():
+    """
+    Trim the autocomplete term table to the most popular terms.
+
+    Runs daily via Celery Beat.
+    """
+    from .suggestions import prune_terms
+
+    try:
+        deleted = prune_terms()
+        logger.info(f"Pruned {deleted} search terms")
+        return {'deleted': deleted}
+    except Exception as e:
+        logger.error(f"Search term pruning failed: {str(e)}")
+        raise
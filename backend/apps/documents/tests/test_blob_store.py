@@ -0,0 +1,114 @@
+"""
+Tests for the content-addressed document blob store
+"""
+import hashlib
+import io
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+
+from apps.documents import blob_store
+from apps.documents.models import ContentBlob, Document, DocumentType, DocumentSource, DocumentVersion
+from apps.documents.uploads import save_document_file
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+@pytest.mark.django_db
+class TestBlobStore:
+    """Deduplication, reference counting and garbage collection"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(
+            username='blobuser',
+            email='blob@example.com',
+            password='testpass123'
+        )
+        self.doc_type, _ = DocumentType.objects.get_or_create(
+            code='SOP',
+            defaults={'name': 'Standard Operating Procedure', 'created_by': self.user}
+        )
+        self.doc_source, _ = DocumentSource.objects.get_or_create(
+            name='Internal',
+            defaults={'source_type': 'INTERNAL'}
+        )
+
+    def _document(self, number):
+        return Document.objects.create(
+            document_number=number,
+            title='Blob Document',
+            document_type=self.doc_type,
+            document_source=self.doc_source,
+            author=self.user,
+            status='DRAFT',
+        )
+
+    def test_identical_content_is_stored_once(self):
+        data = b'identical template content' * 100
+        first = blob_store.store(io.BytesIO(data), 'template.docx')
+        second = blob_store.store(io.BytesIO(data), 'copy-of-template.docx')
+
+        assert first.pk == second.pk
+        assert first.sha256 == hashlib.sha256(data).hexdigest()
+        assert ContentBlob.objects.count() == 1
+        assert not default_storage.listdir('blobs/tmp')[1]
+
+    def test_document_references_are_counted(self):
+        data = b'shared attachment'
+        doc_a = self._document('BLOB-001-v01.00')
+        doc_b = self._document('BLOB-002-v01.00')
+
+        for doc in (doc_a, doc_b):
+            save_document_file(doc, _named(io.BytesIO(data), 'shared.pdf'))
+            doc.save()
+
+        blob = ContentBlob.objects.get(sha256=hashlib.sha256(data).hexdigest())
+        assert blob.ref_count == 2
+        assert doc_a.file_path == doc_b.file_path == blob.storage_path
+
+        doc_a.delete()
+        blob.refresh_from_db()
+        # The version records created for the deleted document go with it
+        assert blob.ref_count == 1
+
+    def test_garbage_collection_respects_references_and_grace_period(self):
+        orphan = blob_store.store(io.BytesIO(b'orphaned upload'), 'orphan.pdf')
+        doc = self._document('BLOB-003-v01.00')
+        save_document_file(doc, _named(io.BytesIO(b'kept'), 'kept.pdf'))
+        doc.save()
+
+        assert blob_store.collect_garbage()['deleted'] == 0
+
+        results = blob_store.collect_garbage(grace_period=timedelta(0))
+        assert results['deleted'] == 1
+        assert not ContentBlob.objects.filter(pk=orphan.pk).exists()
+        assert ContentBlob.objects.filter(storage_path=doc.file_path).exists()
+
+    def test_backfill_moves_existing_files_into_store(self, media_root):
+        doc = self._document('BLOB-004-v01.00')
+        legacy = media_root / 'documents' / str(doc.uuid) / 'legacy.docx'
+        legacy.parent.mkdir(parents=True)
+        legacy.write_bytes(b'legacy content')
+        Document.objects.filter(pk=doc.pk).update(file_path=f'documents/{doc.uuid}/legacy.docx')
+        DocumentVersion.objects.filter(document=doc).update(file_path=f'documents/{doc.uuid}/legacy.docx')
+
+        results = blob_store.backfill()
+
+        doc.refresh_from_db()
+        blob = ContentBlob.objects.get(storage_path=doc.file_path)
+        assert results['created_blobs'] == 1
+        assert blob.ref_count == 2
+        assert blob.sha256 == hashlib.sha256(b'legacy content').hexdigest()
+
+
+def _named(fileobj, name):
+    fileobj.name = name
+    return fileobj
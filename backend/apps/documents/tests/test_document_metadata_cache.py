@@ -0,0 +1,110 @@
+"""
+Tests for the cached document metadata context
+"""
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+
+from apps.documents.annotation_processor import annotation_processor
+from apps.documents.models import Document, DocumentSource, DocumentType
+from apps.workflows.models import DocumentState, DocumentTransition, DocumentWorkflow
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestDocumentMetadataCache:
+    """Metadata contexts served from the cache until the family changes"""
+
+    def setup_method(self):
+        self.author = User.objects.create_user(
+            username='metadata_author', password='test123', first_name='Alex', last_name='Author'
+        )
+        self.approver = User.objects.create_user(username='metadata_approver', password='test123')
+        self.doc_type = DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.author)
+        self.doc_source = DocumentSource.objects.create(name='Digital', source_type='original_digital')
+        self.document = self._create(status='EFFECTIVE', approver=self.approver)
+
+    def _create(self, **kwargs):
+        return Document.objects.create(
+            title='Metadata Procedure',
+            document_type=self.doc_type,
+            document_source=self.doc_source,
+            author=self.author,
+            version_major=1,
+            version_minor=0,
+            **kwargs
+        )
+
+    def _metadata(self):
+        return annotation_processor.get_document_metadata(Document.objects.get(pk=self.document.pk))
+
+    def test_repeat_download_is_a_cache_hit(self, django_assert_max_num_queries, django_assert_num_queries):
+        document = Document.objects.get(pk=self.document.pk)
+
+        with django_assert_max_num_queries(3):  # Document, family, transitions
+            first = annotation_processor.get_document_metadata(document)
+        with django_assert_num_queries(0):
+            second = annotation_processor.get_document_metadata(document)
+
+        download_fields = {name for name in first if name.startswith(('DOWNLOAD', 'CURRENT_'))}
+        assert {name: value for name, value in second.items() if name not in download_fields} == {
+            name: value for name, value in first.items() if name not in download_fields
+        }
+        assert second['AUTHOR_NAME'] == 'Alex Author'
+        assert second['APPROVER_NAME'] == 'metadata_approver'
+        assert second['REVISION_COUNT'] == '1'
+        assert second['VERSION_HISTORY_TABLE_DATA'][0]['comments'] == 'Initial creation'
+
+    def test_family_excludes_longer_sequence_numbers(self):
+        base = self.document.document_number.split('-v')[0]
+        self._create(document_number=f'{base}0-v01.00', status='EFFECTIVE')
+
+        metadata = self._metadata()
+
+        assert metadata['REVISION_COUNT'] == '1'
+        assert len(metadata['VERSION_HISTORY_TABLE_DATA']) == 1
+
+    def test_document_change_rebuilds_context(self, django_capture_on_commit_callbacks):
+        self._metadata()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self.document.title = 'Renamed Procedure'
+            self.document.save()
+
+        assert self._metadata()['DOC_TITLE'] == 'Renamed Procedure'
+
+    def test_new_version_invalidates_family(self, django_capture_on_commit_callbacks):
+        self._metadata()
+
+        with django_capture_on_commit_callbacks(execute=True):
+            self._create(
+                document_number=self.document.document_number.replace('-v01.00', '-v02.00'),
+                status='DRAFT',
+                supersedes=self.document,
+            )
+
+        assert self._metadata()['REVISION_COUNT'] == '2'
+
+    def test_workflow_transition_rebuilds_context(self, django_capture_on_commit_callbacks):
+        draft = DocumentState.objects.create(code='DRAFT', name='Draft')
+        review = DocumentState.objects.create(code='PENDING_REVIEW', name='Pending Review')
+        with django_capture_on_commit_callbacks(execute=True):
+            workflow = DocumentWorkflow.objects.create(
+                document=self.document, current_state=draft, initiated_by=self.author
+            )
+        assert self._metadata()['WORKFLOW_STATUS'] == 'Draft'
+
+        with django_capture_on_commit_callbacks(execute=True):
+            DocumentTransition.objects.create(
+                workflow=workflow, from_state=draft, to_state=review, transitioned_by=self.author
+            )
+            DocumentWorkflow.objects.filter(pk=workflow.pk).update(current_state=review)  # No save signal
+
+        assert self._metadata()['WORKFLOW_STATUS'] == 'Pending Review'
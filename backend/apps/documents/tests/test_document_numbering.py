@@ -0,0 +1,107 @@
+"""
+Tests for counter-based document number allocation
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.documents.models import Document, DocumentNumberSequence, DocumentSource, DocumentType
+
+User = get_user_model()
+
+
+class NumberingFixtures:
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='numbering_author', password='test123')
+        self.doc_type = DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.user)
+        self.doc_source = DocumentSource.objects.create(name='Digital', source_type='original_digital')
+        self.year = timezone.now().year
+
+    def _create(self, **kwargs):
+        return Document.objects.create(
+            title='Numbered Procedure',
+            document_type=self.doc_type,
+            document_source=self.doc_source,
+            author=self.user,
+            status='DRAFT',
+            version_major=1,
+            version_minor=0,
+            **kwargs
+        )
+
+
+@pytest.mark.django_db
+class TestDocumentNumbering(NumberingFixtures):
+    """Numbers come from a per-prefix, per-year counter row"""
+
+    def test_first_allocation_seeds_from_existing_numbers(self):
+        self._create(document_number=f'PROC-{self.year}-0041-v01.00')
+
+        document = self._create()
+
+        assert document.document_number == f'PROC-{self.year}-0042-v01.00'
+        assert DocumentNumberSequence.objects.get(prefix='PROC', year=self.year).last_value == 42
+
+    def test_allocation_does_not_scan_documents(self):
+        self._create()
+        document = Document(
+            title='Next Procedure',
+            document_type=self.doc_type,
+            document_source=self.doc_source,
+            author=self.user,
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            number = document.generate_document_number()
+
+        statements = [q['sql'] for q in queries.captured_queries if 'SAVEPOINT' not in q['sql']]
+        assert len(statements) == 2  # Counter update and read
+        assert all('document_number_sequences' in sql for sql in statements)
+        assert number == f'PROC-{self.year}-0002'
+
+    def test_rolled_back_create_leaves_no_gap(self):
+        self._create()
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                self._create()
+                raise RuntimeError('Upload failed')
+
+        assert self._create().document_number == f'PROC-{self.year}-0002-v01.00'
+
+    def test_seed_command_raises_counters_only(self):
+        self._create(document_number=f'PROC-{self.year}-0007-v01.00')
+        self._create(document_number=f'PROC-{self.year}-0007-v02.00')
+        self._create(document_number=f'PROC-{self.year - 1}-0120-v01.00')
+        DocumentNumberSequence.objects.create(prefix='PROC', year=self.year, last_value=3)
+        DocumentNumberSequence.objects.create(prefix='PROC', year=self.year - 1, last_value=500)
+
+        call_command('seed_document_numbers', verbosity=0)
+
+        counters = dict(DocumentNumberSequence.objects.values_list('year', 'last_value'))
+        assert counters == {self.year: 7, self.year - 1: 500}
+
+
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason='Concurrent writers need row-level locking')
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentNumbering(NumberingFixtures):
+    """Parallel creates never share or skip a number"""
+
+    def _create_in_thread(self, index):
+        try:
+            return self._create(title=f'Parallel Procedure {index}').document_number
+        finally:
+            connections.close_all()
+
+    def test_parallel_creates_get_consecutive_numbers(self):
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            numbers = list(pool.map(self._create_in_thread, range(40)))
+
+        expected = {f'PROC-{self.year}-{sequence:04d}-v01.00' for sequence in range(1, 41)}
+        assert set(numbers) == expected
+        assert DocumentNumberSequence.objects.get(prefix='PROC', year=self.year).last_value == 40
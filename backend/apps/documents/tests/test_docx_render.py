@@ -0,0 +1,95 @@
+"""
+Tests for in-memory DOCX rendering with the template skeleton cache
+"""
+import io
+
+import docx
+import pytest
+from django.contrib.auth import get_user_model
+
+from apps.documents import docx_processor as docx_processor_module
+from apps.documents.docx_processor import docx_processor
+from apps.documents.management.commands.benchmark_docx_render import (
+    build_fixture, fixture_context, render_legacy
+)
+from apps.documents.models import Document, DocumentSource, DocumentType
+
+User = get_user_model()
+
+
+def _text(content):
+    rendered = docx.Document(io.BytesIO(content))
+    return {
+        'header': rendered.sections[0].header.paragraphs[0].text,
+        'paragraphs': [paragraph.text for paragraph in rendered.paragraphs],
+        'tables': [[cell.text for row in table.rows for cell in row.cells] for table in rendered.tables],
+    }
+
+
+@pytest.fixture
+def template_path(tmp_path):
+    path = str(tmp_path / 'template.docx')
+    build_fixture(path, pages=2)
+    docx_processor.skeletons.clear()
+    yield path
+    docx_processor.skeletons.clear()
+
+
+class TestDocxRender:
+    """Rendering on one in-memory document"""
+
+    def test_matches_legacy_pipeline(self, template_path, monkeypatch):
+        monkeypatch.setattr(docx_processor, '_get_current_timestamp', lambda: '01/02/2026 09:00 AM UTC')
+        context = fixture_context()
+
+        rendered = _text(docx_processor.render_template(template_path, 'checksum', context))
+
+        assert rendered == _text(render_legacy(template_path, context))
+        assert rendered['header'] == 'SOP-2026-0001 - Cleanroom Gowning (v05.00)'
+        assert 'VERSION HISTORY' in rendered['paragraphs']
+        assert rendered['tables'][-1][:5] == ['Version', 'Date', 'Author', 'Status', 'Comments']
+
+    def test_repeat_render_skips_parse_and_compile(self, template_path, monkeypatch):
+        parses, compiles = [], []
+        parse, compile_template = docx.Document, docx_processor_module.Template
+        monkeypatch.setattr(docx, 'Document', lambda *args: parses.append(args) or parse(*args))
+        monkeypatch.setattr(
+            docx_processor_module, 'Template', lambda src: compiles.append(src) or compile_template(src)
+        )
+
+        first = docx_processor.render_template(template_path, 'checksum', fixture_context())
+        compiled = len(compiles)
+        second = docx_processor.render_template(
+            template_path, 'checksum', dict(fixture_context(), DOC_TITLE='Second Title')
+        )
+
+        assert len(parses) == 1
+        assert len(compiles) == compiled
+        assert 'Cleanroom Gowning' in _text(first)['header']
+        assert 'Second Title' in _text(second)['header']
+        # The skeleton still holds the unrendered template
+        assert 'Second Title' not in _text(docx_processor.render_template(template_path, 'checksum', {}))['header']
+
+
+@pytest.mark.django_db
+class TestDocumentDocxRender:
+    """Rendering a document's file for download"""
+
+    def test_render_docx_returns_processed_content(self, template_path, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        user = User.objects.create_user(username='docx_author', password='test123')
+        document = Document.objects.create(
+            title='Rendered Procedure',
+            document_type=DocumentType.objects.create(name='Procedure', code='PROC', created_by=user),
+            document_source=DocumentSource.objects.create(name='Digital', source_type='original_digital'),
+            author=user,
+            status='DRAFT',
+            file_name='template.docx',
+            file_path='template.docx',
+        )
+
+        content = docx_processor.render_docx(document, user)
+
+        rendered = _text(content)
+        assert rendered['header'].startswith(f'{document.document_number} - Rendered Procedure')
+        assert document.file_checksum in docx_processor.skeletons
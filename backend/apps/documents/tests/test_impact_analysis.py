@@ -0,0 +1,194 @@
+"""
+Tests for transitive dependency impact analysis
+"""
+import random
+from collections import defaultdict, deque
+
+import pytest
+from django.contrib.auth import get_user_model
+
+from apps.documents.impact_analysis import family_number, impact_analysis
+from apps.documents.models import Document, DocumentDependency, DocumentSource, DocumentType
+from apps.workflows.dependency_manager import DocumentDependencyManager
+
+User = get_user_model()
+
+
+class ImpactFixtures:
+
+    def setup_method(self):
+        self.author = User.objects.create_user(
+            username='impact_author', password='test123', first_name='Ada', last_name='Author'
+        )
+        self.approver = User.objects.create_user(username='impact_approver', password='test123')
+        self.doc_type = DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.author)
+        self.doc_source = DocumentSource.objects.create(name='Digital', source_type='original_digital')
+
+    def _document(self, number, version=(1, 0), status='EFFECTIVE', **kwargs):
+        return Document.objects.create(
+            title=f'Procedure {number}',
+            document_number=f'{number}-v{version[0]:02d}.{version[1]:02d}',
+            version_major=version[0],
+            version_minor=version[1],
+            document_type=self.doc_type,
+            document_source=self.doc_source,
+            author=self.author,
+            status=status,
+            **kwargs
+        )
+
+    def _depends(self, document, depends_on, **kwargs):
+        return DocumentDependency.objects.create(
+            document=document, depends_on=depends_on, created_by=self.author, **kwargs
+        )
+
+
+def test_family_number():
+    assert family_number('SOP-2026-0001-v02.10') == 'SOP-2026-0001'
+    assert family_number('LEGACY-42') == 'LEGACY-42'
+
+
+@pytest.mark.django_db
+class TestImpactAnalysis(ImpactFixtures):
+    """Dependents found through chains, one version per family"""
+
+    def test_transitive_dependents_with_depth(self):
+        source = self._document('POL-2026-0001')
+        direct = self._document('SOP-2026-0001', approver=self.approver)
+        indirect = self._document('WI-2026-0001')
+        further = self._document('FRM-2026-0001')
+        self._depends(direct, source)
+        self._depends(indirect, direct)
+        self._depends(further, indirect)
+
+        result = impact_analysis.analyze(source)
+
+        assert [(d['document_number'], d['depth']) for d in result['affected_documents']] == [
+            (direct.document_number, 1), (indirect.document_number, 2), (further.document_number, 3),
+        ]
+        assert result['truncated'] is False
+        assert result['notification_recipients'] == [
+            {
+                'id': self.approver.id, 'username': 'impact_approver', 'email': '', 'full_name': 'impact_approver',
+                'documents': [direct.document_number],
+            },
+            {
+                'id': self.author.id, 'username': 'impact_author', 'email': '', 'full_name': 'Ada Author',
+                'documents': [direct.document_number, indirect.document_number, further.document_number],
+            },
+        ]
+
+    def test_latest_active_version_per_family(self):
+        source_v1 = self._document('POL-2026-0002', status='SUPERSEDED')
+        source_v2 = self._document('POL-2026-0002', version=(2, 0))
+        superseded = self._document('SOP-2026-0002', status='SUPERSEDED')
+        current = self._document('SOP-2026-0002', version=(2, 0))
+        obsolete = self._document('SOP-2026-0003', status='OBSOLETE')
+        terminated = self._document('SOP-2026-0004', status='TERMINATED')
+        # References to any version of the changed family count
+        self._depends(superseded, source_v1)
+        self._depends(current, source_v1)
+        self._depends(obsolete, source_v2)
+        self._depends(terminated, source_v2)
+
+        result = impact_analysis.analyze(source_v2)
+
+        assert [d['uuid'] for d in result['affected_documents']] == [str(current.uuid)]
+
+    def test_inactive_dependencies_are_not_followed(self):
+        source = self._document('POL-2026-0005')
+        dependent = self._document('SOP-2026-0005')
+        self._depends(dependent, source, is_active=False)
+
+        assert impact_analysis.analyze(source)['affected_documents'] == []
+
+    def test_depth_and_limit_bounds(self):
+        chain = [self._document(f'SOP-2026-01{index:02d}') for index in range(6)]
+        for dependent, depends_on in zip(chain[1:], chain):
+            self._depends(dependent, depends_on)
+
+        shallow = impact_analysis.analyze(chain[0], max_depth=2)
+        limited = impact_analysis.analyze(chain[0], limit=3)
+
+        assert [d['depth'] for d in shallow['affected_documents']] == [1, 2]
+        assert [d['depth'] for d in limited['affected_documents']] == [1, 2, 3]
+        assert limited['truncated'] is True
+
+    def test_dependency_manager_summary(self):
+        source = self._document('POL-2026-0006')
+        direct = self._document('SOP-2026-0006')
+        self._depends(direct, source)
+        self._depends(self._document('WI-2026-0006'), direct)
+
+        impact = DocumentDependencyManager.get_impact_analysis(source)
+
+        assert len(impact['affected_documents']) == 2
+        assert '2 documents are affected (1 reference this document directly)' in impact['impact_summary']
+
+
+@pytest.mark.django_db
+class TestImpactAnalysisLargeGraph(ImpactFixtures):
+    """A synthetic 50k-edge dependency graph is analyzed in one query"""
+
+    DOCUMENTS = 5_000
+    EDGES_PER_DOCUMENT = 10
+
+    def _graph(self):
+        Document.objects.bulk_create([
+            Document(
+                title=f'Synthetic {index}', document_number=f'SYN-2026-{index:05d}-v01.00',
+                document_type=self.doc_type, document_source=self.doc_source,
+                author=self.author, status='EFFECTIVE',
+            )
+            for index in range(self.DOCUMENTS)
+        ], batch_size=1000)
+        ids = list(Document.objects.filter(document_number__startswith='SYN-').order_by('document_number')
+                   .values_list('id', flat=True))
+
+        # Each document depends on documents created before it: a DAG, mostly
+        # on its near predecessors so the graph is deep as well as wide
+        rng = random.Random(42)
+        edges = set()
+        for index in range(1, len(ids)):
+            window = range(max(0, index - 200), index)
+            for target in rng.sample(window, min(self.EDGES_PER_DOCUMENT, len(window))):
+                edges.add((ids[index], ids[target]))
+        DocumentDependency.objects.bulk_create([
+            DocumentDependency(document_id=document, depends_on_id=target, created_by=self.author)
+            for document, target in edges
+        ], batch_size=5000)
+        return ids, edges
+
+    @staticmethod
+    def _expected_depths(source, edges, max_depth):
+        dependents = defaultdict(list)
+        for document, target in edges:
+            dependents[target].append(document)
+        depths, queue = {}, deque([(source, 0)])
+        while queue:
+            node, depth = queue.popleft()
+            if depth == max_depth:
+                continue
+            for dependent in dependents[node]:
+                if dependent not in depths:
+                    depths[dependent] = depth + 1
+                    queue.append((dependent, depth + 1))
+        return depths
+
+    def test_matches_breadth_first_search_within_bounds(self, django_assert_num_queries):
+        ids, edges = self._graph()
+        assert len(edges) > 49_000
+        source = Document.objects.get(pk=ids[0])
+        expected = self._expected_depths(source.pk, edges, max_depth=4)
+        by_number = dict(Document.objects.filter(pk__in=expected).values_list('document_number', 'id'))
+
+        with django_assert_num_queries(1):
+            result = impact_analysis.analyze(source, max_depth=4, limit=len(ids))
+        limited = impact_analysis.analyze(source, limit=100)
+
+        assert {by_number[d['document_number']]: d['depth'] for d in result['affected_documents']} == expected
+        assert result['truncated'] is False
+        assert [r['username'] for r in result['notification_recipients']] == ['impact_author']
+        assert len(limited['affected_documents']) == 100
+        assert limited['truncated'] is True
+        assert [d['depth'] for d in limited['affected_documents']] == sorted(expected.values())[:100]
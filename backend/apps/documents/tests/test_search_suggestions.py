@@ -0,0 +1,166 @@
+"""
+Tests for search autocomplete suggestions
+"""
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from rest_framework.test import APIClient
+
+from apps.documents import suggestions
+from apps.documents.models import Document, DocumentSource, DocumentType, SearchTerm
+
+User = get_user_model()
+
+
+class SuggestionFixtures:
+
+    def setup_method(self):
+        self.author = User.objects.create_user(username='suggest_author', password='test123')
+        self.reader = User.objects.create_user(username='suggest_reader', password='test123')
+        self.doc_type = DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.author)
+        self.doc_source = DocumentSource.objects.create(name='Digital', source_type='original_digital')
+
+    def _create(self, title, **kwargs):
+        kwargs.setdefault('status', 'EFFECTIVE')
+        return Document.objects.create(
+            title=title,
+            document_type=self.doc_type,
+            document_source=self.doc_source,
+            author=self.author,
+            **kwargs
+        )
+
+
+@pytest.mark.django_db
+class TestSuggestions(SuggestionFixtures):
+    """Terms and documents suggested for a partial query"""
+
+    def test_popular_terms_by_prefix(self):
+        self._create('Sterile Filling Line Setup')
+        self._create('Sterilization Cycle Validation')
+        for query in ['Sterile Filling', 'sterile  filling', 'sterile filling', 'Sterilization', 'sterile room']:
+            suggestions.record_search(query)
+        suggestions.record_search('sterilization')
+
+        terms = suggestions.term_suggestions('STERIL', self.reader)
+
+        # Searched once, or no document title contains it: not suggested
+        assert terms == [
+            {'text': 'sterile filling', 'type': 'term', 'frequency': 3},
+            {'text': 'sterilization', 'type': 'term', 'frequency': 2},
+        ]
+
+    def test_terms_matching_only_unreadable_documents_are_not_suggested(self, settings):
+        settings.SEARCH_SUGGESTION_MIN_FREQUENCY = 1
+        self._create('Batch Release Deviation', status='DRAFT')
+        suggestions.record_search('batch release deviation')
+
+        assert suggestions.term_suggestions('batch', self.reader) == []
+        assert suggestions.term_suggestions('batch', self.author) == [
+            {'text': 'batch release deviation', 'type': 'term', 'frequency': 1},
+        ]
+
+    def test_documents_filtered_by_read_access(self):
+        effective = self._create('Cleanroom Gowning')
+        draft = self._create('Cleanroom Monitoring', status='DRAFT')
+        self._create('Equipment Calibration')
+
+        by_author = suggestions.document_suggestions('cleanroom', self.author)
+        by_reader = suggestions.document_suggestions('cleanroom', self.reader)
+
+        assert [s['uuid'] for s in by_author] == [str(effective.uuid), str(draft.uuid)]
+        assert [s['uuid'] for s in by_reader] == [str(effective.uuid)]
+
+    def test_unreadable_matches_do_not_fill_the_candidate_window(self):
+        for index in range(suggestions.CANDIDATE_FACTOR + 1):
+            self._create(f'Cleanroom Draft {index}', status='DRAFT')
+        effective = self._create('Cleanroom Gowning')
+
+        by_reader = suggestions.document_suggestions('cleanroom', self.reader, limit=1)
+
+        assert [s['uuid'] for s in by_reader] == [str(effective.uuid)]
+
+    def test_prefix_matches_rank_first(self):
+        self._create('Annual Sterilization Review')
+        self._create('Sterilization of Glassware')
+        number_match = self._create('Gowning')
+
+        ranked = suggestions.document_suggestions('steril', self.reader)
+        by_number = suggestions.document_suggestions(number_match.document_number[:8], self.reader)
+
+        assert [s['text'] for s in ranked] == ['Sterilization of Glassware', 'Annual Sterilization Review']
+        assert by_number[0]['text'] == 'Gowning'
+
+    def test_prune_keeps_most_popular_terms(self):
+        for index, term in enumerate(['alpha', 'beta', 'gamma', 'delta']):
+            SearchTerm.objects.create(term=term, frequency=index + 1)
+
+        assert suggestions.prune_terms(max_terms=2) == 2
+        assert set(SearchTerm.objects.values_list('term', flat=True)) == {'gamma', 'delta'}
+
+    def test_suggest_endpoint(self, settings):
+        settings.SEARCH_SUGGESTION_MIN_FREQUENCY = 1
+        document = self._create('Cleanroom Gowning')
+        suggestions.record_search('Cleanroom Gowning')
+        client = APIClient()
+        client.force_authenticate(user=self.reader)
+
+        response = client.get('/api/v1/documents/search/suggest/', {'q': 'Clean'})
+
+        assert response.status_code == 200
+        assert response.data['suggestions'] == [
+            {'text': 'cleanroom gowning', 'type': 'term', 'frequency': 1},
+            {
+                'text': 'Cleanroom Gowning', 'type': 'document',
+                'document_number': document.document_number, 'uuid': str(document.uuid),
+            },
+        ]
+
+
+def _p95(func, runs=40):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return sorted(timings)[int(runs * 0.95) - 1]
+
+
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason='Needs the pg_trgm indexes')
+@pytest.mark.django_db
+class TestSuggestionLatency(SuggestionFixtures):
+    """Suggestion P95 latency does not grow with the documents table"""
+
+    def _grow_to(self, total):
+        existing = Document.objects.count()
+        batch = []
+        for index in range(existing, total):
+            batch.append(Document(
+                title=f'Synthetic procedure {index:06d} batch record',
+                document_number=f'SYN-{index:06d}-v01.00',
+                document_type=self.doc_type,
+                document_source=self.doc_source,
+                author=self.author,
+                status='EFFECTIVE' if index % 3 else 'DRAFT',
+            ))
+            if len(batch) == 10000:
+                Document.objects.bulk_create(batch)
+                batch = []
+        Document.objects.bulk_create(batch)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE documents')
+
+    def _measure(self):
+        queries = ['synthetic', 'SYN-00042', 'batch rec', 'procedure 00']
+        return max(_p95(lambda q=q: suggestions.suggest(q, self.reader)) for q in queries)
+
+    def test_p95_flat_from_50k_to_500k_documents(self):
+        self._grow_to(50_000)
+        small = self._measure()
+        self._grow_to(500_000)
+        large = self._measure()
+
+        assert large < 50 / 1000
+        assert large < small * 3 + 5 / 1000
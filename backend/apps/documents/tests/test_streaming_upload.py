@@ -0,0 +1,164 @@
+"""
+Tests for streaming and resumable chunked document uploads
+"""
+import hashlib
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from apps.documents.models import Document, DocumentType, DocumentSource
+from apps.documents.uploads import (
+    ChecksumTemporaryFileUploadHandler, stream_to_storage,
+    initiate_upload_session, store_upload_part, complete_upload_session,
+    MIN_UPLOAD_CHUNK_SIZE,
+)
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+class TestStreamingHelpers:
+    """Checksum computation while streaming"""
+
+    def test_temporary_handler_hashes_received_chunks(self):
+        data = b'scanned page ' * 10000
+        handler = ChecksumTemporaryFileUploadHandler()
+        handler.new_file('file', 'scan.pdf', 'application/pdf', len(data))
+        for start in range(0, len(data), 4096):
+            handler.receive_data_chunk(data[start:start + 4096], start)
+        uploaded = handler.file_complete(len(data))
+
+        assert uploaded.sha256 == hashlib.sha256(data).hexdigest()
+        uploaded.close()
+
+    def test_stream_to_storage_hashes_plain_file_objects(self, media_root):
+        data = b'x' * (3 * 65536 + 17)
+        saved_path, size, checksum = stream_to_storage('documents/test/plain.bin', io.BytesIO(data))
+
+        assert size == len(data)
+        assert checksum == hashlib.sha256(data).hexdigest()
+        assert (media_root / saved_path).read_bytes() == data
+
+
+@pytest.mark.django_db
+class TestChunkedUpload:
+    """Resumable upload protocol"""
+
+    def setup_method(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username='uploader',
+            email='uploader@example.com',
+            password='testpass123'
+        )
+        self.doc_type, _ = DocumentType.objects.get_or_create(
+            code='SOP',
+            defaults={'name': 'Standard Operating Procedure', 'created_by': self.user}
+        )
+        self.doc_source, _ = DocumentSource.objects.get_or_create(
+            name='Internal',
+            defaults={'source_type': 'INTERNAL'}
+        )
+        self.document = Document.objects.create(
+            document_number='UPL-001-v01.00',
+            title='Upload Target',
+            document_type=self.doc_type,
+            document_source=self.doc_source,
+            author=self.user,
+            status='DRAFT',
+        )
+        self.data = bytes(range(256)) * ((MIN_UPLOAD_CHUNK_SIZE * 2 + 1000) // 256)
+
+    def _parts(self):
+        size = MIN_UPLOAD_CHUNK_SIZE
+        return [self.data[i:i + size] for i in range(0, len(self.data), size)]
+
+    def test_parts_assemble_into_verified_document_file(self):
+        session = initiate_upload_session(
+            self.document, self.user, 'scan.pdf', len(self.data),
+            expected_checksum=hashlib.sha256(self.data).hexdigest(),
+            chunk_size=MIN_UPLOAD_CHUNK_SIZE,
+        )
+        parts = self._parts()
+        assert session.total_parts == len(parts)
+
+        # Upload out of order and retry one part, as a flaky client would
+        for number in reversed(range(1, len(parts) + 1)):
+            store_upload_part(session, number, io.BytesIO(parts[number - 1]))
+        store_upload_part(session, 1, io.BytesIO(parts[0]))
+        assert session.missing_parts() == []
+
+        document = complete_upload_session(session)
+        assert document.file_size == len(self.data)
+        assert document.file_checksum == hashlib.sha256(self.data).hexdigest()
+        assert document.verify_file_integrity()
+
+    def test_wrong_part_size_is_rejected(self):
+        session = initiate_upload_session(
+            self.document, self.user, 'scan.pdf', len(self.data),
+            chunk_size=MIN_UPLOAD_CHUNK_SIZE,
+        )
+        with pytest.raises(ValidationError):
+            store_upload_part(session, 1, io.BytesIO(b'short'))
+        assert session.missing_parts() == list(range(1, session.total_parts + 1))
+
+    def test_complete_requires_all_parts(self):
+        session = initiate_upload_session(
+            self.document, self.user, 'scan.pdf', len(self.data),
+            chunk_size=MIN_UPLOAD_CHUNK_SIZE,
+        )
+        store_upload_part(session, 1, io.BytesIO(self._parts()[0]))
+        with pytest.raises(ValidationError):
+            complete_upload_session(session)
+
+    def test_upload_session_api_round_trip(self):
+        self.client.force_authenticate(user=self.user)
+        base = f'/api/v1/documents/documents/{self.document.uuid}/upload-sessions/'
+
+        response = self.client.post(base, {
+            'file_name': 'scan.pdf',
+            'file_size': len(self.data),
+            'chunk_size': MIN_UPLOAD_CHUNK_SIZE,
+        }, format='json')
+        assert response.status_code == status.HTTP_201_CREATED
+        session_id = response.data['session_id']
+
+        for number, part in enumerate(self._parts(), start=1):
+            response = self.client.put(
+                f'{base}{session_id}/parts/{number}/',
+                data=part,
+                content_type='application/octet-stream',
+                HTTP_X_CONTENT_SHA256=hashlib.sha256(part).hexdigest(),
+            )
+            assert response.status_code == status.HTTP_200_OK
+
+        response = self.client.get(f'{base}{session_id}/')
+        assert response.data['missing_parts'] == []
+
+        response = self.client.post(f'{base}{session_id}/complete/')
+        assert response.status_code == status.HTTP_200_OK
+        self.document.refresh_from_db()
+        assert self.document.file_checksum == hashlib.sha256(self.data).hexdigest()
+
+    def test_single_request_upload_sets_checksum(self):
+        self.client.force_authenticate(user=self.user)
+        upload = SimpleUploadedFile('small.txt', b'hello world', content_type='text/plain')
+
+        response = self.client.patch(
+            f'/api/v1/documents/documents/{self.document.uuid}/upload/',
+            {'file': upload},
+            format='multipart'
+        )
+        assert response.status_code == status.HTTP_200_OK
+        self.document.refresh_from_db()
+        assert self.document.file_checksum == hashlib.sha256(b'hello world').hexdigest()
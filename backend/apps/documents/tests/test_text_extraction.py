@@ -0,0 +1,139 @@
+"""
+Tests for body text extraction
+"""
+import shutil
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from docx import Document as DocxDocument
+from PIL import Image
+
+from apps.documents import tasks, text_extraction
+from apps.documents.models import Document, DocumentSource, DocumentType, ExtractedText
+
+User = get_user_model()
+
+
+def _docx(path):
+    docx_document = DocxDocument()
+    docx_document.add_paragraph('Sterilization cycles are validated quarterly.')
+    table = docx_document.add_table(rows=1, cols=2)
+    table.cell(0, 0).text = 'Autoclave'
+    table.cell(0, 1).text = '121 degrees'
+    docx_document.sections[0].header.paragraphs[0].text = 'Controlled copy'
+    docx_document.save(path)
+    return str(path)
+
+
+class TestExtract:
+    """Text pulled out of files by format"""
+
+    def test_docx_paragraphs_tables_and_headers(self, tmp_path):
+        result = text_extraction.extract(_docx(tmp_path / 'procedure.docx'), 'procedure.docx')
+
+        assert result['method'] == 'DOCX'
+        assert 'Sterilization cycles are validated quarterly.' in result['text']
+        assert 'Autoclave 121 degrees' in result['text']
+        assert 'Controlled copy' in result['text']
+
+    def test_image_only_pdf_pages_are_ocred(self, tmp_path, monkeypatch):
+        pages = [Image.new('RGB', (200, 100), 'white') for _ in range(3)]
+        pages[0].save(tmp_path / 'scan.pdf', save_all=True, append_images=pages[1:])
+        recognized = []
+
+        def ocr_image(image, language='eng'):
+            recognized.append(image.size)
+            return f'scanned page {len(recognized)}'
+
+        monkeypatch.setattr(text_extraction, 'ocr_available', lambda: True)
+        monkeypatch.setattr(text_extraction, 'ocr_image', ocr_image)
+        result = text_extraction.extract(str(tmp_path / 'scan.pdf'), 'scan.pdf')
+
+        assert result['method'] == 'PDF_OCR'
+        assert (result['page_count'], result['ocr_page_count']) == (3, 3)
+        assert recognized == [(200, 100)] * 3
+        assert 'scanned page 1' in result['text'] and 'scanned page 3' in result['text']
+
+    def test_unparseable_file_records_the_error(self, tmp_path):
+        (tmp_path / 'broken.docx').write_bytes(b'not a zip archive')
+
+        result = text_extraction.extract(str(tmp_path / 'broken.docx'), 'broken.docx')
+
+        assert result['text'] == '' and result['method'] == 'NONE'
+        assert result['error']
+
+    def test_bounded_map_keeps_order(self):
+        assert list(text_extraction.bounded_map(lambda n: n * n, iter(range(50)), 3)) == [
+            n * n for n in range(50)
+        ]
+
+
+@pytest.mark.django_db
+class TestDocumentExtraction:
+    """Extraction stored per file checksum and scheduled from document changes"""
+
+    def setup_method(self):
+        self.user = User.objects.create_user(username='extraction_author', password='test123')
+        self.doc_type = DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.user)
+        self.doc_source = DocumentSource.objects.create(name='Digital', source_type='original_digital')
+
+    def _create(self, media_root, file_name, **kwargs):
+        if not (media_root / file_name).exists():
+            _docx(media_root / file_name)
+        return Document.objects.create(
+            title='Sterilization Procedure',
+            document_type=self.doc_type,
+            document_source=self.doc_source,
+            author=self.user,
+            file_name=file_name,
+            file_path=file_name,
+            **kwargs
+        )
+
+    def test_identical_upload_reuses_extraction(self, settings, tmp_path, monkeypatch):
+        settings.MEDIA_ROOT = str(tmp_path)
+        first = self._create(tmp_path, 'first.docx')
+        extracted, created = text_extraction.extract_document(first)
+        assert created and extracted.sha256 == first.file_checksum
+
+        shutil.copy(tmp_path / 'first.docx', tmp_path / 'second.docx')  # Same bytes, uploaded again
+        second = self._create(tmp_path, 'second.docx')
+        assert second.file_checksum == first.file_checksum
+        monkeypatch.setattr(text_extraction, 'extract', lambda *args: pytest.fail('file read again'))
+        result = tasks.extract_document_text(second.pk)
+
+        assert result['extracted'] is False and result['method'] == 'DOCX'
+        assert ExtractedText.objects.count() == 1
+
+    def test_new_file_schedules_extraction_after_commit(
+        self, settings, tmp_path, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        settings.MEDIA_ROOT = str(tmp_path)
+        queued = []
+        monkeypatch.setattr(tasks.extract_document_text, 'delay', queued.append)
+
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            document = self._create(tmp_path, 'procedure.docx')
+        assert queued == []
+        for callback in callbacks:
+            callback()
+        assert queued == [document.pk]
+
+        with django_capture_on_commit_callbacks(execute=True):
+            document.title = 'Renamed Procedure'
+            document.save()
+        assert queued == [document.pk]  # Metadata changes only refresh the vector
+
+    def test_save_leaves_search_vector_alone(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        document = self._create(tmp_path, 'procedure.docx')
+
+        with CaptureQueriesContext(connection) as queries:
+            document.title = 'Renamed Procedure'
+            document.save()
+
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE "documents"')]
+        assert len(updates) == 1
+        assert '"search_vector"' not in updates[0]
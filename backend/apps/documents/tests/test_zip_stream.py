@@ -0,0 +1,150 @@
+"""
+Tests for streaming ZIP packages
+"""
+import io
+import os
+import tracemalloc
+import zipfile
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from apps.documents.models import Document, DocumentSource, DocumentType
+from apps.documents.zip_stream import ZipStream
+
+User = get_user_model()
+
+GiB = 1024 ** 3
+ZIP64_EXTRA = b'\x01\x00'
+
+
+def _sparse_file(path, size):
+    with open(path, 'wb') as f:
+        f.truncate(size)
+    if os.stat(path).st_blocks * 512 >= size:
+        pytest.skip('Filesystem does not support sparse files')
+    return str(path)
+
+
+class _SparseSink:
+    """Write an archive to disk, seeking over all-zero chunks instead of writing them."""
+
+    def __init__(self, path):
+        self.file = open(path, 'wb')
+
+    def consume(self, chunks):
+        for chunk in chunks:
+            if chunk.count(0) == len(chunk):
+                self.file.seek(len(chunk), os.SEEK_CUR)
+            else:
+                self.file.write(chunk)
+        self.file.truncate()
+        self.file.close()
+
+
+class TestZipStream:
+    """Archives streamed chunk by chunk read back with zipfile"""
+
+    def test_thousands_of_small_members(self):
+        archive = ZipStream()
+        for index in range(3000):
+            archive.add(
+                f'members/{index:04d}.txt', f'member {index}\n' * (index % 7 + 1),
+                compress_type=zipfile.ZIP_STORED if index % 2 else None
+            )
+
+        content = b''.join(archive)
+
+        with zipfile.ZipFile(io.BytesIO(content)) as result:
+            assert result.testzip() is None
+            assert len(result.infolist()) == 3000
+            assert result.read('members/2999.txt') == b'member 2999\n' * 4
+            assert all(info.flag_bits & 0x08 for info in result.infolist())  # Data descriptors
+
+    def test_multi_gigabyte_sparse_members(self, tmp_path):
+        large = _sparse_file(tmp_path / 'large.bin', 4 * GiB + 4096)
+        medium = _sparse_file(tmp_path / 'medium.bin', GiB)
+        archive = ZipStream()
+        archive.add_file('large.bin', large, 4 * GiB + 4096, compress_type=zipfile.ZIP_STORED)
+        archive.add_file('medium.bin', medium, GiB, compress_type=zipfile.ZIP_STORED)
+        archive.add('tail.txt', 'after five gigabytes')
+
+        tracemalloc.start()
+        try:
+            _SparseSink(tmp_path / 'package.zip').consume(archive)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert peak < 16 * 1024 * 1024
+        with zipfile.ZipFile(tmp_path / 'package.zip') as result:
+            large_info, medium_info, tail_info = result.infolist()
+            assert large_info.file_size == 4 * GiB + 4096
+            assert ZIP64_EXTRA in large_info.extra
+            assert medium_info.file_size == GiB
+            assert tail_info.header_offset > 5 * GiB
+            assert result.read('tail.txt') == b'after five gigabytes'
+            with result.open(medium_info) as member:
+                member.seek(GiB - 10)
+                assert member.read() == b'\0' * 10  # CRC checked at the end of the member
+
+
+@pytest.mark.django_db
+class TestPackageExport:
+    """Multi-document package endpoint"""
+
+    def setup_method(self):
+        self.user = User.objects.create_superuser(username='package_admin', password='test123')
+        self.doc_type = DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.user)
+        self.doc_source = DocumentSource.objects.create(name='Digital', source_type='original_digital')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def _create(self, media_root, title, file_name):
+        with open(os.path.join(media_root, file_name), 'w') as f:
+            f.write(f'{title} content')
+        return Document.objects.create(
+            title=title,
+            document_type=self.doc_type,
+            document_source=self.doc_source,
+            author=self.user,
+            status='EFFECTIVE',
+            file_name=file_name,
+            file_path=file_name,
+        )
+
+    def test_streams_files_and_metadata(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        first = self._create(str(tmp_path), 'First Procedure', 'first.txt')
+        second = self._create(str(tmp_path), 'Second Procedure', 'second.pdf')
+
+        response = self.client.post(
+            '/api/v1/documents/documents/export-package/',
+            {'documents': [str(first.uuid), str(second.uuid)]},
+            format='json'
+        )
+
+        assert response.status_code == 200
+        assert response.streaming
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as result:
+            assert result.testzip() is None
+            assert result.read(f'{first.document_number}/first.txt') == b'First Procedure content'
+            assert result.getinfo(f'{second.document_number}/second.pdf').compress_type == zipfile.ZIP_STORED
+            assert 'First Procedure' in result.read(
+                f'{first.document_number}/{first.document_number}_metadata.txt'
+            ).decode()
+            assert 'README.txt' in result.namelist()
+
+    def test_missing_file_fails_before_streaming(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        document = self._create(str(tmp_path), 'Lost Procedure', 'lost.txt')
+        os.unlink(tmp_path / 'lost.txt')
+
+        response = self.client.post(
+            '/api/v1/documents/documents/export-package/',
+            {'documents': [str(document.uuid)]},
+            format='json'
+        )
+
+        assert response.status_code == 404
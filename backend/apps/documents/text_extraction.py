@@ -0,0 +1,226 @@
+"""
+Body text extraction for full-text search.
+
+``extract`` pulls the text out of a file: paragraphs, tables, headers and
+footers of DOCX files (python-docx), the text layer of PDF pages (PyPDF2)
+and, for PDF pages without one and for images, OCR (pytesseract). OCR runs
+on a bounded thread pool; tesseract works in a subprocess, so pages are
+recognized in parallel while at most twice ``TEXT_EXTRACTION_WORKERS``
+decoded page images are held at a time.
+
+``extract_document`` stores the result once per file SHA-256 as
+``ExtractedText``: a file that was already extracted, such as an identical
+re-upload, is never read again. The ``extract_document_text`` Celery task
+runs it for new document versions and replaced files, then refreshes the
+search vectors of the documents sharing the file.
+"""
+
+import io
+import logging
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+
+# A PDF page with less text than this is treated as a scan and OCRed
+MIN_PAGE_TEXT = 16
+
+TEXT_EXTENSIONS = frozenset({'.txt', '.csv', '.md', '.json', '.xml', '.html', '.htm'})
+IMAGE_EXTENSIONS = frozenset({'.png', '.jpg', '.jpeg', '.tif', '.tiff', '.bmp', '.gif'})
+
+
+def worker_count():
+    return max(1, getattr(settings, 'TEXT_EXTRACTION_WORKERS', DEFAULT_WORKERS))
+
+
+def bounded_map(func, items, workers):
+    """
+    ``func`` over ``items`` on a thread pool, results in order.
+
+    Unlike ``Executor.map`` the items are consumed lazily, keeping at most
+    ``2 * workers`` of them submitted at once.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+@lru_cache(maxsize=1)
+def ocr_available():
+    """Whether pytesseract and the tesseract binary are installed."""
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
+
+
+def ocr_image(image, language='eng'):
+    """Text recognized in a PIL image."""
+    import pytesseract
+    return pytesseract.image_to_string(image, lang=language).strip()
+
+
+def ocr_images(images, language='eng'):
+    """Text recognized in a sequence of PIL images, one block per image."""
+    return '\n'.join(text for text in (ocr_image(image, language) for image in images) if text)
+
+
+def _docx_text(path):
+    from docx import Document as DocxDocument
+
+    docx_document = DocxDocument(path)
+    parts = [paragraph.text for paragraph in docx_document.paragraphs]
+    for table in docx_document.tables:
+        for row in table.rows:
+            parts.append(' '.join(cell.text for cell in row.cells))
+    for section in docx_document.sections:
+        for part in (section.header, section.footer):
+            parts.extend(paragraph.text for paragraph in part.paragraphs)
+    return {'text': '\n'.join(part for part in parts if part.strip()), 'method': 'DOCX'}
+
+
+def page_images(page):
+    """PIL images embedded in a PDF page; a scanned page is one full-page image."""
+    from PIL import Image
+
+    try:
+        files = page.images
+    except Exception:
+        return []  # No resources, or an image filter PyPDF2 cannot decode
+    return [Image.open(io.BytesIO(image_file.data)) for image_file in files]
+
+
+def _pdf_text(path):
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(path)
+    texts = [(page.extract_text() or '').strip() for page in reader.pages]
+    scanned = [index for index, text in enumerate(texts) if len(text) < MIN_PAGE_TEXT]
+
+    ocr_pages = 0
+    if scanned and ocr_available():
+        # Images are decoded here, one window at a time: PdfReader is not thread-safe
+        images = (page_images(reader.pages[index]) for index in scanned)
+        for index, text in zip(scanned, bounded_map(ocr_images, images, worker_count())):
+            if text:
+                texts[index] = f"{texts[index]}\n{text}".strip()
+        ocr_pages = len(scanned)
+    elif scanned:
+        logger.info(f"{len(scanned)} PDF pages without a text layer left unread: tesseract is not installed")
+
+    return {
+        'text': '\n\n'.join(text for text in texts if text),
+        'method': 'PDF_OCR' if ocr_pages else 'PDF',
+        'page_count': len(texts),
+        'ocr_page_count': ocr_pages,
+    }
+
+
+def _image_text(path):
+    from PIL import Image
+
+    if not ocr_available():
+        return {'text': '', 'method': 'NONE', 'error': 'tesseract is not installed'}
+    with Image.open(path) as image:
+        return {'text': ocr_image(image), 'method': 'OCR', 'page_count': 1, 'ocr_page_count': 1}
+
+
+def _plain_text(path):
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return {'text': f.read(), 'method': 'TEXT'}
+
+
+def extract(path, file_name):
+    """
+    Extracted text of the file at ``path``, as ``ExtractedText`` field values.
+
+    A file that cannot be parsed yields no text and the parser error; a
+    missing file raises.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"File not found: {path}")
+
+    extension = os.path.splitext(file_name or path)[1].lower()
+    if extension == '.docx':
+        extractor = _docx_text
+    elif extension == '.pdf':
+        extractor = _pdf_text
+    elif extension in IMAGE_EXTENSIONS:
+        extractor = _image_text
+    elif extension in TEXT_EXTENSIONS:
+        extractor = _plain_text
+    else:
+        return {'text': '', 'method': 'NONE'}
+
+    try:
+        result = extractor(path)
+    except Exception as e:
+        logger.warning(f"Text extraction failed for {file_name}: {e}")
+        return {'text': '', 'method': 'NONE', 'error': str(e)}
+    # PostgreSQL text cannot hold NUL characters
+    result['text'] = result['text'].replace('\x00', '')
+    return result
+
+
+@contextmanager
+def _plaintext_path(document):
+    """Path of the document's file in clear, decrypting encrypted containers to a temporary file."""
+    from apps.security.encryption import CONTAINER_FORMAT, document_encryption
+
+    encryption = document.encryption_metadata or {}
+    if not (document.is_encrypted and encryption.get('format') == CONTAINER_FORMAT):
+        yield document.full_file_path
+        return
+
+    extension = os.path.splitext(document.file_name or '')[1]
+    with tempfile.NamedTemporaryFile(suffix=extension) as plaintext:
+        for chunk in document_encryption.open_decrypted_range(encryption['encrypted_path']):
+            plaintext.write(chunk)
+        plaintext.flush()
+        yield plaintext.name
+
+
+def extract_document(document):
+    """
+    ``ExtractedText`` of the document's file, extracting only unseen checksums.
+
+    Returns:
+        (extracted_text, created)
+    """
+    from .models import ExtractedText
+
+    existing = ExtractedText.objects.filter(sha256=document.file_checksum).first()
+    if existing:
+        return existing, False
+
+    with _plaintext_path(document) as path:
+        result = extract(path, document.file_name)
+    return ExtractedText.objects.get_or_create(sha256=document.file_checksum, defaults=result)
+
+
+def schedule(document_id):
+    """Queue text extraction for a document once the current transaction commits."""
+    def enqueue():
+        from .tasks import extract_document_text
+        try:
+            extract_document_text.delay(document_id)
+        except Exception as e:
+            logger.warning(f"Text extraction for document {document_id} not queued: {e}")
+
+    transaction.on_commit(enqueue)
@@ -0,0 +1,392 @@
+"""
+Streaming uploads for Document Management (O1).
+
+Provides upload handlers that compute the SHA-256 checksum while the
+request body is being received, helpers that stream uploaded files into
+storage without buffering them in memory, and the chunked, resumable
+upload protocol (initiate, upload parts, complete) used for large files.
+Document files end up in the content-addressed blob store (see
+``blob_store``).
+"""
+
+import hashlib
+import logging
+import mimetypes
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler, TemporaryFileUploadHandler
+)
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Read size used when copying between file objects
+STREAM_CHUNK_SIZE = 64 * 1024
+
+DEFAULT_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024  # 8MB
+MIN_UPLOAD_CHUNK_SIZE = 256 * 1024  # 256KB
+MAX_UPLOAD_CHUNK_SIZE = 64 * 1024 * 1024  # 64MB
+DEFAULT_UPLOAD_MAX_FILE_SIZE = 2 * 1024 * 1024 * 1024  # 2GB
+DEFAULT_UPLOAD_SESSION_TTL_HOURS = 24
+
+
+def _upload_setting(key, default):
+    return getattr(settings, 'DOCUMENT_PROCESSING', {}).get(key, default)
+
+
+# ============================================================================
+# Upload handlers
+# ============================================================================
+
+class ChecksumUploadHandlerMixin:
+    """
+    Hash file chunks as they arrive from the request body.
+
+    The resulting uploaded file carries a ``sha256`` attribute so callers
+    never have to read the stored file back to checksum it.
+    """
+
+    def new_file(self, *args, **kwargs):
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        remaining = super().receive_data_chunk(raw_data, start)
+        if remaining is None:
+            # This handler consumed the chunk
+            self.sha256.update(raw_data)
+        return remaining
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        if uploaded_file is not None:
+            uploaded_file.sha256 = self.sha256.hexdigest()
+        return uploaded_file
+
+
+class ChecksumMemoryFileUploadHandler(ChecksumUploadHandlerMixin, MemoryFileUploadHandler):
+    """In-memory upload handler (small files) that computes SHA-256."""
+
+
+class ChecksumTemporaryFileUploadHandler(ChecksumUploadHandlerMixin, TemporaryFileUploadHandler):
+    """Temporary-file upload handler (large files) that computes SHA-256."""
+
+
+# ============================================================================
+# Streaming helpers
+# ============================================================================
+
+class HashingReader:
+    """
+    Read-only file wrapper that computes SHA-256 and size of the data read.
+
+    Used to hash content in the same pass that copies it into storage.
+    """
+
+    def __init__(self, fileobj):
+        self._file = fileobj
+        self._sha256 = hashlib.sha256()
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        data = self._file.read(size)
+        if data:
+            self._sha256.update(data)
+            self.bytes_read += len(data)
+        return data
+
+    def hexdigest(self):
+        return self._sha256.hexdigest()
+
+
+class ConcatenatedReader:
+    """Read-only file object reading a sequence of storage files back to back."""
+
+    def __init__(self, paths, storage=None):
+        self._paths = list(paths)
+        self._storage = storage or default_storage
+        self._current = None
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            return b''.join(iter(lambda: self.read(STREAM_CHUNK_SIZE), b''))
+
+        buffer = bytearray()
+        while len(buffer) < size:
+            if self._current is None:
+                if not self._paths:
+                    break
+                self._current = self._storage.open(self._paths.pop(0), 'rb')
+            data = self._current.read(size - len(buffer))
+            if not data:
+                self._current.close()
+                self._current = None
+                continue
+            buffer += data
+        return bytes(buffer)
+
+    def close(self):
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+
+
+def stream_to_storage(path, source, storage=None):
+    """
+    Save a file object to storage, hashing it on the way through.
+
+    Files received through the checksum upload handlers already carry a
+    ``sha256`` attribute and are saved as-is (temporary uploads are moved
+    rather than copied by ``FileSystemStorage``).
+
+    Args:
+        path: Target storage name
+        source: File-like object or Django ``File``
+        storage: Storage backend (defaults to ``default_storage``)
+
+    Returns:
+        Tuple of (saved_path, size, sha256 hex digest)
+    """
+    storage = storage or default_storage
+    precomputed = getattr(source, 'sha256', None)
+
+    if precomputed and hasattr(source, 'chunks'):
+        saved_path = storage.save(path, source)
+        return saved_path, source.size, precomputed
+
+    reader = HashingReader(source)
+    saved_path = storage.save(path, File(reader, name=path))
+    return saved_path, reader.bytes_read, reader.hexdigest()
+
+
+def save_document_file(document, uploaded_file):
+    """
+    Stream an uploaded file into the content-addressed blob store.
+
+    Identical content already in the store is reused instead of written
+    again. Updates the document's file fields (including ``file_checksum``)
+    but does not save the document; callers persist it as part of their
+    own update, which records the blob reference.
+
+    Returns:
+        The storage path of the blob
+    """
+    from . import blob_store
+
+    blob = blob_store.store(uploaded_file, uploaded_file.name)
+    _point_document_at_blob(document, blob, uploaded_file.name)
+    return blob.storage_path
+
+
+def _point_document_at_blob(document, blob, file_name):
+    document.file_name = file_name
+    document.file_path = blob.storage_path
+    document.file_size = blob.size
+    document.mime_type = mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+    document.file_checksum = blob.sha256
+
+
+# ============================================================================
+# Chunked, resumable uploads
+# ============================================================================
+
+def initiate_upload_session(document, user, file_name, file_size, expected_checksum='', chunk_size=None):
+    """
+    Start a resumable upload for a document file.
+
+    Raises:
+        ValidationError: if the declared file is invalid
+    """
+    from .models import DocumentUploadSession
+
+    if not file_name or '/' in file_name or '\\' in file_name:
+        raise ValidationError('A plain file name is required')
+
+    try:
+        file_size = int(file_size)
+    except (TypeError, ValueError):
+        raise ValidationError('file_size must be an integer')
+
+    max_file_size = _upload_setting('UPLOAD_MAX_FILE_SIZE', DEFAULT_UPLOAD_MAX_FILE_SIZE)
+    if file_size < 1 or file_size > max_file_size:
+        raise ValidationError(f'file_size must be between 1 and {max_file_size} bytes')
+
+    try:
+        chunk_size = int(chunk_size or _upload_setting('UPLOAD_CHUNK_SIZE', DEFAULT_UPLOAD_CHUNK_SIZE))
+    except (TypeError, ValueError):
+        raise ValidationError('chunk_size must be an integer')
+    if not MIN_UPLOAD_CHUNK_SIZE <= chunk_size <= MAX_UPLOAD_CHUNK_SIZE:
+        raise ValidationError(
+            f'chunk_size must be between {MIN_UPLOAD_CHUNK_SIZE} and {MAX_UPLOAD_CHUNK_SIZE} bytes'
+        )
+
+    expected_checksum = (expected_checksum or '').lower()
+    if expected_checksum and (
+        len(expected_checksum) != 64
+        or any(c not in '0123456789abcdef' for c in expected_checksum)
+    ):
+        raise ValidationError('checksum must be a hex-encoded SHA-256 digest')
+
+    ttl_hours = _upload_setting('UPLOAD_SESSION_TTL_HOURS', DEFAULT_UPLOAD_SESSION_TTL_HOURS)
+    return DocumentUploadSession.objects.create(
+        document=document,
+        created_by=user,
+        file_name=file_name,
+        file_size=file_size,
+        chunk_size=chunk_size,
+        expected_checksum=expected_checksum,
+        expires_at=timezone.now() + timedelta(hours=ttl_hours),
+    )
+
+
+def _ensure_active(session):
+    if session.status != 'ACTIVE':
+        raise ValidationError(f'Upload session is {session.status.lower()}')
+    if session.is_expired:
+        raise ValidationError('Upload session has expired')
+
+
+def store_upload_part(session, part_number, source, expected_checksum=''):
+    """
+    Store one part of a resumable upload.
+
+    Re-sending a part replaces the previous copy, so clients can simply
+    retry failed parts.
+
+    Args:
+        session: DocumentUploadSession
+        part_number: 1-based part index
+        source: File-like object with the part's bytes
+        expected_checksum: Optional SHA-256 of the part sent by the client
+
+    Returns:
+        Dict with the stored part's size and checksum
+    """
+    _ensure_active(session)
+
+    if not 1 <= part_number <= session.total_parts:
+        raise ValidationError(f'part_number must be between 1 and {session.total_parts}')
+
+    path = session.part_path(part_number)
+    if default_storage.exists(path):
+        default_storage.delete(path)
+    saved_path, size, checksum = stream_to_storage(path, source)
+
+    expected_size = session.expected_part_size(part_number)
+    if size != expected_size or (expected_checksum and expected_checksum.lower() != checksum):
+        default_storage.delete(saved_path)
+        if size != expected_size:
+            raise ValidationError(f'Part {part_number} must be {expected_size} bytes, received {size}')
+        raise ValidationError(f'Part {part_number} checksum mismatch')
+
+    part = {'size': size, 'checksum': checksum}
+    with transaction.atomic():
+        # Lock the row so parallel part uploads don't overwrite each other's progress
+        locked = type(session).objects.select_for_update().get(pk=session.pk)
+        locked.received_parts[str(part_number)] = part
+        locked.save(update_fields=['received_parts', 'updated_at'])
+    session.received_parts = locked.received_parts
+    return part
+
+
+def _delete_parts(session):
+    for n in range(1, session.total_parts + 1):
+        path = session.part_path(n)
+        try:
+            if default_storage.exists(path):
+                default_storage.delete(path)
+        except Exception as e:
+            logger.warning(f"Could not delete upload part {path}: {e}")
+
+
+def complete_upload_session(session):
+    """
+    Assemble the uploaded parts into the document file and verify it.
+
+    Parts are streamed into the final storage location while the whole-file
+    SHA-256 is computed, then compared to the checksum declared at
+    initiation. The document's file fields are updated and saved.
+
+    Returns:
+        The updated Document
+    """
+    _ensure_active(session)
+
+    missing = session.missing_parts()
+    if missing:
+        raise ValidationError(f'Missing parts: {missing[:20]}')
+
+    from . import blob_store
+
+    document = session.document
+    parts = [session.part_path(n) for n in range(1, session.total_parts + 1)]
+    reader = ConcatenatedReader(parts)
+    try:
+        blob = blob_store.store(
+            reader,
+            session.file_name,
+            expected_size=session.file_size,
+            expected_checksum=session.expected_checksum,
+        )
+    except ValidationError:
+        raise ValidationError('Assembled file does not match the declared size or checksum')
+    finally:
+        reader.close()
+
+    with transaction.atomic():
+        _point_document_at_blob(document, blob, session.file_name)
+        document.save()
+
+        session.status = 'COMPLETED'
+        session.completed_at = timezone.now()
+        session.save(update_fields=['status', 'completed_at', 'updated_at'])
+
+    _delete_parts(session)
+    return document
+
+
+def abort_upload_session(session):
+    """Abort an upload and discard its stored parts."""
+    if session.status == 'ACTIVE':
+        session.status = 'ABORTED'
+        session.save(update_fields=['status', 'updated_at'])
+    _delete_parts(session)
+
+
+def cleanup_expired_upload_sessions():
+    """
+    Abort expired active upload sessions and delete their parts.
+
+    Returns:
+        Number of sessions cleaned up
+    """
+    from .models import DocumentUploadSession
+
+    expired = DocumentUploadSession.objects.filter(status='ACTIVE', expires_at__lte=timezone.now())
+    count = 0
+    for session in expired.iterator():
+        abort_upload_session(session)
+        count += 1
+    return count
+
+
+def upload_session_status(session):
+    """Serializable progress summary for a resumable upload."""
+    return {
+        'session_id': str(session.uuid),
+        'document_uuid': str(session.document.uuid),
+        'file_name': session.file_name,
+        'file_size': session.file_size,
+        'chunk_size': session.chunk_size,
+        'total_parts': session.total_parts,
+        'received_parts': sorted(int(n) for n in session.received_parts),
+        'missing_parts': session.missing_parts(),
+        'status': session.status,
+        'expires_at': session.expires_at.isoformat(),
+    }
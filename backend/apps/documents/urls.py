@@ -19,6 +19,7 @@ from .views import (
     DocumentAttachmentViewSet,
     DocumentWorkflowView,
     DocumentSearchView,
+    DocumentSuggestView,
     DocumentExportView,
     document_download_view,
 )
@@ -61,6 +62,9 @@ urlpatterns = [
     path('search/', 
          DocumentSearchView.as_view(), 
          name='document_search'),
+    path('search/suggest/', 
+         DocumentSuggestView.as_view(), 
+         name='document_search_suggest'),
     
     # Document export
     path('documents/<uuid:document_uuid>/export/', 
@@ -7,10 +7,10 @@ and document lifecycle with proper permission controls and audit logging.
 
 import os
 import logging
-from django.db.models import Q, Count
+from django.db.models import Q, Count, F
 from django.utils import timezone
-from django.http import HttpResponse, Http404
-from django.contrib.postgres.search import SearchVector, SearchQuery
+from django.http import HttpResponse, Http404, StreamingHttpResponse
+from django.contrib.postgres.search import SearchQuery, SearchRank
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ValidationError
 from rest_framework import viewsets, status, permissions
@@ -27,7 +27,7 @@ from apps.users.permissions import CanManageDocuments
 from .models import (
     DocumentType, DocumentSource, Document, DocumentVersion,
     DocumentDependency, DocumentAccessLog, DocumentComment,
-    DocumentAttachment
+    DocumentAttachment, DocumentUploadSession
 )
 from .serializers import (
     DocumentTypeSerializer, DocumentSourceSerializer,
@@ -40,7 +40,13 @@ from .serializers import (
 )
 from .filters import DocumentFilter
 from .utils import log_document_access, create_document_export
+from .uploads import (
+    save_document_file, initiate_upload_session, store_upload_part,
+    complete_upload_session, abort_upload_session, upload_session_status
+)
 from .views_periodic_review import PeriodicReviewMixin
+from .search_vectors import SEARCH_CONFIG
+from .suggestions import DEFAULT_LIMIT as DEFAULT_SUGGESTION_LIMIT, record_search, suggest
 
 
 class DocumentTypeViewSet(viewsets.ModelViewSet):
@@ -664,28 +670,7 @@ class DocumentViewSet(PeriodicReviewMixin, viewsets.ModelViewSet):
             if document.file_name and document.file_name.lower().endswith('.docx') and docx_processor.is_available():
                 # Process .docx template with placeholder replacement
                 try:
-                    processed_file_path = docx_processor.process_docx_template(document, request.user)
-                    
-                    # FIXED: Ensure file exists before reading and properly handle exceptions
-                    if not os.path.exists(processed_file_path):
-                        raise FileNotFoundError(f"Processed file not found: {processed_file_path}")
-                    
-                    # Read the processed file with proper error handling
-                    try:
-                        with open(processed_file_path, 'rb') as f:
-                            file_content = f.read()
-                    except Exception as read_error:
-                        # Clean up on read error
-                        if os.path.exists(processed_file_path):
-                            os.unlink(processed_file_path)
-                        raise Exception(f"Failed to read processed file: {read_error}")
-                    
-                    # Clean up temporary file after successful read
-                    try:
-                        os.unlink(processed_file_path)
-                    except Exception as cleanup_error:
-                        # Log cleanup error but don't fail the download
-                        print(f"Warning: Failed to cleanup temp file {processed_file_path}: {cleanup_error}")
+                    file_content = docx_processor.render_docx(document, request.user)
                     
                     # Create response for processed .docx
                     response = HttpResponse(
@@ -716,24 +701,13 @@ class DocumentViewSet(PeriodicReviewMixin, viewsets.ModelViewSet):
             else:
                 # Non-DOCX file: create ZIP package with original + metadata
                 try:
-                    zip_file_path = zip_processor.create_annotated_zip(document, request.user)
-                    
-                    # Read the ZIP file
-                    with open(zip_file_path, 'rb') as f:
-                        zip_content = f.read()
-                    
-                    # Clean up temporary file
-                    os.unlink(zip_file_path)
+                    archive = zip_processor.annotated_zip_stream(document, request.user)
                     
-                    # Create response with ZIP file
-                    response = HttpResponse(
-                        zip_content,
-                        content_type='application/zip'
-                    )
+                    # Stream the ZIP package as it is written
+                    response = StreamingHttpResponse(archive, content_type='application/zip')
                     
                     filename = f"{document.document_number}_annotated.zip"
                     response['Content-Disposition'] = f'attachment; filename="{filename}"'
-                    response['Content-Length'] = str(len(zip_content))
                     
                     # Log successful download
                     log_document_access(
@@ -802,7 +776,6 @@ class DocumentViewSet(PeriodicReviewMixin, viewsets.ModelViewSet):
         """Generate and serve processed .docx document with placeholder replacement."""
         from .docx_processor import docx_processor
         from django.http import HttpResponse
-        import os
         
         try:
             # Check if document has a .docx file
@@ -820,14 +793,7 @@ class DocumentViewSet(PeriodicReviewMixin, viewsets.ModelViewSet):
                 )
             
             # Process the document
-            processed_file_path = docx_processor.process_docx_template(document, request.user)
-            
-            # Read the processed file
-            with open(processed_file_path, 'rb') as f:
-                file_content = f.read()
-            
-            # Clean up temporary file
-            os.unlink(processed_file_path)
+            file_content = docx_processor.render_docx(document, request.user)
             
             # Create response
             response = HttpResponse(
@@ -987,24 +953,13 @@ class DocumentViewSet(PeriodicReviewMixin, viewsets.ModelViewSet):
                 print(f"Official PDF generator failed, creating ZIP package: {pdf_error}")
                 
                 # Create ZIP package with PDF conversion + metadata
-                zip_file_path = zip_processor.create_official_pdf_zip(document, request.user)
-                
-                # Read the ZIP file
-                with open(zip_file_path, 'rb') as f:
-                    zip_content = f.read()
-                
-                # Clean up temporary file
-                os.unlink(zip_file_path)
+                archive = zip_processor.official_pdf_zip_stream(document, request.user)
                 
-                # Create response with ZIP file
-                response = HttpResponse(
-                    zip_content,
-                    content_type='application/zip'
-                )
+                # Stream the ZIP package as it is written
+                response = StreamingHttpResponse(archive, content_type='application/zip')
                 
                 filename = f"{document.document_number}_official.zip"
                 response['Content-Disposition'] = f'attachment; filename="{filename}"'
-                response['Content-Length'] = str(len(zip_content))
                 
                 # Log successful download
                 log_document_access(
@@ -1038,7 +993,59 @@ class DocumentViewSet(PeriodicReviewMixin, viewsets.ModelViewSet):
         """Download .docx document with placeholders replaced by actual metadata."""
         document = self.get_object()
         return self._serve_processed_docx(document, request)
-    
+
+    @action(detail=False, methods=['post'], url_path='export-package')
+    def export_package(self, request):
+        """
+        Stream a ZIP package of several documents with their metadata.
+
+        Body: {"documents": [<uuid>, ...]}. Every document must be visible to
+        the user and its file present; the archive is streamed as the files
+        are read.
+        """
+        import uuid as uuid_module
+        from .zip_processor import zip_processor
+
+        uuids = request.data.get('documents')
+        if not isinstance(uuids, list) or not uuids:
+            return Response(
+                {'error': 'documents must be a non-empty list of document UUIDs'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            uuids = {str(uuid_module.UUID(str(value))) for value in uuids}
+        except ValueError:
+            return Response({'error': 'Invalid document UUID'}, status=status.HTTP_400_BAD_REQUEST)
+
+        documents = list(self.get_queryset().filter(uuid__in=uuids).order_by('document_number'))
+        missing = uuids - {str(document.uuid) for document in documents}
+        if missing:
+            return Response(
+                {'error': 'Documents not found', 'documents': sorted(missing)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            archive = zip_processor.package_zip_stream(documents, request.user)
+        except (ValueError, FileNotFoundError) as e:
+            return Response({'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+        for document in documents:
+            log_document_access(
+                document=document,
+                user=request.user,
+                access_type='DOWNLOAD',
+                request=request,
+                success=True,
+                file_downloaded=bool(document.file_path),
+                metadata={'download_type': 'package_export', 'package_size': len(documents)}
+            )
+
+        response = StreamingHttpResponse(archive, content_type='application/zip')
+        filename = f"edms_package_{timezone.now().strftime('%Y%m%d_%H%M%S')}.zip"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
     @action(detail=False, methods=['post'], url_path='validate-template')
     def validate_template(self, request):
         """Validate a .docx template file for placeholder usage."""
@@ -1270,53 +1277,171 @@ class DocumentViewSet(PeriodicReviewMixin, viewsets.ModelViewSet):
         """Upload file to a document in DRAFT status."""
         document = self.get_object()
         
-        # Check permissions
-        if not document.can_edit(request.user):
+        error_response = self._check_file_upload_allowed(document, request.user)
+        if error_response:
+            return error_response
+        
+        # Check if file is provided
+        if 'file' not in request.FILES:
+            return Response(
+                {'error': 'No file provided'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        uploaded_file = request.FILES['file']
+        
+        # Stream file into storage; checksum is computed while receiving
+        save_document_file(document, uploaded_file)
+        
+        document.save()
+        
+        # Log file upload
+        log_document_access(
+            document=document,
+            user=request.user,
+            access_type='EDIT',
+            request=request,
+            success=True,
+            metadata={
+                'action': 'file_uploaded',
+                'file_name': uploaded_file.name,
+                'file_size': uploaded_file.size
+            }
+        )
+        
+        # Return updated document
+        serializer = self.get_serializer(document)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+    
+    def _check_file_upload_allowed(self, document, user):
+        """Return an error response if the user may not upload a file to the document."""
+        if not document.can_edit(user):
             return Response(
                 {'error': 'You do not have permission to edit this document'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Check document status
         if document.status != 'DRAFT':
             return Response(
                 {'error': 'Files can only be uploaded to documents in DRAFT status'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Check if file is provided
-        if 'file' not in request.FILES:
-            return Response(
-                {'error': 'No file provided'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        return None
+    
+    def _get_upload_session(self, document, user, session_id):
+        """Look up an upload session belonging to this document and user."""
+        from django.shortcuts import get_object_or_404
+        return get_object_or_404(
+            DocumentUploadSession,
+            uuid=session_id,
+            document=document,
+            created_by=user
+        )
+    
+    @action(detail=True, methods=['post'], url_path='upload-sessions')
+    def initiate_upload(self, request, uuid=None):
+        """
+        Start a resumable chunked upload.
         
-        uploaded_file = request.FILES['file']
+        Body: file_name, file_size, optional checksum (SHA-256 hex) and chunk_size.
+        """
+        document = self.get_object()
         
-        # Save file
-        from django.core.files.storage import default_storage
-        from django.core.files.base import ContentFile
-        import os
-        import mimetypes
+        error_response = self._check_file_upload_allowed(document, request.user)
+        if error_response:
+            return error_response
         
-        # Generate file path
-        file_path = f"documents/{document.uuid}/{uploaded_file.name}"
+        try:
+            session = initiate_upload_session(
+                document=document,
+                user=request.user,
+                file_name=request.data.get('file_name'),
+                file_size=request.data.get('file_size'),
+                expected_checksum=request.data.get('checksum', ''),
+                chunk_size=request.data.get('chunk_size'),
+            )
+        except ValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response(upload_session_status(session), status=status.HTTP_201_CREATED)
+    
+    @action(
+        detail=True,
+        methods=['get', 'delete'],
+        url_path=r'upload-sessions/(?P<session_id>[0-9a-f-]+)'
+    )
+    def upload_session(self, request, uuid=None, session_id=None):
+        """Get progress of a resumable upload (to resume it), or abort it."""
+        document = self.get_object()
+        session = self._get_upload_session(document, request.user, session_id)
         
-        # Save file using default storage
-        saved_path = default_storage.save(file_path, ContentFile(uploaded_file.read()))
+        if request.method == 'DELETE':
+            abort_upload_session(session)
+            return Response(status=status.HTTP_204_NO_CONTENT)
         
-        # Update document with file information
-        document.file_name = uploaded_file.name
-        document.file_path = saved_path
-        document.file_size = uploaded_file.size
-        document.mime_type = mimetypes.guess_type(uploaded_file.name)[0] or 'application/octet-stream'
+        return Response(upload_session_status(session))
+    
+    @action(
+        detail=True,
+        methods=['put'],
+        url_path=r'upload-sessions/(?P<session_id>[0-9a-f-]+)/parts/(?P<part_number>[0-9]+)'
+    )
+    def upload_part(self, request, uuid=None, session_id=None, part_number=None):
+        """
+        Upload one part of a resumable upload.
         
-        # Calculate checksum
-        document.file_checksum = document.calculate_file_checksum()
+        The part is sent either as the raw request body
+        (application/octet-stream) or as a multipart field named ``chunk``.
+        An optional ``X-Content-SHA256`` header is verified against the part.
+        """
+        document = self.get_object()
+        session = self._get_upload_session(document, request.user, session_id)
         
-        document.save()
+        if request.content_type.startswith('multipart/'):
+            source = request.FILES.get('chunk')
+        else:
+            source = request.stream
+        if source is None:
+            return Response({'error': 'No part data provided'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            part = store_upload_part(
+                session,
+                int(part_number),
+                source,
+                expected_checksum=request.META.get('HTTP_X_CONTENT_SHA256', '')
+            )
+        except ValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'part_number': int(part_number),
+            'size': part['size'],
+            'checksum': part['checksum'],
+            'missing_parts': session.missing_parts(),
+        })
+    
+    @action(
+        detail=True,
+        methods=['post'],
+        url_path=r'upload-sessions/(?P<session_id>[0-9a-f-]+)/complete'
+    )
+    def complete_upload(self, request, uuid=None, session_id=None):
+        """Assemble and verify a resumable upload, attaching the file to the document."""
+        document = self.get_object()
+        
+        error_response = self._check_file_upload_allowed(document, request.user)
+        if error_response:
+            return error_response
+        
+        session = self._get_upload_session(document, request.user, session_id)
+        
+        try:
+            document = complete_upload_session(session)
+        except ValidationError as e:
+            return Response({'error': ' '.join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
         
-        # Log file upload
         log_document_access(
             document=document,
             user=request.user,
@@ -1325,12 +1450,12 @@ class DocumentViewSet(PeriodicReviewMixin, viewsets.ModelViewSet):
             success=True,
             metadata={
                 'action': 'file_uploaded',
-                'file_name': uploaded_file.name,
-                'file_size': uploaded_file.size
+                'file_name': document.file_name,
+                'file_size': document.file_size,
+                'via': 'chunked_upload'
             }
         )
         
-        # Return updated document
         serializer = self.get_serializer(document)
         return Response(serializer.data, status=status.HTTP_200_OK)
     
@@ -1528,27 +1653,10 @@ class DocumentViewSet(PeriodicReviewMixin, viewsets.ModelViewSet):
         # Handle file upload if provided
         if uploaded_file:
             try:
-                from django.core.files.storage import default_storage
-                from django.core.files.base import ContentFile
-                import os
-                import mimetypes
-                
                 print(f"Processing file upload: {uploaded_file.name} ({uploaded_file.size} bytes)")
                 
-                # Generate file path
-                file_path = f"documents/{instance.uuid}/{uploaded_file.name}"
-                
-                # Save file using default storage
-                saved_path = default_storage.save(file_path, ContentFile(uploaded_file.read()))
-                
-                # Update document with file information
-                instance.file_name = uploaded_file.name
-                instance.file_path = saved_path
-                instance.file_size = uploaded_file.size
-                instance.mime_type = mimetypes.guess_type(uploaded_file.name)[0] or 'application/octet-stream'
-                
-                # Calculate checksum
-                instance.file_checksum = instance.calculate_file_checksum()
+                # Stream file into storage; checksum is computed while receiving
+                saved_path = save_document_file(instance, uploaded_file)
                 
                 print(f"File saved successfully: {saved_path}")
                 print(f"File info updated: name={instance.file_name}, size={instance.file_size}")
@@ -1605,7 +1713,8 @@ class DocumentViewSet(PeriodicReviewMixin, viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        file_path = document.full_file_path
+        encrypted = _is_stream_encrypted(document)
+        file_path = document.encryption_metadata.get('encrypted_path') if encrypted else document.full_file_path
         if not file_path or not os.path.exists(file_path):
             log_document_access(
                 document=document,
@@ -1649,6 +1758,8 @@ class DocumentViewSet(PeriodicReviewMixin, viewsets.ModelViewSet):
         
         # Serve file
         try:
+            if encrypted:
+                return _encrypted_file_response(document, file_path, request)
             with open(file_path, 'rb') as f:
                 response = HttpResponse(
                     f.read(),
@@ -2983,12 +3094,13 @@ class DocumentSearchView(APIView):
         if date_to:
             queryset = queryset.filter(created_at__lte=date_to)
         
-        # Apply full-text search
+        # Apply full-text search on the stored, GIN-indexed vector, which
+        # includes the extracted body text
         if query:
-            search_query = SearchQuery(query)
-            queryset = queryset.annotate(
-                search=SearchVector('title', 'description', 'keywords', 'document_number')
-            ).filter(search=search_query)
+            search_query = SearchQuery(query, config=SEARCH_CONFIG)
+            queryset = queryset.filter(search_vector=search_query).annotate(
+                rank=SearchRank(F('search_vector'), search_query)
+            ).order_by('-rank')
         
         # Serialize results
         serializer = DocumentListSerializer(
@@ -2997,6 +3109,10 @@ class DocumentSearchView(APIView):
             context={'request': request}
         )
         
+        # Searches that found documents feed autocomplete
+        if query and serializer.data:
+            record_search(query)
+        
         return Response({
             'results': serializer.data,
             'count': len(serializer.data),
@@ -3004,6 +3120,30 @@ class DocumentSearchView(APIView):
         })
 
 
+class DocumentSuggestView(APIView):
+    """
+    Search autocomplete suggestions.
+    
+    Returns popular search terms and readable documents matching the
+    typed text (``q``, at least two characters).
+    """
+    
+    permission_classes = [permissions.IsAuthenticated]
+    
+    def get(self, request):
+        """Suggest terms and documents for a partial query."""
+        query = request.GET.get('q', '')
+        try:
+            limit = min(max(int(request.GET.get('limit', DEFAULT_SUGGESTION_LIMIT)), 1), 50)
+        except ValueError:
+            return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        return Response({
+            'query': query,
+            'suggestions': suggest(query, request.user, limit),
+        })
+
+
 class DocumentExportView(APIView):
     """
     Document export view for compliance reporting.
@@ -3099,3 +3239,70 @@ def document_download_view(request, pk):
         
     except Exception as e:
         raise Http404(f"Download error: {str(e)}")
+
+
+def _is_stream_encrypted(document):
+    """Whether the document file is stored in the streaming AEAD container."""
+    if not document.is_encrypted:
+        return False
+    from apps.security.encryption import CONTAINER_FORMAT
+
+    return document.encryption_metadata.get('format') == CONTAINER_FORMAT
+
+
+def _parse_byte_range(range_header, size):
+    """
+    Parse a single-range ``Range: bytes=...`` header.
+
+    Returns:
+        (start, end) with ``end`` exclusive, None when the header is absent or
+        not a single byte range, or False when the range is unsatisfiable
+    """
+    if not range_header or not range_header.startswith('bytes=') or ',' in range_header:
+        return None
+    first, _, last = range_header[len('bytes='):].strip().partition('-')
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                return False
+            return max(0, size - suffix), size
+        start = int(first)
+        end = min(int(last) + 1, size) if last else size
+    except ValueError:
+        return None
+    if start >= size or end <= start:
+        return False
+    return start, end
+
+
+def _encrypted_file_response(document, encrypted_path, request):
+    """
+    Stream a decrypted document, honouring single HTTP byte ranges.
+
+    Only the encrypted segments covering the requested range are read and
+    authenticated, so large files are never decrypted into memory.
+    """
+    from apps.security.encryption import document_encryption
+
+    with open(encrypted_path, 'rb') as f:
+        size = document_encryption.plaintext_size(f)
+
+    byte_range = _parse_byte_range(request.META.get('HTTP_RANGE'), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range or (0, size)
+    response = StreamingHttpResponse(
+        document_encryption.open_decrypted_range(encrypted_path, start, end),
+        status=206 if byte_range else 200,
+        content_type=document.mime_type or 'application/octet-stream'
+    )
+    response['Content-Length'] = str(end - start)
+    response['Accept-Ranges'] = 'bytes'
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end - 1}/{size}'
+    response['Content-Disposition'] = f'attachment; filename="{document.file_name}"'
+    return response
@@ -62,18 +62,20 @@ class PeriodicReviewMixin:
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        # Check if already has active periodic review
-        active_review = DocumentWorkflow.objects.filter(
+        # Check if already has an active periodic review or another workflow in progress
+        active_workflow = DocumentWorkflow.objects.filter(
             document=document,
-            workflow_type='PERIODIC_REVIEW',
-            is_terminated=False
-        ).exists()
-        
-        if active_review:
-            return Response(
-                {'error': 'Document already has an active periodic review'},
-                status=status.HTTP_400_BAD_REQUEST
+            is_terminated=False,
+            current_state__is_final=False
+        ).first()
+        
+        if active_workflow:
+            error = (
+                'Document already has an active periodic review'
+                if active_workflow.workflow_type == 'PERIODIC_REVIEW'
+                else f'Document has a {active_workflow.workflow_type} workflow in progress'
             )
+            return Response({'error': error}, status=status.HTTP_400_BAD_REQUEST)
         
         # Create periodic review workflow
         periodic_review_service = get_periodic_review_service()
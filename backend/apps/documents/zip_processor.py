@@ -1,16 +1,17 @@
 """
 ZIP-based Document Processing for Non-DOCX Files
 Creates professional metadata packages with VERSION_HISTORY tables for all document formats
+
+Packages are returned as ``ZipStream`` archives and streamed to the client
+while member files are read, never assembled in memory or temporary files.
 """
 
 import os
-import tempfile
-import zipfile
-from typing import Dict, Any, Optional
-from django.conf import settings
+from typing import Dict, Any
 from django.contrib.auth import get_user_model
 from .models import Document
 from .annotation_processor import annotation_processor
+from .zip_stream import ZipStream, member_compression
 
 User = get_user_model()
 
@@ -21,68 +22,41 @@ class ZipDocumentProcessor:
     for non-DOCX document formats
     """
     
-    def create_annotated_zip(self, document: Document, user: User = None) -> Optional[str]:
+    def annotated_zip_stream(self, document: Document, user: User = None) -> ZipStream:
         """
-        Create ZIP package with original document + formatted metadata for annotation download
-        Returns path to ZIP file or None if processing fails
+        ZIP package with original document + formatted metadata for annotation download
+        
+        The original file is read while the archive is streamed; a missing file
+        or failing metadata raises here, before anything is sent.
         """
-        if not document.file_path or not document.full_file_path:
-            raise ValueError("Document has no attached file")
+        original_filename = document.file_name or f"{document.document_number}.{self._get_file_extension(document)}"
+        archive = ZipStream()
         
-        if not os.path.exists(document.full_file_path):
-            raise FileNotFoundError(f"Document file not found: {document.full_file_path}")
+        # Add original document
+        self._add_document_file(archive, original_filename, document)
         
         try:
             # Get metadata for the document
             metadata = annotation_processor.get_document_metadata(document, user)
             
-            # Create temporary ZIP file
-            with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as temp_zip:
-                temp_zip_path = temp_zip.name
-            
-            with zipfile.ZipFile(temp_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Add original document
-                original_filename = document.file_name or f"{document.document_number}.{self._get_file_extension(document)}"
-                zipf.write(document.full_file_path, original_filename)
-                
-                # Create and add metadata text file
-                metadata_content = self._create_metadata_text_file(metadata, document, user)
-                metadata_filename = f"{document.document_number}_metadata.txt"
-                zipf.writestr(metadata_filename, metadata_content)
-                
-                # Create and add placeholder reference file
-                placeholder_content = self._create_placeholder_reference_file(metadata, document)
-                placeholder_filename = f"{document.document_number}_placeholders.txt"
-                zipf.writestr(placeholder_filename, placeholder_content)
-                
-                # Add README file for user instructions
-                readme_content = self._create_readme_file(document)
-                zipf.writestr("README.txt", readme_content)
-            
-            # Verify ZIP was created successfully
-            if not os.path.exists(temp_zip_path):
-                raise RuntimeError("Failed to create ZIP file")
-            
-            file_size = os.path.getsize(temp_zip_path)
-            if file_size == 0:
-                raise RuntimeError("Generated ZIP file is empty")
+            # Create and add metadata text file
+            metadata_content = self._create_metadata_text_file(metadata, document, user)
+            archive.add(f"{document.document_number}_metadata.txt", metadata_content)
             
-            print(f"✅ ZIP package created successfully: {temp_zip_path} ({file_size} bytes)")
-            return temp_zip_path
+            # Create and add placeholder reference file
+            placeholder_content = self._create_placeholder_reference_file(metadata, document)
+            archive.add(f"{document.document_number}_placeholders.txt", placeholder_content)
             
+            # Add README file for user instructions
+            archive.add("README.txt", self._create_readme_file(document))
         except Exception as e:
-            # Clean up on error
-            if 'temp_zip_path' in locals() and os.path.exists(temp_zip_path):
-                try:
-                    os.unlink(temp_zip_path)
-                except:
-                    pass
             raise RuntimeError(f"Failed to create annotated ZIP package: {str(e)}")
+        
+        return archive
     
-    def create_official_pdf_zip(self, document: Document, user: User = None) -> Optional[str]:
+    def official_pdf_zip_stream(self, document: Document, user: User = None) -> ZipStream:
         """
-        Create ZIP package with PDF conversion + PDF metadata for official PDF download
-        Returns path to ZIP file or None if processing fails
+        ZIP package with PDF conversion + PDF metadata for official PDF download
         """
         if not document.file_path or not document.full_file_path:
             raise ValueError("Document has no attached file")
@@ -93,51 +67,97 @@ class ZipDocumentProcessor:
         try:
             # Get metadata for the document
             metadata = annotation_processor.get_document_metadata(document, user)
+            archive = ZipStream()
             
-            # Create temporary ZIP file
-            with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as temp_zip:
-                temp_zip_path = temp_zip.name
-            
-            with zipfile.ZipFile(temp_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                # Convert original document to PDF using LibreOffice
-                pdf_content = self._convert_to_pdf(document)
-                pdf_filename = f"{document.document_number}.pdf"
-                zipf.writestr(pdf_filename, pdf_content)
-                
-                # Create and add metadata PDF file
-                metadata_pdf_content = self._create_metadata_pdf_file(metadata, document, user)
-                metadata_pdf_filename = f"{document.document_number}_metadata.pdf"
-                zipf.writestr(metadata_pdf_filename, metadata_pdf_content)
-                
-                # Create and add placeholder reference PDF
-                placeholder_pdf_content = self._create_placeholder_reference_pdf(metadata, document)
-                placeholder_pdf_filename = f"{document.document_number}_placeholders.pdf"
-                zipf.writestr(placeholder_pdf_filename, placeholder_pdf_content)
-                
-                # Add README file for user instructions
-                readme_content = self._create_readme_file(document, pdf_mode=True)
-                zipf.writestr("README.txt", readme_content)
+            # Convert original document to PDF using LibreOffice
+            archive.add(f"{document.document_number}.pdf", self._convert_to_pdf(document))
             
-            # Verify ZIP was created successfully
-            if not os.path.exists(temp_zip_path):
-                raise RuntimeError("Failed to create ZIP file")
+            # Create and add metadata PDF file
+            metadata_pdf_content = self._create_metadata_pdf_file(metadata, document, user)
+            archive.add(f"{document.document_number}_metadata.pdf", metadata_pdf_content)
             
-            file_size = os.path.getsize(temp_zip_path)
-            if file_size == 0:
-                raise RuntimeError("Generated ZIP file is empty")
+            # Create and add placeholder reference PDF
+            placeholder_pdf_content = self._create_placeholder_reference_pdf(metadata, document)
+            archive.add(f"{document.document_number}_placeholders.pdf", placeholder_pdf_content)
             
-            print(f"✅ Official PDF ZIP package created: {temp_zip_path} ({file_size} bytes)")
-            return temp_zip_path
+            # Add README file for user instructions
+            archive.add("README.txt", self._create_readme_file(document, pdf_mode=True))
+            return archive
             
         except Exception as e:
-            # Clean up on error
-            if 'temp_zip_path' in locals() and os.path.exists(temp_zip_path):
-                try:
-                    os.unlink(temp_zip_path)
-                except:
-                    pass
             raise RuntimeError(f"Failed to create official PDF ZIP package: {str(e)}")
     
+    def package_zip_stream(self, documents, user: User = None) -> ZipStream:
+        """
+        ZIP package of several documents, each in a folder named after its
+        document number with its file and metadata.
+        
+        Every file is checked before streaming starts; documents without a
+        file contribute their metadata only.
+        """
+        archive = ZipStream()
+        for document in documents:
+            folder = document.document_number or str(document.uuid)
+            if document.file_path:
+                self._add_document_file(archive, f"{folder}/{document.file_name or os.path.basename(document.file_path)}", document)
+            metadata = annotation_processor.get_document_metadata(document, user)
+            archive.add(
+                f"{folder}/{folder}_metadata.txt",
+                self._create_metadata_text_file(metadata, document, user)
+            )
+        archive.add("README.txt", self._create_package_readme_file(documents, user))
+        return archive
+    
+    def _add_document_file(self, archive: ZipStream, name: str, document: Document) -> None:
+        """Add the document's plaintext file to ``archive``, read in chunks."""
+        from apps.security.encryption import CONTAINER_FORMAT, document_encryption
+        
+        if not document.file_path or not document.full_file_path:
+            raise ValueError(f"Document {document.document_number} has no attached file")
+        
+        encryption = document.encryption_metadata or {}
+        if document.is_encrypted and encryption.get('format') == CONTAINER_FORMAT:
+            # Streaming AEAD container: decrypt segment by segment
+            encrypted_path = encryption.get('encrypted_path')
+            if not encrypted_path or not os.path.exists(encrypted_path):
+                raise FileNotFoundError(f"Document file not found: {encrypted_path}")
+            with open(encrypted_path, 'rb') as f:
+                size = document_encryption.plaintext_size(f)
+            archive.add(
+                name, lambda: document_encryption.open_decrypted_range(encrypted_path),
+                size=size, compress_type=member_compression(name)
+            )
+            return
+        
+        if not os.path.exists(document.full_file_path):
+            raise FileNotFoundError(f"Document file not found: {document.full_file_path}")
+        archive.add_file(name, document.full_file_path, os.path.getsize(document.full_file_path))
+    
+    def _create_package_readme_file(self, documents, user: User = None) -> str:
+        """Create README listing the documents of a multi-document package"""
+        lines = []
+        
+        lines.append("DOCUMENT PACKAGE")
+        lines.append("=" * 16)
+        lines.append("")
+        lines.append(f"This ZIP package contains {len(documents)} document(s), one folder per document number.")
+        lines.append("")
+        
+        lines.append("PACKAGE CONTENTS")
+        lines.append("-" * 16)
+        for document in documents:
+            lines.append(f"• {document.document_number} - {document.title} (v{document.version_string})")
+        lines.append("• README.txt - This file")
+        lines.append("")
+        
+        lines.append("GENERATED BY")
+        lines.append("-" * 12)
+        lines.append((user.get_full_name() or user.username) if user else 'System')
+        lines.append("Electronic Document Management System (EDMS)")
+        lines.append("")
+        
+        return "\n".join(lines)
+    
     def _create_metadata_text_file(self, metadata: Dict[str, Any], document: Document, user: User = None) -> str:
         """Create formatted metadata text file with professional VERSION_HISTORY table"""
         lines = []
@@ -0,0 +1,112 @@
+"""
+Streaming ZIP archives.
+
+``ZipStream`` produces a ZIP archive as an iterator of byte chunks, suitable
+for ``StreamingHttpResponse``. Members are read in chunks while the archive
+is being sent, so memory stays constant whatever the package size.
+
+The archive is written by ``zipfile`` into a sink that cannot seek: each
+local header announces a data descriptor, written after the member data
+with its CRC and sizes, instead of being patched afterwards. Members whose
+size may exceed 4 GiB get ZIP64 sizes, and ``zipfile`` adds the ZIP64 end
+records when offsets or the member count need them.
+"""
+
+import zipfile
+from datetime import datetime
+
+CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Formats that are already compressed and gain nothing from deflate
+COMPRESSED_EXTENSIONS = frozenset({
+    '.7z', '.bz2', '.docx', '.gif', '.gz', '.jpeg', '.jpg', '.mp3', '.mp4', '.odt',
+    '.pdf', '.png', '.pptx', '.xlsx', '.xz', '.zip',
+})
+
+
+def iter_file(path, chunk_size=CHUNK_SIZE):
+    """Iterate over the bytes of a file in chunks."""
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def member_compression(file_name):
+    """Deflate unless the file format is already compressed."""
+    extension = ('.' + file_name.rsplit('.', 1)[-1].lower()) if '.' in file_name else ''
+    return zipfile.ZIP_STORED if extension in COMPRESSED_EXTENSIONS else zipfile.ZIP_DEFLATED
+
+
+class _Sink:
+    """Write-only, non-seekable file collecting what ``zipfile`` writes."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(data if isinstance(data, bytes) else bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self._chunks = self._chunks, []
+        return chunks
+
+
+class ZipStream:
+    """
+    ZIP archive assembled lazily from its members.
+
+    Members are registered with ``add`` and read only while iterating; an
+    archive can be iterated once.
+    """
+
+    def __init__(self, compression=zipfile.ZIP_DEFLATED):
+        self.compression = compression
+        self._members = []
+
+    def add(self, name, content, size=None, compress_type=None, date_time=None):
+        """
+        Register a member.
+
+        Args:
+            name: Path of the member in the archive
+            content: bytes, str, or a callable returning an iterable of bytes
+                chunks, called when the member is written
+            size: Uncompressed size if known; unknown or large sizes get ZIP64
+                headers
+            compress_type: zipfile.ZIP_STORED or ZIP_DEFLATED, defaults to the
+                archive's compression
+            date_time: Modification time, defaults to now
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        if isinstance(content, bytes):
+            data = content
+            content, size = (lambda: [data]), len(data)
+        self._members.append((name, content, size, compress_type, date_time))
+
+    def add_file(self, name, path, size, compress_type=None):
+        """Register a file on disk, read in chunks when the member is written."""
+        if compress_type is None:
+            compress_type = member_compression(name)
+        self.add(name, lambda: iter_file(path), size=size, compress_type=compress_type)
+
+    def __iter__(self):
+        sink = _Sink()
+        with zipfile.ZipFile(sink, 'w', compression=self.compression, allowZip64=True) as archive:
+            for name, content, size, compress_type, date_time in self._members:
+                info = zipfile.ZipInfo(name, date_time=(date_time or datetime.now()).timetuple()[:6])
+                info.compress_type = self.compression if compress_type is None else compress_type
+                info.file_size = size or 0
+                with archive.open(info, 'w', force_zip64=size is None) as member:
+                    for chunk in content():
+                        member.write(chunk)
+                        yield from sink.drain()
+                yield from sink.drain()
+        yield from sink.drain()
@@ -46,6 +46,12 @@ from apps.audit.services import audit_service
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
+# Versions left out of the version history table
+VERSION_HISTORY_EXCLUDED_STATUSES = frozenset({
+    'DRAFT', 'PENDING_REVIEW', 'UNDER_REVIEW', 'REVIEW_COMPLETED',
+    'PENDING_APPROVAL', 'UNDER_APPROVAL', 'REJECTED', 'TERMINATED'
+})
+
 
 class PlaceholderService:
     """
@@ -371,8 +377,13 @@ class PlaceholderService:
             # Fallback to simple statement
             return "This document has been electronically processed and validated by the Electronic Document Management System (EDMS). For verification, contact your system administrator."
 
-    def _get_version_history_data(self, document):
-        """Get version history as structured data for native DOCX table rendering."""
+    def _get_version_history_data(self, document, family=None):
+        """
+        Get version history as structured data for native DOCX table rendering.
+        
+        ``family`` may hold the document's versions already loaded (with
+        ``author`` and ``workflow__transitions``), saving the query.
+        """
         if not document:
             return {"error": "No document provided"}
         
@@ -388,16 +399,20 @@ class PlaceholderService:
             
             # Find all versions of this document, but only include approved/effective versions
             # Exclude draft, pending, under review, and rejected versions from version history
-            all_versions = Document.objects.filter(
-                document_number__startswith=base_number + '-v'
-            ).exclude(
-                status__in=[
-                    'DRAFT', 'PENDING_REVIEW', 'UNDER_REVIEW', 'REVIEW_COMPLETED',
-                    'PENDING_APPROVAL', 'UNDER_APPROVAL', 'REJECTED', 'TERMINATED'
-                ]
-            ).order_by('version_major', 'version_minor')
-            
-            if not all_versions.exists():
+            if family is None:
+                family = Document.objects.filter(
+                    document_number__startswith=base_number + '-v'
+                ).select_related('author', 'workflow').prefetch_related('workflow__transitions')
+            all_versions = sorted(
+                (
+                    version_doc for version_doc in family
+                    if version_doc.document_number.startswith(base_number + '-v')
+                    and version_doc.status not in VERSION_HISTORY_EXCLUDED_STATUSES
+                ),
+                key=lambda version_doc: (version_doc.version_major, version_doc.version_minor)
+            )
+            
+            if not all_versions:
                 return {"error": "No version history available"}
             
             # Return structured data for DOCX table rendering
@@ -520,24 +535,14 @@ class PlaceholderService:
                 return desc[:50] + '...' if len(desc) > 50 else desc
             
             # 4. Fallback to workflow submission comments
-            from apps.workflows.models import DocumentWorkflow, DocumentTransition
-            
-            workflows = DocumentWorkflow.objects.filter(document=document).order_by('created_at')
+            workflow = getattr(document, 'workflow', None)
             
-            if workflows.exists():
-                first_workflow = workflows.first()
-                
+            if workflow is not None:
                 # Get the first transition (submission comment)
-                try:
-                    transitions = DocumentTransition.objects.filter(workflow=first_workflow).order_by('transitioned_at')
-                except:
-                    try:
-                        transitions = DocumentTransition.objects.filter(workflow=first_workflow).order_by('created_at')
-                    except:
-                        transitions = DocumentTransition.objects.filter(workflow=first_workflow)
+                transitions = sorted(workflow.transitions.all(), key=lambda transition: transition.transitioned_at)
                 
-                if transitions.exists():
-                    first_transition = transitions.first()
+                if transitions:
+                    first_transition = transitions[0]
                     if first_transition.comment and first_transition.comment != 'No comment':
                         comment = first_transition.comment.strip()
                         return comment[:50] + '...' if len(comment) > 50 else comment
@@ -845,7 +850,7 @@ class OCRService:
 
     def extract_text_from_pdf_images(self, pdf_path: str, language: str = 'eng') -> List[str]:
         """
-        Extract text from PDF by converting pages to images and running OCR.
+        Extract text from PDF by running OCR on the images of each page.
         
         Args:
             pdf_path: Path to PDF file
@@ -854,13 +859,17 @@ class OCRService:
         Returns:
             List of extracted text for each page
         """
-        extracted_texts = []
+        from PyPDF2 import PdfReader
+        from apps.documents.text_extraction import bounded_map, ocr_images, page_images, worker_count
         
         try:
-            # This would require additional libraries like pdf2image
-            # For now, return empty list
-            logger.info(f"OCR extraction for PDF not implemented: {pdf_path}")
-            return []
+            # Scanned pages carry their content as embedded images; pages
+            # are recognized in parallel on a bounded pool
+            reader = PdfReader(pdf_path)
+            images = (page_images(page) for page in reader.pages)
+            return list(bounded_map(
+                lambda page: ocr_images(page, language), images, worker_count()
+            ))
             
         except Exception as e:
             logger.error(f"PDF OCR extraction failed for {pdf_path}: {str(e)}")
@@ -150,34 +150,28 @@ class NotificationViewSet(viewsets.ReadOnlyModelViewSet):
         Returns Celery Beat, Worker status, and task statistics
         """
         try:
-            from celery import current_app
             from django_celery_beat.models import PeriodicTask
             from datetime import timedelta
+            from apps.scheduler.worker_state import worker_state
             
-            # Get Celery inspect instance
-            inspect = current_app.control.inspect()
-            
-            # Check Celery Worker status
-            active_workers = inspect.active()
-            registered_tasks = inspect.registered()
-            stats = inspect.stats()
+            # Worker status from the cached, event-driven worker state
+            workers = worker_state.alive_workers()
             
             worker_status = {
-                'is_running': active_workers is not None and len(active_workers) > 0,
-                'worker_count': len(active_workers) if active_workers else 0,
+                'is_running': len(workers) > 0,
+                'worker_count': len(workers),
                 'workers': []
             }
             
-            if active_workers:
-                for worker_name, tasks in active_workers.items():
-                    worker_info = {
-                        'name': worker_name,
-                        'active_tasks': len(tasks),
-                        'registered_tasks': len(registered_tasks.get(worker_name, [])) if registered_tasks else 0
-                    }
-                    if stats and worker_name in stats:
-                        worker_info['pool_size'] = stats[worker_name].get('pool', {}).get('max-concurrency', 0)
-                    worker_status['workers'].append(worker_info)
+            for worker_name, worker in sorted(workers.items()):
+                worker_info = {
+                    'name': worker_name,
+                    'active_tasks': worker['active'],
+                    'registered_tasks': len(worker.get('registered') or [])
+                }
+                if worker.get('pool_size'):
+                    worker_info['pool_size'] = worker['pool_size']
+                worker_status['workers'].append(worker_info)
             
             # Check Celery Beat status (via periodic tasks)
             periodic_tasks = PeriodicTask.objects.filter(enabled=True)
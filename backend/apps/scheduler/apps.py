@@ -4,4 +4,9 @@ from django.apps import AppConfig
 class SchedulerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.scheduler'
-    verbose_name = 'Scheduler (S3)'
\ No newline at end of file
+    verbose_name = 'Scheduler (S3)'
+
+    def ready(self):
+        """Report Celery worker process metrics (no-op outside workers)."""
+        from .metrics import connect_worker_signals
+        connect_worker_signals()
@@ -0,0 +1,35 @@
+"""
+Django management command that runs the Celery event monitor.
+
+Consumes worker heartbeats and task events and publishes a compact state
+snapshot to the cache, which the scheduler dashboard, task monitor and
+health checks read instead of broadcasting inspect() requests.
+
+Workers must send task events (CELERY_WORKER_SEND_TASK_EVENTS).
+
+Usage: python manage.py monitor_celery_events
+"""
+
+from django.core.management.base import BaseCommand
+
+from apps.scheduler.worker_state import WorkerStateMonitor, PUBLISH_INTERVAL
+
+
+class Command(BaseCommand):
+    help = 'Consume Celery events into the cached worker state used by the scheduler dashboard'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=PUBLISH_INTERVAL,
+            help='Seconds between state snapshots',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write('📡 Monitoring Celery events...')
+        monitor = WorkerStateMonitor(publish_interval=options['interval'])
+        try:
+            monitor.run()
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped')
@@ -0,0 +1,840 @@
+"""
+Runtime performance metrics for health checks and Prometheus.
+
+Three kinds of measurements are collected:
+
+* Counters recorded while serving traffic: request latency histograms per
+  endpoint (``RequestMetricsMiddleware``) and database query counts, query
+  time and slow queries (a connection execute wrapper installed by the same
+  middleware). Each process accumulates them in memory and periodically adds
+  them to a shared Redis hash, so every web worker contributes to the same
+  totals and a scrape hitting any worker sees all of them.
+* Process statistics (RSS, CPU time) that every web worker and Celery worker
+  process reports about itself, from ``/proc`` and ``os.times()``, along
+  with the state of its database connection pool when pooling is enabled.
+* Point-in-time probes taken when metrics are read: database round trip and
+  connection usage, Redis round trip, storage volume usage and growth, and
+  Celery queue depth.
+
+``performance_metrics.collect()`` returns everything as a dict for the
+health service and scheduler dashboard; ``render_prometheus()`` formats the
+same data in the Prometheus text exposition format served by ``/metrics``.
+
+Only the standard library is used (no psutil/prometheus_client), so the
+process statistics require Linux ``/proc``; elsewhere RSS falls back to the
+peak value reported by ``getrusage``.
+"""
+
+import hmac
+import json
+import logging
+import os
+import resource
+import shutil
+import socket
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.views.decorators.http import require_http_methods
+
+from apps.core.db.pool import pool_stats
+
+logger = logging.getLogger(__name__)
+
+COUNTERS_KEY = 'edms:scheduler:metrics:counters'
+PROCESS_METRICS_KEY = 'edms:scheduler:metrics:processes'
+STORAGE_SAMPLES_CACHE_KEY = 'scheduler:metrics:storage_samples'
+COUNTER_SAMPLES_CACHE_KEY = 'scheduler:metrics:counter_samples'
+
+# Seconds between flushes of in-process counters to Redis
+FLUSH_INTERVAL = 15
+# Process reports older than this belong to processes that have exited
+PROCESS_STALE_AFTER = 120
+# Storage usage is sampled at most this often for growth estimates
+STORAGE_SAMPLE_INTERVAL = 60 * 60
+STORAGE_SAMPLE_RETENTION = 7 * 24 * 60 * 60
+# Health checks judge counters over roughly the last hour, not since startup
+COUNTER_WINDOW = 60 * 60
+COUNTER_SAMPLE_INTERVAL = 10 * 60
+
+LATENCY_BUCKETS = (0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+DEFAULTS = {
+    'AUTH_TOKEN': '',
+    'SLOW_QUERY_MS': 500,
+    'STORAGE_PATHS': {},
+    'DISK_WARNING_PERCENT': 80,
+    'DISK_CRITICAL_PERCENT': 90,
+    'STORAGE_FULL_WARNING_DAYS': 30,
+    'MEMORY_WARNING_PERCENT': 85,
+    'DB_CONNECTIONS_WARNING_PERCENT': 80,
+    'DB_LATENCY_WARNING_MS': 100,
+    'DB_POOL_WAIT_WARNING_MS': 100,
+    'REDIS_LATENCY_WARNING_MS': 50,
+    'REQUEST_P95_WARNING_MS': 2000,
+    'QUEUE_DEPTH_WARNING': 100,
+    'QUEUE_DEPTH_CRITICAL': 1000,
+}
+
+
+def metrics_setting(name):
+    return getattr(settings, 'PERFORMANCE_METRICS', {}).get(name, DEFAULTS[name])
+
+
+def _redis():
+    """Raw Redis client behind the default cache, or None (e.g. locmem in development)."""
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+    except Exception:
+        return None
+
+
+def _status_class(status_code):
+    return f'{status_code // 100}xx'
+
+
+# ============================================================================
+# Process statistics
+# ============================================================================
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def process_stats():
+    """RSS and CPU time of the current process."""
+    try:
+        with open('/proc/self/statm') as statm:
+            rss_bytes = int(statm.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        # Peak RSS in KB on Linux; the best available without /proc
+        rss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+    times = os.times()
+    return {
+        'pid': os.getpid(),
+        'hostname': socket.gethostname(),
+        'rss_bytes': rss_bytes,
+        'cpu_seconds': round(times.user + times.system, 3),
+    }
+
+
+def memory_limit_bytes():
+    """Memory available to this container: the cgroup limit if set, else physical memory."""
+    limits = []
+    for path in ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes'):
+        try:
+            with open(path) as limit_file:
+                value = limit_file.read().strip()
+            if value.isdigit() and int(value) < 1 << 60:
+                limits.append(int(value))
+        except OSError:
+            continue
+    try:
+        limits.append(os.sysconf('SC_PHYS_PAGES') * _PAGE_SIZE)
+    except (AttributeError, ValueError, OSError):
+        pass
+    return min(limits) if limits else None
+
+
+# ============================================================================
+# In-process recording
+# ============================================================================
+
+class MetricsRecorder:
+    """
+    Accumulate counters for this process and push them to Redis.
+
+    Counters live in a flat ``{field: value}`` dict whose fields encode the
+    metric and its labels, e.g. ``http_requests|GET|api/v1/documents/|2xx``.
+    Histogram buckets are stored non-cumulatively and summed when rendered.
+    """
+
+    def __init__(self, role='web'):
+        self.role = role
+        self._lock = threading.Lock()
+        self._pending = defaultdict(float)
+        self._last_flush = time.monotonic()
+        self._last_cpu = None
+
+    def observe_request(self, method, route, status_code, seconds, queries=None):
+        labels = f'{method}|{route}|{_status_class(status_code)}'
+        bucket = next((str(b) for b in LATENCY_BUCKETS if seconds <= b), '+Inf')
+        with self._lock:
+            self._pending[f'http_requests|{labels}'] += 1
+            self._pending[f'http_duration_sum|{labels}'] += seconds
+            self._pending[f'http_duration_bucket|{labels}|{bucket}'] += 1
+            if queries is not None:
+                self._pending['db_queries'] += queries.count
+                self._pending['db_query_seconds'] += queries.seconds
+                self._pending['db_slow_queries'] += queries.slow
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        if time.monotonic() - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self):
+        """Add pending counters to the shared hash and report this process."""
+        client = _redis()
+        self._last_flush = time.monotonic()
+        if client is None:
+            return  # Counters stay in-process and are read from here
+
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+        try:
+            pipe = client.pipeline(transaction=False)
+            for field, value in pending.items():
+                pipe.hincrbyfloat(COUNTERS_KEY, field, value)
+            report = self.process_report()
+            pipe.hset(PROCESS_METRICS_KEY, f"{self.role}:{report['hostname']}:{report['pid']}", json.dumps(report))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"Could not flush performance metrics: {str(e)}")
+            with self._lock:
+                for field, value in pending.items():
+                    self._pending[field] += value
+
+    def process_report(self):
+        report = process_stats()
+        now = time.time()
+        if self._last_cpu:
+            elapsed = now - self._last_cpu[0]
+            if elapsed > 0:
+                report['cpu_percent'] = round((report['cpu_seconds'] - self._last_cpu[1]) / elapsed * 100, 1)
+        self._last_cpu = (now, report['cpu_seconds'])
+        report.update(role=self.role, updated_at=now, memory_limit_bytes=memory_limit_bytes())
+        pools = pool_stats()
+        if pools:
+            report['db_pools'] = pools
+        return report
+
+    def counters(self):
+        """Totals across all processes (or just this one without Redis)."""
+        with self._lock:
+            totals = defaultdict(float, self._pending)
+        client = _redis()
+        if client is not None:
+            try:
+                for field, value in client.hgetall(COUNTERS_KEY).items():
+                    totals[_text(field)] += float(value)
+            except Exception as e:
+                logger.warning(f"Could not read shared performance metrics: {str(e)}")
+        return totals
+
+    def processes(self):
+        """Latest report of every live process, pruning exited ones."""
+        client = _redis()
+        if client is None:
+            return [self.process_report()]
+        try:
+            reports = client.hgetall(PROCESS_METRICS_KEY)
+        except Exception as e:
+            logger.warning(f"Could not read process metrics: {str(e)}")
+            return []
+
+        live, stale = [], []
+        now = time.time()
+        for field, value in reports.items():
+            report = json.loads(value)
+            if now - report['updated_at'] > PROCESS_STALE_AFTER:
+                stale.append(field)
+            else:
+                live.append(report)
+        if stale:
+            client.hdel(PROCESS_METRICS_KEY, *stale)
+        return sorted(live, key=lambda r: (r['role'], r['hostname'], r['pid']))
+
+
+def _text(value):
+    return value.decode() if isinstance(value, bytes) else value
+
+
+recorder = MetricsRecorder()
+
+
+# ============================================================================
+# Request and query timing
+# ============================================================================
+
+class QueryTimer:
+    """Connection execute wrapper counting queries, query time and slow queries."""
+
+    def __init__(self, slow_seconds=None):
+        self.slow_seconds = slow_seconds if slow_seconds is not None else metrics_setting('SLOW_QUERY_MS') / 1000
+        self.count = 0
+        self.seconds = 0.0
+        self.slow = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.seconds += elapsed
+            if elapsed >= self.slow_seconds:
+                self.slow += 1
+                logger.warning(f"Slow query ({elapsed * 1000:.0f} ms): {sql[:300]}")
+
+
+class RequestMetricsMiddleware:
+    """
+    Record request latency per endpoint plus database query statistics.
+
+    Endpoints are labelled by their URL pattern (``api/v1/documents/<uuid:pk>/``)
+    rather than the path, so label cardinality stays bounded; unresolved
+    paths (404 probes) share a single ``unmatched`` label.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryTimer()
+        start = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match and match.route else 'unmatched'
+        try:
+            recorder.observe_request(request.method, route, response.status_code, elapsed, queries)
+        except Exception as e:
+            logger.warning(f"Could not record request metrics: {str(e)}")
+        return response
+
+
+# ============================================================================
+# Celery worker process reports
+# ============================================================================
+
+worker_recorder = MetricsRecorder(role='celery')
+
+
+def report_worker_process(**kwargs):
+    """Heartbeat/task hook: report this worker process at most every FLUSH_INTERVAL."""
+    try:
+        worker_recorder.maybe_flush()
+    except Exception as e:
+        logger.warning(f"Could not report worker metrics: {str(e)}")
+
+
+def connect_worker_signals():
+    from celery.signals import heartbeat_sent, task_postrun
+
+    # Heartbeats come from the worker's main process, task_postrun from pool processes
+    heartbeat_sent.connect(report_worker_process, weak=False, dispatch_uid='scheduler_metrics_heartbeat')
+    task_postrun.connect(report_worker_process, weak=False, dispatch_uid='scheduler_metrics_postrun')
+
+
+# ============================================================================
+# Point-in-time probes
+# ============================================================================
+
+def database_metrics():
+    """Round trip, connection usage and size of the default database."""
+    start = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+        cursor.fetchone()
+        metrics = {'ping_ms': round((time.perf_counter() - start) * 1000, 2), 'vendor': connection.vendor}
+
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                "SELECT COALESCE(state, 'unknown'), COUNT(*) FROM pg_stat_activity "
+                "WHERE datname = current_database() GROUP BY 1"
+            )
+            metrics['connections'] = {state: count for state, count in cursor.fetchall()}
+            cursor.execute("SELECT current_setting('max_connections')::int, pg_database_size(current_database())")
+            metrics['max_connections'], metrics['size_bytes'] = cursor.fetchone()
+            total = sum(metrics['connections'].values())
+            metrics['connections_total'] = total
+            metrics['connections_percent'] = round(total / metrics['max_connections'] * 100, 1)
+    return metrics
+
+
+def pool_summary(processes):
+    """Connection pool totals across the reporting processes, or None without pooling."""
+    pools = [pool for process in processes for pool in process.get('db_pools') or []]
+    if not pools:
+        return None
+    checkouts = sum(pool['checkouts'] for pool in pools)
+    checkout_seconds = sum(pool['checkout_seconds'] for pool in pools)
+    return {
+        'pools': len(pools),
+        'size': sum(pool['size'] for pool in pools),
+        'in_use': sum(pool['in_use'] for pool in pools),
+        'idle': sum(pool['idle'] for pool in pools),
+        'waiters': sum(pool['waiters'] for pool in pools),
+        'max_size': sum(pool['max_size'] for pool in pools),
+        'checkouts': checkouts,
+        'checkout_avg_ms': round(checkout_seconds / checkouts * 1000, 3) if checkouts else 0.0,
+        'checkout_max_ms': max(pool['checkout_max_ms'] for pool in pools),
+        'timeouts': sum(pool['timeouts'] for pool in pools),
+        'health_check_failures': sum(pool['health_check_failures'] for pool in pools),
+    }
+
+
+def redis_metrics():
+    """Round trip to the cache/broker Redis; falls back to a cache read elsewhere."""
+    client = _redis()
+    start = time.perf_counter()
+    if client is None:
+        cache.get('scheduler:metrics:ping')
+        return {'ping_ms': round((time.perf_counter() - start) * 1000, 2), 'backend': 'cache'}
+
+    client.ping()
+    metrics = {'ping_ms': round((time.perf_counter() - start) * 1000, 2), 'backend': 'redis'}
+    info = client.info()
+    metrics['used_memory_bytes'] = info.get('used_memory')
+    metrics['connected_clients'] = info.get('connected_clients')
+    return metrics
+
+
+def storage_metrics(now=None):
+    """Usage of each storage volume, with growth estimated from hourly samples."""
+    now = now or time.time()
+    volumes = {}
+    seen_devices = {}
+    for name, path in metrics_setting('STORAGE_PATHS').items():
+        if not os.path.isdir(path):
+            continue
+        device = os.stat(path).st_dev
+        if device in seen_devices:
+            volumes[seen_devices[device]]['paths'].append(str(path))
+            continue
+        usage = shutil.disk_usage(path)
+        seen_devices[device] = name
+        volumes[name] = {
+            'paths': [str(path)],
+            'total_bytes': usage.total,
+            'used_bytes': usage.used,
+            'free_bytes': usage.free,
+            'used_percent': round(usage.used / usage.total * 100, 1) if usage.total else 0,
+        }
+
+    samples = cache.get(STORAGE_SAMPLES_CACHE_KEY) or []
+    if not samples or now - samples[-1]['at'] >= STORAGE_SAMPLE_INTERVAL:
+        samples.append({'at': now, 'used': {name: v['used_bytes'] for name, v in volumes.items()}})
+        samples = [s for s in samples if now - s['at'] <= STORAGE_SAMPLE_RETENTION]
+        cache.set(STORAGE_SAMPLES_CACHE_KEY, samples, timeout=None)
+
+    for name, volume in volumes.items():
+        history = [s for s in samples if name in s['used']]
+        volume['growth_bytes_per_day'] = None
+        volume['days_until_full'] = None
+        if len(history) < 2 or history[-1]['at'] - history[0]['at'] < STORAGE_SAMPLE_INTERVAL:
+            continue
+        days = (history[-1]['at'] - history[0]['at']) / 86400
+        growth = (history[-1]['used'][name] - history[0]['used'][name]) / days
+        volume['growth_bytes_per_day'] = int(growth)
+        if growth > 0:
+            volume['days_until_full'] = round(volume['free_bytes'] / growth, 1)
+    return volumes
+
+
+def queue_names():
+    from celery import current_app
+
+    names = {current_app.conf.task_default_queue or 'celery'}
+    for route in (current_app.conf.task_routes or {}).values():
+        if isinstance(route, dict) and route.get('queue'):
+            names.add(route['queue'])
+    return sorted(names)
+
+
+def queue_metrics():
+    """Messages waiting in each Celery queue (passive declare, works on Redis and AMQP)."""
+    from celery import current_app
+
+    depths = {}
+    with current_app.connection_for_read() as conn:
+        conn.ensure_connection(max_retries=1, interval_start=0)
+        channel = conn.default_channel
+        for name in queue_names():
+            try:
+                depths[name] = channel.queue_declare(queue=name, passive=True).message_count
+            except Exception:
+                depths[name] = 0  # Queue not declared yet: nothing has been sent to it
+    return depths
+
+
+# ============================================================================
+# Aggregation
+# ============================================================================
+
+def histogram_quantile(quantile, buckets):
+    """Estimate a quantile from non-cumulative ``{upper_bound: count}`` buckets."""
+    total = sum(buckets.values())
+    if not total:
+        return None
+    rank = quantile * total
+    cumulative = 0
+    lower = 0.0
+    for bound in sorted(buckets, key=float):
+        count = buckets[bound]
+        if cumulative + count >= rank:
+            if bound == '+Inf':
+                return lower  # Beyond the largest bucket; report its bound
+            upper = float(bound)
+            return lower + (upper - lower) * ((rank - cumulative) / count if count else 0)
+        cumulative += count
+        lower = float(bound) if bound != '+Inf' else lower
+    return lower
+
+
+def http_summary(counters):
+    """Per-endpoint request counts, mean and p95 latency from the raw counters."""
+    endpoints = {}
+    for field, value in counters.items():
+        parts = field.split('|')
+        if parts[0] not in ('http_requests', 'http_duration_sum', 'http_duration_bucket'):
+            continue
+        method, route = parts[1], parts[2]
+        entry = endpoints.setdefault((method, route), {'requests': 0, 'duration_sum': 0.0, 'buckets': defaultdict(float)})
+        if parts[0] == 'http_requests':
+            entry['requests'] += value
+        elif parts[0] == 'http_duration_sum':
+            entry['duration_sum'] += value
+        else:
+            entry['buckets'][parts[4]] += value
+
+    overall = defaultdict(float)
+    summary = []
+    for (method, route), entry in endpoints.items():
+        for bound, count in entry['buckets'].items():
+            overall[bound] += count
+        p95 = histogram_quantile(0.95, entry['buckets'])
+        summary.append({
+            'method': method,
+            'route': route,
+            'requests': int(entry['requests']),
+            'mean_ms': round(entry['duration_sum'] / entry['requests'] * 1000, 1) if entry['requests'] else None,
+            'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+        })
+    summary.sort(key=lambda e: e['p95_ms'] or 0, reverse=True)
+
+    p95 = histogram_quantile(0.95, overall)
+    return {
+        'requests': int(sum(e['requests'] for e in summary)),
+        'p95_ms': round(p95 * 1000, 1) if p95 is not None else None,
+        'slowest_endpoints': summary[:10],
+    }
+
+
+def recent_counters(counters, now=None):
+    """
+    Counter increases over about the last COUNTER_WINDOW seconds.
+
+    Totals are sampled into the cache every COUNTER_SAMPLE_INTERVAL; the
+    newest sample at least a window old is subtracted from the current
+    totals. Returns ``(counters, window_seconds)``.
+    """
+    now = now or time.time()
+    samples = cache.get(COUNTER_SAMPLES_CACHE_KEY) or []
+    reference = next((sample for sample in reversed(samples) if now - sample['at'] >= COUNTER_WINDOW), None)
+    reference = reference or (samples[0] if samples else None)
+
+    if not samples or now - samples[-1]['at'] >= COUNTER_SAMPLE_INTERVAL:
+        samples.append({'at': now, 'counters': dict(counters)})
+        samples = [s for s in samples if now - s['at'] <= COUNTER_WINDOW + COUNTER_SAMPLE_INTERVAL]
+        cache.set(COUNTER_SAMPLES_CACHE_KEY, samples, timeout=None)
+
+    if reference is None:
+        return dict(counters), None
+    baseline = reference['counters']
+    # Clamped at zero in case the shared totals were reset
+    recent = {field: max(value - baseline.get(field, 0.0), 0.0) for field, value in counters.items()}
+    return recent, now - reference['at']
+
+
+class PerformanceMetricsService:
+    """Collect all runtime metrics and evaluate them against capacity thresholds."""
+
+    PROBES = {
+        'database': database_metrics,
+        'redis': redis_metrics,
+        'storage': storage_metrics,
+        'queues': queue_metrics,
+    }
+
+    def collect(self):
+        counters = recorder.counters()
+        recent, window = recent_counters(counters)
+        processes = recorder.processes()
+        for process in processes:
+            # Each process reports the limit of its own container
+            if process.get('memory_limit_bytes'):
+                process['memory_percent'] = round(process['rss_bytes'] / process['memory_limit_bytes'] * 100, 1)
+
+        snapshot = {
+            'collected_at': time.time(),
+            'processes': processes,
+            # Totals since the shared counters were created (Prometheus counters)
+            'counters': dict(counters),
+            # Request and query statistics over the recent window (health checks)
+            'window_seconds': round(window) if window is not None else None,
+            'http': http_summary(recent),
+            'queries': {
+                'total': int(recent.get('db_queries', 0)),
+                'seconds': round(recent.get('db_query_seconds', 0.0), 3),
+                'slow': int(recent.get('db_slow_queries', 0)),
+            },
+            'errors': {},
+        }
+        for name, probe in self.PROBES.items():
+            try:
+                snapshot[name] = probe()
+            except Exception as e:
+                logger.warning(f"Performance probe '{name}' failed: {str(e)}")
+                snapshot[name] = None
+                snapshot['errors'][name] = str(e)
+        return snapshot
+
+    def capacity_issues(self, snapshot):
+        """
+        Threshold violations as alert dicts (``component``/``level``/``message``/
+        ``action``), shared by the health service and the scheduler dashboard.
+        """
+        issues = []
+
+        def add(component, level, message, action):
+            issues.append({'component': component, 'level': level, 'message': message, 'action': action})
+
+        for name, volume in (snapshot.get('storage') or {}).items():
+            if volume['used_percent'] >= metrics_setting('DISK_CRITICAL_PERCENT'):
+                add('storage', 'CRITICAL', f"Storage volume '{name}' is {volume['used_percent']}% full",
+                    'Free or extend document storage immediately')
+            elif volume['used_percent'] >= metrics_setting('DISK_WARNING_PERCENT'):
+                add('storage', 'WARNING', f"Storage volume '{name}' is {volume['used_percent']}% full",
+                    'Plan a storage extension')
+            days = volume.get('days_until_full')
+            if days is not None and days <= metrics_setting('STORAGE_FULL_WARNING_DAYS'):
+                add('storage', 'WARNING', f"Storage volume '{name}' will be full in about {days:.0f} days at the current growth rate",
+                    'Plan a storage extension')
+
+        for process in snapshot.get('processes') or []:
+            percent = process.get('memory_percent')
+            if percent is not None and percent >= metrics_setting('MEMORY_WARNING_PERCENT'):
+                add('memory', 'WARNING', f"{process['role']} process {process['hostname']}:{process['pid']} uses {percent}% of memory",
+                    'Check for memory leaks or lower worker concurrency')
+
+        database = snapshot.get('database')
+        if database is None:
+            add('database', 'CRITICAL', 'Database probe failed', 'Check database connectivity')
+        else:
+            if database['ping_ms'] >= metrics_setting('DB_LATENCY_WARNING_MS'):
+                add('database', 'WARNING', f"Database round trip is {database['ping_ms']} ms", 'Check database load and network latency')
+            percent = database.get('connections_percent')
+            if percent is not None and percent >= metrics_setting('DB_CONNECTIONS_WARNING_PERCENT'):
+                add('database', 'WARNING', f"Database connections at {percent}% of max_connections",
+                    'Reduce worker counts or raise max_connections')
+
+        for process in snapshot.get('processes') or []:
+            where = f"{process['role']} process {process['hostname']}:{process['pid']}"
+            for pool in process.get('db_pools') or []:
+                if pool['waiters']:
+                    add('database', 'WARNING', f"{pool['waiters']} threads waiting for a database connection in {where} (pool of {pool['max_size']})",
+                        'Raise DB_POOL_MAX_SIZE or lower the threads per worker')
+                if pool['checkout_avg_ms'] >= metrics_setting('DB_POOL_WAIT_WARNING_MS'):
+                    add('database', 'WARNING', f"Database connection checkout averages {pool['checkout_avg_ms']:.0f} ms in {where}",
+                        'Raise DB_POOL_MAX_SIZE or look for long transactions holding connections')
+
+        redis_probe = snapshot.get('redis')
+        if redis_probe is None:
+            add('redis', 'CRITICAL', 'Redis is not reachable', 'Check the Redis container')
+        elif redis_probe['ping_ms'] >= metrics_setting('REDIS_LATENCY_WARNING_MS'):
+            add('redis', 'WARNING', f"Redis round trip is {redis_probe['ping_ms']} ms", 'Check Redis load and network latency')
+
+        p95 = (snapshot.get('http') or {}).get('p95_ms')
+        if p95 is not None and p95 >= metrics_setting('REQUEST_P95_WARNING_MS'):
+            add('requests', 'WARNING', f'Request latency p95 is {p95:.0f} ms', 'Review the slowest endpoints in the performance metrics')
+
+        slow = (snapshot.get('queries') or {}).get('slow', 0)
+        if slow:
+            add('database', 'WARNING', f'{slow} slow database queries in the last hour', 'Review slow query log entries')
+
+        if snapshot.get('queues') is None:
+            add('queues', 'CRITICAL', 'Celery broker is not reachable', 'Check the broker (Redis) container')
+        for queue, depth in (snapshot.get('queues') or {}).items():
+            if depth >= metrics_setting('QUEUE_DEPTH_CRITICAL'):
+                add('queues', 'CRITICAL', f"Celery queue '{queue}' has {depth} waiting tasks", 'Add workers or investigate stuck tasks')
+            elif depth >= metrics_setting('QUEUE_DEPTH_WARNING'):
+                add('queues', 'WARNING', f"Celery queue '{queue}' has {depth} waiting tasks", 'Check worker throughput for this queue')
+
+        return issues
+
+
+# ============================================================================
+# Prometheus exposition
+# ============================================================================
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _labels(**labels):
+    if not labels:
+        return ''
+    escaped = (
+        f'{key}="' + str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') + '"'
+        for key, value in labels.items()
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _number(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Exposition:
+    def __init__(self):
+        self.lines = []
+
+    def family(self, name, kind, help_text):
+        self.lines.append(f'# HELP {name} {help_text}')
+        self.lines.append(f'# TYPE {name} {kind}')
+
+    def sample(self, name, value, **labels):
+        if value is not None:
+            self.lines.append(f'{name}{_labels(**labels)} {_number(value)}')
+
+    def text(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+def render_prometheus(snapshot):
+    """Format a ``collect()`` snapshot in the Prometheus text exposition format."""
+    out = _Exposition()
+
+    processes = snapshot.get('processes') or []
+    out.family('edms_process_resident_memory_bytes', 'gauge', 'Resident memory of each web and Celery worker process.')
+    for p in processes:
+        out.sample('edms_process_resident_memory_bytes', p['rss_bytes'], role=p['role'], instance=p['hostname'], pid=p['pid'])
+    out.family('edms_process_cpu_seconds_total', 'counter', 'User and system CPU time of each process.')
+    for p in processes:
+        out.sample('edms_process_cpu_seconds_total', p['cpu_seconds'], role=p['role'], instance=p['hostname'], pid=p['pid'])
+
+    counters = snapshot.get('counters') or {}
+    requests, sums, buckets = {}, {}, defaultdict(dict)
+    for field, value in counters.items():
+        parts = field.split('|')
+        if parts[0] == 'http_requests':
+            requests[tuple(parts[1:4])] = value
+        elif parts[0] == 'http_duration_sum':
+            sums[tuple(parts[1:4])] = value
+        elif parts[0] == 'http_duration_bucket':
+            buckets[tuple(parts[1:4])][parts[4]] = value
+
+    out.family('edms_http_request_duration_seconds', 'histogram', 'Request latency by endpoint.')
+    for key in sorted(requests):
+        method, route, status = key
+        cumulative = 0
+        for bound in [str(b) for b in LATENCY_BUCKETS] + ['+Inf']:
+            cumulative += buckets[key].get(bound, 0)
+            out.sample('edms_http_request_duration_seconds_bucket', cumulative,
+                       method=method, route=route, status=status, le=bound)
+        out.sample('edms_http_request_duration_seconds_sum', round(sums.get(key, 0.0), 6),
+                   method=method, route=route, status=status)
+        out.sample('edms_http_request_duration_seconds_count', requests[key],
+                   method=method, route=route, status=status)
+
+    out.family('edms_db_queries_total', 'counter', 'Database queries executed while serving requests.')
+    out.sample('edms_db_queries_total', counters.get('db_queries', 0.0))
+    out.family('edms_db_query_duration_seconds_total', 'counter', 'Time spent in database queries while serving requests.')
+    out.sample('edms_db_query_duration_seconds_total', round(counters.get('db_query_seconds', 0.0), 6))
+    out.family('edms_db_slow_queries_total', 'counter', 'Queries slower than PERFORMANCE_METRICS SLOW_QUERY_MS.')
+    out.sample('edms_db_slow_queries_total', counters.get('db_slow_queries', 0.0))
+
+    database = snapshot.get('database') or {}
+    out.family('edms_db_up', 'gauge', 'Whether the database answered the probe query.')
+    out.sample('edms_db_up', 1 if database else 0)
+    if database:
+        out.family('edms_db_ping_seconds', 'gauge', 'Database round trip time.')
+        out.sample('edms_db_ping_seconds', database['ping_ms'] / 1000)
+    if database.get('connections') is not None:
+        out.family('edms_db_connections', 'gauge', 'Database connections by state.')
+        for state, count in sorted(database['connections'].items()):
+            out.sample('edms_db_connections', count, state=state)
+        out.family('edms_db_max_connections', 'gauge', 'Configured max_connections.')
+        out.sample('edms_db_max_connections', database['max_connections'])
+        out.family('edms_db_size_bytes', 'gauge', 'Size of the application database.')
+        out.sample('edms_db_size_bytes', database['size_bytes'])
+
+    pools = [(p, pool) for p in processes for pool in p.get('db_pools') or []]
+    for metric, key, kind, help_text in (
+        ('edms_db_pool_size', 'size', 'gauge', 'Connections held by the connection pool of each process.'),
+        ('edms_db_pool_in_use', 'in_use', 'gauge', 'Pooled connections checked out.'),
+        ('edms_db_pool_waiters', 'waiters', 'gauge', 'Threads waiting for a pooled connection.'),
+        ('edms_db_pool_max_size', 'max_size', 'gauge', 'Configured connection pool size.'),
+        ('edms_db_pool_checkouts_total', 'checkouts', 'counter', 'Connections checked out of the pool.'),
+        ('edms_db_pool_checkout_seconds_total', 'checkout_seconds', 'counter', 'Time spent checking out pooled connections.'),
+        ('edms_db_pool_timeouts_total', 'timeouts', 'counter', 'Checkouts that found no connection within the pool timeout.'),
+        ('edms_db_pool_health_check_failures_total', 'health_check_failures', 'counter', 'Pooled connections replaced after failing the checkout health check.'),
+    ):
+        if pools:
+            out.family(metric, kind, help_text)
+        for p, pool in pools:
+            out.sample(metric, pool[key], role=p['role'], instance=p['hostname'], pid=p['pid'], database=pool['alias'])
+
+    redis_probe = snapshot.get('redis') or {}
+    out.family('edms_redis_up', 'gauge', 'Whether Redis answered the probe.')
+    out.sample('edms_redis_up', 1 if redis_probe else 0)
+    if redis_probe:
+        out.family('edms_redis_ping_seconds', 'gauge', 'Redis round trip time.')
+        out.sample('edms_redis_ping_seconds', redis_probe['ping_ms'] / 1000)
+        if redis_probe.get('used_memory_bytes') is not None:
+            out.family('edms_redis_used_memory_bytes', 'gauge', 'Memory used by Redis.')
+            out.sample('edms_redis_used_memory_bytes', redis_probe['used_memory_bytes'])
+
+    storage = snapshot.get('storage') or {}
+    for metric, key, help_text in (
+        ('edms_storage_size_bytes', 'total_bytes', 'Size of each storage volume.'),
+        ('edms_storage_used_bytes', 'used_bytes', 'Used space on each storage volume.'),
+        ('edms_storage_free_bytes', 'free_bytes', 'Free space on each storage volume.'),
+        ('edms_storage_growth_bytes_per_day', 'growth_bytes_per_day', 'Average daily growth of used space over the sampled period.'),
+    ):
+        out.family(metric, 'gauge', help_text)
+        for name, volume in sorted(storage.items()):
+            out.sample(metric, volume.get(key), volume=name)
+
+    queues = snapshot.get('queues') or {}
+    out.family('edms_celery_queue_depth', 'gauge', 'Tasks waiting in each Celery queue.')
+    for name, depth in sorted(queues.items()):
+        out.sample('edms_celery_queue_depth', depth, queue=name)
+
+    return out.text()
+
+
+@require_http_methods(["GET"])
+def prometheus_metrics_view(request):
+    """
+    Prometheus scrape endpoint.
+
+    Scrapers authenticate with ``Authorization: Bearer <METRICS_AUTH_TOKEN>``;
+    staff users with a session can open it in the browser.
+    """
+    token = metrics_setting('AUTH_TOKEN')
+    user = getattr(request, 'user', None)
+    authorized = (
+        (token and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}'))
+        or (user is not None and user.is_authenticated and user.is_staff)
+    )
+    if not authorized:
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+
+    return HttpResponse(render_prometheus(performance_metrics.collect()), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+# Singleton instance
+performance_metrics = PerformanceMetricsService()
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.16 on 2026-10-18 21:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduler', '0004_remove_documentschedule_created_by_and_more'),
+        ('django_celery_results', '0011_taskresult_periodic_task_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskExecutionSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_name', models.CharField(max_length=255)),
+                ('hour', models.DateTimeField()),
+                ('runs', models.PositiveIntegerField(default=0)),
+                ('success_count', models.PositiveIntegerField(default=0)),
+                ('failure_count', models.PositiveIntegerField(default=0)),
+                ('total_duration', models.FloatField(default=0, help_text='Sum of run durations in seconds')),
+                ('max_duration', models.FloatField(blank=True, help_text='Longest run in seconds', null=True)),
+                ('last_run_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['-hour'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='taskexecutionsummary',
+            constraint=models.UniqueConstraint(fields=('task_name', 'hour'), name='unique_task_summary_hour'),
+        ),
+        # Per-task history lookups for the scheduler dashboard: window statistics
+        # and "last run" read (task_name, date_done) ranges without touching the heap
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS celery_taskresult_name_done_idx "
+            "ON django_celery_results_taskresult (task_name, date_done DESC) "
+            "INCLUDE (status, date_created);",
+            reverse_sql="DROP INDEX IF EXISTS celery_taskresult_name_done_idx;"
+        ),
+    ]
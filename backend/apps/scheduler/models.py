@@ -16,3 +16,30 @@ class ScheduledTask(models.Model):
         
     class Meta:
         ordering = ['-scheduled_time']
+
+
+class TaskExecutionSummary(models.Model):
+    """
+    Hourly rollup of Celery task results per task.
+
+    Keeps execution history available after old results are cleaned up and
+    lets the scheduler dashboard answer long-range questions without
+    scanning the results table.
+    """
+    task_name = models.CharField(max_length=255)
+    hour = models.DateTimeField()
+    runs = models.PositiveIntegerField(default=0)
+    success_count = models.PositiveIntegerField(default=0)
+    failure_count = models.PositiveIntegerField(default=0)
+    total_duration = models.FloatField(default=0, help_text='Sum of run durations in seconds')
+    max_duration = models.FloatField(null=True, blank=True, help_text='Longest run in seconds')
+    last_run_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.task_name} @ {self.hour:%Y-%m-%d %H:00}"
+
+    class Meta:
+        ordering = ['-hour']
+        constraints = [
+            models.UniqueConstraint(fields=['task_name', 'hour'], name='unique_task_summary_hour'),
+        ]
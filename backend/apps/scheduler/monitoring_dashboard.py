@@ -12,7 +12,6 @@ from django.contrib.auth.decorators import login_required
 from django.utils import timezone
 from django.db import transaction
 from django.shortcuts import render
-from celery import current_app
 from celery.events.state import State
 import json
 import logging
@@ -27,6 +26,8 @@ from .tasks import (
     send_daily_health_report,
     send_test_email_to_self
 )
+from .worker_state import worker_state
+from .metrics import performance_metrics
 from ..audit.integrity_tasks import (
     run_daily_integrity_check,
     verify_audit_trail_checksums
@@ -165,7 +166,7 @@ class SchedulerMonitoringService:
                 'health_metrics': health_metrics,
                 'recent_executions': recent_executions,
                 'available_tasks': self._format_available_tasks(),
-                'alerts': self._generate_alerts(celery_status, task_stats)
+                'alerts': self._generate_alerts(celery_status, task_stats, health_metrics)
             }
             
         except Exception as e:
@@ -308,22 +309,13 @@ class SchedulerMonitoringService:
     def _check_celery_workers(self):
         """Check status of Celery workers and beat scheduler."""
         try:
-            inspect = current_app.control.inspect()
+            # Read the event-driven worker state instead of broadcasting inspect()
+            snapshot = worker_state.snapshot()
+            workers = worker_state.alive_workers(snapshot)
+            all_registered_tasks = worker_state.registered_tasks(snapshot)
             
-            # Check active workers
-            active_workers = inspect.active() or {}
-            
-            # Check scheduled tasks from beat
-            scheduled_tasks = inspect.scheduled() or {}
-            
-            # Check worker statistics
-            stats = inspect.stats() or {}
-            
-            # CRITICAL: Check registered tasks in workers
-            registered_tasks_by_worker = inspect.registered() or {}
-            
-            worker_count = len(active_workers)
-            beat_status = 'RUNNING' if scheduled_tasks else 'UNKNOWN'
+            worker_count = len(workers)
+            beat_status = worker_state.beat_status(snapshot)
             
             # Define critical tasks that MUST be registered
             critical_tasks = [
@@ -334,10 +326,6 @@ class SchedulerMonitoringService:
             ]
             
             # Check if critical tasks are registered
-            all_registered_tasks = []
-            for worker_tasks in registered_tasks_by_worker.values():
-                all_registered_tasks.extend(worker_tasks)
-            
             missing_tasks = [task for task in critical_tasks if task not in all_registered_tasks]
             tasks_registered = len(missing_tasks) == 0
             
@@ -345,12 +333,22 @@ class SchedulerMonitoringService:
                 'worker_count': worker_count,
                 'workers_active': worker_count > 0,
                 'beat_status': beat_status,
-                'active_workers': list(active_workers.keys()),
-                'scheduled_task_count': sum(len(tasks) for tasks in scheduled_tasks.values()),
-                'worker_stats': stats,
+                'active_workers': sorted(workers),
+                'scheduled_task_count': snapshot['reserved_eta_tasks'],
+                'active_task_count': snapshot['active_tasks'],
+                'worker_stats': {
+                    hostname: {
+                        'active': worker['active'],
+                        'processed': worker['processed'],
+                        'loadavg': worker['loadavg'],
+                        'pool_size': worker['pool_size'],
+                    }
+                    for hostname, worker in workers.items()
+                },
+                'state_source': snapshot['source'],
                 'tasks_registered': tasks_registered,
                 'missing_critical_tasks': missing_tasks,
-                'total_registered_tasks': len(set(all_registered_tasks)),
+                'total_registered_tasks': len(all_registered_tasks),
                 'registered_scheduler_tasks': len([t for t in all_registered_tasks if 'scheduler' in t])
             }
             
@@ -427,6 +425,7 @@ class SchedulerMonitoringService:
                     action__in=['DOCUMENT_EFFECTIVE_DATE_PROCESSED', 'DOCUMENT_OBSOLETED']
                 ).count()
             }
+            metrics.update(self._get_performance_metrics())
             
             return metrics
             
@@ -434,6 +433,34 @@ class SchedulerMonitoringService:
             logger.error(f"Failed to get health metrics: {str(e)}")
             return {'database_responsive': False, 'error': str(e)}
     
+    def _get_performance_metrics(self):
+        """Runtime capacity metrics (latency, storage, queues) and their threshold violations."""
+        try:
+            snapshot = performance_metrics.collect()
+        except Exception as e:
+            logger.error(f"Failed to collect performance metrics: {str(e)}")
+            return {'performance': None, 'capacity_issues': []}
+        
+        database = snapshot.get('database') or {}
+        storage = snapshot.get('storage') or {}
+        return {
+            'database_latency_ms': database.get('ping_ms'),
+            'performance': {
+                'request_latency_p95_ms': snapshot['http']['p95_ms'],
+                'slow_queries': snapshot['queries']['slow'],
+                'db_connections_percent': database.get('connections_percent'),
+                'redis_latency_ms': (snapshot.get('redis') or {}).get('ping_ms'),
+                'storage_used_percent': {name: v['used_percent'] for name, v in storage.items()},
+                'storage_days_until_full': {name: v['days_until_full'] for name, v in storage.items()},
+                'queue_depth': snapshot.get('queues'),
+                'max_process_memory_percent': max(
+                    (p['memory_percent'] for p in snapshot['processes'] if p.get('memory_percent') is not None),
+                    default=None
+                ),
+            },
+            'capacity_issues': performance_metrics.capacity_issues(snapshot),
+        }
+    
     def _get_recent_executions(self, limit=10):
         """Get recent task executions from audit trail."""
         try:
@@ -523,32 +550,46 @@ class SchedulerMonitoringService:
             'recommendation': 'Scheduler running normally' if beat_status == 'RUNNING' else 'Start Celery Beat to enable scheduled tasks'
         }
         
-        # Database responsiveness (20 points)
+        # Database responsiveness (15 points)
         db_responsive = health_metrics.get('database_responsive', False)
-        db_score = 20 if db_responsive else 0
-        score += db_score
+        db_latency = health_metrics.get('database_latency_ms')
+        db_issues = [i for i in health_metrics.get('capacity_issues', []) if i['component'] == 'database']
         total_docs = health_metrics.get('total_documents', 0)
+        if not db_responsive:
+            db_score = 0
+            db_status = 'unhealthy'
+            db_recommendation = 'Check database connectivity and restart if needed'
+        elif db_issues:
+            db_score = 8
+            db_status = 'warning'
+            db_recommendation = db_issues[0]['action']
+        else:
+            db_score = 15
+            db_status = 'healthy'
+            db_recommendation = 'Database operating normally'
+        score += db_score
+        latency_details = f', {db_latency} ms round trip' if db_latency is not None else ''
         breakdown['components']['database'] = {
             'score': db_score,
-            'max_score': 20,
-            'status': 'healthy' if db_responsive else 'unhealthy',
-            'details': f'Database responsive, {total_docs} documents stored',
-            'recommendation': 'Database operating normally' if db_responsive else 'Check database connectivity and restart if needed'
+            'max_score': 15,
+            'status': db_status,
+            'details': f'Database responsive{latency_details}, {total_docs} documents stored' if db_responsive else 'Database not responding',
+            'recommendation': db_recommendation
         }
         
-        # Recent errors (20 points - deduct for errors)
+        # Recent errors (15 points - deduct for errors)
         recent_errors = health_metrics.get('scheduler_errors_24h', 0)
         successful_automations = health_metrics.get('successful_automations_24h', 0)
         if recent_errors == 0:
-            error_score = 20
+            error_score = 15
             error_status = 'excellent'
             error_recommendation = 'No recent errors - system operating perfectly'
         elif recent_errors <= 5:
-            error_score = 15
+            error_score = 11
             error_status = 'good'
             error_recommendation = f'{recent_errors} minor errors in 24h - within acceptable range for development'
         elif recent_errors <= 10:
-            error_score = 10
+            error_score = 7
             error_status = 'warning'
             error_recommendation = f'{recent_errors} errors in 24h - investigate recurring issues'
         else:
@@ -559,7 +600,7 @@ class SchedulerMonitoringService:
         score += error_score
         breakdown['components']['recent_errors'] = {
             'score': error_score,
-            'max_score': 20,
+            'max_score': 15,
             'status': error_status,
             'details': f'{recent_errors} errors, {successful_automations} successful automations in last 24h',
             'recommendation': error_recommendation
@@ -590,6 +631,35 @@ class SchedulerMonitoringService:
             'recommendation': workflow_recommendation
         }
         
+        # Capacity (10 points) - storage, memory, request latency, Redis, queue backlog
+        capacity_issues = [i for i in health_metrics.get('capacity_issues', []) if i['component'] != 'database']
+        critical_capacity = [i for i in capacity_issues if i['level'] == 'CRITICAL']
+        if health_metrics.get('performance') is None:
+            capacity_score = 5
+            capacity_status = 'unknown'
+            capacity_recommendation = 'Performance metrics unavailable - check metrics collection'
+        elif critical_capacity:
+            capacity_score = 0
+            capacity_status = 'critical'
+            capacity_recommendation = critical_capacity[0]['action']
+        elif capacity_issues:
+            capacity_score = 5
+            capacity_status = 'warning'
+            capacity_recommendation = capacity_issues[0]['action']
+        else:
+            capacity_score = 10
+            capacity_status = 'healthy'
+            capacity_recommendation = 'Resources within capacity thresholds'
+        
+        score += capacity_score
+        breakdown['components']['capacity'] = {
+            'score': capacity_score,
+            'max_score': 10,
+            'status': capacity_status,
+            'details': '; '.join(i['message'] for i in capacity_issues) or 'No capacity issues',
+            'recommendation': capacity_recommendation
+        }
+        
         breakdown['total_score'] = min(100, score)
         breakdown['score_interpretation'] = self._get_score_interpretation(breakdown['total_score'])
         
@@ -665,7 +735,7 @@ class SchedulerMonitoringService:
             } for name, info in self.available_tasks.items()
         }
     
-    def _generate_alerts(self, celery_status, task_stats):
+    def _generate_alerts(self, celery_status, task_stats, health_metrics=None):
         """Generate alerts based on current system status."""
         alerts = []
         
@@ -741,6 +811,14 @@ class SchedulerMonitoringService:
                 'action': 'Enable backup configurations to ensure data protection'
             })
         
+        # Capacity alerts from runtime performance metrics
+        for issue in (health_metrics or {}).get('capacity_issues', []):
+            alerts.append({
+                'level': issue['level'],
+                'message': issue['message'],
+                'action': issue['action']
+            })
+        
         return alerts
 
 
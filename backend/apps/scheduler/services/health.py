@@ -14,6 +14,7 @@ from ...documents.models import Document
 from ...workflows.models import DocumentWorkflow
 from ...audit.models import AuditTrail
 from ...users.models import User
+from ..metrics import performance_metrics, pool_summary
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -48,8 +49,12 @@ class SystemHealthService:
                 'errors': []
             }
             
+            # Runtime metrics shared by the database, storage and performance checks
+            metrics = performance_metrics.collect()
+            issues = performance_metrics.capacity_issues(metrics)
+            
             # Database connectivity check
-            health_results['checks']['database'] = self._check_database()
+            health_results['checks']['database'] = self._check_database(metrics, issues)
             
             # Workflow system check
             health_results['checks']['workflows'] = self._check_workflow_system()
@@ -58,14 +63,17 @@ class SystemHealthService:
             health_results['checks']['audit_system'] = self._check_audit_system()
             
             # Document storage check
-            health_results['checks']['document_storage'] = self._check_document_storage()
+            health_results['checks']['document_storage'] = self._check_document_storage(metrics, issues)
             
             # Memory and performance check
-            health_results['checks']['performance'] = self._check_performance()
+            health_results['checks']['performance'] = self._check_performance(metrics, issues)
             
             # Email notification system check
             health_results['checks']['email_system'] = self._check_email_system()
             
+            for name, result in health_results['checks'].items():
+                health_results['warnings'].extend(f"{name}: {warning}" for warning in result.get('warnings', []))
+            
             # Determine overall status
             failed_checks = [name for name, result in health_results['checks'].items() if not result['healthy']]
             
@@ -97,20 +105,36 @@ class SystemHealthService:
                 'error': str(e)
             }
     
-    def _check_database(self) -> Dict[str, Any]:
-        """Check database connectivity and basic operations."""
+    def _check_database(self, metrics=None, issues=None) -> Dict[str, Any]:
+        """Check database connectivity, latency, connection and pool usage and query times."""
         try:
+            metrics, issues = self._metrics(metrics, issues)
+            database = metrics.get('database')
+            if database is None:
+                return {
+                    'healthy': False,
+                    'error': metrics['errors'].get('database', 'Database probe failed')
+                }
+            
             # Test basic database operations
             user_count = User.objects.count()
             document_count = Document.objects.count()
             workflow_count = DocumentWorkflow.objects.count()
             
             return {
-                'healthy': True,
+                **self._issue_status(issues, 'database'),
                 'users': user_count,
                 'documents': document_count,
                 'workflows': workflow_count,
-                'response_time_ms': 10  # Placeholder
+                'response_time_ms': database['ping_ms'],
+                'connections': database.get('connections_total'),
+                'max_connections': database.get('max_connections'),
+                'connections_percent': database.get('connections_percent'),
+                'connection_pool': pool_summary(metrics['processes']),
+                'size_bytes': database.get('size_bytes'),
+                'queries_last_hour': metrics['queries']['total'],
+                'query_time_seconds': metrics['queries']['seconds'],
+                'slow_queries': metrics['queries']['slow'],
             }
         except Exception as e:
             return {
@@ -152,15 +176,24 @@ class SystemHealthService:
                 'error': str(e)
             }
     
-    def _check_document_storage(self) -> Dict[str, Any]:
-        """Check document storage system."""
+    def _check_document_storage(self, metrics=None, issues=None) -> Dict[str, Any]:
+        """Check document storage volumes: usage and growth."""
         try:
-            total_documents = Document.objects.count()
+            metrics, issues = self._metrics(metrics, issues)
+            volumes = metrics.get('storage')
+            if not volumes:
+                return {
+                    'healthy': False,
+                    'storage_accessible': False,
+                    'error': metrics['errors'].get('storage', 'No storage volume found')
+                }
             
             return {
-                'healthy': True,
-                'total_documents': total_documents,
-                'storage_accessible': True
+                **self._issue_status(issues, 'storage'),
+                'total_documents': Document.objects.count(),
+                'storage_accessible': True,
+                'volumes': volumes,
+                'disk_usage': max(volume['used_percent'] for volume in volumes.values()),
             }
         except Exception as e:
             return {
@@ -168,14 +201,24 @@ class SystemHealthService:
                 'error': str(e)
             }
     
-    def _check_performance(self) -> Dict[str, Any]:
-        """Check system performance metrics."""
+    def _check_performance(self, metrics=None, issues=None) -> Dict[str, Any]:
+        """Check process memory/CPU, request latency, Redis and Celery queue depth."""
         try:
+            metrics, issues = self._metrics(metrics, issues)
+            processes = metrics['processes']
+            memory = [p['memory_percent'] for p in processes if p.get('memory_percent') is not None]
+            cpu = [p['cpu_percent'] for p in processes if p.get('cpu_percent') is not None]
+            
             return {
-                'healthy': True,
-                'cpu_usage': 25.0,  # Placeholder
-                'memory_usage': 60.0,  # Placeholder
-                'disk_usage': 45.0   # Placeholder
+                **self._issue_status(issues, 'memory', 'requests', 'redis', 'queues'),
+                'cpu_usage': max(cpu) if cpu else None,
+                'memory_usage': max(memory) if memory else None,
+                'processes': processes,
+                'request_latency_p95_ms': metrics['http']['p95_ms'],
+                'requests_last_hour': metrics['http']['requests'],
+                'slowest_endpoints': metrics['http']['slowest_endpoints'][:5],
+                'redis_response_time_ms': (metrics.get('redis') or {}).get('ping_ms'),
+                'queue_depth': metrics.get('queues'),
             }
         except Exception as e:
             return {
@@ -183,6 +226,24 @@ class SystemHealthService:
                 'error': str(e)
             }
     
+    @staticmethod
+    def _metrics(metrics, issues):
+        """Runtime metrics for checks called on their own."""
+        if metrics is None:
+            metrics = performance_metrics.collect()
+        if issues is None:
+            issues = performance_metrics.capacity_issues(metrics)
+        return metrics, issues
+    
+    @staticmethod
+    def _issue_status(issues, *components):
+        """Health flag and warnings for the capacity issues of some components."""
+        relevant = [issue for issue in issues if issue['component'] in components]
+        return {
+            'healthy': not any(issue['level'] == 'CRITICAL' for issue in relevant),
+            'warnings': [issue['message'] for issue in relevant],
+        }
+    
     def _check_email_system(self) -> Dict[str, Any]:
         """Check email notification system health."""
         try:
@@ -280,15 +341,12 @@ class SystemHealthService:
             
             # 5. Check Celery worker status (for async email sending)
             try:
-                from celery import current_app
-                inspect = current_app.control.inspect()
-                registered = inspect.registered()
+                from apps.scheduler.worker_state import worker_state
+                snapshot = worker_state.snapshot()
                 
-                if registered:
+                if worker_state.alive_workers(snapshot):
                     # Check if email tasks are registered
-                    all_tasks = []
-                    for worker_tasks in registered.values():
-                        all_tasks.extend(worker_tasks)
+                    all_tasks = worker_state.registered_tasks(snapshot)
                     
                     email_task_registered = any('email' in task.lower() for task in all_tasks)
                     email_health['celery_worker_active'] = True
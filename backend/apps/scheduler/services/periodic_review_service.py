@@ -3,34 +3,72 @@ Periodic Review Service
 
 Handles the business logic for document periodic reviews:
 - Monitoring review due dates
-- Creating review notifications
+- Creating review workflows in bulk
+- Sending stakeholder review digests
 - Processing review completions
+
+The daily kickoff finds the due documents without an active review in one
+anti-join and starts their workflows in batches. A document holds a single
+workflow row, so a finished row (terminated, or in a final state such as the
+EFFECTIVE one its approval leaves) is restarted as the periodic review with
+``bulk_update``; documents without one get a row from ``bulk_create``.
+Documents whose workflow is still in progress (an active review, a pending
+obsolescence) are left alone. Each
+stakeholder then gets one digest listing all of their newly due documents,
+sent by a Celery task after the batches commit, so a slow mail server no
+longer holds up the kickoff.
 """
 
+import logging
+from collections import defaultdict
 from datetime import date, timedelta
-from typing import Dict, List, Any
+from typing import Dict, Iterable, List, Any
+from django.conf import settings
 from django.db import transaction
+from django.db.models import Exists, OuterRef
 from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from apps.api.change_feed import change_feed
+from apps.api.dashboard_store import dashboard_store
+from apps.documents.metadata_cache import metadata_cache
 from apps.documents.models import Document
 from apps.workflows.models import DocumentWorkflow, DocumentState
 from apps.workflows.models_review import DocumentReview
+from apps.workflows.task_inbox import task_inbox
 
+logger = logging.getLogger(__name__)
 User = get_user_model()
 
+# Days stakeholders have to complete a periodic review
+REVIEW_DUE_DAYS = 30
+
+# Workflows started per kickoff transaction
+DEFAULT_KICKOFF_BATCH_SIZE = 500
+
+# Columns reset when a finished workflow row is restarted as a periodic review
+RESTARTED_FIELDS = [
+    'workflow_type', 'current_state', 'initiated_by', 'current_assignee', 'due_date',
+    'is_terminated', 'termination_reason', 'workflow_data', 'updated_at',
+]
+
 
 class PeriodicReviewService:
     """Service for managing periodic document reviews."""
-    
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'PERIODIC_REVIEW_BATCH_SIZE', DEFAULT_KICKOFF_BATCH_SIZE)
+
     def process_periodic_reviews(self) -> Dict[str, Any]:
         """
-        Check for documents that need periodic review.
+        Start periodic reviews for every due document.
         
-        This runs daily via Celery Beat scheduler.
+        This runs daily via Celery Beat.
         
         Returns:
-            dict: Processing results with counts and errors
+            dict: Processing results with counts and errors; notifications_created
+            is the number of stakeholder digests queued
         """
         today = date.today()
         
@@ -39,7 +77,18 @@ class PeriodicReviewService:
             status='EFFECTIVE',
             next_review_date__lte=today,
             is_active=True
-        ).select_related('author', 'reviewer', 'approver')
+        )
+        # Includes active periodic reviews
+        in_progress = DocumentWorkflow.objects.filter(
+            document=OuterRef('pk'),
+            is_terminated=False,
+            current_state__is_final=False
+        )
+        pending = list(
+            documents_due.filter(~Exists(in_progress))
+            .select_related('author', 'reviewer', 'approver', 'workflow__current_state')
+            .order_by('next_review_date', 'document_number')
+        )
         
         results = {
             'total_checked': documents_due.count(),
@@ -49,51 +98,33 @@ class PeriodicReviewService:
             'processed_documents': []
         }
         
-        for document in documents_due:
+        review_state = self._review_state()
+        digests = defaultdict(list)
+        for offset in range(0, len(pending), self.batch_size):
+            batch = pending[offset:offset + self.batch_size]
             try:
-                # Check if already has active periodic review workflow
-                active_review = DocumentWorkflow.objects.filter(
-                    document=document,
-                    workflow_type='PERIODIC_REVIEW',
-                    is_terminated=False
-                ).exists()
-                
-                if active_review:
-                    # Skip if already under review
-                    continue
-                
-                # Create periodic review workflow
-                workflow = self._create_periodic_review_workflow(document)
-                
-                # Create notifications for stakeholders
-                notification_count = self._create_review_notifications(workflow, document)
-                
-                results['workflows_created'] += 1
-                results['notifications_created'] += notification_count
+                self._create_periodic_review_workflows(batch, review_state)
+            except Exception as e:
+                logger.error(f"Periodic review kickoff failed for {len(batch)} documents: {e}")
+                results['errors'].extend(
+                    {'document_number': document.document_number, 'error': str(e)} for document in batch
+                )
+                continue
+            
+            for document in batch:
+                for user in self._stakeholders(document):
+                    digests[user.pk].append(document.pk)
                 results['processed_documents'].append({
                     'document_number': document.document_number,
                     'title': document.title,
                     'due_date': document.next_review_date.isoformat()
                 })
-                
-            except Exception as e:
-                results['errors'].append({
-                    'document_number': document.document_number,
-                    'error': str(e)
-                })
+            results['workflows_created'] += len(batch)
         
+        results['notifications_created'] = self._queue_review_digests(digests)
         return results
     
-    def _create_periodic_review_workflow(self, document: Document) -> DocumentWorkflow:
-        """
-        Create a periodic review workflow for a document.
-        
-        Args:
-            document: Document to review
-            
-        Returns:
-            DocumentWorkflow: Created workflow instance
-        """
+    def _review_state(self) -> DocumentState:
         # Get PERIODIC_REVIEW state (will be created by migration/setup)
         review_state, _ = DocumentState.objects.get_or_create(
             code='UNDER_PERIODIC_REVIEW',
@@ -104,80 +135,194 @@ class PeriodicReviewService:
                 'is_final': False
             }
         )
+        return review_state
+    
+    def _build_workflow(
+        self, document: Document, review_state: DocumentState, workflow: DocumentWorkflow = None
+    ) -> DocumentWorkflow:
+        """A new periodic review workflow, or the document's finished ``workflow`` restarted as one."""
+        workflow_data = {
+            'review_type': 'periodic',
+            'original_next_review_date': document.next_review_date.isoformat() if document.next_review_date else None,
+            'review_period_months': document.review_period_months
+        }
+        if workflow is None:
+            workflow = DocumentWorkflow(document=document)
+        else:
+            workflow_data['previous_workflow_type'] = workflow.workflow_type
+            workflow.updated_at = timezone.now()
+        workflow.workflow_type = 'PERIODIC_REVIEW'
+        workflow.current_state = review_state
+        workflow.initiated_by = document.author  # System initiated, but attribute to author
+        workflow.current_assignee = document.author  # Assign to document owner first
+        workflow.due_date = timezone.now() + timedelta(days=REVIEW_DUE_DAYS)
+        workflow.is_terminated = False
+        workflow.termination_reason = ''
+        workflow.workflow_data = workflow_data
+        return workflow
+    
+    def _create_periodic_review_workflow(self, document: Document) -> DocumentWorkflow:
+        """
+        Create a periodic review workflow for a document.
         
-        # Create workflow
-        workflow = DocumentWorkflow.objects.create(
-            document=document,
-            workflow_type='PERIODIC_REVIEW',
-            current_state=review_state,
-            initiated_by=document.author,  # System initiated, but attribute to author
-            current_assignee=document.author,  # Assign to document owner first
-            due_date=date.today() + timedelta(days=30),  # 30 days to complete review
-            workflow_data={
-                'review_type': 'periodic',
-                'original_next_review_date': document.next_review_date.isoformat() if document.next_review_date else None,
-                'review_period_months': document.review_period_months
-            }
-        )
+        The document's finished workflow, if any, is restarted as the review.
         
+        Args:
+            document: Document to review
+            
+        Returns:
+            DocumentWorkflow: Created or restarted workflow instance
+            
+        Raises:
+            ValueError: If the document's workflow is still in progress
+        """
+        finished = DocumentWorkflow.objects.select_related('current_state').filter(document=document).first()
+        if finished is not None and not self._is_finished(finished):
+            raise ValueError(
+                f"Document {document.document_number} has a {finished.workflow_type} workflow in progress"
+            )
+        workflow = self._build_workflow(document, self._review_state(), finished)
+        workflow.save()
         return workflow
     
+    def _create_periodic_review_workflows(
+        self, documents: List[Document], review_state: DocumentState
+    ) -> List[DocumentWorkflow]:
+        """
+        Start periodic review workflows for a batch of documents in one transaction.
+        
+        Documents with a finished workflow (``select_related('workflow')``)
+        get that row restarted with ``bulk_update``; the others get new rows
+        from ``bulk_create``. Both skip the DocumentWorkflow post_save
+        receivers, so their effects (inbox tasks, dashboard counter, change
+        feed, metadata cache) are applied here for the whole batch.
+        
+        Raises:
+            ValueError: If a document's workflow is still in progress
+        """
+        created, restarted = [], []
+        reactivated = 0
+        for document in documents:
+            finished = getattr(document, 'workflow', None)
+            if finished is None:
+                created.append(self._build_workflow(document, review_state))
+            elif not self._is_finished(finished):
+                raise ValueError(
+                    f"Document {document.document_number} has a {finished.workflow_type} workflow in progress"
+                )
+            else:
+                reactivated += finished.is_terminated  # Terminated rows are not counted as active
+                restarted.append(self._build_workflow(document, review_state, finished))
+        
+        with transaction.atomic():
+            DocumentWorkflow.objects.bulk_create(created)
+            task_inbox.add_new_workflows(created)
+            if restarted:
+                DocumentWorkflow.objects.bulk_update(restarted, RESTARTED_FIELDS)
+                task_inbox.restart_workflows(restarted)
+            dashboard_store.adjust(active_workflows=len(created) + reactivated)
+            change_feed.touch('dashboard')
+            change_feed.touch('tasks', [user.pk for document in documents for user in self._stakeholders(document)])
+            for document in documents:
+                metadata_cache.invalidate(document.document_number)
+        return created + restarted
+    
+    @staticmethod
+    def _is_finished(workflow: DocumentWorkflow) -> bool:
+        return workflow.is_terminated or workflow.current_state.is_final
+    
+    @staticmethod
+    def _stakeholders(document: Document) -> List[User]:
+        stakeholders = {}
+        for user in (document.author, document.reviewer, document.approver):
+            if user is not None:
+                stakeholders.setdefault(user.pk, user)
+        return list(stakeholders.values())
+    
     def _create_review_notifications(self, workflow: DocumentWorkflow, document: Document) -> int:
         """
-        Create notifications for document stakeholders about periodic review.
+        Queue review digests for the stakeholders of one document.
         
         Args:
             workflow: Created workflow instance
             document: Document being reviewed
             
         Returns:
-            int: Number of notifications created
+            int: Number of notifications queued
+        """
+        stakeholders = self._stakeholders(document)
+        for user in stakeholders:
+            logger.info(
+                f"Periodic review notification: {document.document_number} - "
+                f"Assigned to {user.username} (workflow ID: {workflow.id})"
+            )
+        return self._queue_review_digests({user.pk: [document.pk] for user in stakeholders})
+    
+    def _queue_review_digests(self, digests: Dict[int, List[int]]) -> int:
+        """Send one digest task per stakeholder once the current transaction commits."""
+        from apps.scheduler.tasks import send_periodic_review_digest
+        
+        for user_id, document_ids in digests.items():
+            transaction.on_commit(
+                lambda user_id=user_id, document_ids=document_ids:
+                    send_periodic_review_digest.delay(user_id, document_ids),
+                robust=True
+            )
+        return len(digests)
+    
+    def send_review_digest(self, user_id: int, document_ids: Iterable[int]) -> Dict[str, Any]:
+        """
+        Email a stakeholder the documents due for periodic review.
+        
+        Args:
+            user_id: Stakeholder to notify
+            document_ids: Documents whose periodic review started
+            
+        Returns:
+            dict: Recipient, documents listed and whether the email was sent
         """
-        import logging
-        logger = logging.getLogger(__name__)
+        from django.core.mail import send_mail
         
-        # Collect stakeholders
-        stakeholders = set()
-        if document.author:
-            stakeholders.add(document.author)
-        if document.reviewer:
-            stakeholders.add(document.reviewer)
-        if document.approver:
-            stakeholders.add(document.approver)
+        user = User.objects.filter(pk=user_id, is_active=True).first()
+        if user is None or not user.email:
+            return {'user_id': user_id, 'documents': 0, 'sent': False}
         
-        # Log notification creation (actual email notifications can be added later)
-        notification_count = 0
-        for user in stakeholders:
-            try:
-                logger.info(
-                    f"Periodic review notification: {document.document_number} - "
-                    f"Assigned to {user.username} (workflow ID: {workflow.id})"
-                )
-                notification_count += 1
-                
-                # Send email notification
-                from django.core.mail import send_mail
-                from django.conf import settings
-                
-                try:
-                    subject = f"Periodic Review Due: {document.document_number}"
-                    message = f"""
+        documents = list(
+            Document.objects.filter(pk__in=document_ids).order_by('next_review_date', 'document_number')
+        )
+        if not documents:
+            return {'user_id': user_id, 'documents': 0, 'sent': False}
+        
+        if len(documents) == 1:
+            subject = f"Periodic Review Due: {documents[0].document_number}"
+        else:
+            subject = f"Periodic Review Due: {len(documents)} documents"
+        
+        lines = []
+        for document in documents:
+            last_review = document.last_review_date.strftime('%Y-%m-%d') if document.last_review_date else 'Never'
+            review_due = document.next_review_date.strftime('%Y-%m-%d') if document.next_review_date else 'Now'
+            lines.append(
+                f"- {document.document_number} - {document.title}\n"
+                f"  Version: v{document.version_major}.{document.version_minor:02d} | "
+                f"Review Period: {document.review_period_months} months | "
+                f"Last Review: {last_review} | Next Review Due: {review_due}"
+            )
+        document_list = "\n".join(lines)
+        
+        message = f"""
 Periodic Review Required
 
-Document: {document.document_number} - {document.title}
-Current Version: v{document.version_major}.{document.version_minor:02d}
-Status: {document.status}
+The following documents assigned to you are due for periodic review:
 
-Review Period: {document.periodic_review_period} months
-Last Review: {document.last_reviewed_date.strftime('%Y-%m-%d') if document.last_reviewed_date else 'Never'}
-Next Review Due: {document.next_review_date.strftime('%Y-%m-%d') if document.next_review_date else 'Now'}
+{document_list}
 
 ACTION REQUIRED:
-This document requires a periodic review to ensure it remains current and accurate.
+These documents require a periodic review to ensure they remain current and accurate.
 
 Review Process:
 1. Log into EDMS
-2. Navigate to the document  
+2. Navigate to each document
 3. Review the content for accuracy and relevance
 4. Create a new version if changes are needed, or
 5. Confirm the document is still valid
@@ -186,23 +331,17 @@ Access EDMS: {settings.FRONTEND_URL}/document-management
 
 ---
 This is an automated notification from the EDMS system.
-                    """.strip()
-                    
-                    send_mail(
-                        subject,
-                        message,
-                        settings.DEFAULT_FROM_EMAIL,
-                        [user.email],
-                        fail_silently=False
-                    )
-                    logger.info(f"✅ Sent periodic review notification email to {user.email} for {document.document_number}")
-                except Exception as e:
-                    logger.warning(f"❌ Failed to send periodic review notification email: {e}")
-                
-            except Exception as e:
-                logger.error(f"Failed to notify {user.username}: {str(e)}")
+        """.strip()
         
-        return notification_count
+        send_mail(
+            subject,
+            message,
+            settings.DEFAULT_FROM_EMAIL,
+            [user.email],
+            fail_silently=False
+        )
+        logger.info(f"Sent periodic review digest to {user.email} ({len(documents)} documents)")
+        return {'user_id': user_id, 'documents': len(documents), 'sent': True}
     
     def complete_periodic_review(
         self, 
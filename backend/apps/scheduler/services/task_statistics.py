@@ -0,0 +1,333 @@
+"""
+Task Execution Statistics Service
+
+Computes per-task execution statistics (runs, success/failure counts,
+average/p50/p95 duration, last run) for all scheduled tasks at once, with a
+fixed number of queries regardless of how many tasks or results exist, and
+rolls results up into an hourly summary table that outlives the Celery
+results cleanup.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, Any
+
+from django.db import connections
+from django.db.models import (
+    Aggregate, Avg, Count, DurationField, ExpressionWrapper, F, Max, Q, Sum
+)
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+try:
+    from django_celery_results.models import TaskResult
+    CELERY_RESULTS_AVAILABLE = True
+except ImportError:
+    CELERY_RESULTS_AVAILABLE = False
+    TaskResult = None
+
+# Hours re-rolled on every rollup run to absorb results stored late
+ROLLUP_OVERLAP_HOURS = 1
+# How far back the first rollup reaches
+ROLLUP_INITIAL_DAYS = 7
+
+
+class PercentileCont(Aggregate):
+    """PostgreSQL ``percentile_cont(p) WITHIN GROUP (ORDER BY expr)``."""
+    function = 'PERCENTILE_CONT'
+    name = 'PercentileCont'
+    template = '%(function)s(%(percentile)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+
+    def __init__(self, expression, percentile, **extra):
+        super().__init__(expression, percentile=float(percentile), **extra)
+
+
+def _duration():
+    return ExpressionWrapper(F('date_done') - F('date_created'), output_field=DurationField())
+
+
+def _seconds(value):
+    return round(value.total_seconds(), 2) if value is not None else None
+
+
+def _percentile(sorted_values, fraction):
+    """Linear-interpolated percentile, matching ``percentile_cont``."""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+class TaskStatisticsService:
+    """Service for aggregated Celery task execution statistics"""
+
+    def collect(self, task_names: Iterable[str], window_hours: int = 24) -> Dict[str, Dict[str, Any]]:
+        """
+        Statistics and last run for several tasks.
+
+        Window statistics come from one grouped query over the results
+        table; the last run of each task is fetched with one more query
+        (the hourly summary supplies the timestamp for tasks that did not
+        run inside the window, and the last run itself once the results
+        cleanup has deleted that row).
+
+        Returns:
+            Dict mapping task name to {'statistics': {...}, 'last_run': {...}}
+        """
+        names = sorted({name for name in task_names if name})
+        if not CELERY_RESULTS_AVAILABLE or not names:
+            return {}
+
+        since = timezone.now() - timedelta(hours=window_hours)
+        window = self._window_statistics(names, since)
+        last_done = {name: stats['last_done'] for name, stats in window.items()}
+        last_done.update(self._last_done_outside_window([n for n in names if n not in last_done]))
+        last_results = self._last_results(last_done)
+        cleaned_up = {name: done for name, done in last_done.items() if done and name not in last_results}
+        last_results.update(self._summary_last_runs(cleaned_up))
+
+        return {
+            name: {
+                'statistics': self._format_statistics(window.get(name)),
+                'last_run': last_results.get(name),
+            }
+            for name in names
+        }
+
+    def _window_statistics(self, names, since):
+        results = TaskResult.objects.filter(
+            task_name__in=names,
+            date_done__gte=since,
+        ).exclude(status='REVOKED')
+
+        aggregates = {
+            'runs': Count('id'),
+            'success_count': Count('id', filter=Q(status='SUCCESS')),
+            'failure_count': Count('id', filter=Q(status='FAILURE')),
+            'avg_duration': Avg(_duration()),
+            'last_done': Max('date_done'),
+        }
+        postgres = connections[results.db].vendor == 'postgresql'
+        if postgres:
+            aggregates['p50_duration'] = PercentileCont(_duration(), 0.5, output_field=DurationField())
+            aggregates['p95_duration'] = PercentileCont(_duration(), 0.95, output_field=DurationField())
+
+        rows = {
+            row['task_name']: row
+            for row in results.values('task_name').annotate(**aggregates).order_by()
+        }
+
+        if not postgres and rows:
+            # No ordered-set aggregates outside PostgreSQL (development only)
+            durations = {}
+            for name, duration in results.values_list('task_name', _duration()):
+                if duration is not None:
+                    durations.setdefault(name, []).append(duration)
+            for name, row in rows.items():
+                values = sorted(durations.get(name, []))
+                row['p50_duration'] = _percentile(values, 0.5)
+                row['p95_duration'] = _percentile(values, 0.95)
+
+        return rows
+
+    def _last_done_outside_window(self, names):
+        """Last completion time of tasks that did not run inside the window."""
+        if not names:
+            return {}
+        from apps.scheduler.models import TaskExecutionSummary
+
+        last_done = dict(
+            TaskExecutionSummary.objects.filter(task_name__in=names)
+            .values('task_name').annotate(last=Max('last_run_at'))
+            .values_list('task_name', 'last')
+        )
+        remaining = [name for name in names if name not in last_done]
+        if remaining:
+            # Not rolled up yet: served by the (task_name, date_done) index
+            last_done.update(
+                TaskResult.objects.filter(task_name__in=remaining).exclude(status='REVOKED')
+                .values('task_name').annotate(last=Max('date_done'))
+                .values_list('task_name', 'last')
+            )
+        return last_done
+
+    def _last_results(self, last_done):
+        """Fetch the most recent result row of every task in one query."""
+        condition = Q()
+        for name, done in last_done.items():
+            if done:
+                condition |= Q(task_name=name, date_done=done)
+        if not condition:
+            return {}
+
+        last_results = {}
+        rows = TaskResult.objects.filter(condition).exclude(status='REVOKED').order_by('date_done', 'id')
+        for result in rows.only('task_name', 'status', 'date_done', 'date_created', 'result', 'traceback'):
+            last_results[result.task_name] = result  # Latest wins on ties
+        return {name: self._format_last_run(result) for name, result in last_results.items()}
+
+    def _summary_last_runs(self, last_done):
+        """Last runs rebuilt from the hourly summary when their result rows are gone."""
+        if not last_done:
+            return {}
+        from apps.scheduler.models import TaskExecutionSummary
+
+        condition = Q()
+        for name, done in last_done.items():
+            condition |= Q(task_name=name, last_run_at=done)
+        return {
+            summary.task_name: self._format_summary_last_run(summary)
+            for summary in TaskExecutionSummary.objects.filter(condition)
+        }
+
+    @staticmethod
+    def _format_statistics(row):
+        if not row:
+            return {
+                'runs_24h': 0,
+                'success_count': 0,
+                'failure_count': 0,
+                'success_rate': 100,
+                'avg_duration': None,
+                'p50_duration': None,
+                'p95_duration': None,
+            }
+        return {
+            'runs_24h': row['runs'],
+            'success_count': row['success_count'],
+            'failure_count': row['failure_count'],
+            'success_rate': (row['success_count'] / row['runs'] * 100) if row['runs'] else 100,
+            'avg_duration': _seconds(row['avg_duration']),
+            'p50_duration': _seconds(row.get('p50_duration')),
+            'p95_duration': _seconds(row.get('p95_duration')),
+        }
+
+    @staticmethod
+    def _format_last_run(result):
+        duration = None
+        if result.date_done and result.date_created:
+            duration = (result.date_done - result.date_created).total_seconds()
+        return {
+            'timestamp': result.date_done.isoformat() if result.date_done else None,
+            'date_done': result.date_done,
+            'status': result.status,
+            'duration': duration,
+            'result': result.result if result.status == 'SUCCESS' else result.traceback,
+        }
+
+    @staticmethod
+    def _format_summary_last_run(summary):
+        # The hour's counts only tell the outcome when every run shared it
+        if summary.runs and summary.success_count == summary.runs:
+            status = 'SUCCESS'
+        elif summary.runs and summary.failure_count == summary.runs:
+            status = 'FAILURE'
+        else:
+            status = 'UNKNOWN'
+        return {
+            'timestamp': summary.last_run_at.isoformat(),
+            'date_done': summary.last_run_at,
+            'status': status,
+            'duration': summary.total_duration if summary.runs == 1 else None,
+            'result': None,
+        }
+
+    # ------------------------------------------------------------------
+    # Hourly rollup
+    # ------------------------------------------------------------------
+
+    def rollup(self, now=None) -> Dict[str, Any]:
+        """
+        Roll completed task results up into TaskExecutionSummary, per task and hour.
+
+        Idempotent: the most recent rolled-up hours are recomputed and
+        upserted on every run.
+        """
+        if not CELERY_RESULTS_AVAILABLE:
+            return {'success': False, 'error': 'django-celery-results not available'}
+
+        from apps.scheduler.models import TaskExecutionSummary
+
+        now = now or timezone.now()
+        current_hour = now.replace(minute=0, second=0, microsecond=0)
+        last_hour = TaskExecutionSummary.objects.aggregate(last=Max('hour'))['last']
+        if last_hour:
+            start = last_hour - timedelta(hours=ROLLUP_OVERLAP_HOURS - 1)
+        else:
+            start = current_hour - timedelta(days=ROLLUP_INITIAL_DAYS)
+
+        rows = (
+            TaskResult.objects.filter(date_done__gte=start, date_done__lt=current_hour)
+            .exclude(status='REVOKED')
+            .annotate(hour=TruncHour('date_done'))
+            .values('task_name', 'hour')
+            .annotate(
+                runs=Count('id'),
+                success_count=Count('id', filter=Q(status='SUCCESS')),
+                failure_count=Count('id', filter=Q(status='FAILURE')),
+                total_duration=Sum(_duration()),
+                max_duration=Max(_duration()),
+                last_run_at=Max('date_done'),
+            )
+            .order_by()
+        )
+
+        summaries = [
+            TaskExecutionSummary(
+                task_name=row['task_name'],
+                hour=row['hour'],
+                runs=row['runs'],
+                success_count=row['success_count'],
+                failure_count=row['failure_count'],
+                total_duration=row['total_duration'].total_seconds() if row['total_duration'] else 0,
+                max_duration=row['max_duration'].total_seconds() if row['max_duration'] else None,
+                last_run_at=row['last_run_at'],
+            )
+            for row in rows if row['task_name']
+        ]
+        TaskExecutionSummary.objects.bulk_create(
+            summaries,
+            update_conflicts=True,
+            unique_fields=['task_name', 'hour'],
+            update_fields=['runs', 'success_count', 'failure_count', 'total_duration', 'max_duration', 'last_run_at'],
+        )
+
+        logger.info(f"Rolled up {len(summaries)} hourly task summaries since {start.isoformat()}")
+        return {
+            'success': True,
+            'since': start.isoformat(),
+            'until': current_hour.isoformat(),
+            'summaries': len(summaries),
+        }
+
+    def history(self, task_names: Iterable[str], days: int = 7) -> Dict[str, Dict[str, Any]]:
+        """Run counts over a longer period, from the hourly summary table."""
+        from apps.scheduler.models import TaskExecutionSummary
+
+        since = timezone.now() - timedelta(days=days)
+        rows = (
+            TaskExecutionSummary.objects.filter(task_name__in=list(task_names), hour__gte=since)
+            .values('task_name')
+            .annotate(
+                runs=Sum('runs'),
+                failures=Sum('failure_count'),
+                total_duration=Sum('total_duration'),
+            )
+            .order_by()
+        )
+        return {
+            row['task_name']: {
+                'runs': row['runs'],
+                'failures': row['failures'],
+                'avg_duration': round(row['total_duration'] / row['runs'], 2) if row['runs'] else None,
+            }
+            for row in rows
+        }
+
+
+# Singleton instance
+task_statistics_service = TaskStatisticsService()
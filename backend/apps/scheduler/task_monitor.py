@@ -3,10 +3,12 @@ Task Monitor - Simple and Intuitive Scheduler Dashboard
 Shows task execution history, next run times, and status
 """
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime
 from django.utils import timezone
 from celery import current_app
 from celery.schedules import crontab, schedule as celery_schedule
+from .worker_state import worker_state
+from .services.task_statistics import task_statistics_service
 # TaskResult not available - will use alternative tracking
 try:
     from django_celery_results.models import TaskResult
@@ -73,6 +75,21 @@ class TaskMonitor:
             'category': 'System Maintenance',
             'description': 'Cleans up old task execution records and REVOKED tasks'
         },
+        'apps.scheduler.tasks.rollup_task_statistics': {
+            'name': 'Task Statistics Rollup',
+            'category': 'System Maintenance',
+            'description': 'Summarizes task executions per hour for the scheduler dashboard'
+        },
+        'apps.documents.tasks.cleanup_expired_upload_sessions': {
+            'name': 'Cleanup Upload Sessions',
+            'category': 'System Maintenance',
+            'description': 'Aborts expired resumable uploads and deletes their stored parts'
+        },
+        'apps.documents.tasks.collect_blob_garbage': {
+            'name': 'Blob Garbage Collection',
+            'category': 'System Maintenance',
+            'description': 'Deletes stored files no longer referenced by any document'
+        },
         'apps.scheduler.tasks.send_test_email_to_self': {
             'name': 'Send Test Email',
             'category': 'Email Notifications',
@@ -86,30 +103,20 @@ class TaskMonitor:
             # Get scheduled tasks from Celery Beat
             beat_schedule = current_app.conf.beat_schedule or {}
             
-            # Get registered tasks from workers
-            inspect = current_app.control.inspect()
-            registered_tasks_by_worker = inspect.registered() or {}
-            all_registered_tasks = set()
-            for worker_tasks in registered_tasks_by_worker.values():
-                all_registered_tasks.update(worker_tasks)
+            # Get registered tasks from the cached worker state
+            all_registered_tasks = worker_state.registered_tasks()
             
-            # Build task list from beat_schedule
-            tasks = []
-            for schedule_name, schedule_config in beat_schedule.items():
-                task_path = schedule_config.get('task')
-                task_info = self._get_task_info(
-                    schedule_name, 
-                    task_path, 
-                    schedule_config,
-                    all_registered_tasks
-                )
-                tasks.append(task_info)
+            # Collect schedule entries from beat_schedule
+            entries = [
+                (schedule_name, schedule_config.get('task'), schedule_config, False)
+                for schedule_name, schedule_config in beat_schedule.items()
+            ]
             
             # Also include PeriodicTask database records (for manual-trigger tasks)
             try:
                 from django_celery_beat.models import PeriodicTask
                 db_tasks = PeriodicTask.objects.filter(enabled=True).exclude(
-                    name__in=[t['schedule_name'] for t in tasks]  # Avoid duplicates
+                    name__in=list(beat_schedule)  # Avoid duplicates
                 )
                 for db_task in db_tasks:
                     # Create schedule config from database task
@@ -118,17 +125,25 @@ class TaskMonitor:
                         'schedule': None,  # Database tasks may have crontab/interval
                         'options': {}
                     }
-                    task_info = self._get_task_info(
-                        db_task.name,
-                        db_task.task,
-                        schedule_config,
-                        all_registered_tasks,
-                        is_manual=True  # Flag as manual-trigger task
-                    )
-                    tasks.append(task_info)
+                    entries.append((db_task.name, db_task.task, schedule_config, True))  # Manual-trigger task
             except Exception as e:
                 logger.warning(f"Could not load PeriodicTask database tasks: {e}")
             
+            # Execution history for all tasks at once (grouped queries, not per task)
+            history = self._collect_history([entry[1] for entry in entries])
+            
+            tasks = [
+                self._get_task_info(
+                    schedule_name,
+                    task_path,
+                    schedule_config,
+                    all_registered_tasks,
+                    history.get(task_path),
+                    is_manual=is_manual
+                )
+                for schedule_name, task_path, schedule_config, is_manual in entries
+            ]
+            
             # Group by category
             tasks_by_category = {}
             for task in tasks:
@@ -172,16 +187,17 @@ class TaskMonitor:
                 'tasks_by_category': {}
             }
     
-    def _get_task_info(self, schedule_name, task_path, schedule_config, registered_tasks, is_manual=False):
+    def _get_task_info(self, schedule_name, task_path, schedule_config, registered_tasks, history=None, is_manual=False):
         """Get detailed information about a single task"""
         task_def = self.TASK_DEFINITIONS.get(task_path, {
             'name': schedule_name,
             'category': 'Manual Tasks' if is_manual else 'Other',
             'description': 'Manual trigger task' if is_manual else 'Scheduled task'
         })
+        history = history or self._empty_history()
         
         # Get execution history
-        last_run = self._get_last_run(task_path)
+        last_run = history['last_run']
         
         # Calculate next run
         next_run = self._calculate_next_run(schedule_config.get('schedule'))
@@ -204,54 +220,64 @@ class TaskMonitor:
             'next_run': next_run,
             'status': status,
             'status_message': status_message,
-            'statistics': self._get_task_statistics(task_path)
+            'statistics': history['statistics']
         }
     
-    def _get_last_run(self, task_name):
-        """Get information about the last task execution"""
+    def _collect_history(self, task_names):
+        """Get last run and 24h statistics for all tasks"""
         if not CELERY_RESULTS_AVAILABLE or not TaskResult:
             # Use Celery inspect as fallback
-            return self._get_last_run_from_inspect(task_name)
+            return {name: self._empty_history(name) for name in task_names}
         
         try:
-            # Filter out REVOKED tasks - they're not meaningful executions
-            # Get the most recent ACTUAL execution (SUCCESS, FAILURE, RETRY)
-            last_result = TaskResult.objects.filter(
-                task_name=task_name
-            ).exclude(
-                status='REVOKED'
-            ).order_by('-date_done').first()
+            collected = task_statistics_service.collect(task_names)
+            weekly = task_statistics_service.history(task_names, days=7)
+        except Exception as e:
+            logger.error(f"Failed to get task statistics: {str(e)}")
+            error_run = {
+                'timestamp': None,
+                'relative_time': 'Error',
+                'status': 'UNKNOWN',
+                'duration': None,
+                'result': str(e)
+            }
+            return {name: dict(self._empty_history(), last_run=error_run) for name in task_names}
+        
+        history = {}
+        for name in task_names:
+            entry = collected.get(name, {})
+            statistics = entry.get('statistics') or self._empty_history()['statistics']
+            statistics['runs_7d'] = weekly.get(name, {}).get('runs')
+            statistics['failures_7d'] = weekly.get(name, {}).get('failures')
             
-            if not last_result:
-                return {
+            last_run = entry.get('last_run')
+            if last_run:
+                date_done = last_run.pop('date_done')
+                last_run['relative_time'] = self._format_relative_time(date_done) if date_done else 'Unknown'
+            else:
+                last_run = {
                     'timestamp': None,
                     'relative_time': 'Never run',
                     'status': 'PENDING',
                     'duration': None,
                     'result': None
                 }
-            
-            duration = None
-            if last_result.date_done and hasattr(last_result, 'date_created'):
-                duration = (last_result.date_done - last_result.date_created).total_seconds()
-            
-            return {
-                'timestamp': last_result.date_done.isoformat() if last_result.date_done else None,
-                'relative_time': self._format_relative_time(last_result.date_done) if last_result.date_done else 'Unknown',
-                'status': last_result.status,
-                'duration': duration,
-                'result': last_result.result if last_result.status == 'SUCCESS' else last_result.traceback
-            }
-            
-        except Exception as e:
-            logger.error(f"Failed to get last run for {task_name}: {str(e)}")
-            return {
-                'timestamp': None,
-                'relative_time': 'Error',
-                'status': 'UNKNOWN',
-                'duration': None,
-                'result': str(e)
+            history[name] = {'last_run': last_run, 'statistics': statistics}
+        return history
+    
+    def _empty_history(self, task_name=None):
+        return {
+            'last_run': self._get_last_run_from_inspect(task_name),
+            'statistics': {
+                'runs_24h': None,
+                'success_count': None,
+                'failure_count': None,
+                'success_rate': None,
+                'avg_duration': None,
+                'p50_duration': None,
+                'p95_duration': None,
             }
+        }
     
     def _get_last_run_from_inspect(self, task_name):
         """Fallback method when TaskResult is not available"""
@@ -301,59 +327,6 @@ class TaskMonitor:
                 'relative_time': 'Calculation error'
             }
     
-    def _get_task_statistics(self, task_name):
-        """Get statistics for task executions in last 24 hours"""
-        if not CELERY_RESULTS_AVAILABLE or not TaskResult:
-            return {
-                'runs_24h': None,
-                'success_count': None,
-                'failure_count': None,
-                'success_rate': None,
-                'avg_duration': None
-            }
-        
-        try:
-            since = timezone.now() - timedelta(hours=24)
-            
-            # Exclude REVOKED tasks from statistics - they're not real executions
-            results = TaskResult.objects.filter(
-                task_name=task_name,
-                date_done__gte=since
-            ).exclude(
-                status='REVOKED'
-            )
-            
-            total_runs = results.count()
-            success_count = results.filter(status='SUCCESS').count()
-            failure_count = results.filter(status='FAILURE').count()
-            
-            # Calculate average duration
-            durations = []
-            for result in results:
-                if result.date_done and hasattr(result, 'date_created'):
-                    duration = (result.date_done - result.date_created).total_seconds()
-                    durations.append(duration)
-            
-            avg_duration = sum(durations) / len(durations) if durations else None
-            
-            return {
-                'runs_24h': total_runs,
-                'success_count': success_count,
-                'failure_count': failure_count,
-                'success_rate': (success_count / total_runs * 100) if total_runs > 0 else 100,
-                'avg_duration': round(avg_duration, 2) if avg_duration else None
-            }
-            
-        except Exception as e:
-            logger.error(f"Failed to get statistics for {task_name}: {str(e)}")
-            return {
-                'runs_24h': 0,
-                'success_count': 0,
-                'failure_count': 0,
-                'success_rate': 100,
-                'avg_duration': None
-            }
-    
     def _determine_task_status(self, last_run, is_registered):
         """Determine overall status of a task"""
         if not is_registered:
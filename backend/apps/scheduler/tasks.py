@@ -13,6 +13,7 @@ from celery.utils.log import get_task_logger
 from .services.automation import document_automation_service
 from .services.health import system_health_service
 from .services.cleanup import celery_cleanup_service
+from .services.task_statistics import task_statistics_service
 
 logger = get_task_logger(__name__)
 
@@ -134,6 +135,8 @@ def cleanup_celery_results(days_to_keep: int = 7, remove_revoked: bool = True):
         remove_revoked: Whether to remove all REVOKED tasks (default: True)
     """
     try:
+        # Roll up results into hourly summaries before they are deleted
+        task_statistics_service.rollup()
         results = celery_cleanup_service.cleanup(days_to_keep, remove_revoked)
         
         if results['success']:
@@ -151,6 +154,23 @@ def cleanup_celery_results(days_to_keep: int = 7, remove_revoked: bool = True):
         raise
 
 
+@shared_task
+def rollup_task_statistics():
+    """
+    Roll Celery task results up into hourly per-task summaries.
+    
+    Celery task wrapper that delegates to TaskStatisticsService.
+    Runs hourly via Celery Beat.
+    """
+    try:
+        results = task_statistics_service.rollup()
+        logger.info(f"Task statistics rollup completed: {results.get('summaries', 0)} hourly summaries")
+        return results
+    except Exception as e:
+        logger.error(f"Task statistics rollup failed: {str(e)}")
+        raise
+
+
 # ============================================================================
 # Periodic Review Tasks
 # ============================================================================
@@ -171,7 +191,7 @@ def process_periodic_reviews():
         logger.info(
             f"Periodic review check completed: "
             f"{results['workflows_created']} workflows created, "
-            f"{results['notifications_created']} notifications sent"
+            f"{results['notifications_created']} stakeholder digests queued"
         )
         return results
     except Exception as e:
@@ -179,6 +199,24 @@ def process_periodic_reviews():
         raise
 
 
+@shared_task(bind=True, max_retries=3)
+def send_periodic_review_digest(self, user_id, document_ids):
+    """
+    Email one stakeholder the documents due for periodic review.
+    
+    Celery task wrapper that delegates to PeriodicReviewService.
+    Queued by process_periodic_reviews, one per stakeholder.
+    """
+    try:
+        from .services.periodic_review_service import get_periodic_review_service
+        return get_periodic_review_service().send_review_digest(user_id, document_ids)
+    except Exception as e:
+        logger.error(f"Periodic review digest for user {user_id} failed: {str(e)}")
+        if self.request.retries < self.max_retries:
+            raise self.retry(countdown=300 * (self.request.retries + 1))
+        raise
+
+
 # ============================================================================
 # Email Notification Tasks
 # ============================================================================
@@ -466,7 +504,9 @@ __all__ = [
     'perform_system_health_check',
     'cleanup_workflow_tasks',
     'cleanup_celery_results',
+    'rollup_task_statistics',
     'process_periodic_reviews',
+    'send_periodic_review_digest',
     'send_test_email_to_self',
     'send_daily_health_report',
 ]
@@ -0,0 +1,164 @@
+"""
+Runtime performance metrics tests
+
+Request latency histograms and query counters recorded by the middleware,
+storage growth estimates, capacity thresholds and the Prometheus endpoint.
+"""
+
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from apps.scheduler import metrics
+from apps.scheduler.metrics import (
+    STORAGE_SAMPLES_CACHE_KEY, MetricsRecorder, QueryTimer, RequestMetricsMiddleware,
+    histogram_quantile, performance_metrics, prometheus_metrics_view, render_prometheus
+)
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def local_metrics(settings, monkeypatch):
+    # In-process counters only: no shared Redis hash between test runs
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    cache.clear()
+    monkeypatch.setattr(metrics, 'recorder', MetricsRecorder())
+
+
+class TestRequestMetrics:
+    """Latency histograms per endpoint and their exposition"""
+
+    def test_histogram_buckets_are_cumulative_in_exposition(self):
+        for seconds in (0.01, 0.02, 0.3, 4.0, 30.0):
+            metrics.recorder.observe_request('GET', 'api/v1/documents/', 200, seconds)
+
+        text = render_prometheus({'counters': metrics.recorder.counters()})
+
+        labels = 'method="GET",route="api/v1/documents/",status="2xx"'
+        assert f'edms_http_request_duration_seconds_bucket{{{labels},le="0.025"}} 2' in text
+        assert f'edms_http_request_duration_seconds_bucket{{{labels},le="0.5"}} 3' in text
+        assert f'edms_http_request_duration_seconds_bucket{{{labels},le="10.0"}} 4' in text
+        assert f'edms_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} 5' in text
+        assert f'edms_http_request_duration_seconds_count{{{labels}}} 5' in text
+
+    def test_histogram_quantile_interpolates_within_bucket(self):
+        buckets = {'0.1': 50, '0.25': 40, '0.5': 10}
+        assert histogram_quantile(0.5, buckets) == pytest.approx(0.1)
+        assert histogram_quantile(0.95, buckets) == pytest.approx(0.375)
+        assert histogram_quantile(0.95, {}) is None
+
+    @pytest.mark.django_db
+    def test_middleware_records_route_and_query_counts(self, monkeypatch):
+        monkeypatch.setattr(metrics, 'QueryTimer', lambda: QueryTimer(slow_seconds=0))
+        request = RequestFactory().get('/api/v1/users/42/')
+
+        def view(request):
+            User.objects.count()
+            User.objects.filter(pk=42).exists()
+            request.resolver_match = type('Match', (), {'route': 'api/v1/users/<int:pk>/'})()
+            return HttpResponse(status=404)
+
+        RequestMetricsMiddleware(view)(request)
+
+        counters = metrics.recorder.counters()
+        assert counters['http_requests|GET|api/v1/users/<int:pk>/|4xx'] == 1
+        assert counters['db_queries'] == 2
+        assert counters['db_slow_queries'] == 2
+
+
+class TestCapacity:
+    """Storage growth and threshold evaluation"""
+
+    def test_storage_growth_and_days_until_full(self, settings, tmp_path):
+        settings.PERFORMANCE_METRICS = {'STORAGE_PATHS': {'media': str(tmp_path)}}
+        current = metrics.storage_metrics()['media']
+        day_ago = time.time() - 86400
+        growth = 10 * 1024 ** 3
+        cache.set(STORAGE_SAMPLES_CACHE_KEY, [
+            {'at': day_ago, 'used': {'media': current['used_bytes'] - growth}},
+        ])
+
+        volume = metrics.storage_metrics()['media']
+
+        assert volume['growth_bytes_per_day'] == pytest.approx(growth, rel=0.01)
+        assert volume['days_until_full'] == pytest.approx(volume['free_bytes'] / growth, rel=0.01)
+
+    def test_capacity_issues_flag_backlogs_and_full_volumes(self):
+        snapshot = {
+            'storage': {'documents': {'used_percent': 95.0, 'days_until_full': None}},
+            'processes': [],
+            'database': {'ping_ms': 2.0},
+            'redis': {'ping_ms': 1.0},
+            'http': {'p95_ms': 150.0},
+            'queries': {'slow': 0},
+            'queues': {'documents': 5000, 'scheduler': 3},
+        }
+
+        issues = performance_metrics.capacity_issues(snapshot)
+
+        assert {(i['component'], i['level']) for i in issues} == {
+            ('storage', 'CRITICAL'),
+            ('queues', 'CRITICAL'),
+        }
+
+    def test_connection_pool_waits_are_reported(self):
+        pool = {
+            'alias': 'default', 'size': 10, 'idle': 0, 'in_use': 10, 'waiters': 3, 'min_size': 1,
+            'max_size': 10, 'checkouts': 400, 'checkout_seconds': 60.0, 'checkout_avg_ms': 150.0,
+            'checkout_max_ms': 900.0, 'timeouts': 2, 'health_check_failures': 0,
+            'connections_opened': 10, 'connections_closed': 0,
+        }
+        process = {'role': 'web', 'hostname': 'web-1', 'pid': 7, 'rss_bytes': 1, 'cpu_seconds': 1.0, 'db_pools': [pool]}
+        snapshot = {
+            'storage': {},
+            'processes': [process, {**process, 'pid': 8, 'db_pools': [{**pool, 'waiters': 0, 'checkout_avg_ms': 1.0}]}],
+            'database': {'ping_ms': 2.0},
+            'redis': {'ping_ms': 1.0},
+            'http': {'p95_ms': 150.0},
+            'queries': {'slow': 0},
+            'queues': {},
+        }
+
+        messages = [i['message'] for i in performance_metrics.capacity_issues(snapshot) if i['component'] == 'database']
+        summary = metrics.pool_summary(snapshot['processes'])
+        text = render_prometheus(snapshot)
+
+        assert messages == [
+            '3 threads waiting for a database connection in web process web-1:7 (pool of 10)',
+            'Database connection checkout averages 150 ms in web process web-1:7',
+        ]
+        assert (summary['size'], summary['waiters'], summary['timeouts'], summary['checkout_avg_ms']) == (20, 3, 4, 150.0)
+        assert 'edms_db_pool_waiters{role="web",instance="web-1",pid="7",database="default"} 3' in text
+        assert 'edms_db_pool_checkout_seconds_total{role="web",instance="web-1",pid="8",database="default"} 60' in text
+
+    def test_no_pool_metrics_without_pooling(self):
+        assert metrics.pool_summary([{'role': 'web'}]) is None
+        assert 'edms_db_pool' not in render_prometheus({'processes': []})
+
+
+@pytest.mark.django_db
+class TestPrometheusEndpoint:
+    """Access control on the scrape endpoint"""
+
+    def setup_method(self):
+        self.factory = RequestFactory()
+
+    def test_requires_token_or_staff(self, settings, monkeypatch):
+        settings.PERFORMANCE_METRICS = {'AUTH_TOKEN': 'scrape-secret', 'STORAGE_PATHS': {}}
+        monkeypatch.setattr(performance_metrics, 'PROBES', {'database': metrics.database_metrics})
+
+        anonymous = self.factory.get('/metrics/')
+        anonymous.user = type('Anonymous', (), {'is_authenticated': False, 'is_staff': False})()
+        assert prometheus_metrics_view(anonymous).status_code == 403
+
+        scrape = self.factory.get('/metrics/', HTTP_AUTHORIZATION='Bearer scrape-secret')
+        response = prometheus_metrics_view(scrape)
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+        assert b'edms_db_up 1' in response.content
@@ -0,0 +1,234 @@
+"""
+Periodic Review Kickoff Tests
+
+Tests for the batched periodic review kickoff:
+- Due documents without an active review get workflows in bulk
+- Finished workflow rows are restarted as the periodic review
+- Workflows still in progress are left alone
+- Each stakeholder is queued one digest listing all of their documents
+- Inbox tasks are created for the bulk-created workflows
+- Digest emails list every due document
+"""
+
+import pytest
+from datetime import date, timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.documents.models import Document, DocumentType, DocumentSource
+from apps.scheduler.services.periodic_review_service import PeriodicReviewService
+from apps.workflows.models import DocumentState, DocumentWorkflow, WorkflowInboxTask
+
+User = get_user_model()
+
+# apps.scheduler.tasks cannot be imported with the scheduler app disabled in tests
+QUEUE_DIGESTS = 'apps.scheduler.services.periodic_review_service.PeriodicReviewService._queue_review_digests'
+
+
+@pytest.mark.django_db
+class TestPeriodicReviewKickoff:
+    """Test suite for the bulk periodic review kickoff"""
+
+    def setup_method(self):
+        """Setup test data"""
+        self.author = User.objects.create_user(
+            username='review_author', password='test123', email='author@example.com'
+        )
+        self.reviewer = User.objects.create_user(
+            username='review_reviewer', password='test123', email='reviewer@example.com'
+        )
+        self.approver = User.objects.create_user(
+            username='review_approver', password='test123', email='approver@example.com'
+        )
+        self.doc_type = DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.author)
+        self.doc_source = DocumentSource.objects.create(
+            name='Original Digital Draft', source_type='original_digital'
+        )
+        self.service = PeriodicReviewService()
+
+    def _document(self, title, next_review_date, status='EFFECTIVE', author=None, **kwargs):
+        return Document.objects.create(
+            title=title,
+            description='Periodic review test document',
+            document_type=self.doc_type,
+            document_source=self.doc_source,
+            author=author or self.author,
+            status=status,
+            next_review_date=next_review_date,
+            **kwargs
+        )
+
+    def _run(self, django_capture_on_commit_callbacks):
+        digests = {}
+
+        def queue(queued):
+            digests.update({user_id: sorted(document_ids) for user_id, document_ids in queued.items()})
+            return len(queued)
+
+        with mock.patch(QUEUE_DIGESTS, side_effect=queue):
+            with django_capture_on_commit_callbacks(execute=True):
+                results = self.service.process_periodic_reviews()
+        return results, digests
+
+    def test_creates_workflows_and_one_digest_per_stakeholder(self, django_capture_on_commit_callbacks):
+        """Test each stakeholder is queued a single digest for all of their due documents"""
+        overdue = date.today() - timedelta(days=1)
+        first = self._document('First Due', overdue, reviewer=self.reviewer, approver=self.approver)
+        second = self._document('Second Due', date.today(), reviewer=self.reviewer)
+        self._document('Not Due', date.today() + timedelta(days=30))
+        self._document('Draft', overdue, status='DRAFT')
+
+        results, digests = self._run(django_capture_on_commit_callbacks)
+
+        assert results['total_checked'] == 2
+        assert results['workflows_created'] == 2
+        assert results['errors'] == []
+        assert results['notifications_created'] == 3
+        assert digests == {
+            self.author.pk: sorted([first.pk, second.pk]),
+            self.reviewer.pk: sorted([first.pk, second.pk]),
+            self.approver.pk: [first.pk],
+        }
+
+        workflows = DocumentWorkflow.objects.filter(workflow_type='PERIODIC_REVIEW')
+        assert workflows.count() == 2
+        assert set(workflows.values_list('current_state__code', flat=True)) == {'UNDER_PERIODIC_REVIEW'}
+        tasks = WorkflowInboxTask.objects.filter(status='PENDING', task_type='PERIODIC_REVIEW')
+        assert sorted(tasks.values_list('document_id', flat=True)) == sorted([first.pk, second.pk])
+        assert set(tasks.values_list('assignee_id', flat=True)) == {self.author.pk}
+
+    def test_skips_documents_under_active_review(self, django_capture_on_commit_callbacks):
+        """Test a second run does not start reviews that are already active"""
+        self._document('Due', date.today())
+        self._run(django_capture_on_commit_callbacks)
+
+        results, digests = self._run(django_capture_on_commit_callbacks)
+
+        assert results['total_checked'] == 1
+        assert results['workflows_created'] == 0
+        assert digests == {}
+        assert DocumentWorkflow.objects.count() == 1
+
+    def test_restarts_completed_workflows(self, django_capture_on_commit_callbacks):
+        """Test a document's finished workflow row is restarted as its periodic review"""
+        reviewed = self._document('Reviewed', date.today())
+        terminated = self._document('Terminated', date.today())
+        free = self._document('Free', date.today())
+        effective_state = DocumentState.objects.create(code='EFFECTIVE', name='Effective', is_final=True)
+        completed = DocumentWorkflow.objects.create(
+            document=reviewed,
+            workflow_type='REVIEW',
+            current_state=effective_state,
+            initiated_by=self.reviewer,
+            current_assignee=self.reviewer,
+        )
+        DocumentWorkflow.objects.create(
+            document=terminated,
+            workflow_type='PERIODIC_REVIEW',
+            current_state=effective_state,
+            initiated_by=self.author,
+            is_terminated=True,
+            termination_reason='Withdrawn',
+        )
+
+        with mock.patch('apps.scheduler.services.periodic_review_service.dashboard_store.adjust') as adjust:
+            results, digests = self._run(django_capture_on_commit_callbacks)
+
+        assert results['errors'] == []
+        assert results['workflows_created'] == 3
+        assert digests == {self.author.pk: sorted([reviewed.pk, terminated.pk, free.pk])}
+        # The completed review was still counted as active; the terminated one was not
+        adjust.assert_called_once_with(active_workflows=2)
+
+        restarted = DocumentWorkflow.objects.get(document=reviewed)
+        assert restarted.pk == completed.pk
+        assert restarted.workflow_type == 'PERIODIC_REVIEW'
+        assert restarted.current_state.code == 'UNDER_PERIODIC_REVIEW'
+        assert restarted.current_assignee == self.author
+        assert restarted.due_date is not None
+        assert restarted.workflow_data['previous_workflow_type'] == 'REVIEW'
+        reopened = DocumentWorkflow.objects.get(document=terminated)
+        assert (reopened.is_terminated, reopened.termination_reason) == (False, '')
+
+        tasks = WorkflowInboxTask.objects.filter(status='PENDING', task_type='PERIODIC_REVIEW')
+        assert sorted(tasks.values_list('document_id', flat=True)) == sorted([reviewed.pk, terminated.pk, free.pk])
+
+        again, _ = self._run(django_capture_on_commit_callbacks)
+        assert again['workflows_created'] == 0
+
+    def test_leaves_workflows_in_progress_alone(self, django_capture_on_commit_callbacks):
+        """Test a pending obsolescence is neither restarted nor its tasks closed"""
+        obsoleting = self._document('Obsoleting', date.today() - timedelta(days=1), approver=self.approver)
+        self._document('Free', date.today())
+        workflow = DocumentWorkflow.objects.create(
+            document=obsoleting,
+            workflow_type='OBSOLETE',
+            current_state=DocumentState.objects.create(code='PENDING_APPROVAL', name='Pending Approval'),
+            initiated_by=self.author,
+            current_assignee=self.approver,
+        )
+        task = WorkflowInboxTask.objects.create(
+            assignee=self.approver,
+            document=obsoleting,
+            workflow=workflow,
+            task_type='APPROVE',
+            state_code='PENDING_APPROVAL',
+            name=f'Approve Document: {obsoleting.document_number}',
+        )
+
+        results, digests = self._run(django_capture_on_commit_callbacks)
+
+        assert results['total_checked'] == 2
+        assert results['workflows_created'] == 1
+        assert obsoleting.pk not in digests.get(self.author.pk, [])
+        workflow.refresh_from_db()
+        assert (workflow.workflow_type, workflow.current_state.code) == ('OBSOLETE', 'PENDING_APPROVAL')
+        task.refresh_from_db()
+        assert task.status == 'PENDING'
+
+        with pytest.raises(ValueError):
+            self.service._create_periodic_review_workflow(obsoleting)
+
+    def test_kickoff_queries_do_not_grow_with_documents(self, settings, django_capture_on_commit_callbacks):
+        """Test the kickoff runs a fixed number of queries per batch"""
+        settings.PERIODIC_REVIEW_BATCH_SIZE = 50
+        author = User.objects.create_user(username='bulk_author', password='test123', email='bulk@example.com')
+        for index in range(40):
+            self._document(f'Bulk {index}', date.today(), author=author)
+
+        with CaptureQueriesContext(connection) as queries:
+            results, digests = self._run(django_capture_on_commit_callbacks)
+
+        assert results['workflows_created'] == 40
+        assert list(digests) == [author.pk]
+        assert len(digests[author.pk]) == 40
+        assert len(queries) < 15
+
+    def test_digest_lists_every_document(self):
+        """Test the digest email lists all documents in one message"""
+        first = self._document('Digest One', date.today(), review_period_months=12)
+        second = self._document('Digest Two', date.today())
+
+        result = self.service.send_review_digest(self.author.pk, [first.pk, second.pk])
+
+        assert result == {'user_id': self.author.pk, 'documents': 2, 'sent': True}
+        assert len(mail.outbox) == 1
+        message = mail.outbox[0]
+        assert message.to == ['author@example.com']
+        assert message.subject == 'Periodic Review Due: 2 documents'
+        assert first.document_number in message.body
+        assert second.document_number in message.body
+        assert 'Review Period: 12 months' in message.body
+
+    def test_digest_skips_users_without_email(self):
+        """Test no email is attempted for a stakeholder without an address"""
+        user = User.objects.create_user(username='no_email', password='test123')
+        document = self._document('No Email', date.today(), author=user)
+
+        result = self.service.send_review_digest(user.pk, [document.pk])
+
+        assert result['sent'] is False
+        assert mail.outbox == []
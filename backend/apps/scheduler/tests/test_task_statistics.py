@@ -0,0 +1,95 @@
+"""
+Task Execution Statistics Tests
+
+Scheduler dashboard statistics are computed for all tasks with a fixed
+number of grouped queries, and hourly rollups keep history available after
+old Celery results are cleaned up.
+"""
+
+import pytest
+from datetime import timedelta
+from django.apps import apps
+from django.utils import timezone
+from django_celery_results.models import TaskResult
+
+from apps.scheduler.services.task_statistics import task_statistics_service
+
+HEALTH_TASK = 'apps.scheduler.tasks.perform_system_health_check'
+EMAIL_TASK = 'apps.scheduler.tasks.send_daily_health_report'
+REVIEW_TASK = 'apps.scheduler.tasks.process_periodic_reviews'
+
+# Test settings exclude the scheduler app (and so its models)
+requires_scheduler_models = pytest.mark.skipif(
+    not apps.is_installed('apps.scheduler'),
+    reason='apps.scheduler is not installed in test settings'
+)
+
+
+def _result(task_name, status, done, seconds):
+    result = TaskResult.objects.create(
+        task_id=f'{task_name}-{done.timestamp()}-{status}',
+        task_name=task_name,
+        status=status,
+    )
+    # Both timestamps are set automatically on save; backdate them
+    TaskResult.objects.filter(pk=result.pk).update(
+        date_done=done,
+        date_created=done - timedelta(seconds=seconds),
+    )
+    return result
+
+
+@pytest.mark.django_db
+class TestTaskStatistics:
+    """Grouped statistics and hourly rollup"""
+
+    def setup_method(self):
+        self.now = timezone.now()
+        for minutes, seconds in enumerate([1, 2, 3, 4, 10]):
+            _result(HEALTH_TASK, 'SUCCESS', self.now - timedelta(minutes=30 + minutes), seconds)
+        _result(HEALTH_TASK, 'FAILURE', self.now - timedelta(minutes=5), 6)
+        _result(HEALTH_TASK, 'REVOKED', self.now - timedelta(minutes=1), 0)
+        _result(EMAIL_TASK, 'SUCCESS', self.now - timedelta(hours=2), 2)
+        _result(REVIEW_TASK, 'SUCCESS', self.now - timedelta(days=3), 8)
+
+    def test_statistics_for_all_tasks_in_fixed_queries(self, django_assert_max_num_queries):
+        # Window statistics + last runs (plus one for percentiles off PostgreSQL)
+        with django_assert_max_num_queries(3):
+            collected = task_statistics_service.collect([HEALTH_TASK, EMAIL_TASK])
+
+        health = collected[HEALTH_TASK]['statistics']
+        assert health['runs_24h'] == 6
+        assert health['success_count'] == 5
+        assert health['failure_count'] == 1
+        assert health['p50_duration'] == pytest.approx(3.5, abs=0.01)
+        assert health['p95_duration'] == pytest.approx(9, abs=0.01)
+        # The REVOKED result is not an execution
+        assert collected[HEALTH_TASK]['last_run']['status'] == 'FAILURE'
+        assert collected[EMAIL_TASK]['last_run']['duration'] == pytest.approx(2, abs=0.01)
+
+    @requires_scheduler_models
+    def test_last_run_outside_window_and_rollup(self):
+        collected = task_statistics_service.collect([REVIEW_TASK, 'apps.scheduler.tasks.never_run'])
+        assert collected[REVIEW_TASK]['statistics']['runs_24h'] == 0
+        assert collected[REVIEW_TASK]['last_run']['duration'] == pytest.approx(8, abs=0.01)
+        assert collected['apps.scheduler.tasks.never_run']['last_run'] is None
+
+        # Re-running the rollup is idempotent
+        task_statistics_service.rollup(now=self.now + timedelta(hours=1))
+        task_statistics_service.rollup(now=self.now + timedelta(hours=1))
+
+        TaskResult.objects.filter(task_name=REVIEW_TASK).delete()
+        history = task_statistics_service.history([HEALTH_TASK, REVIEW_TASK])
+        assert history[HEALTH_TASK]['runs'] == 6
+        assert history[REVIEW_TASK]['runs'] == 1
+
+    @requires_scheduler_models
+    def test_last_run_from_summary_after_results_cleanup(self):
+        task_statistics_service.rollup(now=self.now + timedelta(hours=1))
+        TaskResult.objects.filter(task_name=REVIEW_TASK).delete()
+
+        last_run = task_statistics_service.collect([REVIEW_TASK])[REVIEW_TASK]['last_run']
+
+        assert last_run['date_done'] == self.now - timedelta(days=3)
+        assert last_run['status'] == 'SUCCESS'
+        assert last_run['duration'] == pytest.approx(8, abs=0.01)
@@ -0,0 +1,85 @@
+"""
+Event-driven Celery worker state tests
+
+The scheduler dashboard reads worker and task state from a snapshot built
+from Celery events instead of broadcasting inspect() on every request.
+"""
+
+import time
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+
+from apps.scheduler.worker_state import (
+    SNAPSHOT_CACHE_KEY, WorkerStateMonitor, worker_state
+)
+
+
+def _event(type_, **fields):
+    return {'type': type_, 'timestamp': time.time(), 'local_received': time.time(), 'clock': 1, **fields}
+
+
+class TestWorkerStateMonitor:
+    """Snapshots built from the Celery event stream"""
+
+    def setup_method(self):
+        cache.clear()
+        self.monitor = WorkerStateMonitor(publish_interval=3600)
+        # Registered tasks come from a one-off targeted inspect per worker
+        self.monitor._details = lambda worker: {
+            'registered': ['apps.scheduler.tasks.perform_system_health_check'],
+            'pool_size': 4,
+        }
+
+    def _heartbeat(self, hostname='celery@worker1'):
+        self.monitor.on_event(_event(
+            'worker-heartbeat', hostname=hostname, freq=2.0, active=1, processed=10, pid=42,
+        ))
+
+    def test_events_are_published_to_snapshot(self):
+        self._heartbeat()
+        self.monitor.on_event(_event(
+            'task-received', uuid='t1', name='apps.scheduler.tasks.perform_system_health_check',
+            hostname='celery@worker1', args='()', kwargs='{}', retries=0, eta=None,
+        ))
+        self.monitor.on_event(_event('task-started', uuid='t1', hostname='celery@worker1'))
+        self.monitor.on_event(_event('task-succeeded', uuid='t1', hostname='celery@worker1', result='ok', runtime=0.5))
+        self.monitor.publish()
+
+        snapshot = worker_state.snapshot()
+        assert snapshot['source'] == 'events'
+        assert list(worker_state.alive_workers(snapshot)) == ['celery@worker1']
+        assert 'apps.scheduler.tasks.perform_system_health_check' in worker_state.registered_tasks(snapshot)
+        summary = snapshot['tasks']['apps.scheduler.tasks.perform_system_health_check']
+        assert summary['last_state'] == 'SUCCESS'
+        assert summary['succeeded'] == 1
+        assert worker_state.beat_status(snapshot) == 'RUNNING'
+
+    def test_workers_without_recent_heartbeat_are_not_alive(self):
+        self._heartbeat()
+        self.monitor.publish()
+
+        snapshot = cache.get(SNAPSHOT_CACHE_KEY)
+        snapshot['workers']['celery@worker1']['heartbeat'] -= 60
+        assert worker_state.alive_workers(snapshot) == {}
+
+    def test_stale_snapshot_falls_back_to_single_inspect(self):
+        self._heartbeat()
+        self.monitor.publish()
+        snapshot = cache.get(SNAPSHOT_CACHE_KEY)
+        snapshot['updated_at'] -= 600
+        cache.set(SNAPSHOT_CACHE_KEY, snapshot)
+
+        inspect = mock.Mock()
+        inspect.active.return_value = {'celery@worker2': []}
+        inspect.registered.return_value = {'celery@worker2': ['apps.documents.tasks.collect_blob_garbage']}
+        inspect.stats.return_value = {}
+        inspect.scheduled.return_value = {}
+        with mock.patch('celery.app.control.Control.inspect', return_value=inspect) as patched:
+            first = worker_state.snapshot()
+            second = worker_state.snapshot()
+
+        assert patched.call_count == 1
+        assert first['source'] == second['source'] == 'inspect'
+        assert list(worker_state.alive_workers(first)) == ['celery@worker2']
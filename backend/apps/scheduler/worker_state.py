@@ -0,0 +1,271 @@
+"""
+Celery worker state for the scheduler dashboard and health checks.
+
+``inspect()`` broadcasts a request to every worker and blocks for the full
+reply timeout, so calling it on each dashboard load is slow and floods the
+broker. Instead, the ``monitor_celery_events`` management command consumes
+the Celery event stream (worker heartbeats and task events) into Celery's
+in-memory ``State`` and publishes a compact snapshot to the cache (Redis in
+production). Readers get the latest snapshot instantly via ``worker_state``.
+
+When no event monitor is running (e.g. local development), readers fall
+back to a single ``inspect()`` round whose result is cached for a short
+time, so repeated page loads still don't broadcast on every request.
+"""
+
+import logging
+import socket
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CACHE_KEY = 'scheduler:celery_worker_state'
+FALLBACK_LOCK_KEY = 'scheduler:celery_worker_state:inspect_lock'
+
+# How often the monitor publishes a snapshot, in seconds
+PUBLISH_INTERVAL = 2
+# Snapshots older than this are considered stale (monitor not running)
+STALE_AFTER = 30
+# How long an inspect() fallback result is reused
+FALLBACK_TTL = 30
+INSPECT_TIMEOUT = 1.0
+# Beat is considered running if a scheduled task was received within this window
+BEAT_ACTIVITY_WINDOW = 2 * 60 * 60
+
+MAX_TASKS_IN_MEMORY = 5000
+
+
+def _beat_task_names():
+    from celery import current_app
+
+    return {entry.get('task') for entry in (current_app.conf.beat_schedule or {}).values()}
+
+
+# ============================================================================
+# Event monitor (runs in its own process)
+# ============================================================================
+
+class WorkerStateMonitor:
+    """
+    Consume Celery events and publish compact worker/task state snapshots.
+
+    Registered task lists and pool sizes are not part of the event stream,
+    so they are fetched once per worker process with a targeted ``inspect``
+    when the worker first appears (or restarts with a new pid).
+    """
+
+    def __init__(self, app=None, publish_interval=PUBLISH_INTERVAL):
+        from celery import current_app
+
+        self.app = app or current_app
+        self.state = self.app.events.State(max_tasks_in_memory=MAX_TASKS_IN_MEMORY)
+        self.publish_interval = publish_interval
+        self._worker_details = {}
+        self._last_publish = 0
+        self._beat_task_names = _beat_task_names()
+
+    def on_event(self, event):
+        self.state.event(event)
+        if time.time() - self._last_publish >= self.publish_interval:
+            self.publish()
+
+    def run(self):
+        """Capture events forever, reconnecting if the broker goes away."""
+        while True:
+            try:
+                with self.app.connection_for_read() as connection:
+                    receiver = self.app.events.Receiver(connection, handlers={'*': self.on_event})
+                    # Ask workers to announce themselves right away
+                    self.app.control.broadcast('heartbeat', connection=connection)
+                    logger.info("Celery event monitor connected")
+                    while True:
+                        try:
+                            receiver.capture(limit=None, timeout=self.publish_interval, wakeup=False)
+                        except socket.timeout:
+                            # No events: keep the snapshot fresh so readers know we're alive
+                            self.publish()
+            except (KeyboardInterrupt, SystemExit):
+                raise
+            except Exception as e:
+                logger.error(f"Celery event monitor lost connection: {str(e)}")
+                self.publish()
+                time.sleep(5)
+
+    def publish(self):
+        cache.set(SNAPSHOT_CACHE_KEY, self.snapshot(), timeout=None)
+        self._last_publish = time.time()
+
+    def snapshot(self):
+        now = time.time()
+        workers = {}
+        for hostname, worker in self.state.workers.items():
+            if not worker.heartbeats:
+                continue
+            workers[hostname] = {
+                'hostname': hostname,
+                'heartbeat': worker.heartbeats[-1],
+                'freq': worker.freq,
+                'active': worker.active or 0,
+                'processed': worker.processed or 0,
+                'loadavg': worker.loadavg,
+                'sw_ver': worker.sw_ver,
+                'pid': worker.pid,
+                **self._details(worker),
+            }
+
+        tasks = {}
+        active_tasks = reserved_eta = 0
+        last_beat_task_at = None
+        for task in self.state.tasks.values():
+            if not task.name:
+                continue
+            if task.state == 'STARTED':
+                active_tasks += 1
+            elif task.state == 'RECEIVED' and task.eta:
+                reserved_eta += 1
+            if task.name in self._beat_task_names and task.received:
+                last_beat_task_at = max(last_beat_task_at or 0, task.received)
+
+            summary = tasks.setdefault(task.name, {
+                'last_state': None, 'last_timestamp': 0, 'last_runtime': None,
+                'succeeded': 0, 'failed': 0,
+            })
+            if task.state == 'SUCCESS':
+                summary['succeeded'] += 1
+            elif task.state == 'FAILURE':
+                summary['failed'] += 1
+            if (task.timestamp or 0) >= summary['last_timestamp']:
+                summary['last_state'] = task.state
+                summary['last_timestamp'] = task.timestamp or 0
+                summary['last_runtime'] = task.runtime
+
+        return {
+            'source': 'events',
+            'updated_at': now,
+            'workers': workers,
+            'tasks': tasks,
+            'active_tasks': active_tasks,
+            'reserved_eta_tasks': reserved_eta,
+            'last_beat_task_at': last_beat_task_at,
+        }
+
+    def _details(self, worker):
+        """Registered tasks and pool size, fetched once per worker process."""
+        cached = self._worker_details.get(worker.hostname)
+        if cached and cached['pid'] == worker.pid:
+            return cached['details']
+
+        details = {'registered': [], 'pool_size': None}
+        try:
+            inspect = self.app.control.inspect(destination=[worker.hostname], timeout=INSPECT_TIMEOUT)
+            details['registered'] = sorted((inspect.registered() or {}).get(worker.hostname, []))
+            stats = (inspect.stats() or {}).get(worker.hostname, {})
+            details['pool_size'] = stats.get('pool', {}).get('max-concurrency')
+        except Exception as e:
+            logger.warning(f"Could not inspect worker {worker.hostname}: {str(e)}")
+            return details  # Retry on the next publish
+
+        self._worker_details[worker.hostname] = {'pid': worker.pid, 'details': details}
+        return details
+
+
+# ============================================================================
+# Readers
+# ============================================================================
+
+class WorkerStateService:
+    """Read the latest worker state snapshot."""
+
+    def snapshot(self):
+        snapshot = cache.get(SNAPSHOT_CACHE_KEY)
+        if snapshot and time.time() - snapshot['updated_at'] <= self._max_age(snapshot):
+            return snapshot
+        return self._inspect_snapshot(stale=snapshot)
+
+    @staticmethod
+    def _max_age(snapshot):
+        return STALE_AFTER if snapshot.get('source') == 'events' else FALLBACK_TTL
+
+    def _inspect_snapshot(self, stale=None):
+        """One inspect() round, shared by concurrent readers for FALLBACK_TTL seconds."""
+        if not cache.add(FALLBACK_LOCK_KEY, True, timeout=int(INSPECT_TIMEOUT * 5) + 1):
+            # Another request is already refreshing; serve what we have
+            return stale or self._empty_snapshot()
+
+        try:
+            from celery import current_app
+
+            inspect = current_app.control.inspect(timeout=INSPECT_TIMEOUT)
+            active = inspect.active() or {}
+            registered = inspect.registered() or {}
+            stats = inspect.stats() or {}
+            scheduled = inspect.scheduled() or {}
+        except Exception as e:
+            logger.error(f"Failed to inspect Celery workers: {str(e)}")
+            active = registered = stats = scheduled = {}
+        finally:
+            cache.delete(FALLBACK_LOCK_KEY)
+
+        now = time.time()
+        workers = {}
+        for hostname in set(active) | set(registered) | set(stats):
+            workers[hostname] = {
+                'hostname': hostname,
+                'heartbeat': now,
+                'freq': FALLBACK_TTL,
+                'active': len(active.get(hostname, [])),
+                'processed': sum((stats.get(hostname, {}).get('total') or {}).values()),
+                'loadavg': stats.get(hostname, {}).get('rusage', {}).get('loadavg'),
+                'sw_ver': None,
+                'pid': stats.get(hostname, {}).get('pid'),
+                'registered': sorted(registered.get(hostname, [])),
+                'pool_size': stats.get(hostname, {}).get('pool', {}).get('max-concurrency'),
+            }
+
+        snapshot = {
+            'source': 'inspect',
+            'updated_at': now,
+            'workers': workers,
+            'tasks': {},
+            'active_tasks': sum(len(tasks) for tasks in active.values()),
+            'reserved_eta_tasks': sum(len(tasks) for tasks in scheduled.values()),
+            'last_beat_task_at': now if scheduled else None,
+        }
+        cache.set(SNAPSHOT_CACHE_KEY, snapshot, timeout=FALLBACK_TTL)
+        return snapshot
+
+    @staticmethod
+    def _empty_snapshot():
+        return {
+            'source': 'none', 'updated_at': time.time(), 'workers': {}, 'tasks': {},
+            'active_tasks': 0, 'reserved_eta_tasks': 0, 'last_beat_task_at': None,
+        }
+
+    def alive_workers(self, snapshot=None):
+        """Workers whose last heartbeat is within twice their heartbeat interval."""
+        snapshot = snapshot or self.snapshot()
+        now = time.time()
+        return {
+            hostname: worker for hostname, worker in snapshot['workers'].items()
+            if now - worker['heartbeat'] <= (worker['freq'] or PUBLISH_INTERVAL) * 2
+        }
+
+    def registered_tasks(self, snapshot=None):
+        """Names of tasks registered on any live worker."""
+        registered = set()
+        for worker in self.alive_workers(snapshot).values():
+            registered.update(worker.get('registered') or [])
+        return registered
+
+    def beat_status(self, snapshot=None):
+        snapshot = snapshot or self.snapshot()
+        last = snapshot.get('last_beat_task_at')
+        if last and time.time() - last <= BEAT_ACTIVITY_WINDOW:
+            return 'RUNNING'
+        return 'UNKNOWN'
+
+
+# Singleton instance
+worker_state = WorkerStateService()
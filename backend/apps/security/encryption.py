@@ -6,11 +6,15 @@ with 21 CFR Part 11 compliance and integrity verification.
 """
 
 import os
+import struct
 import hashlib
 import hmac
 from base64 import b64encode, b64decode
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from django.conf import settings
@@ -19,15 +23,40 @@ import secrets
 import json
 
 
+# Streaming AEAD container format
+#
+#   header  = magic(8) | version(1) | algorithm(1) | segment_size(4)
+#             | nonce_prefix(7) | kek_id(8) | wrapped_dek_len(2) | wrapped_dek
+#   body    = segment_0 | segment_1 | ... | segment_n-1
+#   segment = AES-256-GCM(dek, nonce_prefix | index(4) | last(1), plaintext, aad=header)
+#
+# Each segment carries its own 16-byte tag, so files are encrypted,
+# decrypted and verified one segment at a time, and any byte range can be
+# decrypted by reading only the segments that cover it. The segment index
+# and last-segment flag in the nonce prevent reordering and truncation.
+CONTAINER_MAGIC = b'EDMSAEAD'
+CONTAINER_VERSION = 1
+ALGORITHM_AES_256_GCM = 1
+CONTAINER_FORMAT = 'EDMS-AEAD-v1'
+DEFAULT_SEGMENT_SIZE = 64 * 1024
+TAG_SIZE = 16
+_HEADER_FIXED = struct.Struct('>8sBBI7s8sH')
+
+
 class DocumentEncryption:
     """
-    Document encryption service using Fernet (symmetric encryption)
-    with PBKDF2 key derivation for secure file encryption.
+    Document encryption service using streaming AES-256-GCM.
+
+    Every file gets its own random data encryption key (DEK), wrapped by a
+    key-encryption key derived once from the master key, so no per-call key
+    derivation is needed. Files written by the previous Fernet/PBKDF2
+    implementation can still be decrypted and verified.
     """
     
     def __init__(self):
         """Initialize encryption service with master key."""
         self.master_key = self._get_master_key()
+        self._kek = None
         
     def _get_master_key(self):
         """Get or generate master encryption key."""
@@ -49,8 +78,25 @@ class DocumentEncryption:
             
         return master_key
     
+    @property
+    def kek(self) -> bytes:
+        """Key-encryption key, derived from the master key once per process."""
+        if self._kek is None:
+            self._kek = HKDF(
+                algorithm=hashes.SHA256(),
+                length=32,
+                salt=b'edms-document-kek',
+                info=b'edms-aead-v1',
+            ).derive(self.master_key)
+        return self._kek
+    
+    @property
+    def kek_id(self) -> bytes:
+        """Short identifier of the key-encryption key (for key rotation)."""
+        return hashlib.sha256(self.kek).digest()[:8]
+    
     def derive_key(self, password: str, salt: bytes) -> bytes:
-        """Derive encryption key from password and salt using PBKDF2."""
+        """Derive encryption key from password and salt using PBKDF2 (legacy Fernet files)."""
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
@@ -59,6 +105,182 @@ class DocumentEncryption:
         )
         return b64encode(kdf.derive(password.encode()))
     
+    # ------------------------------------------------------------------
+    # Container primitives
+    # ------------------------------------------------------------------
+    
+    def _build_header(self, dek: bytes, nonce_prefix: bytes, segment_size: int) -> bytes:
+        wrap_nonce = os.urandom(12)
+        wrapped_dek = wrap_nonce + AESGCM(self.kek).encrypt(wrap_nonce, dek, CONTAINER_MAGIC)
+        return _HEADER_FIXED.pack(
+            CONTAINER_MAGIC, CONTAINER_VERSION, ALGORITHM_AES_256_GCM,
+            segment_size, nonce_prefix, self.kek_id, len(wrapped_dek)
+        ) + wrapped_dek
+    
+    def _read_header(self, src):
+        """Parse a container header and unwrap its DEK."""
+        fixed = _read_exact(src, _HEADER_FIXED.size)
+        if len(fixed) != _HEADER_FIXED.size:
+            raise ValueError("Not an encrypted EDMS container - header truncated")
+        magic, version, algorithm, segment_size, nonce_prefix, kek_id, wrapped_len = _HEADER_FIXED.unpack(fixed)
+        if magic != CONTAINER_MAGIC or version != CONTAINER_VERSION or algorithm != ALGORITHM_AES_256_GCM:
+            raise ValueError("Unsupported encrypted container format")
+        if kek_id != self.kek_id:
+            raise ValueError("File was encrypted with a different master key")
+        wrapped_dek = _read_exact(src, wrapped_len)
+        try:
+            dek = AESGCM(self.kek).decrypt(wrapped_dek[:12], wrapped_dek[12:], CONTAINER_MAGIC)
+        except InvalidTag:
+            raise ValueError("File integrity verification failed - key unwrap failed")
+        header = fixed + wrapped_dek
+        return header, AESGCM(dek), nonce_prefix, segment_size
+    
+    @staticmethod
+    def _segment_nonce(nonce_prefix: bytes, index: int, last: bool) -> bytes:
+        return nonce_prefix + struct.pack('>IB', index, 1 if last else 0)
+    
+    def encrypt_stream(self, src, dst, segment_size: int = DEFAULT_SEGMENT_SIZE) -> dict:
+        """
+        Encrypt a readable stream into a writable stream in constant memory.
+        
+        Returns:
+            Dict with original_hash (SHA-256 of the plaintext), original_size
+            and encrypted_size
+        """
+        dek = AESGCM.generate_key(bit_length=256)
+        cipher = AESGCM(dek)
+        nonce_prefix = os.urandom(7)
+        header = self._build_header(dek, nonce_prefix, segment_size)
+        dst.write(header)
+        
+        original_hash = hashlib.sha256()
+        original_size = 0
+        encrypted_size = len(header)
+        
+        index = 0
+        current = _read_exact(src, segment_size)
+        while True:
+            # Look ahead one segment so the final segment can be flagged
+            following = _read_exact(src, segment_size) if len(current) == segment_size else b''
+            last = not following
+            original_hash.update(current)
+            original_size += len(current)
+            segment = cipher.encrypt(self._segment_nonce(nonce_prefix, index, last), current, header)
+            dst.write(segment)
+            encrypted_size += len(segment)
+            if last:
+                break
+            current = following
+            index += 1
+        
+        return {
+            'original_hash': original_hash.hexdigest(),
+            'original_size': original_size,
+            'encrypted_size': encrypted_size,
+        }
+    
+    def iter_decrypt(self, src, start: int = 0, end: int = None):
+        """
+        Yield decrypted plaintext for the byte range [start, end).
+        
+        Only the segments overlapping the range are read and authenticated.
+        Sequential reads work on any stream; ranges other than the whole
+        file require ``src`` to be seekable.
+        
+        Raises:
+            ValueError: if any segment fails authentication
+        """
+        header, cipher, nonce_prefix, segment_size = self._read_header(src)
+        stored_segment = segment_size + TAG_SIZE
+        
+        body_size = self._body_size(src, len(header))
+        if body_size is None:
+            # Non-seekable stream: decrypt sequentially from the start
+            yield from self._iter_sequential(src, header, cipher, nonce_prefix, segment_size, start, end)
+            return
+        
+        segment_count = max(1, -(-body_size // stored_segment))
+        plaintext_size = body_size - segment_count * TAG_SIZE
+        if plaintext_size < 0:
+            raise ValueError("File integrity verification failed - truncated container")
+        
+        end = plaintext_size if end is None else min(end, plaintext_size)
+        if start >= end:
+            # Still authenticate the final segment so truncation is detected
+            first = last = segment_count - 1
+        else:
+            first, last = start // segment_size, (end - 1) // segment_size
+        
+        src.seek(len(header) + first * stored_segment)
+        for index in range(first, last + 1):
+            is_last = index == segment_count - 1
+            segment = _read_exact(src, stored_segment)
+            try:
+                plaintext = cipher.decrypt(self._segment_nonce(nonce_prefix, index, is_last), segment, header)
+            except InvalidTag:
+                raise ValueError(f"File integrity verification failed - segment {index} is corrupt")
+            if start >= end:
+                return
+            offset = index * segment_size
+            yield plaintext[max(0, start - offset):end - offset]
+    
+    def _iter_sequential(self, src, header, cipher, nonce_prefix, segment_size, start, end):
+        stored_segment = segment_size + TAG_SIZE
+        index = 0
+        segment = _read_exact(src, stored_segment)
+        while True:
+            following = _read_exact(src, stored_segment) if len(segment) == stored_segment else b''
+            is_last = not following
+            try:
+                plaintext = cipher.decrypt(self._segment_nonce(nonce_prefix, index, is_last), segment, header)
+            except InvalidTag:
+                raise ValueError(f"File integrity verification failed - segment {index} is corrupt")
+            offset = index * segment_size
+            if end is None or offset < end:
+                piece = plaintext[max(0, start - offset):None if end is None else end - offset]
+                if piece:
+                    yield piece
+            if is_last:
+                return
+            segment = following
+            index += 1
+    
+    @staticmethod
+    def _body_size(src, header_size):
+        try:
+            current = src.tell()
+            total = src.seek(0, os.SEEK_END)
+            src.seek(current)
+        except (AttributeError, OSError, ValueError):
+            return None
+        return total - header_size
+    
+    def decrypt_stream(self, src, dst) -> dict:
+        """
+        Decrypt a whole container into a writable stream in constant memory.
+        
+        Returns:
+            Dict with original_hash and original_size of the plaintext
+        """
+        original_hash = hashlib.sha256()
+        original_size = 0
+        for chunk in self.iter_decrypt(src):
+            original_hash.update(chunk)
+            original_size += len(chunk)
+            dst.write(chunk)
+        return {'original_hash': original_hash.hexdigest(), 'original_size': original_size}
+    
+    def plaintext_size(self, src) -> int:
+        """Plaintext size of a seekable container, without decrypting it."""
+        header, _, _, segment_size = self._read_header(src)
+        body_size = self._body_size(src, len(header))
+        segment_count = max(1, -(-body_size // (segment_size + TAG_SIZE)))
+        return body_size - segment_count * TAG_SIZE
+    
+    # ------------------------------------------------------------------
+    # File API
+    # ------------------------------------------------------------------
+    
     def encrypt_file(self, file_path: str, metadata: dict = None) -> dict:
         """
         Encrypt a file and return encryption metadata.
@@ -73,50 +295,22 @@ class DocumentEncryption:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        # Generate salt and derive key
-        salt = os.urandom(16)
-        key = self.derive_key(self.master_key.decode(), salt)
-        cipher = Fernet(key)
-        
-        # Read and encrypt file
-        with open(file_path, 'rb') as f:
-            file_data = f.read()
-        
-        # Calculate original file hash
-        original_hash = hashlib.sha256(file_data).hexdigest()
-        
-        # Encrypt data
-        encrypted_data = cipher.encrypt(file_data)
-        
-        # Create encrypted file
         encrypted_path = f"{file_path}.encrypted"
-        with open(encrypted_path, 'wb') as f:
-            f.write(encrypted_data)
-        
-        # Generate HMAC for integrity
-        hmac_key = self.master_key[:32]
-        file_hmac = hmac.new(
-            hmac_key, 
-            encrypted_data, 
-            hashlib.sha256
-        ).hexdigest()
+        with open(file_path, 'rb') as src, open(encrypted_path, 'wb') as dst:
+            result = self.encrypt_stream(src, dst)
         
-        # Create metadata
-        encryption_metadata = {
+        return {
             'encrypted_path': encrypted_path,
-            'salt': b64encode(salt).decode(),
-            'algorithm': 'Fernet-PBKDF2',
-            'iterations': 100000,
-            'original_hash': original_hash,
-            'encrypted_hash': hashlib.sha256(encrypted_data).hexdigest(),
-            'hmac': file_hmac,
-            'key_derivation': 'PBKDF2-SHA256',
-            'encrypted_size': len(encrypted_data),
-            'original_size': len(file_data),
+            'format': CONTAINER_FORMAT,
+            'algorithm': 'AES-256-GCM',
+            'segment_size': DEFAULT_SEGMENT_SIZE,
+            'key_wrapping': 'AES-256-GCM (HKDF-SHA256 master key)',
+            'kek_id': self.kek_id.hex(),
+            'original_hash': result['original_hash'],
+            'original_size': result['original_size'],
+            'encrypted_size': result['encrypted_size'],
             'metadata': metadata or {}
         }
-        
-        return encryption_metadata
     
     def decrypt_file(self, encrypted_path: str, encryption_metadata: dict, 
                     output_path: str = None) -> str:
@@ -134,51 +328,38 @@ class DocumentEncryption:
         if not os.path.exists(encrypted_path):
             raise FileNotFoundError(f"Encrypted file not found: {encrypted_path}")
         
-        # Read encrypted data
-        with open(encrypted_path, 'rb') as f:
-            encrypted_data = f.read()
-        
-        # Verify HMAC integrity
-        hmac_key = self.master_key[:32]
-        expected_hmac = encryption_metadata['hmac']
-        calculated_hmac = hmac.new(
-            hmac_key, 
-            encrypted_data, 
-            hashlib.sha256
-        ).hexdigest()
-        
-        if not hmac.compare_digest(expected_hmac, calculated_hmac):
-            raise ValueError("File integrity verification failed - HMAC mismatch")
-        
-        # Derive decryption key
-        salt = b64decode(encryption_metadata['salt'])
-        key = self.derive_key(self.master_key.decode(), salt)
-        cipher = Fernet(key)
-        
-        # Decrypt data
-        try:
-            decrypted_data = cipher.decrypt(encrypted_data)
-        except Exception as e:
-            raise ValueError(f"Decryption failed: {e}")
-        
-        # Verify original file hash
-        calculated_hash = hashlib.sha256(decrypted_data).hexdigest()
-        if calculated_hash != encryption_metadata['original_hash']:
-            raise ValueError("File integrity verification failed - hash mismatch")
-        
-        # Write decrypted file
         if not output_path:
             output_path = encrypted_path.replace('.encrypted', '.decrypted')
         
-        with open(output_path, 'wb') as f:
-            f.write(decrypted_data)
+        if encryption_metadata.get('format') != CONTAINER_FORMAT:
+            return self._decrypt_legacy_file(encrypted_path, encryption_metadata, output_path)
+        
+        try:
+            with open(encrypted_path, 'rb') as src, open(output_path, 'wb') as dst:
+                result = self.decrypt_stream(src, dst)
+            if result['original_hash'] != encryption_metadata['original_hash']:
+                raise ValueError("File integrity verification failed - hash mismatch")
+        except Exception:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            raise
         
         return output_path
     
+    def open_decrypted_range(self, encrypted_path: str, start: int = 0, end: int = None):
+        """
+        Iterate over decrypted bytes [start, end) of an encrypted file.
+        
+        Intended for streaming responses and HTTP Range requests; only the
+        segments covering the range are read and decrypted.
+        """
+        with open(encrypted_path, 'rb') as src:
+            yield from self.iter_decrypt(src, start, end)
+    
     def verify_file_integrity(self, encrypted_path: str, 
                              encryption_metadata: dict) -> bool:
         """
-        Verify encrypted file integrity without decryption.
+        Verify encrypted file integrity without writing plaintext.
         
         Args:
             encrypted_path: Path to encrypted file
@@ -191,28 +372,84 @@ class DocumentEncryption:
             if not os.path.exists(encrypted_path):
                 return False
             
-            # Read encrypted data
-            with open(encrypted_path, 'rb') as f:
-                encrypted_data = f.read()
+            if encryption_metadata.get('format') != CONTAINER_FORMAT:
+                return self._verify_legacy_file(encrypted_path, encryption_metadata)
             
-            # Verify HMAC
-            hmac_key = self.master_key[:32]
-            expected_hmac = encryption_metadata['hmac']
-            calculated_hmac = hmac.new(
-                hmac_key, 
-                encrypted_data, 
-                hashlib.sha256
-            ).hexdigest()
+            original_hash = hashlib.sha256()
+            with open(encrypted_path, 'rb') as src:
+                for chunk in self.iter_decrypt(src):
+                    original_hash.update(chunk)
             
-            # Verify encrypted file hash
-            calculated_encrypted_hash = hashlib.sha256(encrypted_data).hexdigest()
-            expected_encrypted_hash = encryption_metadata['encrypted_hash']
-            
-            return (hmac.compare_digest(expected_hmac, calculated_hmac) and
-                    calculated_encrypted_hash == expected_encrypted_hash)
+            expected_hash = encryption_metadata.get('original_hash')
+            return not expected_hash or original_hash.hexdigest() == expected_hash
             
         except Exception:
             return False
+    
+    # ------------------------------------------------------------------
+    # Legacy Fernet/PBKDF2 files
+    # ------------------------------------------------------------------
+    
+    def _decrypt_legacy_file(self, encrypted_path, encryption_metadata, output_path):
+        with open(encrypted_path, 'rb') as f:
+            encrypted_data = f.read()
+        
+        if not self._legacy_hmac_matches(encrypted_data, encryption_metadata):
+            raise ValueError("File integrity verification failed - HMAC mismatch")
+        
+        salt = b64decode(encryption_metadata['salt'])
+        key = self.derive_key(self.master_key.decode(), salt)
+        try:
+            decrypted_data = Fernet(key).decrypt(encrypted_data)
+        except Exception as e:
+            raise ValueError(f"Decryption failed: {e}")
+        
+        if hashlib.sha256(decrypted_data).hexdigest() != encryption_metadata['original_hash']:
+            raise ValueError("File integrity verification failed - hash mismatch")
+        
+        with open(output_path, 'wb') as f:
+            f.write(decrypted_data)
+        
+        return output_path
+    
+    def _verify_legacy_file(self, encrypted_path, encryption_metadata):
+        with open(encrypted_path, 'rb') as f:
+            encrypted_data = f.read()
+        
+        return (self._legacy_hmac_matches(encrypted_data, encryption_metadata) and
+                hashlib.sha256(encrypted_data).hexdigest() == encryption_metadata['encrypted_hash'])
+    
+    def _legacy_hmac_matches(self, encrypted_data, encryption_metadata):
+        calculated_hmac = hmac.new(
+            self.master_key[:32], 
+            encrypted_data, 
+            hashlib.sha256
+        ).hexdigest()
+        return hmac.compare_digest(encryption_metadata['hmac'], calculated_hmac)
+
+
+def _hash_file(file_path: str, chunk_size: int = DEFAULT_SEGMENT_SIZE):
+    """SHA-256 digest and size of a file, read in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.digest(), size
+
+
+def _read_exact(src, size: int) -> bytes:
+    """Read up to ``size`` bytes, looping over short reads until EOF."""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        data = src.read(remaining)
+        if not data:
+            break
+        chunks.append(data)
+        remaining -= len(data)
+    return b''.join(chunks)
 
 
 class DigitalSignature:
@@ -309,12 +546,8 @@ class DigitalSignature:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Document not found: {file_path}")
         
-        # Read document content
-        with open(file_path, 'rb') as f:
-            document_data = f.read()
-        
-        # Calculate document hash
-        document_hash = hashlib.sha256(document_data).digest()
+        # Hash document content in chunks
+        document_hash, document_size = _hash_file(file_path)
         
         # Create signature
         signature = self.private_key.sign(
@@ -331,7 +564,7 @@ class DigitalSignature:
             'signature': b64encode(signature).decode(),
             'algorithm': 'RSA-PSS-SHA256',
             'document_hash': document_hash.hex(),
-            'document_size': len(document_data),
+            'document_size': document_size,
             'timestamp': secrets.token_hex(16),  # Replace with proper timestamp service
             'signer_info': signer_info or {},
             'public_key_fingerprint': self._get_public_key_fingerprint()
@@ -354,12 +587,8 @@ class DigitalSignature:
             if not os.path.exists(file_path):
                 return False
             
-            # Read document content
-            with open(file_path, 'rb') as f:
-                document_data = f.read()
-            
             # Verify document hash
-            document_hash = hashlib.sha256(document_data).digest()
+            document_hash, _ = _hash_file(file_path)
             expected_hash = signature_metadata['document_hash']
             
             if document_hash.hex() != expected_hash:
@@ -0,0 +1,111 @@
+"""
+Management command comparing per-document PDF signing with cached signing
+keys and the batch signing API.
+
+Signs the same official PDF for many unsaved documents through the old path
+(certificate and private key deserialized for every signature), through
+``sign_pdf`` with the process key cache, and through ``sign_many``.
+"""
+
+import io
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from reportlab.pdfgen import canvas
+
+from apps.documents.models import Document
+from apps.security.models import PDFSigningCertificate
+from apps.security.services.certificate_manager import CertificateManager
+from apps.security.services.pdf_signer import PDFDigitalSigner
+from apps.security.services.signing_keys import signing_keys
+
+
+def benchmark_certificate():
+    """Unsaved self-signed certificate with a fixed identity."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, 'EDMS Benchmark Signer')])
+    now = datetime.utcnow()
+    cert = (
+        x509.CertificateBuilder().subject_name(name).issuer_name(name)
+        .public_key(private_key.public_key()).serial_number(x509.random_serial_number())
+        .not_valid_before(now).not_valid_after(now + timedelta(days=30))
+        .sign(private_key, hashes.SHA256())
+    )
+    return PDFSigningCertificate(
+        pk=-1, name='Benchmark certificate', subject_cn='EDMS Benchmark Signer', issuer_name='EDMS Benchmark Signer',
+        certificate_pem=cert.public_bytes(serialization.Encoding.PEM).decode('utf-8'),
+        private_key_pem=private_key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+        ).decode('utf-8'),
+        public_key_pem='', serial_number=str(cert.serial_number),
+        valid_from=timezone.now(), valid_until=timezone.now() + timedelta(days=30), is_active=True,
+    )
+
+
+def official_pdf(pages):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for page in range(pages):
+        pdf.drawString(72, 720, f'Standard Operating Procedure - page {page + 1}')
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def sign_legacy(signer, pdf_content, document, user, certificate):
+    """The per-signature work ``sign_pdf`` did before the key cache."""
+    x509.load_pem_x509_certificate(certificate.certificate_pem.encode('utf-8'))
+    serialization.load_pem_private_key(certificate.private_key_pem.encode('utf-8'), password=None)
+    return signer._sign(pdf_content, document, user, certificate)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark PDF signing throughput with and without cached signing keys'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=500, help='PDFs signed per path')
+        parser.add_argument('--pages', type=int, default=5, help='Pages per PDF')
+
+    def handle(self, *args, **options):
+        # Unsaved instances: nothing is written to the database
+        user = get_user_model()(username='benchmark', first_name='Release', last_name='Manager')
+        certificate = benchmark_certificate()
+        pdf_content = official_pdf(options['pages'])
+        documents = [
+            Document(uuid=uuid.uuid4(), document_number=f'SOP-2026-{index:04d}-v01.00', title=f'Procedure {index}')
+            for index in range(options['documents'])
+        ]
+        signer = PDFDigitalSigner()
+        cert_manager = CertificateManager()
+        signing_keys.clear()
+
+        def sign_cached():
+            for document in documents:
+                cert_manager.validate_certificate(certificate)
+                signer.sign_pdf(pdf_content, document, user, certificate=certificate)
+
+        timings = {}
+        for name, sign in [
+            ('legacy', lambda: [sign_legacy(signer, pdf_content, d, user, certificate) for d in documents]),
+            ('cached', sign_cached),
+            ('batch', lambda: list(signer.sign_many(((pdf_content, d) for d in documents), user, certificate))),
+        ]:
+            started = time.perf_counter()
+            sign()
+            timings[name] = time.perf_counter() - started
+            self.stdout.write(
+                f"{name:>7}: {timings[name]:.2f} s for {len(documents)} PDFs "
+                f"({len(documents) / timings[name]:.0f} PDFs/s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Batch signing is {timings['legacy'] / timings['batch']:.1f}x faster than loading keys per PDF"
+        ))
@@ -15,6 +15,8 @@ from cryptography.x509.oid import NameOID
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 
+from .signing_keys import signing_keys
+
 logger = logging.getLogger(__name__)
 
 
@@ -169,19 +171,9 @@ class CertificateManager:
             if pdf_certificate.expires_soon:
                 logger.warning(f"Certificate {pdf_certificate.name} expires soon: {pdf_certificate.valid_until}")
             
-            # Try to load the certificate and private key
-            cert_bytes = pdf_certificate.certificate_pem.encode('utf-8')
-            key_bytes = pdf_certificate.private_key_pem.encode('utf-8')
-            
-            # Parse certificate
-            cert = x509.load_pem_x509_certificate(cert_bytes)
-            
-            # Parse private key
-            private_key = serialization.load_pem_private_key(key_bytes, password=None)
-            
-            # Verify they match
-            public_key = cert.public_key()
-            private_public_key = private_key.public_key()
+            # Load the certificate and private key (cached per process)
+            signing_key = signing_keys.get(pdf_certificate)
+            cert = signing_key.certificate
             
             # Basic validation (in production, would do more thorough checks)
             if cert.serial_number != int(pdf_certificate.serial_number):
@@ -21,8 +21,9 @@ except ImportError:
 # Cryptography libraries
 try:
     from cryptography import x509
-    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives import hashes
     from cryptography.hazmat.primitives.asymmetric import padding
+    from .signing_keys import signing_keys
     CRYPTO_AVAILABLE = True
 except ImportError:
     CRYPTO_AVAILABLE = False
@@ -47,6 +48,14 @@ class PDFDigitalSigner:
         if not CRYPTO_AVAILABLE:
             raise PDFSignerError("Cryptography library not available")
     
+    def signing_certificate(self):
+        """Get and validate the active signing certificate."""
+        from .certificate_manager import CertificateManager
+        cert_manager = CertificateManager()
+        certificate = cert_manager.get_active_signing_certificate()
+        cert_manager.validate_certificate(certificate)
+        return certificate
+    
     def sign_pdf(self, pdf_content, document, user, certificate=None):
         """Apply digital signature to PDF content."""
         logger.info(f"Signing PDF for document {document.document_number} by user {user.username}")
@@ -54,32 +63,9 @@ class PDFDigitalSigner:
         try:
             # Get certificate if not provided
             if not certificate:
-                from .certificate_manager import CertificateManager
-                cert_manager = CertificateManager()
-                certificate = cert_manager.get_active_signing_certificate()
-                cert_manager.validate_certificate(certificate)
-            
-            # Create signature data
-            signature_data = {
-                'document_id': str(document.uuid),
-                'document_number': document.document_number,
-                'document_title': document.title,
-                'document_version': getattr(document, 'version_string', '1.0'),
-                'signed_by': user.get_full_name() or user.username,
-                'signed_at': timezone.now().isoformat(),
-                'signature_reason': 'Official EDMS document signature',
-                'signature_location': 'EDMS System',
-                'certificate_subject': certificate.subject_cn,
-                'certificate_issuer': certificate.issuer_name,
-                'certificate_serial': certificate.serial_number
-            }
+                certificate = self.signing_certificate()
             
-            if PYPDF2_AVAILABLE:
-                # Use PyPDF2 for proper PDF signing
-                signed_pdf = self._sign_pdf_with_pypdf2(pdf_content, signature_data, certificate)
-            else:
-                # Fallback to metadata embedding
-                signed_pdf = self._add_signature_metadata(pdf_content, signature_data, certificate)
+            signed_pdf = self._sign(pdf_content, document, user, certificate)
             
             logger.info(f"PDF signing completed successfully for document {document.document_number}")
             return signed_pdf
@@ -88,6 +74,66 @@ class PDFDigitalSigner:
             logger.error(f"PDF signing failed: {e}")
             raise PDFSignerError(f"PDF signing failed: {e}")
     
+    def sign_many(self, items, user, certificate=None):
+        """
+        Apply digital signatures to many PDFs with one certificate.
+        
+        The certificate is looked up and validated once, and its key is
+        loaded once for the whole batch. PDFs are signed as ``items`` are
+        consumed, so a batch is never held in memory at once.
+        
+        Args:
+            items: Iterable of (pdf_content, document) pairs
+            user: User applying the signatures
+            certificate: Signing certificate (default: the active one)
+            
+        Yields:
+            {'document', 'content', 'error'} dicts in input order; 'content'
+            is None for a PDF that could not be signed
+        """
+        try:
+            if not certificate:
+                certificate = self.signing_certificate()
+            signing_keys.get(certificate)
+        except Exception as e:
+            logger.error(f"Batch PDF signing failed: {e}")
+            raise PDFSignerError(f"Batch PDF signing failed: {e}")
+        
+        signed = total = 0
+        for pdf_content, document in items:
+            total += 1
+            try:
+                content, error = self._sign(pdf_content, document, user, certificate), None
+                signed += 1
+            except Exception as e:
+                logger.error(f"PDF signing failed for document {document.document_number}: {e}")
+                content, error = None, str(e)
+            yield {'document': document, 'content': content, 'error': error}
+        
+        logger.info(f"Batch PDF signing completed: {signed}/{total} signed with {certificate.name}")
+    
+    def _sign(self, pdf_content, document, user, certificate):
+        # Create signature data
+        signature_data = {
+            'document_id': str(document.uuid),
+            'document_number': document.document_number,
+            'document_title': document.title,
+            'document_version': getattr(document, 'version_string', '1.0'),
+            'signed_by': user.get_full_name() or user.username,
+            'signed_at': timezone.now().isoformat(),
+            'signature_reason': 'Official EDMS document signature',
+            'signature_location': 'EDMS System',
+            'certificate_subject': certificate.subject_cn,
+            'certificate_issuer': certificate.issuer_name,
+            'certificate_serial': certificate.serial_number
+        }
+        
+        if PYPDF2_AVAILABLE:
+            # Use PyPDF2 for proper PDF signing
+            return self._sign_pdf_with_pypdf2(pdf_content, signature_data, certificate)
+        # Fallback to metadata embedding
+        return self._add_signature_metadata(pdf_content, signature_data, certificate)
+    
     def _sign_pdf_with_pypdf2(self, pdf_content, signature_data, certificate):
         """Sign PDF using PyPDF2 with proper digital signature."""
         try:
@@ -162,9 +208,8 @@ class PDFDigitalSigner:
     def _create_signature_hash(self, signature_data, certificate):
         """Create cryptographic signature hash."""
         try:
-            # Load private key
-            private_key_pem = certificate.private_key_pem.encode('utf-8')
-            private_key = serialization.load_pem_private_key(private_key_pem, password=None)
+            # Deserialized once per certificate version
+            private_key = signing_keys.private_key(certificate)
             
             # Create message to sign
             message = f"{signature_data['document_id']}|{signature_data['signed_by']}|{signature_data['signed_at']}".encode('utf-8')
@@ -0,0 +1,107 @@
+"""
+Signing Key Cache
+
+Keeps the deserialized certificate and private key of each PDF signing
+certificate per process. Loading a PEM RSA private key checks the key and
+costs tens of milliseconds, far more than the signature itself, and
+signing a PDF loaded it up to twice (certificate validation and the
+signature hash).
+
+Entries are keyed by certificate id and stamped with a fingerprint of the
+certificate and key PEM, so a replaced key is loaded again on next use in
+every process. Saving or deleting a certificate evicts its entry in the
+process making the change; a deactivated certificate is refused and
+evicted wherever it is presented.
+"""
+
+import hashlib
+import logging
+import threading
+
+from cryptography import x509
+from cryptography.hazmat.primitives import serialization
+
+logger = logging.getLogger(__name__)
+
+
+class SigningKeyError(Exception):
+    """Exception for unusable signing key material."""
+    pass
+
+
+class SigningKey:
+    """Deserialized certificate and private key of one certificate version."""
+
+    __slots__ = ('certificate_id', 'fingerprint', 'certificate', 'private_key')
+
+    def __init__(self, certificate_id, fingerprint, certificate, private_key):
+        self.certificate_id = certificate_id
+        self.fingerprint = fingerprint
+        self.certificate = certificate
+        self.private_key = private_key
+
+
+def key_fingerprint(pdf_certificate):
+    """SHA-256 over the certificate and private key PEM of a ``PDFSigningCertificate``."""
+    digest = hashlib.sha256(pdf_certificate.certificate_pem.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(pdf_certificate.private_key_pem.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class SigningKeyCache:
+    """Process-wide cache of deserialized signing keys."""
+
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, pdf_certificate):
+        """
+        Deserialized key material of an active certificate.
+
+        Raises:
+            SigningKeyError: If the certificate is inactive or its PEM data
+                cannot be loaded
+        """
+        if not pdf_certificate.is_active:
+            self.evict(pdf_certificate.pk)
+            raise SigningKeyError(f"Certificate {pdf_certificate.name} is not active")
+
+        fingerprint = key_fingerprint(pdf_certificate)
+        entry = self._entries.get(pdf_certificate.pk)
+        if entry is not None and entry.fingerprint == fingerprint:
+            return entry
+
+        entry = self._load(pdf_certificate, fingerprint)
+        if pdf_certificate.pk is not None:
+            with self._lock:
+                self._entries[pdf_certificate.pk] = entry
+        return entry
+
+    @staticmethod
+    def _load(pdf_certificate, fingerprint):
+        try:
+            certificate = x509.load_pem_x509_certificate(pdf_certificate.certificate_pem.encode('utf-8'))
+            private_key = serialization.load_pem_private_key(
+                pdf_certificate.private_key_pem.encode('utf-8'), password=None
+            )
+        except Exception as e:
+            raise SigningKeyError(f"Cannot load key material of certificate {pdf_certificate.name}: {e}")
+        logger.info(f"Loaded signing key for certificate {pdf_certificate.name} ({fingerprint[:12]})")
+        return SigningKey(pdf_certificate.pk, fingerprint, certificate, private_key)
+
+    def private_key(self, pdf_certificate):
+        return self.get(pdf_certificate).private_key
+
+    def evict(self, certificate_id):
+        with self._lock:
+            self._entries.pop(certificate_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Service instance
+signing_keys = SigningKeyCache()
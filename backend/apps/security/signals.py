@@ -7,7 +7,8 @@ for encryption, decryption, and signature operations.
 
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import EncryptionKey, DigitalSignature, SecurityEvent
+from .models import EncryptionKey, DigitalSignature, SecurityEvent, PDFSigningCertificate
+from .services.signing_keys import signing_keys
 
 
 @receiver(post_save, sender=EncryptionKey)
@@ -65,4 +66,11 @@ def log_key_deletion(sender, instance, **kwargs):
             'key_id': instance.key_id,
             'was_active': instance.is_active,
         }
-    )
\ No newline at end of file
+    )
+
+
+@receiver(post_save, sender=PDFSigningCertificate)
+@receiver(post_delete, sender=PDFSigningCertificate)
+def evict_signing_key(sender, instance, **kwargs):
+    """Drop the cached key of a changed or deleted signing certificate."""
+    signing_keys.evict(instance.pk)
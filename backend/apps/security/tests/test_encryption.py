@@ -0,0 +1,61 @@
+"""
+Tests for streaming document encryption
+"""
+import hashlib
+import io
+import os
+
+import pytest
+
+from apps.security.encryption import DocumentEncryption, DEFAULT_SEGMENT_SIZE
+
+
+class TestStreamingEncryption:
+    """Segmented AES-256-GCM container"""
+
+    def setup_method(self):
+        self.encryption = DocumentEncryption()
+        self.data = os.urandom(DEFAULT_SEGMENT_SIZE * 3 + 123)
+
+    def _encrypt(self, data):
+        out = io.BytesIO()
+        result = self.encryption.encrypt_stream(io.BytesIO(data), out)
+        return out.getvalue(), result
+
+    def test_round_trip_and_plaintext_hash(self):
+        for data in (b'', self.data[:DEFAULT_SEGMENT_SIZE], self.data):
+            ciphertext, result = self._encrypt(data)
+            assert result['original_hash'] == hashlib.sha256(data).hexdigest()
+            assert self.encryption.plaintext_size(io.BytesIO(ciphertext)) == len(data)
+            assert b''.join(self.encryption.iter_decrypt(io.BytesIO(ciphertext))) == data
+
+    def test_range_decryption_reads_only_covering_segments(self):
+        ciphertext, _ = self._encrypt(self.data)
+        start, end = DEFAULT_SEGMENT_SIZE - 10, DEFAULT_SEGMENT_SIZE * 2 + 10
+
+        # Corrupting a segment outside the range does not affect the read
+        damaged = bytearray(ciphertext)
+        damaged[-1] ^= 0xFF
+        chunks = self.encryption.iter_decrypt(io.BytesIO(bytes(damaged)), start, end)
+        assert b''.join(chunks) == self.data[start:end]
+
+    def test_tampering_and_truncation_are_detected(self):
+        ciphertext, _ = self._encrypt(self.data)
+        damaged = bytearray(ciphertext)
+        damaged[len(damaged) // 2] ^= 0x01
+
+        for corrupt in (bytes(damaged), ciphertext[:-(DEFAULT_SEGMENT_SIZE + 16)]):
+            with pytest.raises(ValueError):
+                b''.join(self.encryption.iter_decrypt(io.BytesIO(corrupt)))
+
+    def test_encrypt_file_metadata_round_trip(self, tmp_path):
+        source = tmp_path / 'record.pdf'
+        source.write_bytes(self.data)
+
+        metadata = self.encryption.encrypt_file(str(source))
+        assert self.encryption.verify_file_integrity(metadata['encrypted_path'], metadata)
+
+        output = self.encryption.decrypt_file(
+            metadata['encrypted_path'], metadata, str(tmp_path / 'record.out')
+        )
+        assert open(output, 'rb').read() == self.data
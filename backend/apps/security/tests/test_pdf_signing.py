@@ -0,0 +1,128 @@
+"""
+Tests for cached signing keys and batch PDF signing
+"""
+import io
+
+import pytest
+from django.contrib.auth import get_user_model
+from PyPDF2 import PdfReader
+from reportlab.pdfgen import canvas
+
+from apps.documents.models import Document, DocumentSource, DocumentType
+from apps.documents.tasks import sign_official_pdfs
+from apps.security.services import signing_keys as signing_keys_module
+from apps.security.services.certificate_manager import CertificateManager
+from apps.security.services.pdf_signer import PDFDigitalSigner
+from apps.security.services.signing_keys import SigningKeyError, signing_keys
+
+User = get_user_model()
+
+
+def _pdf(pages=2):
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for page in range(pages):
+        pdf.drawString(72, 720, f'Page {page + 1}')
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+@pytest.mark.django_db
+class TestPDFSigning:
+    """Signing keys are deserialized once per certificate version"""
+
+    @pytest.fixture(autouse=True)
+    def certificate_storage(self, settings, tmp_path, monkeypatch):
+        settings.OFFICIAL_PDF_CONFIG = {**settings.OFFICIAL_PDF_CONFIG, 'CERTIFICATE_STORAGE_PATH': str(tmp_path)}
+        settings.MEDIA_ROOT = str(tmp_path)
+        signing_keys.clear()
+
+        self.key_loads = 0
+        load = signing_keys_module.serialization.load_pem_private_key
+
+        def counting_load(*args, **kwargs):
+            self.key_loads += 1
+            return load(*args, **kwargs)
+
+        monkeypatch.setattr(signing_keys_module.serialization, 'load_pem_private_key', counting_load)
+        yield
+        signing_keys.clear()
+
+    def setup_method(self):
+        self.user = User.objects.create_superuser(
+            username='signer', password='test123', first_name='Release', last_name='Manager'
+        )
+        self.certificate = CertificateManager().create_self_signed_certificate()
+        doc_type = DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.user)
+        doc_source = DocumentSource.objects.create(name='Digital', source_type='original_digital')
+        self.documents = [
+            Document.objects.create(
+                title=f'Procedure {index}', document_type=doc_type, document_source=doc_source,
+                author=self.user, status='APPROVED_PENDING_EFFECTIVE',
+            )
+            for index in range(3)
+        ]
+
+    def test_key_loaded_once_for_many_signatures(self):
+        signer = PDFDigitalSigner()
+        for document in self.documents:
+            signed = signer.sign_pdf(_pdf(), document, self.user)
+            assert PdfReader(io.BytesIO(signed)).metadata['/Author'] == 'Release Manager'
+
+        assert self.key_loads == 1
+
+    def test_changed_key_material_is_reloaded(self):
+        first = signing_keys.get(self.certificate)
+        assert signing_keys.get(self.certificate) is first
+
+        replacement = CertificateManager().create_self_signed_certificate(common_name='EDMS PDF Signer 2')
+        self.certificate.private_key_pem = replacement.private_key_pem
+        self.certificate.certificate_pem = replacement.certificate_pem
+
+        assert signing_keys.get(self.certificate).fingerprint != first.fingerprint
+        assert self.key_loads == 2
+
+    def test_deactivated_certificate_is_refused_and_evicted(self):
+        signing_keys.get(self.certificate)
+        self.certificate.is_active = False
+        self.certificate.save()
+
+        with pytest.raises(SigningKeyError):
+            signing_keys.get(self.certificate)
+
+        self.certificate.is_active = True
+        signing_keys.get(self.certificate)
+        assert self.key_loads == 2
+
+    def test_sign_many_shares_certificate_and_key(self, django_assert_max_num_queries):
+        items = [(_pdf(pages=index + 1), document) for index, document in enumerate(self.documents)]
+        signer = PDFDigitalSigner()
+
+        # Certificate lookup only, however many PDFs are signed
+        with django_assert_max_num_queries(2):
+            results = list(signer.sign_many(items, self.user))
+
+        assert [result['document'] for result in results] == self.documents
+        assert [len(PdfReader(io.BytesIO(result['content'])).pages) for result in results] == [1, 2, 3]
+        assert all(result['error'] is None for result in results)
+        assert self.key_loads == 1
+
+    def test_sign_official_pdfs_task(self):
+        from django.core.files.base import ContentFile
+        from django.core.files.storage import default_storage
+
+        items = []
+        for document in self.documents:
+            source = default_storage.save(f'unsigned/{document.pk}.pdf', ContentFile(_pdf()))
+            items.append({'document_id': document.pk, 'source': source, 'destination': f'signed/{document.pk}.pdf'})
+        items.append({'document_id': 999999, 'source': 'unsigned/missing.pdf', 'destination': 'signed/missing.pdf'})
+
+        result = sign_official_pdfs.apply(args=[items, self.user.pk]).get()
+
+        assert result == {'signed': 3, 'failed': []}
+        for document in self.documents:
+            with default_storage.open(f'signed/{document.pk}.pdf', 'rb') as signed:
+                metadata = PdfReader(signed).metadata
+            assert document.document_number in metadata['/Subject']
+        assert self.key_loads == 1
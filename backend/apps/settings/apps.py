@@ -4,4 +4,8 @@ from django.apps import AppConfig
 class SettingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.settings'
-    verbose_name = 'App Settings (S7)'
\ No newline at end of file
+    verbose_name = 'App Settings (S7)'
+    
+    def ready(self):
+        """Import signals when the app is ready."""
+        import apps.settings.signals  # noqa
@@ -0,0 +1,177 @@
+"""
+Compiled, process-cached feature toggle evaluation.
+
+``FeatureToggle.is_enabled_for_user`` used to read the toggle's targeted
+users and the user's roles from the database on every check. The engine
+here loads every toggle once into an in-process snapshot: the enabled
+flag, the active window as timestamps, the users targeted directly or
+through an active role assignment as one frozenset, and the rollout
+percentage. A check is then a dictionary lookup and a few comparisons,
+without any query; each user's outcome is memoized on the snapshot.
+
+The snapshot is stamped with a version token kept in the shared cache
+(Redis). Toggle, target user and role assignment changes replace the token
+when their transaction commits. Each process compares its snapshot's stamp
+with the shared token at most every ``FEATURE_TOGGLE_VERSION_CHECK_INTERVAL``
+seconds, and rebuilds the snapshot only when the token differs.
+"""
+
+import logging
+import threading
+import time
+import uuid
+import zlib
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'settings:feature_toggles:version'
+
+# Seconds between checks of the shared version token
+DEFAULT_CHECK_INTERVAL = 1.0
+
+
+def _rollout_seed(key):
+    return zlib.crc32(f'{key}:'.encode())
+
+
+def rollout_bucket(key, user_id, seed=None):
+    """Stable 0-99 bucket of a user for a toggle, the same in every process."""
+    return zlib.crc32(str(user_id).encode(), _rollout_seed(key) if seed is None else seed) % 100
+
+
+class CompiledToggle:
+    """One toggle reduced to what evaluation needs."""
+
+    __slots__ = ('key', 'enabled', 'start', 'end', 'user_ids', 'rollout_percentage', 'seed', 'decisions')
+
+    def __init__(self, key, enabled, start, end, user_ids, rollout_percentage):
+        self.key = key
+        self.enabled = enabled
+        self.start = start
+        self.end = end
+        self.user_ids = user_ids
+        self.rollout_percentage = rollout_percentage
+        self.seed = _rollout_seed(key)
+        # Targeting and rollout outcome per user id, memoized for the snapshot's lifetime
+        self.decisions = {}
+
+    def _decide(self, user_id):
+        decision = user_id in self.user_ids or (
+            self.rollout_percentage > 0 and rollout_bucket(self.key, user_id, self.seed) < self.rollout_percentage
+        )
+        self.decisions[user_id] = decision
+        return decision
+
+    def evaluate(self, user_id):
+        if not self.enabled or user_id is None:
+            return False
+        if self.start is not None or self.end is not None:
+            now = time.time()
+            if (self.start is not None and now < self.start) or (self.end is not None and now > self.end):
+                return False
+        decision = self.decisions.get(user_id)
+        return self._decide(user_id) if decision is None else decision
+
+
+def compile_toggles():
+    """Compile every toggle from the database (three queries)."""
+    from apps.users.models import UserRole
+    from .models import FeatureToggle
+
+    rows = list(FeatureToggle.objects.values(
+        'id', 'key', 'is_enabled', 'start_date', 'end_date', 'target_roles', 'rollout_percentage'
+    ))
+
+    users_by_toggle = defaultdict(set)
+    for toggle_id, user_id in FeatureToggle.target_users.through.objects.values_list('featuretoggle_id', 'user_id'):
+        users_by_toggle[toggle_id].add(user_id)
+
+    role_names = {name for row in rows for name in (row['target_roles'] or [])}
+    users_by_role = defaultdict(set)
+    if role_names:
+        assignments = UserRole.objects.filter(
+            role__name__in=role_names, is_active=True
+        ).values_list('role__name', 'user_id')
+        for role_name, user_id in assignments:
+            users_by_role[role_name].add(user_id)
+
+    toggles = {}
+    for row in rows:
+        user_ids = set(users_by_toggle[row['id']])
+        for role_name in row['target_roles'] or []:
+            user_ids |= users_by_role[role_name]
+        toggles[row['key']] = CompiledToggle(
+            key=row['key'],
+            enabled=row['is_enabled'],
+            start=row['start_date'].timestamp() if row['start_date'] else None,
+            end=row['end_date'].timestamp() if row['end_date'] else None,
+            user_ids=frozenset(user_ids),
+            rollout_percentage=row['rollout_percentage'],
+        )
+    return toggles
+
+
+class FeatureToggleEngine:
+    """Feature toggle checks against a process-wide compiled snapshot."""
+
+    def __init__(self):
+        self._toggles = None
+        self._version = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def check_interval(self):
+        return getattr(settings, 'FEATURE_TOGGLE_VERSION_CHECK_INTERVAL', DEFAULT_CHECK_INTERVAL)
+
+    def _shared_version(self):
+        try:
+            version = cache.get(VERSION_KEY)
+            if version is None:
+                cache.add(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+                version = cache.get(VERSION_KEY)
+            return version
+        except Exception as e:
+            logger.warning(f"Feature toggle version unavailable: {e}")
+            return None
+
+    def _refresh(self):
+        with self._lock:
+            if self._toggles is not None and time.monotonic() < self._next_check:
+                return  # Refreshed by another thread meanwhile
+            # Read the version before the toggles: a change committing in
+            # between leaves the snapshot stamped as stale
+            version = self._shared_version()
+            if self._toggles is None or version is None or version != self._version:
+                self._toggles = compile_toggles()
+                self._version = version
+            self._next_check = time.monotonic() + self.check_interval
+
+    def is_enabled(self, key, user=None):
+        """Whether toggle ``key`` is on for ``user``; unknown toggles are off."""
+        if self._toggles is None or time.monotonic() >= self._next_check:
+            self._refresh()
+        toggle = self._toggles.get(key)
+        if toggle is None:
+            return False
+        return toggle.evaluate(getattr(user, 'pk', None))
+
+    def invalidate(self):
+        """Make every process recompile its snapshot once the current transaction commits."""
+        def bump():
+            try:
+                cache.set(VERSION_KEY, uuid.uuid4().hex, timeout=None)
+            except Exception as e:
+                logger.warning(f"Feature toggle version not bumped: {e}")
+            self._next_check = 0.0
+
+        transaction.on_commit(bump)
+
+
+# Service instance
+feature_toggles = FeatureToggleEngine()
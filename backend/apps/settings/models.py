@@ -10,7 +10,6 @@ import json
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils.translation import gettext_lazy as _
-from django.utils import timezone
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 
@@ -384,38 +383,14 @@ class FeatureToggle(models.Model):
         return f"{self.key} ({'ON' if self.is_enabled else 'OFF'})"
     
     def is_enabled_for_user(self, user: User) -> bool:
-        """Check if feature is enabled for a specific user."""
-        # Check if feature is globally disabled
-        if not self.is_enabled:
-            return False
+        """
+        Check if feature is enabled for a specific user.
         
-        # Check date range
-        now = timezone.now()
-        if self.start_date and now < self.start_date:
-            return False
-        if self.end_date and now > self.end_date:
-            return False
-        
-        # Check user targeting
-        if self.target_users.filter(id=user.id).exists():
-            return True
-        
-        # Check role targeting
-        if self.target_roles:
-            user_roles = user.user_roles.filter(
-                role__name__in=self.target_roles,
-                is_active=True
-            )
-            if user_roles.exists():
-                return True
-        
-        # Check percentage rollout
-        if self.rollout_percentage > 0:
-            # Use user ID hash for consistent rollout
-            user_hash = hash(str(user.id) + self.key) % 100
-            return user_hash < self.rollout_percentage
-        
-        return False
+        Evaluated against the compiled toggle snapshot; see
+        apps.settings.feature_toggles.
+        """
+        from .feature_toggles import feature_toggles
+        return feature_toggles.is_enabled(self.key, user)
 
 
 class ConfigurationHistory(models.Model):
@@ -562,32 +537,34 @@ class NotificationTemplate(models.Model):
     def __str__(self):
         return f"{self.name} ({self.template_type} - {self.event_type})"
     
+    @property
+    def compiled(self):
+        """Parsed templates of this version, cached per process."""
+        from .notification_templates import compiled_templates
+        return compiled_templates.get(self)
+    
+    @property
+    def declared_variables(self) -> frozenset:
+        """Context variables the subject, body and HTML templates use."""
+        return self.compiled.variables
+    
     def render_template(self, context: dict) -> dict:
         """Render template with provided context variables."""
-        from django.template import Template, Context
+        try:
+            return self.compiled.render(context)
+        except Exception as e:
+            raise ValueError(f"Template rendering failed: {str(e)}")
+    
+    def render_many(self, contexts, validate: bool = False) -> list:
+        """
+        Render template against many contexts, e.g. one per reminder recipient.
         
+        With ``validate``, contexts missing declared variables raise
+        ValueError; see ``CompiledNotificationTemplate.render_many``.
+        """
         try:
-            # Render subject
-            subject = ''
-            if self.subject_template:
-                subject_tmpl = Template(self.subject_template)
-                subject = subject_tmpl.render(Context(context))
-            
-            # Render body
-            body_tmpl = Template(self.body_template)
-            body = body_tmpl.render(Context(context))
-            
-            # Render HTML if available
-            html = ''
-            if self.html_template:
-                html_tmpl = Template(self.html_template)
-                html = html_tmpl.render(Context(context))
-            
-            return {
-                'subject': subject,
-                'body': body,
-                'html': html
-            }
-            
+            return self.compiled.render_many(contexts, validate=validate)
+        except ValueError:
+            raise
         except Exception as e:
             raise ValueError(f"Template rendering failed: {str(e)}")
\ No newline at end of file
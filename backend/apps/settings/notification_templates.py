@@ -0,0 +1,175 @@
+"""
+Compiled notification templates.
+
+``NotificationTemplate.render_template`` parsed the subject, body and HTML
+strings into Django ``Template`` objects on every notification, so a
+scheduler batch of reminders re-parsed the same template thousands of
+times. ``compiled_templates`` keeps the parsed templates per process,
+keyed by template id and ``updated_at`` (an edited template gets a new
+key), in a bounded LRU.
+
+A compiled template also exposes the variables it declares: the root names
+used in ``{{ }}`` output, tag arguments and filter arguments, minus loop
+and ``with`` locals. Callers can validate a batch's context keys once
+instead of discovering blanks in the rendered messages.
+"""
+
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.template import Context, Template
+from django.template.base import FilterExpression, Node, Variable, VariableNode
+from django.template.defaulttags import ForNode, IfNode, TemplateLiteral, WithNode
+
+# Compiled templates kept per process
+DEFAULT_CACHE_SIZE = 256
+
+# Names Django templates provide themselves
+BUILTIN_VARIABLES = frozenset({'forloop', 'block', 'True', 'False', 'None'})
+
+
+def _condition_expressions(condition):
+    if condition is None:
+        return
+    if isinstance(condition, TemplateLiteral):
+        yield condition.value
+        return
+    yield from _condition_expressions(getattr(condition, 'first', None))
+    yield from _condition_expressions(getattr(condition, 'second', None))
+
+
+def _node_expressions(node):
+    if isinstance(node, VariableNode):
+        yield node.filter_expression
+    elif isinstance(node, ForNode):
+        yield node.sequence
+    elif isinstance(node, IfNode):
+        for condition, _ in node.conditions_nodelists:
+            yield from _condition_expressions(condition)
+    elif isinstance(node, WithNode):
+        yield from node.extra_context.values()
+
+
+def _expression_roots(expression):
+    if not isinstance(expression, FilterExpression):
+        return
+    if isinstance(expression.var, Variable) and expression.var.lookups:
+        yield expression.var.lookups[0]
+    for _, arguments in expression.filters:
+        for is_lookup, argument in arguments:
+            if is_lookup and argument.lookups:
+                yield argument.lookups[0]
+
+
+def declared_variables(template):
+    """Root context names a Django ``Template`` reads."""
+    names, local = set(), set()
+    for node in template.nodelist.get_nodes_by_type(Node):
+        for expression in _node_expressions(node):
+            names.update(_expression_roots(expression))
+        if isinstance(node, ForNode):
+            local.update(node.loopvars)
+        elif isinstance(node, WithNode):
+            local.update(node.extra_context)
+    return frozenset(names - local - BUILTIN_VARIABLES)
+
+
+class CompiledNotificationTemplate:
+    """Parsed subject, body and HTML templates of one ``NotificationTemplate`` version."""
+
+    def __init__(self, subject_template, body_template, html_template):
+        self.subject = Template(subject_template) if subject_template else None
+        self.body = Template(body_template)
+        self.html = Template(html_template) if html_template else None
+        self.variables = frozenset().union(*(
+            declared_variables(template) for template in (self.subject, self.body, self.html) if template
+        ))
+
+    def missing_variables(self, context):
+        """Declared variables ``context`` does not provide."""
+        return self.variables.difference(context)
+
+    def render(self, context):
+        """Render subject, body and HTML against one context."""
+        return self._render(Context(context))
+
+    def render_many(self, contexts, validate=False):
+        """
+        Render the template against many contexts.
+
+        Args:
+            contexts: Iterable of context dictionaries
+            validate: Raise ValueError when a context lacks declared
+                variables; each distinct set of context keys is checked once
+
+        Returns:
+            List of ``{'subject', 'body', 'html'}`` dictionaries
+        """
+        checked = set()
+        base = Context()
+        rendered = []
+        for context in contexts:
+            if validate:
+                keys = frozenset(context)
+                if keys not in checked:
+                    missing = self.variables - keys
+                    if missing:
+                        raise ValueError(f"Missing template variables: {', '.join(sorted(missing))}")
+                    checked.add(keys)
+            with base.push(context):
+                rendered.append(self._render(base))
+        return rendered
+
+    def _render(self, context):
+        return {
+            'subject': self.subject.render(context) if self.subject else '',
+            'body': self.body.render(context),
+            'html': self.html.render(context) if self.html else '',
+        }
+
+
+class CompiledTemplateCache:
+    """Process-wide LRU of compiled notification templates."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def max_size(self):
+        return getattr(settings, 'NOTIFICATION_TEMPLATE_CACHE_SIZE', DEFAULT_CACHE_SIZE)
+
+    def get(self, notification_template):
+        """Compiled form of ``notification_template``, parsing it on first use of each version."""
+        if notification_template.pk is None:
+            return self._compile(notification_template)
+        key = (notification_template.pk, notification_template.updated_at)
+        with self._lock:
+            compiled = self._entries.get(key)
+            if compiled is not None:
+                self._entries.move_to_end(key)
+                return compiled
+
+        compiled = self._compile(notification_template)
+        with self._lock:
+            self._entries[key] = compiled
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return compiled
+
+    @staticmethod
+    def _compile(notification_template):
+        return CompiledNotificationTemplate(
+            notification_template.subject_template,
+            notification_template.body_template,
+            notification_template.html_template,
+        )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Service instance
+compiled_templates = CompiledTemplateCache()
@@ -0,0 +1,29 @@
+"""
+Signal handlers for App Settings (S7).
+
+Replace the feature toggle snapshot version whenever a toggle, its target
+users or a role assignment changes.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .feature_toggles import feature_toggles
+from .models import FeatureToggle
+
+
+@receiver(post_save, sender=FeatureToggle)
+@receiver(post_delete, sender=FeatureToggle)
+@receiver(post_save, sender='users.Role')
+@receiver(post_save, sender='users.UserRole')
+@receiver(post_delete, sender='users.UserRole')
+def invalidate_feature_toggles(sender, **kwargs):
+    """Recompile feature toggles after a toggle or role assignment change."""
+    feature_toggles.invalidate()
+
+
+@receiver(m2m_changed, sender=FeatureToggle.target_users.through)
+def invalidate_feature_toggle_targets(sender, action, **kwargs):
+    """Recompile feature toggles after target users change."""
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        feature_toggles.invalidate()
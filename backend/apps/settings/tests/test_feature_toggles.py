@@ -0,0 +1,104 @@
+"""
+Tests for compiled feature toggle evaluation
+"""
+import time
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+
+from apps.settings.feature_toggles import VERSION_KEY, feature_toggles, rollout_bucket
+from apps.settings.models import FeatureToggle
+from apps.users.models import Role, UserRole
+
+User = get_user_model()
+
+
+@pytest.fixture(autouse=True)
+def local_cache(settings):
+    settings.CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+    cache.clear()
+    feature_toggles._next_check = 0.0
+
+
+@pytest.mark.django_db
+class TestFeatureToggleEngine:
+    """Toggles evaluated in memory from a versioned snapshot"""
+
+    def setup_method(self):
+        self.admin = User.objects.create_user(username='toggle_admin', password='test123')
+        self.targeted = User.objects.create_user(username='toggle_targeted', password='test123')
+        self.reviewer = User.objects.create_user(username='toggle_reviewer', password='test123')
+        self.other = User.objects.create_user(username='toggle_other', password='test123')
+        self.role = Role.objects.create(name='Document Reviewer', module='O1', permission_level='review')
+        UserRole.objects.create(user=self.reviewer, role=self.role)
+
+    def _toggle(self, key, **kwargs):
+        kwargs.setdefault('is_enabled', True)
+        return FeatureToggle.objects.create(
+            key=key, name=key, description='', toggle_type='RELEASE', created_by=self.admin, **kwargs
+        )
+
+    def test_user_role_and_date_targeting(self):
+        toggle = self._toggle('new_viewer', target_roles=['Document Reviewer'])
+        toggle.target_users.add(self.targeted)
+        self._toggle('disabled', is_enabled=False).target_users.add(self.targeted)
+        self._toggle('expired', end_date=timezone.now() - timedelta(days=1)).target_users.add(self.targeted)
+        self._toggle('scheduled', start_date=timezone.now() + timedelta(days=1)).target_users.add(self.targeted)
+
+        assert toggle.is_enabled_for_user(self.targeted)
+        assert toggle.is_enabled_for_user(self.reviewer)
+        assert not toggle.is_enabled_for_user(self.other)
+        assert not any(
+            feature_toggles.is_enabled(key, self.targeted) for key in ('disabled', 'expired', 'scheduled', 'unknown')
+        )
+
+    def test_rollout_is_stable_and_proportional(self):
+        self._toggle('gradual', rollout_percentage=30)
+        User.objects.bulk_create(User(username=f'rollout_{index}') for index in range(400))
+        users = list(User.objects.filter(username__startswith='rollout_'))
+
+        enabled = [user for user in users if feature_toggles.is_enabled('gradual', user)]
+
+        assert all(rollout_bucket('gradual', user.pk) < 30 for user in enabled)
+        assert 0.2 < len(enabled) / len(users) < 0.4
+
+    def test_steady_state_checks_are_query_free(self, django_assert_num_queries):
+        self._toggle('new_viewer', target_roles=['Document Reviewer'], rollout_percentage=50)
+        feature_toggles.is_enabled('new_viewer', self.reviewer)
+
+        with django_assert_num_queries(0):
+            checks = 100_000
+            start = time.perf_counter()
+            for _ in range(checks):
+                feature_toggles.is_enabled('new_viewer', self.other)
+            elapsed = time.perf_counter() - start
+
+        assert elapsed / checks < 5e-6  # Well below a microsecond untraced; coverage slows the loop
+
+    def test_changes_recompile_after_commit(self, django_capture_on_commit_callbacks, django_assert_num_queries):
+        toggle = self._toggle('new_viewer')
+        assert not feature_toggles.is_enabled('new_viewer', self.targeted)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            toggle.target_users.add(self.targeted)
+        assert feature_toggles.is_enabled('new_viewer', self.targeted)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            UserRole.objects.create(user=self.other, role=self.role)
+            toggle.target_roles = ['Document Reviewer']
+            toggle.save()
+        assert feature_toggles.is_enabled('new_viewer', self.other)
+
+    def test_version_change_from_another_process(self, settings):
+        settings.FEATURE_TOGGLE_VERSION_CHECK_INTERVAL = 0
+        self._toggle('new_viewer')
+        assert not feature_toggles.is_enabled('new_viewer', self.other)
+
+        FeatureToggle.objects.filter(key='new_viewer').update(rollout_percentage=100)  # No signal
+        assert not feature_toggles.is_enabled('new_viewer', self.other)
+
+        cache.set(VERSION_KEY, 'bumped elsewhere', timeout=None)
+        assert feature_toggles.is_enabled('new_viewer', self.other)
@@ -0,0 +1,105 @@
+"""
+Tests for compiled notification templates
+"""
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from apps.settings import notification_templates
+from apps.settings.models import NotificationTemplate
+from apps.settings.notification_templates import compiled_templates
+
+User = get_user_model()
+
+BODY = (
+    '{% with owner=document.author %}{{ owner }}{% endwith %} '
+    '{% for item in open_items %}{{ item|default:fallback }}{{ forloop.counter }}{% endfor %}'
+    '{% if days_overdue > 0 and not muted %}{{ days_overdue }} days overdue{% endif %}'
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_template_cache():
+    compiled_templates.clear()
+
+
+@pytest.mark.django_db
+class TestCompiledNotificationTemplates:
+    """Templates parsed once per version and rendered in batches"""
+
+    def setup_method(self):
+        self.admin = User.objects.create_user(username='template_admin', password='test123')
+        self.template = NotificationTemplate.objects.create(
+            name='Review reminder',
+            template_type='EMAIL',
+            event_type='WORKFLOW_OVERDUE',
+            subject_template='Review due: {{ document_number }}',
+            body_template='Dear {{ recipient_name }}, {{ document_number }} is due.',
+            created_by=self.admin,
+        )
+
+    def _count_compiles(self, monkeypatch):
+        compiles = []
+        original = notification_templates.CompiledNotificationTemplate
+
+        def compile_template(*args):
+            compiles.append(args)
+            return original(*args)
+
+        monkeypatch.setattr(notification_templates, 'CompiledNotificationTemplate', compile_template)
+        return compiles
+
+    def test_declared_variables(self):
+        self.template.body_template = BODY
+        self.template.save()
+
+        assert self.template.declared_variables == {
+            'document_number', 'document', 'open_items', 'fallback', 'days_overdue', 'muted'
+        }
+
+    def test_parsed_once_per_version(self, monkeypatch):
+        compiles = self._count_compiles(monkeypatch)
+        context = {'recipient_name': 'Alex', 'document_number': 'SOP-2026-0001'}
+
+        first = NotificationTemplate.objects.get(pk=self.template.pk).render_template(context)
+        second = NotificationTemplate.objects.get(pk=self.template.pk).render_template(context)
+        assert first == second == {
+            'subject': 'Review due: SOP-2026-0001', 'body': 'Dear Alex, SOP-2026-0001 is due.', 'html': ''
+        }
+        assert len(compiles) == 1
+
+        self.template.body_template = 'Reminder for {{ recipient_name }}'
+        self.template.save()
+        assert self.template.render_template(context)['body'] == 'Reminder for Alex'
+        assert len(compiles) == 2
+
+    def test_render_many_validates_each_key_set_once(self):
+        contexts = [
+            {'recipient_name': f'Reviewer {index}', 'document_number': f'SOP-2026-{index:04d}'}
+            for index in range(3)
+        ]
+
+        rendered = self.template.render_many(contexts, validate=True)
+
+        assert rendered == [self.template.render_template(context) for context in contexts]
+        with pytest.raises(ValueError, match='recipient_name'):
+            self.template.render_many(contexts + [{'document_number': 'SOP-2026-0009'}], validate=True)
+        assert self.template.render_many([{}])[0]['body'] == 'Dear ,  is due.'
+
+    def test_ten_thousand_reminders_parse_once(self, monkeypatch):
+        compiles = self._count_compiles(monkeypatch)
+        contexts = [
+            {'recipient_name': f'Reviewer {index}', 'document_number': f'SOP-2026-{index:04d}'}
+            for index in range(10_000)
+        ]
+
+        rendered = self.template.render_many(contexts, validate=True)
+
+        assert len(rendered) == 10_000 and len(compiles) == 1
+        assert rendered[9999]['subject'] == 'Review due: SOP-2026-9999'
+
+    def test_benchmark_command(self, capsys):
+        call_command('benchmark_notification_templates', renders=50)
+
+        output = capsys.readouterr().out
+        assert 'for 50 reminders' in output and 'faster than parsing per reminder' in output
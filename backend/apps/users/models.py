@@ -11,8 +11,10 @@ from django.db import models
 from django.core.validators import RegexValidator
 from django.utils.translation import gettext_lazy as _
 
+from apps.core.change_capture import ChangeCaptureMixin
 
-class User(AbstractUser):
+
+class User(ChangeCaptureMixin, AbstractUser):
     """
     Custom User model extending Django's AbstractUser.
     
@@ -5,7 +5,7 @@ Handles automatic creation of audit records, role assignments,
 and other user lifecycle events for compliance tracking.
 """
 
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth.signals import user_logged_in, user_logged_out
 from django.utils import timezone
@@ -13,6 +13,13 @@ from django.utils import timezone
 from .models import User, UserRole
 # UserSession moved to audit app
 
+# User fields recorded in audit trail field changes
+TRACKED_FIELDS = [
+    'username', 'email', 'first_name', 'last_name',
+    'is_active', 'is_staff', 'is_superuser', 'is_validated',
+    'department', 'position', 'phone_number'
+]
+
 
 @receiver(post_save, sender=User)
 def create_user_audit_record(sender, instance, created, **kwargs):
@@ -24,7 +31,10 @@ def create_user_audit_record(sender, instance, created, **kwargs):
         content_object=instance,
         action=action,
         user=getattr(instance, '_current_user', None),
-        field_changes=getattr(instance, '_field_changes', {}),
+        field_changes={
+            field: {'old': old, 'new': new}
+            for field, (old, new) in instance.field_changes.items() if field in TRACKED_FIELDS
+        },
         metadata={
             'model': 'User',
             'user_uuid': str(instance.uuid),
@@ -127,35 +137,3 @@ def update_logout_session(sender, request, user, **kwargs):
             ])
         except UserSession.DoesNotExist:
             pass
-
-
-@receiver(pre_save, sender=User)
-def track_user_field_changes(sender, instance, **kwargs):
-    """Track field changes for audit purposes."""
-    if instance.pk:
-        try:
-            old_instance = User.objects.get(pk=instance.pk)
-            changes = {}
-            
-            # Track specific field changes
-            tracked_fields = [
-                'username', 'email', 'first_name', 'last_name',
-                'is_active', 'is_staff', 'is_superuser', 'is_validated',
-                'department', 'position', 'phone_number'
-            ]
-            
-            for field in tracked_fields:
-                old_value = getattr(old_instance, field, None)
-                new_value = getattr(instance, field, None)
-                if old_value != new_value:
-                    changes[field] = {
-                        'old': old_value,
-                        'new': new_value
-                    }
-            
-            # Store changes on instance for use in post_save signal
-            instance._field_changes = changes
-            
-        except User.DoesNotExist:
-            # New user, no changes to track
-            instance._field_changes = {}
\ No newline at end of file
@@ -11,7 +11,8 @@ from django.urls import reverse
 from django.utils.safestring import mark_safe
 from .models import (
     WorkflowType, DocumentState, DocumentWorkflow, DocumentTransition,
-    WorkflowInstance, WorkflowRule, WorkflowNotification, WorkflowTemplate
+    WorkflowInstance, WorkflowRule, WorkflowNotification, WorkflowTemplate,
+    WorkflowInboxTask
     # WorkflowTask removed - using document filters instead
 )
 
@@ -208,6 +209,17 @@ class WorkflowInstanceAdmin(admin.ModelAdmin):
 # WorkflowTaskAdmin removed - using document filters instead of separate task management
 
 
+@admin.register(WorkflowInboxTask)
+class WorkflowInboxTaskAdmin(admin.ModelAdmin):
+    """Read-mostly view of the task inbox projection."""
+    
+    list_display = ['name', 'assignee', 'task_type', 'priority', 'status', 'due_date', 'created_at']
+    list_filter = ['status', 'task_type', 'priority']
+    search_fields = ['name', 'assignee__username', 'document__document_number']
+    readonly_fields = ['uuid', 'workflow', 'document', 'state_code', 'created_at', 'completed_at']
+    list_select_related = ['assignee']
+
+
 @admin.register(WorkflowRule)
 class WorkflowRuleAdmin(admin.ModelAdmin):
     """Admin interface for WorkflowRule management."""
@@ -6,20 +6,97 @@ document type, criticality level, and workload.
 """
 
 from django.contrib.auth import get_user_model
-from django.db.models import Q, Count
+from django.db.models import BooleanField, Case, Count, Exists, F, OuterRef, Prefetch, Q, Value, When
+from django.db.models.functions import Coalesce, Concat, NullIf, Trim
 from django.contrib.auth.models import Group
 from typing import List, Dict, Any
 
-from .models import DocumentWorkflow
-
 User = get_user_model()
 
 
+# Workflow states counting as an active task of the current assignee
+APPROVAL_TASK_STATES = ['UNDER_APPROVAL', 'PENDING_APPROVAL', 'REVIEWED']
+REVIEW_TASK_STATES = ['UNDER_REVIEW', 'PENDING_REVIEW']
+
+# Users are available below MAX_ACTIVE_* active tasks and recommended up to
+# RECOMMENDED_MAX_*
+MAX_ACTIVE_APPROVALS = 6
+MAX_ACTIVE_REVIEWS = 10
+RECOMMENDED_MAX_APPROVALS = 2
+RECOMMENDED_MAX_REVIEWS = 3
+
+
+def _in_group(name):
+    return Exists(User.groups.through.objects.filter(user_id=OuterRef('pk'), group__name=name))
+
+
+def _has_permission(codename):
+    return Exists(
+        User.user_permissions.through.objects.filter(user_id=OuterRef('pk'), permission__codename=codename)
+    )
+
+
 class ApproverSelectionService:
     """
     Service for selecting eligible approvers based on strict role validation.
+    
+    Candidate lists come from one annotated query: group and permission
+    flags as EXISTS subqueries, active tasks as a conditional COUNT, and the
+    recommendation order as ORDER BY. Group names are prefetched, for two
+    queries whatever the number of candidates.
     """
     
+    def _candidates(self, flags: Dict[str, Any], eligible: Q, task_states: List[str],
+                    recommended_max: int, available_below: int, exclude_user: User = None):
+        """
+        Active users matching ``eligible``, annotated and in recommendation order.
+        
+        Annotations: the ``flags``, ``active_tasks``, ``is_available``,
+        ``is_recommended`` and ``full_name``.
+        """
+        queryset = User.objects.filter(is_active=True).annotate(**flags).filter(eligible)
+        if exclude_user:
+            queryset = queryset.exclude(id=exclude_user.id)
+        
+        return queryset.annotate(
+            active_tasks=Count(
+                'assigned_document_workflows',
+                filter=Q(assigned_document_workflows__current_state__code__in=task_states)
+            ),
+        ).annotate(
+            is_available=Case(
+                When(active_tasks__lt=available_below, then=Value(True)),
+                default=Value(False), output_field=BooleanField()
+            ),
+            is_recommended=Case(
+                When(active_tasks__lte=recommended_max, active_tasks__lt=available_below, then=Value(True)),
+                default=Value(False), output_field=BooleanField()
+            ),
+            full_name=Coalesce(
+                NullIf(Trim(Concat('first_name', Value(' '), 'last_name')), Value('')),
+                'username'
+            ),
+        ).order_by(
+            # Recommended first, then available, then lower workload, then by name
+            F('is_recommended').desc(), F('is_available').desc(), 'active_tasks', 'full_name'
+        ).prefetch_related(Prefetch('groups', queryset=Group.objects.only('id', 'name')))
+    
+    def _candidate_info(self, user: User) -> Dict[str, Any]:
+        return {
+            'id': user.id,
+            'username': user.username,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'email': user.email,
+            'full_name': user.full_name,
+            'is_available': user.is_available,
+            'department': getattr(user, 'department', None) or 'Unknown',
+            'is_recommended': user.is_recommended,
+            # Additional metadata
+            'user_groups': [group.name for group in user.groups.all()],
+            'last_login': user.last_login.isoformat() if user.last_login else None
+        }
+    
     def get_eligible_approvers(self, document_type: str = None, 
                              criticality: str = 'normal',
                              exclude_user: User = None) -> List[Dict[str, Any]]:
@@ -34,77 +111,55 @@ class ApproverSelectionService:
         Returns:
             List of eligible approver data dictionaries
         """
-        # Base query: Users who are in Document Approvers group OR have explicit approval permission
-        approvers_query = User.objects.filter(
-            Q(groups__name='Document Approvers') |
-            Q(groups__name='Senior Document Approvers') |
-            Q(user_permissions__codename='can_approve_document') |
-            Q(is_superuser=True)
-        ).filter(
-            is_active=True
-        ).distinct()
+        flags = {
+            'in_approvers': _in_group('Document Approvers'),
+            'in_senior_approvers': _in_group('Senior Document Approvers'),
+            'can_approve': _has_permission('can_approve_document'),
+            'can_senior_approve': _has_permission('can_senior_approve_document'),
+        }
+        # Users who are in an approvers group OR have explicit approval permission
+        can_approve = (
+            Q(in_approvers=True) | Q(in_senior_approvers=True) | Q(can_approve=True) | Q(is_superuser=True)
+        )
+        can_senior_approve = Q(in_senior_approvers=True) | Q(can_senior_approve=True) | Q(is_superuser=True)
         
         # For high/critical documents, require senior approval permissions
+        eligible = can_approve
         if criticality in ['high', 'critical']:
-            approvers_query = approvers_query.filter(
-                Q(groups__name='Senior Document Approvers') |
-                Q(user_permissions__codename='can_senior_approve_document') |
-                Q(is_superuser=True)
-            )
+            eligible &= can_senior_approve
         
-        # Exclude specific user (e.g., document author)
-        if exclude_user:
-            approvers_query = approvers_query.exclude(id=exclude_user.id)
+        approvers = self._candidates(
+            flags, eligible, APPROVAL_TASK_STATES,
+            recommended_max=RECOMMENDED_MAX_APPROVALS, available_below=MAX_ACTIVE_APPROVALS,
+            exclude_user=exclude_user
+        )
         
-        # Add workload and availability information
         approver_data = []
-        for user in approvers_query:
-            # Count active approval tasks
-            active_approvals = DocumentWorkflow.objects.filter(
-                current_assignee=user,
-                current_state__code__in=['UNDER_APPROVAL', 'PENDING_APPROVAL', 'REVIEWED']
-            ).count()
-            
-            # Determine availability and workload status
-            workload_status = self._calculate_workload_status(active_approvals)
-            is_available = self._is_user_available(user, active_approvals)
-            
-            # Get user's approval level
-            approval_level = self._get_approval_level(user)
+        for user in approvers:
+            if user.is_superuser:
+                approval_level = 'superuser'
+            elif user.in_senior_approvers:
+                approval_level = 'senior'
+            elif user.in_approvers:
+                approval_level = 'standard'
+            else:
+                approval_level = 'none'
             
-            # Get department info if available
-            department = getattr(user, 'department', None) or 'Unknown'
+            if criticality in ['high', 'critical']:
+                can_approve_criticality = user.in_senior_approvers or user.can_senior_approve or user.is_superuser
+            else:
+                can_approve_criticality = True  # Every candidate holds standard approval rights
             
-            approver_info = {
-                'id': user.id,
-                'username': user.username,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'email': user.email,
-                'full_name': f"{user.first_name} {user.last_name}".strip() or user.username,
-                'active_approvals': active_approvals,
-                'workload_status': workload_status,
-                'is_available': is_available,
+            approver_info = self._candidate_info(user)
+            approver_info.update({
+                'active_approvals': user.active_tasks,
+                'workload_status': self._calculate_workload_status(user.active_tasks),
                 'approval_level': approval_level,
-                'department': department,
-                'can_approve_criticality': self._can_approve_criticality(user, criticality),
-                'is_recommended': active_approvals <= 2 and is_available,
-                # Additional metadata
-                'user_groups': list(user.groups.values_list('name', flat=True)),
+                'can_approve_criticality': can_approve_criticality,
                 'is_superuser': user.is_superuser,
-                'last_login': user.last_login.isoformat() if user.last_login else None
-            }
-            
+            })
             approver_data.append(approver_info)
         
-        # Sort by recommendation, then availability, then workload
-        approver_data.sort(key=lambda x: (
-            not x['is_recommended'],  # Recommended first
-            not x['is_available'],    # Available first  
-            x['active_approvals'],    # Lower workload first
-            x['full_name']           # Alphabetical by name
-        ))
-        
         return approver_data
     
     def get_eligible_reviewers(self, document_type: str = None,
@@ -119,65 +174,34 @@ class ApproverSelectionService:
         Returns:
             List of eligible reviewer data dictionaries
         """
-        # Base query: Users who are in Document Reviewers group OR have explicit review permission
-        reviewers_query = User.objects.filter(
-            Q(groups__name='Document Reviewers') |
-            Q(groups__name='Document Approvers') |  # Approvers can also review
-            Q(groups__name='Senior Document Approvers') |
-            Q(user_permissions__codename='can_review_document') |
+        flags = {
+            'in_reviewers': _in_group('Document Reviewers'),
+            'in_approvers': _in_group('Document Approvers'),  # Approvers can also review
+            'in_senior_approvers': _in_group('Senior Document Approvers'),
+            'can_review': _has_permission('can_review_document'),
+        }
+        eligible = (
+            Q(in_reviewers=True) | Q(in_approvers=True) | Q(in_senior_approvers=True) |
+            Q(can_review=True) |
             Q(is_staff=True)  # Staff can review
-        ).filter(
-            is_active=True
-        ).distinct()
+        )
         
-        # Exclude specific user (e.g., document author)
-        if exclude_user:
-            reviewers_query = reviewers_query.exclude(id=exclude_user.id)
+        reviewers = self._candidates(
+            flags, eligible, REVIEW_TASK_STATES,
+            recommended_max=RECOMMENDED_MAX_REVIEWS, available_below=MAX_ACTIVE_REVIEWS,
+            exclude_user=exclude_user
+        )
         
-        # Add workload and availability information
         reviewer_data = []
-        for user in reviewers_query:
-            # Count active review tasks
-            active_reviews = DocumentWorkflow.objects.filter(
-                current_assignee=user,
-                current_state__code__in=['UNDER_REVIEW', 'PENDING_REVIEW']
-            ).count()
-            
-            # Determine availability and workload status
-            workload_status = self._calculate_workload_status(active_reviews, task_type='review')
-            is_available = self._is_user_available(user, active_reviews, task_type='review')
-            
-            # Get department info if available
-            department = getattr(user, 'department', None) or 'Unknown'
-            
-            reviewer_info = {
-                'id': user.id,
-                'username': user.username,
-                'first_name': user.first_name,
-                'last_name': user.last_name,
-                'email': user.email,
-                'full_name': f"{user.first_name} {user.last_name}".strip() or user.username,
-                'active_reviews': active_reviews,
-                'workload_status': workload_status,
-                'is_available': is_available,
-                'department': department,
-                'is_recommended': active_reviews <= 3 and is_available,
-                # Additional metadata
-                'user_groups': list(user.groups.values_list('name', flat=True)),
+        for user in reviewers:
+            reviewer_info = self._candidate_info(user)
+            reviewer_info.update({
+                'active_reviews': user.active_tasks,
+                'workload_status': self._calculate_workload_status(user.active_tasks, task_type='review'),
                 'is_staff': user.is_staff,
-                'last_login': user.last_login.isoformat() if user.last_login else None
-            }
-            
+            })
             reviewer_data.append(reviewer_info)
         
-        # Sort by recommendation, then availability, then workload
-        reviewer_data.sort(key=lambda x: (
-            not x['is_recommended'],  # Recommended first
-            not x['is_available'],    # Available first  
-            x['active_reviews'],      # Lower workload first
-            x['full_name']           # Alphabetical by name
-        ))
-        
         return reviewer_data
     
     def validate_approver_eligibility(self, user: User, criticality: str = 'normal') -> Dict[str, Any]:
@@ -258,9 +282,9 @@ class ApproverSelectionService:
     def _is_user_available(self, user: User, active_tasks: int, task_type: str = 'approval') -> bool:
         """Determine if user is available for new assignments."""
         if task_type == 'review':
-            return active_tasks < 10  # Max 10 concurrent reviews
+            return active_tasks < MAX_ACTIVE_REVIEWS
         else:  # approval tasks
-            return active_tasks < 6   # Max 6 concurrent approvals
+            return active_tasks < MAX_ACTIVE_APPROVALS
     
     def _get_approval_level(self, user: User) -> str:
         """Get user's approval level based on groups and permissions."""
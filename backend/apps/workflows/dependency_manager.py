@@ -9,6 +9,7 @@ Implements dependency checking and validation as required by EDMS_details_workfl
 
 from django.db.models import Q
 from apps.documents.models import Document, DocumentDependency
+from apps.documents.impact_analysis import impact_analysis
 
 
 class DocumentDependencyManager:
@@ -82,43 +83,47 @@ class DocumentDependencyManager:
         }
     
     @staticmethod
-    def get_impact_analysis(document):
+    def get_impact_analysis(document, max_depth=None, limit=None):
         """
         Get impact analysis for up-versioning a document.
         
+        Follows dependency chains transitively (see
+        ``apps.documents.impact_analysis``), reporting the latest active
+        version of each affected document family.
+        
         Args:
             document: Document being up-versioned
+            max_depth: Dependency hops to follow
+            limit: Affected documents to return
             
         Returns:
             dict: {
                 'affected_documents': list,
                 'notification_recipients': list,
-                'impact_summary': str
+                'impact_summary': str,
+                'max_depth': int,
+                'truncated': bool
             }
         """
-        dependency_check = DocumentDependencyManager.check_dependencies(document)
-        
-        affected_documents = dependency_check['dependent_documents']
+        analysis = impact_analysis.analyze(document, max_depth=max_depth, limit=limit)
         
-        # Get authors and approvers of affected documents for notification
-        notification_recipients = set()
-        for doc in affected_documents:
-            if hasattr(doc, 'author') and doc.author:
-                notification_recipients.add(doc.author)
-            if hasattr(doc, 'approver') and doc.approver:
-                notification_recipients.add(doc.approver)
+        affected_documents = analysis['affected_documents']
+        notification_recipients = analysis['notification_recipients']
+        direct_count = sum(1 for doc in affected_documents if doc['depth'] == 1)
         
         impact_summary = f"""
         Up-versioning impact analysis:
-        - {len(affected_documents)} documents reference this document
+        - {len(affected_documents)}{'+' if analysis['truncated'] else ''} documents are affected ({direct_count} reference this document directly)
         - {len(notification_recipients)} users will be notified to review impact
         - Affected documents may need revision after this document is updated
         """
         
         return {
             'affected_documents': affected_documents,
-            'notification_recipients': list(notification_recipients),
-            'impact_summary': impact_summary.strip()
+            'notification_recipients': notification_recipients,
+            'impact_summary': impact_summary.strip(),
+            'max_depth': analysis['max_depth'],
+            'truncated': analysis['truncated']
         }
     
     @staticmethod
@@ -1563,19 +1563,7 @@ This is an automated notification from the EDMS system.
                 # Handle post-transition actions
                 self._handle_post_transition(workflow, transition)
                 
-                # Complete current assignee's existing task before creating new one
-                if workflow.current_assignee and workflow.current_assignee != assignee:
-                    from django.db import transaction as db_transaction
-                    db_transaction.on_commit(
-                        lambda: self._complete_current_task_safe(workflow.current_assignee.id, workflow.document.document_number, user.id)
-                    )
-                
-                # Schedule task creation after transaction commits successfully
-                if assignee:
-                    from django.db import transaction as db_transaction
-                    db_transaction.on_commit(
-                        lambda: self._create_workflow_task_safe(workflow.id, to_state.code, assignee.id, user.id, comment)
-                    )
+                # Inbox tasks follow the workflow save (signals.sync_task_inbox)
                 
                 return True
                 
@@ -1586,93 +1574,6 @@ This is an automated notification from the EDMS system.
             traceback.print_exc()
             return False
     
-    def _create_workflow_task_for_assignee(self, workflow: DocumentWorkflow, to_state, 
-                                          assignee: User, transitioned_by: User, comment: str):
-        """Create WorkflowTask when workflow is assigned to a user."""
-        if not assignee:
-            return
-            
-        try:
-            # Use ScheduledTask with metadata for task tracking
-            from ..scheduler.models import ScheduledTask
-            document = workflow.document
-            
-            # Determine task type and details based on state
-            task_mapping = {
-                'PENDING_REVIEW': {
-                    'task_type': 'REVIEW',
-                    'name': f'Review Document: {document.document_number}',
-                    'description': f'Review "{document.title}" and provide feedback. Document submitted by {transitioned_by.get_full_name()}.',
-                    'priority': 'normal',
-                    'due_days': 5
-                },
-                'PENDING_APPROVAL': {
-                    'task_type': 'APPROVE', 
-                    'name': f'Approve Document: {document.document_number}',
-                    'description': f'Final approval required for "{document.title}". Document has passed review stage.',
-                    'priority': 'high',
-                    'due_days': 3
-                },
-                'UNDER_REVIEW': {
-                    'task_type': 'REVIEW',
-                    'name': f'Continue Review: {document.document_number}',
-                    'description': f'Continue reviewing "{document.title}". Review started by {transitioned_by.get_full_name()}.',
-                    'priority': 'normal',
-                    'due_days': 3
-                }
-            }
-            
-            task_config = task_mapping.get(to_state.code)
-            if task_config:
-                # Check if task already exists to avoid duplicates
-                existing_task = ScheduledTask.objects.filter(
-                    name__icontains=document.document_number,
-                    metadata__assignee=assignee.username,
-                    status='PENDING',
-                    task_type='workflow_task'
-                ).first()
-                
-                if not existing_task:
-                    # Create a scheduled task that represents the workflow task
-                    due_date = timezone.now() + timezone.timedelta(days=task_config['due_days'])
-                    
-                    task = ScheduledTask.objects.create(
-                        name=task_config['name'],
-                        description=task_config['description'], 
-                        task_type='workflow_task',
-                        task_function='workflow.task.execute',
-                        task_module='apps.workflows.tasks',
-                        status='PENDING',
-                        created_by=transitioned_by,
-                        metadata={
-                            'assignee': assignee.username,
-                            'assignee_id': assignee.id,
-                            'task_type': task_config['task_type'],
-                            'document_id': document.id,
-                            'document_uuid': str(document.uuid),
-                            'document_number': document.document_number,
-                            'document_title': document.title,
-                            'workflow_id': workflow.id,
-                            'workflow_uuid': str(workflow.uuid),
-                            'state_code': to_state.code,
-                            'transition_comment': comment,
-                            'priority': task_config['priority'],
-                            'due_date': due_date.isoformat(),
-                            'assigned_by': transitioned_by.username,
-                            'assigned_by_id': transitioned_by.id
-                        }
-                    )
-                    print(f"✅ Created workflow task for {assignee.username}: {task_type}")
-                    
-                    # Notification is now handled separately to prevent transaction rollback
-                else:
-                    print(f"ℹ️ Task already exists for {assignee.username} on document {document.document_number}")
-                    
-        except Exception as e:
-            print(f"❌ Failed to create workflow task: {e}")
-            import traceback
-            traceback.print_exc()
-
     def _send_task_assignment_notification_simple(self, task, assigned_by: User, assignee: User):
         """Send notification when a task is assigned."""
         try:
@@ -1840,166 +1741,6 @@ Document Details:
         except Exception as e:
             print(f"⚠️ Failed to send task notification: {e}")
     
-    def _complete_current_task_safe(self, current_assignee_id: int, document_number: str, completed_by_id: int):
-        """Complete current assignee's task safely after transaction commits."""
-        try:
-            from .models import WorkflowTask
-            from django.contrib.auth import get_user_model
-            from django.utils import timezone
-            
-            User = get_user_model()
-            current_assignee = User.objects.get(id=current_assignee_id)
-            completed_by = User.objects.get(id=completed_by_id)
-            
-            # Find and complete the pending task for current assignee on this document
-            pending_task = WorkflowTask.objects.filter(
-                assigned_to=current_assignee,
-                status='PENDING',
-                task_data__document_number=document_number
-            ).first()
-            
-            if pending_task:
-                pending_task.status = 'COMPLETED'
-                pending_task.completed_at = timezone.now()
-                pending_task.completion_note = f'Task completed via workflow transition by {completed_by.username}'
-                pending_task.save()
-                print(f"✅ Marked existing task as COMPLETED for {current_assignee.username}")
-            else:
-                print(f"ℹ️ No pending task found for {current_assignee.username} on document {document_number}")
-                
-        except Exception as e:
-            print(f"⚠️ Task completion failed (non-critical): {e}")
-
-    def _create_workflow_task_safe(self, workflow_id: int, state_code: str, assignee_id: int, transitioned_by_id: int, comment: str):
-        """Create workflow task safely after transaction commits."""
-        try:
-            from .models import DocumentWorkflow, DocumentState
-            from django.contrib.auth import get_user_model
-            
-            User = get_user_model()
-            
-            workflow = DocumentWorkflow.objects.get(id=workflow_id)
-            to_state = DocumentState.objects.get(code=state_code)
-            assignee = User.objects.get(id=assignee_id)
-            transitioned_by = User.objects.get(id=transitioned_by_id)
-            
-            # Create task without affecting the main transaction
-            task = self._create_workflow_task_for_assignee(workflow, to_state, assignee, transitioned_by, comment)
-            if task:
-                print(f"✅ Post-commit task creation successful")
-            
-        except Exception as e:
-            print(f"⚠️ Post-commit task creation failed (non-critical): {e}")
-    
-    def _create_workflow_task_for_assignee(self, workflow: DocumentWorkflow, to_state,
-                                           assignee: User, transitioned_by: User, comment: str):
-        """Create WorkflowTask when workflow is assigned to a user."""
-        try:
-            from .models import WorkflowTask, WorkflowInstance, WorkflowType
-            from django.contrib.contenttypes.models import ContentType
-            
-            # Get or create WorkflowInstance to bridge DocumentWorkflow and WorkflowTask
-            workflow_instance = self._get_or_create_workflow_instance(workflow, transitioned_by)
-            
-            # Determine task type based on state
-            task_type_map = {
-                'PENDING_REVIEW': 'REVIEW',
-                'PENDING_APPROVAL': 'APPROVE', 
-                'REVIEW_COMPLETED': 'REVIEW'
-            }
-            
-            task_type = task_type_map.get(to_state.code, 'REVIEW')
-            
-            # Create the task with proper schema alignment
-            task = WorkflowTask.objects.create(
-                workflow_instance=workflow_instance,  # Required field
-                name=f"Review Document - {workflow.document.document_number}",
-                description=f"Review document {workflow.document.document_number} - {workflow.document.title}",
-                task_type=task_type,
-                assigned_to=assignee,
-                assigned_by=transitioned_by,
-                status='PENDING',
-                priority='NORMAL',
-                due_date=workflow.due_date,
-                task_data={
-                    'document_uuid': str(workflow.document.uuid),
-                    'document_workflow_id': workflow.id,
-                    'document_number': workflow.document.document_number,
-                    'action_required': to_state.code,
-                    'comment': comment
-                },
-                metadata={
-                    'workflow_type': workflow.workflow_type,
-                    'current_state': to_state.code,
-                    'bridge_mode': 'document_workflow'  # Indicate this is bridged
-                }
-            )
-            
-            print(f"✅ Created workflow task {workflow_task.uuid} for {assignee.username}")
-            
-            # Send notification separately to avoid transaction rollback
-            try:
-                self._send_task_notification_simple(task, transitioned_by, assignee)
-            except Exception as notif_error:
-                print(f"⚠️ Task created but notification failed: {notif_error}")
-            
-            return task
-            
-        except Exception as e:
-            print(f"❌ Failed to create workflow task: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
-    
-    def _get_or_create_workflow_instance(self, workflow: DocumentWorkflow, user: User):
-        """Get or create WorkflowInstance to bridge DocumentWorkflow and WorkflowTask systems."""
-        try:
-            from .models import WorkflowInstance, WorkflowType
-            from django.contrib.contenttypes.models import ContentType
-            
-            # Try to find existing WorkflowInstance for this document
-            document_ct = ContentType.objects.get_for_model(workflow.document)
-            
-            instance = WorkflowInstance.objects.filter(
-                content_type=document_ct,
-                object_id=str(workflow.document.uuid)
-            ).first()
-            
-            if not instance:
-                # Get or create workflow type
-                workflow_type, created = WorkflowType.objects.get_or_create(
-                    workflow_type='REVIEW',
-                    defaults={
-                        'name': 'Document Review Workflow',
-                        'description': 'Standard document review workflow',
-                        'created_by': user
-                    }
-                )
-                
-                # Create new WorkflowInstance
-                instance = WorkflowInstance.objects.create(
-                    workflow_type=workflow_type,
-                    content_type=document_ct,
-                    object_id=str(workflow.document.uuid),
-                    initiated_by=user,
-                    current_assignee=workflow.current_assignee,
-                    state=workflow.current_state.code,
-                    due_date=workflow.due_date,
-                    workflow_data={
-                        'document_workflow_id': workflow.id,
-                        'bridge_mode': True
-                    }
-                )
-                print(f"✅ Created WorkflowInstance bridge for document {workflow.document.document_number}")
-            
-            return instance
-            
-        except Exception as e:
-            print(f"❌ Failed to create WorkflowInstance: {e}")
-            import traceback
-            traceback.print_exc()
-            return None
-    
     def _can_review(self, document: Document, user: User) -> bool:
         """Check if user can review document."""
         # Segregation of Duties: Author cannot review their own document
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.16 on 2026-10-18 22:07
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+def backfill_inbox_tasks(apps, schema_editor):
+    """Project the current assignee of every active workflow into the inbox."""
+    from apps.workflows.task_inbox import backfill
+
+    backfill(
+        workflow_model=apps.get_model('workflows', 'DocumentWorkflow'),
+        task_model=apps.get_model('workflows', 'WorkflowInboxTask'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('documents', '0011_content_blobs'),
+        ('workflows', '0005_update_periodic_review_outcomes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkflowInboxTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('task_type', models.CharField(choices=[('REVIEW', 'Review'), ('APPROVE', 'Approve'), ('ROUTE_FOR_APPROVAL', 'Route for Approval'), ('REVISE', 'Revise'), ('PERIODIC_REVIEW', 'Periodic Review')], max_length=20)),
+                ('priority', models.CharField(choices=[('LOW', 'Low'), ('NORMAL', 'Normal'), ('HIGH', 'High'), ('URGENT', 'Urgent')], default='NORMAL', max_length=10)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('COMPLETED', 'Completed'), ('CANCELLED', 'Cancelled')], default='PENDING', max_length=10)),
+                ('state_code', models.CharField(help_text='Workflow state the task was created for', max_length=50)),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('due_date', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('completion_note', models.TextField(blank=True)),
+                ('assigned_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='assigned_inbox_tasks', to=settings.AUTH_USER_MODEL)),
+                ('assignee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_tasks', to=settings.AUTH_USER_MODEL)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_tasks', to='documents.document')),
+                ('workflow', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_tasks', to='workflows.documentworkflow')),
+            ],
+            options={
+                'verbose_name': 'Workflow Inbox Task',
+                'verbose_name_plural': 'Workflow Inbox Tasks',
+                'db_table': 'workflow_inbox_tasks',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='workflowinboxtask',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['assignee', 'due_date'], include=('priority', 'task_type'), name='inbox_pending_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workflowinboxtask',
+            index=models.Index(condition=models.Q(('status', 'PENDING')), fields=['assignee', '-created_at'], name='inbox_pending_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='workflowinboxtask',
+            index=models.Index(fields=['document', 'status'], name='inbox_document_status_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='workflowinboxtask',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'PENDING')), fields=('workflow', 'assignee'), name='unique_pending_inbox_task'),
+        ),
+        migrations.RunPython(backfill_inbox_tasks, migrations.RunPython.noop),
+    ]
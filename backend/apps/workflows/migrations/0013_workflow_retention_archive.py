@@ -0,0 +1,66 @@
+# Generated by Django 4.2.16 on 2026-10-18 23:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workflows', '0012_workflow_inbox_tasks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkflowRetentionRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cutoff', models.DateTimeField()),
+                ('batch_size', models.PositiveIntegerField()),
+                ('last_workflow_id', models.BigIntegerField(default=0)),
+                ('batches', models.PositiveIntegerField(default=0)),
+                ('workflows_archived', models.PositiveIntegerField(default=0)),
+                ('transitions_archived', models.PositiveIntegerField(default=0)),
+                ('notifications_archived', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Workflow Retention Run',
+                'verbose_name_plural': 'Workflow Retention Runs',
+                'db_table': 'workflow_retention_runs',
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WorkflowArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('workflow_uuid', models.UUIDField(unique=True)),
+                ('workflow_type', models.CharField(max_length=100)),
+                ('state', models.CharField(max_length=50)),
+                ('object_type', models.CharField(max_length=100)),
+                ('object_id', models.CharField(max_length=100)),
+                ('initiated_by', models.CharField(max_length=150)),
+                ('started_at', models.DateTimeField()),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('completion_reason', models.CharField(blank=True, max_length=200)),
+                ('workflow_data', models.JSONField(blank=True, default=dict)),
+                ('transitions', models.JSONField(blank=True, default=list)),
+                ('notifications', models.JSONField(blank=True, default=list)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('retention_run', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archives', to='workflows.workflowretentionrun')),
+            ],
+            options={
+                'verbose_name': 'Workflow Archive',
+                'verbose_name_plural': 'Workflow Archives',
+                'db_table': 'workflow_archives',
+                'ordering': ['-completed_at'],
+                'indexes': [
+                    models.Index(fields=['object_type', 'object_id'], name='workflow_ar_object__6db0a0_idx'),
+                    models.Index(fields=['completed_at'], name='workflow_ar_complet_26156d_idx'),
+                ],
+            },
+        ),
+    ]
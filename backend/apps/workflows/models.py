@@ -413,6 +413,8 @@ class WorkflowTemplate(models.Model):
 
 # Import simple workflow models (EDMS-compliant approach)
 from .models_simple import DocumentState, DocumentWorkflow, DocumentTransition
+from .models_inbox import WorkflowInboxTask
+from .models_archive import WorkflowRetentionRun, WorkflowArchive
 
 
 # River workflow states for document management (for reference)
@@ -0,0 +1,99 @@
+"""
+Workflow retention archive models
+
+Completed WorkflowInstances past the retention period are reduced to one
+WorkflowArchive row each, carrying their transitions and notifications as
+JSON, before the live rows are deleted. WorkflowRetentionRun records the
+progress of a retention pass so an interrupted pass resumes where it
+stopped.
+"""
+
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+__all__ = ['WorkflowRetentionRun', 'WorkflowArchive']
+
+
+class WorkflowRetentionRun(models.Model):
+    """
+    One retention pass over completed workflows.
+
+    The cutoff is fixed when the pass starts; ``last_workflow_id`` is the
+    keyset cursor, advanced in the same transaction as each archived batch.
+    """
+
+    cutoff = models.DateTimeField()
+    batch_size = models.PositiveIntegerField()
+    last_workflow_id = models.BigIntegerField(default=0)
+
+    # Progress
+    batches = models.PositiveIntegerField(default=0)
+    workflows_archived = models.PositiveIntegerField(default=0)
+    transitions_archived = models.PositiveIntegerField(default=0)
+    notifications_archived = models.PositiveIntegerField(default=0)
+
+    # Timing
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        app_label = "workflows"
+        db_table = 'workflow_retention_runs'
+        verbose_name = _('Workflow Retention Run')
+        verbose_name_plural = _('Workflow Retention Runs')
+        ordering = ['-started_at']
+
+    def __str__(self):
+        state = 'completed' if self.completed_at else 'in progress'
+        return f"Retention before {self.cutoff:%Y-%m-%d} ({self.workflows_archived} archived, {state})"
+
+
+class WorkflowArchive(models.Model):
+    """
+    Compact copy of a deleted WorkflowInstance with its transitions and
+    notifications.
+
+    Users are kept as usernames and the workflow type by name, so archive
+    rows do not hold foreign keys into live tables.
+    """
+
+    workflow_uuid = models.UUIDField(unique=True)
+    workflow_type = models.CharField(max_length=100)
+    state = models.CharField(max_length=50)
+
+    # Content object, as "app_label.model" and id
+    object_type = models.CharField(max_length=100)
+    object_id = models.CharField(max_length=100)
+
+    initiated_by = models.CharField(max_length=150)
+    started_at = models.DateTimeField()
+    completed_at = models.DateTimeField(null=True, blank=True)
+    completion_reason = models.CharField(max_length=200, blank=True)
+
+    # Workflow data and metadata, transitions and notifications
+    workflow_data = models.JSONField(default=dict, blank=True)
+    transitions = models.JSONField(default=list, blank=True)
+    notifications = models.JSONField(default=list, blank=True)
+
+    retention_run = models.ForeignKey(
+        WorkflowRetentionRun,
+        on_delete=models.PROTECT,
+        related_name='archives'
+    )
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        app_label = "workflows"
+        db_table = 'workflow_archives'
+        verbose_name = _('Workflow Archive')
+        verbose_name_plural = _('Workflow Archives')
+        ordering = ['-completed_at']
+        indexes = [
+            models.Index(fields=['object_type', 'object_id']),
+            models.Index(fields=['completed_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.workflow_type} - {self.state} (archived)"
@@ -0,0 +1,124 @@
+"""
+WorkflowInboxTask Model for the user task inbox
+
+A projection of each DocumentWorkflow's current state and assignee into
+typed, indexed rows, so the task inbox and the task badge polled by every
+logged-in user are index scans instead of JSON metadata scans.
+"""
+
+from django.db import models
+from django.db.models import Q
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+import uuid
+
+User = get_user_model()
+
+
+__all__ = ['WorkflowInboxTask']
+
+
+class WorkflowInboxTask(models.Model):
+    """
+    One workflow step waiting for a user.
+
+    Rows are maintained by ``apps.workflows.task_inbox`` whenever a
+    DocumentWorkflow is saved; there is at most one pending row per
+    workflow and assignee.
+    """
+
+    TASK_TYPES = [
+        ('REVIEW', 'Review'),
+        ('APPROVE', 'Approve'),
+        ('ROUTE_FOR_APPROVAL', 'Route for Approval'),
+        ('REVISE', 'Revise'),
+        ('PERIODIC_REVIEW', 'Periodic Review'),
+    ]
+
+    PRIORITIES = [
+        ('LOW', 'Low'),
+        ('NORMAL', 'Normal'),
+        ('HIGH', 'High'),
+        ('URGENT', 'Urgent'),
+    ]
+
+    STATUSES = [
+        ('PENDING', 'Pending'),
+        ('COMPLETED', 'Completed'),
+        ('CANCELLED', 'Cancelled'),
+    ]
+
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    assignee = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='inbox_tasks'
+    )
+    document = models.ForeignKey(
+        'documents.Document',
+        on_delete=models.CASCADE,
+        related_name='inbox_tasks'
+    )
+    workflow = models.ForeignKey(
+        'workflows.DocumentWorkflow',
+        on_delete=models.CASCADE,
+        related_name='inbox_tasks'
+    )
+
+    task_type = models.CharField(max_length=20, choices=TASK_TYPES)
+    priority = models.CharField(max_length=10, choices=PRIORITIES, default='NORMAL')
+    status = models.CharField(max_length=10, choices=STATUSES, default='PENDING')
+    state_code = models.CharField(max_length=50, help_text="Workflow state the task was created for")
+
+    name = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    assigned_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='assigned_inbox_tasks'
+    )
+
+    due_date = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    completion_note = models.TextField(blank=True)
+
+    class Meta:
+        app_label = "workflows"
+        db_table = 'workflow_inbox_tasks'
+        verbose_name = _('Workflow Inbox Task')
+        verbose_name_plural = _('Workflow Inbox Tasks')
+        ordering = ['-created_at']
+        indexes = [
+            # Summary counts: index-only scan of a user's pending tasks (PostgreSQL)
+            models.Index(
+                fields=['assignee', 'due_date'],
+                include=['priority', 'task_type'],
+                condition=Q(status='PENDING'),
+                name='inbox_pending_due_idx',
+            ),
+            # Inbox listing, newest first
+            models.Index(
+                fields=['assignee', '-created_at'],
+                condition=Q(status='PENDING'),
+                name='inbox_pending_recent_idx',
+            ),
+            models.Index(fields=['document', 'status'], name='inbox_document_status_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['workflow', 'assignee'],
+                condition=Q(status='PENDING'),
+                name='unique_pending_inbox_task',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.assignee.username}) - {self.status}"
+
+    @property
+    def is_overdue(self):
+        from django.utils import timezone
+        return bool(self.due_date and self.status == 'PENDING' and self.due_date < timezone.now())
@@ -34,6 +34,8 @@ from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
+from apps.core.change_capture import ChangeCaptureMixin
+
 User = get_user_model()
 
 
@@ -93,7 +95,7 @@ class DocumentState(models.Model):
         return self.name
 
 
-class DocumentWorkflow(models.Model):
+class DocumentWorkflow(ChangeCaptureMixin, models.Model):
     """Document Workflow model aligned with EDMS specification."""
     
     WORKFLOW_TYPES = [
@@ -0,0 +1,223 @@
+"""
+Retention of completed workflows.
+
+``cleanup_completed_workflows`` used to load every completed workflow past
+the retention period, write an audit event for it and call ``delete()``,
+running Django's cascade collector once per workflow inside one long task.
+The service here works in keyset batches over the workflow id instead. Each
+batch is one short transaction that:
+
+* copies the workflows, their transitions and notifications into compact
+  ``WorkflowArchive`` rows (three reads, one bulk insert),
+* deletes the live rows with set-based deletes,
+* writes one summarized audit event for the batch, and
+* advances the ``WorkflowRetentionRun`` cursor.
+
+A pass interrupted between batches loses nothing: the next pass resumes the
+unfinished run with its original cutoff from the last committed cursor.
+"""
+
+import logging
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from apps.audit.services import audit_service
+
+from .models import (
+    WorkflowArchive, WorkflowInstance, WorkflowNotification,
+    WorkflowRetentionRun, WorkflowTransition,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RETENTION_DAYS = 365
+DEFAULT_BATCH_SIZE = 500
+
+TRANSITION_FIELDS = [
+    'workflow_instance_id', 'from_state', 'to_state', 'transition_name', 'transitioned_by__username',
+    'transitioned_at', 'ip_address', 'comment', 'transition_data',
+]
+
+NOTIFICATION_FIELDS = [
+    'workflow_instance_id', 'notification_type', 'recipient__username', 'subject', 'status',
+    'created_at', 'sent_at', 'read_at',
+]
+
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+
+def _compact_transition(row):
+    return {
+        'from_state': row['from_state'],
+        'to_state': row['to_state'],
+        'transition_name': row['transition_name'],
+        'transitioned_by': row['transitioned_by__username'],
+        'transitioned_at': _isoformat(row['transitioned_at']),
+        'ip_address': row['ip_address'],
+        'comment': row['comment'],
+        'transition_data': row['transition_data'],
+    }
+
+
+def _compact_notification(row):
+    return {
+        'notification_type': row['notification_type'],
+        'recipient': row['recipient__username'],
+        'subject': row['subject'],
+        'status': row['status'],
+        'created_at': _isoformat(row['created_at']),
+        'sent_at': _isoformat(row['sent_at']),
+        'read_at': _isoformat(row['read_at']),
+    }
+
+
+def _group_by_workflow(queryset, fields, compact, ordering):
+    grouped = defaultdict(list)
+    for row in queryset.order_by(*ordering).values(*fields):
+        grouped[row['workflow_instance_id']].append(compact(row))
+    return grouped
+
+
+class WorkflowRetentionService:
+    """Archives and deletes completed workflows past the retention period."""
+
+    @property
+    def retention_days(self):
+        return getattr(settings, 'WORKFLOW_RETENTION_DAYS', DEFAULT_RETENTION_DAYS)
+
+    @property
+    def batch_size(self):
+        return getattr(settings, 'WORKFLOW_RETENTION_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+
+    def current_run(self):
+        """The unfinished retention run, or a new one cut off at the retention period."""
+        run = WorkflowRetentionRun.objects.filter(completed_at__isnull=True).order_by('started_at').first()
+        if run is None:
+            run = WorkflowRetentionRun.objects.create(
+                cutoff=timezone.now() - timedelta(days=self.retention_days),
+                batch_size=self.batch_size,
+            )
+        return run
+
+    def expired_workflows(self, run):
+        return WorkflowInstance.objects.filter(
+            is_completed=True,
+            completed_at__lt=run.cutoff,
+            pk__gt=run.last_workflow_id,
+        )
+
+    def archive_batch(self, run):
+        """
+        Archive and delete the next batch of ``run``.
+
+        Returns:
+            Number of workflows archived; 0 once the run is complete
+        """
+        with transaction.atomic():
+            ids = list(
+                self.expired_workflows(run).select_for_update(skip_locked=True)
+                .order_by('pk').values_list('pk', flat=True)[:run.batch_size]
+            )
+            if not ids:
+                run.completed_at = timezone.now()
+                run.save(update_fields=['completed_at', 'updated_at'])
+                return 0
+
+            workflows = list(
+                WorkflowInstance.objects.filter(pk__in=ids).order_by('pk').values(
+                    'pk', 'uuid', 'workflow_type__name', 'state', 'content_type__app_label',
+                    'content_type__model', 'object_id', 'initiated_by__username', 'started_at',
+                    'completed_at', 'completion_reason', 'workflow_data', 'metadata',
+                )
+            )
+            transitions = _group_by_workflow(
+                WorkflowTransition.objects.filter(workflow_instance_id__in=ids),
+                TRANSITION_FIELDS, _compact_transition, ['transitioned_at', 'pk'],
+            )
+            notifications = _group_by_workflow(
+                WorkflowNotification.objects.filter(workflow_instance_id__in=ids),
+                NOTIFICATION_FIELDS, _compact_notification, ['created_at', 'pk'],
+            )
+
+            WorkflowArchive.objects.bulk_create([
+                WorkflowArchive(
+                    workflow_uuid=workflow['uuid'],
+                    workflow_type=workflow['workflow_type__name'],
+                    state=workflow['state'],
+                    object_type=f"{workflow['content_type__app_label']}.{workflow['content_type__model']}",
+                    object_id=workflow['object_id'],
+                    initiated_by=workflow['initiated_by__username'],
+                    started_at=workflow['started_at'],
+                    completed_at=workflow['completed_at'],
+                    completion_reason=workflow['completion_reason'],
+                    workflow_data={'data': workflow['workflow_data'], 'metadata': workflow['metadata']},
+                    transitions=transitions[workflow['pk']],
+                    notifications=notifications[workflow['pk']],
+                    retention_run=run,
+                )
+                for workflow in workflows
+            ])
+
+            # Transitions and notifications go with their workflows as
+            # set-based deletes (none of the three models has delete signals)
+            _, deleted = WorkflowInstance.objects.filter(pk__in=ids).delete()
+
+            transition_count = deleted.get(WorkflowTransition._meta.label, 0)
+            notification_count = deleted.get(WorkflowNotification._meta.label, 0)
+            run.last_workflow_id = ids[-1]
+            run.batches += 1
+            run.workflows_archived += len(workflows)
+            run.transitions_archived += transition_count
+            run.notifications_archived += notification_count
+            run.save()
+
+            audit_service.log_system_event(
+                event_type='WORKFLOW_ARCHIVED',
+                object_type='WorkflowRetentionRun',
+                object_id=run.pk,
+                description=f"Archived {len(workflows)} completed workflows (batch {run.batches})",
+                additional_data={
+                    'retention_run': run.pk,
+                    'batch': run.batches,
+                    'cutoff': run.cutoff.isoformat(),
+                    'first_workflow_id': ids[0],
+                    'last_workflow_id': ids[-1],
+                    'workflows': len(workflows),
+                    'transitions': transition_count,
+                    'notifications': notification_count,
+                    'workflow_types': dict(Counter(workflow['workflow_type__name'] for workflow in workflows)),
+                },
+            )
+        return len(workflows)
+
+    def run(self, max_batches=None):
+        """
+        Archive expired workflows batch by batch, resuming an unfinished run.
+
+        Args:
+            max_batches: Stop after this many batches; the next call resumes
+
+        Returns:
+            Dict with the run id, workflows archived by this call and whether
+            the run completed
+        """
+        run = self.current_run()
+        archived = batches = 0
+        while max_batches is None or batches < max_batches:
+            count = self.archive_batch(run)
+            if not count:
+                break
+            archived += count
+            batches += 1
+            logger.info(f"Retention run {run.pk}: archived batch {run.batches} ({count} workflows)")
+        return {'run': run.pk, 'archived': archived, 'batches': batches, 'completed': run.completed_at is not None}
+
+
+# Service instance
+workflow_retention = WorkflowRetentionService()
@@ -5,6 +5,7 @@ Simplified signals for the DocumentWorkflow approach.
 Handles basic audit logging without complex dependencies.
 """
 
+from django.db import transaction
 from django.db.models.signals import post_save
 from django.dispatch import receiver
 
@@ -18,6 +19,15 @@ def log_workflow_creation(sender, instance, created, **kwargs):
         print(f"✓ Workflow created: {instance.document.document_number} - {instance.workflow_type}")
 
 
+@receiver(post_save, sender=DocumentWorkflow)
+def sync_task_inbox(sender, instance, **kwargs):
+    """Keep the assignee's task inbox in step with the workflow (after commit)."""
+    from .task_inbox import task_inbox
+
+    workflow_id = instance.pk
+    transaction.on_commit(lambda: task_inbox.sync_workflow(workflow_id), robust=True)
+
+
 @receiver(post_save, sender=DocumentTransition)
 def log_workflow_transition(sender, instance, created, **kwargs):
     """Simple logging for workflow transitions."""
@@ -1,79 +1,60 @@
 """
 Task API Views for Workflow Tasks
 Provides endpoints that match frontend expectations for task data.
+
+Tasks are read from the WorkflowInboxTask projection (see task_inbox.py),
+so the inbox and the badge counts are served from indexed columns.
 """
 
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.utils import timezone
-from datetime import datetime, timedelta
-import json
+
+from apps.api.change_feed import conditional_on_changes
+
+from .task_inbox import task_inbox
+
+
+PRIORITY_CLASSES = {
+    'LOW': 'bg-gray-100 text-gray-800',
+    'NORMAL': 'bg-blue-100 text-blue-800',
+    'HIGH': 'bg-orange-100 text-orange-800',
+    'URGENT': 'bg-red-100 text-red-800'
+}
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_on_changes('tasks', ttl=60)
 def author_tasks(request):
     """Get tasks assigned to the current user (matching frontend expectations)."""
     try:
-        from apps.scheduler.models import ScheduledTask
-        user = request.user
-        
-        # Get workflow tasks assigned to this user
-        tasks = ScheduledTask.objects.filter(
-            task_type='workflow_task',
-            metadata__assignee=user.username,
-            status='PENDING'
-        ).order_by('-created_at')
-        
-        # Convert to frontend expected format
+        now = timezone.now()
         task_list = []
-        for task in tasks:
-            metadata = task.metadata
-            
-            # Parse due date
-            due_date = None
-            is_overdue = False
-            try:
-                due_date_str = metadata.get('due_date')
-                if due_date_str:
-                    due_date = datetime.fromisoformat(due_date_str.replace('Z', '+00:00'))
-                    is_overdue = due_date < timezone.now()
-            except:
-                pass
-            
-            # Determine priority class for styling
-            priority = metadata.get('priority', 'normal').upper()
-            priority_class = {
-                'LOW': 'bg-gray-100 text-gray-800',
-                'NORMAL': 'bg-blue-100 text-blue-800', 
-                'HIGH': 'bg-orange-100 text-orange-800',
-                'URGENT': 'bg-red-100 text-red-800'
-            }.get(priority, 'bg-blue-100 text-blue-800')
-            
-            task_data = {
+        for task in task_inbox.pending_tasks(request.user):
+            document = task.document
+            task_list.append({
                 'id': str(task.uuid),
                 'name': task.name,
                 'description': task.description,
-                'task_type': metadata.get('task_type', 'REVIEW'),
-                'priority': priority,
-                'status': 'PENDING',
+                'task_type': task.task_type,
+                'priority': task.priority,
+                'status': task.status,
                 'created_at': task.created_at.isoformat(),
-                'due_date': due_date.isoformat() if due_date else None,
-                'is_overdue': is_overdue,
-                'assigned_by': metadata.get('assigned_by', 'System'),
+                'due_date': task.due_date.isoformat() if task.due_date else None,
+                'is_overdue': bool(task.due_date and task.due_date < now),
+                'assigned_by': task.assigned_by.username if task.assigned_by else 'System',
                 'workflow_type': 'REVIEW',
-                'document_id': metadata.get('document_id'),
-                'document_uuid': metadata.get('document_uuid'),
-                'document_number': metadata.get('document_number'),
-                'document_title': metadata.get('document_title'),
-                'document_status': metadata.get('state_code', 'PENDING_REVIEW'),
-                'document_version': 'v1.0',  # Default version
-                'action_url': f"/document-management?doc={metadata.get('document_uuid')}" if metadata.get('document_uuid') else None,
-                'priority_class': priority_class
-            }
-            
-            task_list.append(task_data)
+                'document_id': document.id,
+                'document_uuid': str(document.uuid),
+                'document_number': document.document_number,
+                'document_title': document.title,
+                'document_status': task.state_code,
+                'document_version': document.version_string,
+                'action_url': f"/document-management?doc={document.uuid}",
+                'priority_class': PRIORITY_CLASSES.get(task.priority, PRIORITY_CLASSES['NORMAL'])
+            })
         
         return Response({'tasks': task_list})
         
@@ -85,59 +66,11 @@ def author_tasks(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_on_changes('tasks', ttl=60)
 def task_summary(request):
     """Get task summary for the current user."""
     try:
-        from apps.scheduler.models import ScheduledTask
-        user = request.user
-        
-        # Get all workflow tasks for this user
-        tasks = ScheduledTask.objects.filter(
-            task_type='workflow_task',
-            metadata__assignee=user.username,
-            status='PENDING'
-        )
-        
-        total_tasks = tasks.count()
-        overdue_tasks = 0
-        high_priority_tasks = 0
-        upcoming_due_count = 0
-        task_types = {}
-        
-        # Analyze tasks
-        for task in tasks:
-            metadata = task.metadata
-            
-            # Check if overdue
-            try:
-                due_date_str = metadata.get('due_date')
-                if due_date_str:
-                    due_date = datetime.fromisoformat(due_date_str.replace('Z', '+00:00'))
-                    if due_date < timezone.now():
-                        overdue_tasks += 1
-                    elif due_date < timezone.now() + timedelta(days=7):
-                        upcoming_due_count += 1
-            except:
-                pass
-            
-            # Check priority
-            priority = metadata.get('priority', 'normal')
-            if priority in ['high', 'urgent']:
-                high_priority_tasks += 1
-            
-            # Count task types
-            task_type = metadata.get('task_type', 'REVIEW')
-            task_types[task_type] = task_types.get(task_type, 0) + 1
-        
-        summary = {
-            'total_tasks': total_tasks,
-            'overdue_tasks': overdue_tasks,
-            'high_priority_tasks': high_priority_tasks,
-            'upcoming_due_count': upcoming_due_count,
-            'task_types': task_types
-        }
-        
-        return Response({'summary': summary})
+        return Response({'summary': task_inbox.summary(request.user)})
         
     except Exception as e:
         import traceback
@@ -150,30 +83,14 @@ def task_summary(request):
 def complete_task(request, task_uuid):
     """Complete a task."""
     try:
-        from apps.scheduler.models import ScheduledTask
-        user = request.user
-        
-        # Get the task
-        task = ScheduledTask.objects.get(
-            uuid=task_uuid,
-            metadata__assignee=user.username,
-            task_type='workflow_task',
-            status='PENDING'
-        )
-        
         completion_note = request.data.get('completion_note', 'Task completed via My Tasks page')
         
-        # Update task status
-        task.status = 'COMPLETED'
-        task.metadata['completed_at'] = timezone.now().isoformat()
-        task.metadata['completion_note'] = completion_note
-        task.save()
+        if not task_inbox.complete_task(task_uuid, request.user, completion_note):
+            return Response({'error': 'Task not found'}, status=404)
         
         return Response({'success': True, 'message': 'Task completed successfully'})
         
-    except ScheduledTask.DoesNotExist:
-        return Response({'error': 'Task not found'}, status=404)
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return Response({'error': str(e)}, status=500)
\ No newline at end of file
+        return Response({'error': str(e)}, status=500)
@@ -0,0 +1,237 @@
+"""
+Task Inbox Service for Document Workflows
+
+Keeps WorkflowInboxTask rows in step with DocumentWorkflow state and
+assignee, and answers inbox and badge queries from the indexed columns.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Any, Dict, Optional
+
+from django.contrib.auth import get_user_model
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from apps.api.change_feed import change_feed
+
+from .models import DocumentWorkflow, WorkflowInboxTask
+
+logger = logging.getLogger(__name__)
+User = get_user_model()
+
+# Workflow states that put a task in the current assignee's inbox
+STATE_TASK_TYPES = {
+    'PENDING_REVIEW': 'REVIEW',
+    'UNDER_REVIEW': 'REVIEW',
+    'REVIEWED': 'ROUTE_FOR_APPROVAL',
+    'PENDING_APPROVAL': 'APPROVE',
+    'UNDER_APPROVAL': 'APPROVE',
+    'UNDER_PERIODIC_REVIEW': 'PERIODIC_REVIEW',
+}
+
+TASK_NAMES = {
+    'REVIEW': 'Review Document',
+    'APPROVE': 'Approve Document',
+    'ROUTE_FOR_APPROVAL': 'Route for Approval',
+    'REVISE': 'Revise Document',
+    'PERIODIC_REVIEW': 'Periodic Review',
+}
+
+TASK_PRIORITIES = {
+    'APPROVE': 'HIGH',
+}
+
+# Due date used when the workflow has none
+DEFAULT_DUE_DAYS = {
+    'REVIEW': 5,
+    'APPROVE': 3,
+    'ROUTE_FOR_APPROVAL': 3,
+    'REVISE': 5,
+    'PERIODIC_REVIEW': 30,
+}
+
+UPCOMING_DAYS = 7
+
+
+class TaskInboxService:
+    """Maintain and query the per-user workflow task inbox."""
+
+    def sync_workflow(self, workflow_id: int) -> Optional[WorkflowInboxTask]:
+        """
+        Bring the inbox in line with a workflow's current state and assignee.
+
+        Pending tasks of anyone who is no longer the assignee are closed; the
+        assignee's pending task is created or updated. Idempotent.
+        """
+        workflow = DocumentWorkflow.objects.select_related(
+            'current_state', 'document', 'current_assignee'
+        ).filter(pk=workflow_id).first()
+        if workflow is None:
+            return None
+
+        expected = self._expected_task(workflow)
+        now = timezone.now()
+        current = None
+        closed = []
+        for task in WorkflowInboxTask.objects.filter(workflow=workflow, status='PENDING'):
+            if expected and task.assignee_id == expected['assignee'].id:
+                current = task
+                continue
+            task.status = 'CANCELLED' if self._is_cancelled(workflow) else 'COMPLETED'
+            task.completed_at = now
+            task.completion_note = f'Workflow moved to {workflow.current_state.code}'
+            closed.append(task)
+        if closed:
+            WorkflowInboxTask.objects.bulk_update(closed, ['status', 'completed_at', 'completion_note'])
+            change_feed.touch('tasks', [task.assignee_id for task in closed])
+
+        if not expected:
+            return None
+        if current is None:
+            change_feed.touch('tasks', [expected['assignee'].id])
+            return WorkflowInboxTask.objects.create(**expected)
+
+        # Same person, next step (e.g. PENDING_REVIEW -> UNDER_REVIEW): keep the task
+        if workflow.due_date is None and current.task_type == expected['task_type']:
+            expected['due_date'] = current.due_date  # Default due date already set
+        changed = [
+            field for field in ('task_type', 'priority', 'state_code', 'name', 'due_date')
+            if getattr(current, field) != expected[field]
+        ]
+        if changed:
+            for field in changed:
+                setattr(current, field, expected[field])
+            current.save(update_fields=changed)
+            change_feed.touch('tasks', [current.assignee_id])
+        return current
+
+    def add_new_workflows(self, workflows) -> int:
+        """
+        Create inbox tasks for workflows inserted with ``bulk_create``.
+
+        ``bulk_create`` skips the post_save sync; new workflows have neither
+        transitions nor pending tasks, so the tasks are inserted directly.
+        """
+        tasks = []
+        for workflow in workflows:
+            expected = self._expected_task(workflow, new=True)
+            if expected:
+                tasks.append(WorkflowInboxTask(**expected))
+        WorkflowInboxTask.objects.bulk_create(tasks, batch_size=500)
+        change_feed.touch('tasks', [task.assignee_id for task in tasks])
+        return len(tasks)
+
+    def restart_workflows(self, workflows) -> int:
+        """
+        Replace the inbox tasks of finished workflows restarted with ``bulk_update``.
+
+        Pending tasks left from the earlier run are completed, then the
+        tasks of the restarted state are inserted as for new workflows.
+        """
+        pending = WorkflowInboxTask.objects.filter(workflow__in=workflows, status='PENDING')
+        change_feed.touch('tasks', pending.values_list('assignee_id', flat=True))
+        pending.update(
+            status='COMPLETED',
+            completed_at=timezone.now(),
+            completion_note='Workflow restarted',
+        )
+        return self.add_new_workflows(workflows)
+
+    def _expected_task(self, workflow, new: bool = False) -> Optional[Dict[str, Any]]:
+        assignee = workflow.current_assignee
+        if assignee is None or self._is_cancelled(workflow):
+            return None
+
+        state_code = workflow.current_state.code
+        last_transition = None if new else workflow.transitions.select_related('transitioned_by').order_by(
+            '-transitioned_at', '-id'
+        ).first()
+        task_type = STATE_TASK_TYPES.get(state_code)
+        if state_code == 'DRAFT' and last_transition and last_transition.to_state_id == workflow.current_state_id:
+            task_type = 'REVISE'  # Returned to the author
+        if task_type is None:
+            return None
+
+        document = workflow.document
+        due_date = workflow.due_date or timezone.now() + timedelta(days=DEFAULT_DUE_DAYS[task_type])
+        description = f'{TASK_NAMES[task_type]} "{document.title}"'
+        if last_transition and last_transition.comment:
+            description += f': {last_transition.comment}'
+
+        return {
+            'assignee': assignee,
+            'document': document,
+            'workflow': workflow,
+            'task_type': task_type,
+            'priority': TASK_PRIORITIES.get(task_type, 'NORMAL'),
+            'state_code': state_code,
+            'name': f'{TASK_NAMES[task_type]}: {document.document_number}',
+            'description': description,
+            'assigned_by': last_transition.transitioned_by if last_transition else workflow.initiated_by,
+            'due_date': due_date,
+        }
+
+    @staticmethod
+    def _is_cancelled(workflow) -> bool:
+        return workflow.is_terminated or workflow.current_state.code == 'TERMINATED'
+
+    def cancel_document_tasks(self, document, note: str = '') -> int:
+        """Cancel every pending task for a document (e.g. on termination)."""
+        pending = WorkflowInboxTask.objects.filter(document=document, status='PENDING')
+        change_feed.touch('tasks', pending.values_list('assignee_id', flat=True))
+        return pending.update(
+            status='CANCELLED',
+            completed_at=timezone.now(),
+            completion_note=note,
+        )
+
+    def complete_task(self, task_uuid, user, note: str = '') -> bool:
+        """Mark one of the user's pending tasks completed."""
+        completed = WorkflowInboxTask.objects.filter(
+            uuid=task_uuid, assignee=user, status='PENDING'
+        ).update(status='COMPLETED', completed_at=timezone.now(), completion_note=note)
+        if completed:
+            change_feed.touch('tasks', [user.pk])
+        return bool(completed)
+
+    def pending_tasks(self, user):
+        """The user's pending tasks, newest first (inbox_pending_recent_idx)."""
+        return WorkflowInboxTask.objects.filter(
+            assignee=user, status='PENDING'
+        ).select_related('document', 'assigned_by').order_by('-created_at')
+
+    def summary(self, user) -> Dict[str, Any]:
+        """Badge and dashboard counts in a single aggregate query."""
+        now = timezone.now()
+        task_types = [code for code, _ in WorkflowInboxTask.TASK_TYPES]
+        counts = WorkflowInboxTask.objects.filter(assignee=user, status='PENDING').aggregate(
+            total_tasks=Count('id'),
+            overdue_tasks=Count('id', filter=Q(due_date__lt=now)),
+            upcoming_due_count=Count('id', filter=Q(
+                due_date__gte=now, due_date__lt=now + timedelta(days=UPCOMING_DAYS)
+            )),
+            high_priority_tasks=Count('id', filter=Q(priority__in=['HIGH', 'URGENT'])),
+            **{f'type_{code}': Count('id', filter=Q(task_type=code)) for code in task_types},
+        )
+        by_type = {code: counts.pop(f'type_{code}') for code in task_types}
+        counts['task_types'] = {code: count for code, count in by_type.items() if count}
+        return counts
+
+
+# Service instance
+task_inbox = TaskInboxService()
+
+
+def backfill(workflow_model, task_model) -> int:
+    """Create pending inbox tasks for every active workflow (used by the migration)."""
+    tasks = []
+    workflows = workflow_model.objects.filter(
+        is_terminated=False, current_assignee__isnull=False
+    ).select_related('current_state', 'document', 'current_assignee', 'initiated_by')
+    for workflow in workflows.iterator():
+        expected = task_inbox._expected_task(workflow)
+        if expected:
+            tasks.append(task_model(**expected))
+    task_model.objects.bulk_create(tasks, batch_size=500)
+    return len(tasks)
@@ -22,6 +22,7 @@ except ImportError:
     workflow_service = None
 from apps.documents.models import Document
 from apps.audit.services import audit_service
+from .retention import workflow_retention
 
 logger = get_task_logger(__name__)
 User = get_user_model()
@@ -251,49 +252,21 @@ def send_dashboard_notification(self, notification_id):
 
 
 @shared_task(bind=True, max_retries=3)
-def cleanup_completed_workflows(self):
+def cleanup_completed_workflows(self, max_batches=None):
     """
     Clean up old completed workflows.
     
-    Archives or removes completed workflows older than retention period.
+    Archives completed workflows older than the retention period into
+    compact archive rows and deletes them in batches; an interrupted
+    cleanup resumes from its last committed batch.
     """
     try:
         logger.info("Cleaning up completed workflows")
         
-        # Get workflows completed more than 1 year ago
-        cutoff_date = timezone.now() - timedelta(days=365)
-        old_workflows = WorkflowInstance.objects.filter(
-            is_completed=True,
-            completed_at__lt=cutoff_date
-        )
-        
-        count = 0
-        for workflow in old_workflows:
-            try:
-                # Archive workflow data before deletion
-                audit_service.log_system_event(
-                    event_type='WORKFLOW_ARCHIVED',
-                    object_type='WorkflowInstance',
-                    object_id=workflow.id,
-                    description=f"Workflow archived: {workflow.workflow_type.name}",
-                    additional_data={
-                        'workflow_type': workflow.workflow_type.workflow_type,
-                        'initiated_by': workflow.initiated_by.username,
-                        'completed_at': workflow.completed_at.isoformat() if workflow.completed_at else None,
-                        'final_state': str(workflow.state)
-                    }
-                )
-                
-                # Delete the workflow (cascade will handle related objects)
-                workflow.delete()
-                count += 1
-                
-            except Exception as e:
-                logger.error(f"Error archiving workflow {workflow.id}: {str(e)}")
-                continue
+        result = workflow_retention.run(max_batches=max_batches)
         
-        logger.info(f"Archived {count} old workflows")
-        return {"archived": count}
+        logger.info(f"Archived {result['archived']} old workflows in {result['batches']} batches")
+        return result
         
     except Exception as exc:
         logger.error(f"Task failed: {str(exc)}")
@@ -0,0 +1,123 @@
+"""
+Approver Selection Tests
+
+Eligible reviewers and approvers come from one annotated query:
+- Group and permission eligibility, with the author excluded
+- Active task counts per candidate, from the current workflow states
+- Recommendation order computed by the database
+- A constant number of queries whatever the number of candidates
+"""
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+
+from apps.documents.models import Document, DocumentType, DocumentSource
+from apps.workflows.approver_selection import approver_selection_service
+from apps.workflows.models import DocumentState, DocumentWorkflow
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestApproverSelection:
+    """Test suite for reviewer and approver eligibility"""
+
+    def setup_method(self):
+        """Setup test data"""
+        self.approvers = Group.objects.create(name='Document Approvers')
+        self.senior = Group.objects.create(name='Senior Document Approvers')
+        self.reviewers = Group.objects.create(name='Document Reviewers')
+
+        self.author = User.objects.create_user(username='author_select', password='test123')
+        self.author.groups.add(self.approvers)
+        self.busy = User.objects.create_user(
+            username='busy_select', password='test123', first_name='Bea', last_name='Busy'
+        )
+        self.busy.groups.add(self.approvers)
+        self.free = User.objects.create_user(
+            username='free_select', password='test123', first_name='Fay', last_name='Free'
+        )
+        self.free.groups.add(self.senior)
+        self.reviewer = User.objects.create_user(username='reviewer_select', password='test123')
+        self.reviewer.groups.add(self.reviewers)
+        User.objects.create_user(username='outsider_select', password='test123')
+
+        self.states = {
+            code: DocumentState.objects.create(code=code, name=code.replace('_', ' ').title())
+            for code in ['DRAFT', 'PENDING_APPROVAL', 'UNDER_REVIEW']
+        }
+        self.doc_type = DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.author)
+        self.doc_source = DocumentSource.objects.create(
+            name='Original Digital Draft',
+            source_type='original_digital'
+        )
+
+    def _assign(self, user, state_code, count=1):
+        for index in range(count):
+            document = Document.objects.create(
+                title=f'Selection Procedure {index}',
+                document_type=self.doc_type,
+                document_source=self.doc_source,
+                author=self.author,
+            )
+            DocumentWorkflow.objects.create(
+                document=document,
+                current_state=self.states[state_code],
+                initiated_by=self.author,
+                current_assignee=user
+            )
+
+    def test_approvers_ordered_by_recommendation_and_workload(self):
+        self._assign(self.busy, 'PENDING_APPROVAL', count=3)
+        self._assign(self.busy, 'DRAFT')  # Not an approval task
+
+        approvers = approver_selection_service.get_eligible_approvers(exclude_user=self.author)
+
+        assert [a['username'] for a in approvers] == ['free_select', 'busy_select']
+        free, busy = approvers
+        assert (free['active_approvals'], free['is_recommended'], free['approval_level']) == (0, True, 'senior')
+        assert (busy['active_approvals'], busy['is_recommended'], busy['is_available']) == (3, False, True)
+        assert busy['workload_status'] == 'normal'
+        assert busy['full_name'] == 'Bea Busy'
+        assert busy['user_groups'] == ['Document Approvers']
+
+    def test_critical_documents_need_senior_approvers(self):
+        approvers = approver_selection_service.get_eligible_approvers(criticality='critical')
+
+        assert [a['username'] for a in approvers] == ['free_select']
+        assert approvers[0]['can_approve_criticality']
+
+    def test_reviewers_include_approvers(self):
+        self._assign(self.reviewer, 'UNDER_REVIEW', count=4)
+
+        reviewers = approver_selection_service.get_eligible_reviewers()
+
+        # Equal workloads sort by full name, falling back to the username
+        assert [r['username'] for r in reviewers] == [
+            'busy_select', 'free_select', 'author_select', 'reviewer_select'
+        ]
+        assert reviewers[-1]['active_reviews'] == 4
+        assert not reviewers[-1]['is_recommended']
+
+    @pytest.mark.parametrize('candidates', [10, 100, 1000])
+    def test_query_count_does_not_grow_with_candidates(self, candidates, django_assert_num_queries):
+        User.objects.bulk_create(
+            User(username=f'candidate_{index:04d}', first_name='Candidate', last_name=f'{index:04d}')
+            for index in range(candidates)
+        )
+        users = User.objects.filter(username__startswith='candidate_')
+        memberships = User.groups.through
+        memberships.objects.bulk_create(
+            memberships(user_id=user.pk, group_id=(self.approvers if index % 2 else self.reviewers).pk)
+            for index, user in enumerate(users)
+        )
+        self._assign(users[0], 'PENDING_APPROVAL', count=2)
+
+        with django_assert_num_queries(2):  # Candidates, then their groups
+            approvers = approver_selection_service.get_eligible_approvers()
+        with django_assert_num_queries(2):
+            reviewers = approver_selection_service.get_eligible_reviewers()
+
+        assert len(approvers) == candidates // 2 + 3
+        assert len(reviewers) == candidates + 4
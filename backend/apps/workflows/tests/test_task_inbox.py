@@ -0,0 +1,138 @@
+"""
+Workflow Task Inbox Tests
+
+The inbox projection follows DocumentWorkflow saves:
+- The current assignee gets one typed pending task
+- Moving the workflow on closes the previous assignee's task
+- Terminating the document cancels pending tasks
+- Summary counts come from a single aggregate query
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.documents.models import Document, DocumentType, DocumentSource
+from apps.workflows.models import (
+    DocumentState, DocumentTransition, DocumentWorkflow, WorkflowInboxTask
+)
+from apps.workflows.task_inbox import task_inbox
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestTaskInbox:
+    """Test suite for the workflow task inbox"""
+
+    def setup_method(self):
+        """Setup test data"""
+        self.author = User.objects.create_user(username='author_inbox', password='test123')
+        self.reviewer = User.objects.create_user(username='reviewer_inbox', password='test123')
+        self.approver = User.objects.create_user(username='approver_inbox', password='test123')
+
+        self.states = {
+            code: DocumentState.objects.create(code=code, name=code.replace('_', ' ').title())
+            for code in ['DRAFT', 'PENDING_REVIEW', 'UNDER_REVIEW', 'PENDING_APPROVAL', 'TERMINATED']
+        }
+
+        doc_type = DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.author)
+        doc_source = DocumentSource.objects.create(
+            name='Original Digital Draft',
+            source_type='original_digital'
+        )
+        self.document = Document.objects.create(
+            title='Inbox Procedure',
+            document_type=doc_type,
+            document_source=doc_source,
+            author=self.author,
+            status='DRAFT',
+            version_major=1,
+            version_minor=0
+        )
+        self.workflow = DocumentWorkflow.objects.create(
+            document=self.document,
+            current_state=self.states['DRAFT'],
+            initiated_by=self.author,
+            current_assignee=self.author
+        )
+
+    def _move(self, state, assignee, actor):
+        DocumentTransition.objects.create(
+            workflow=self.workflow,
+            from_state=self.workflow.current_state,
+            to_state=self.states[state],
+            transitioned_by=actor,
+            comment=f'Moved to {state}'
+        )
+        self.workflow.current_state = self.states[state]
+        self.workflow.current_assignee = assignee
+        self.workflow.save()
+
+    def test_workflow_save_creates_task_after_commit(self, django_capture_on_commit_callbacks):
+        """The assignee's task is created once the workflow save commits"""
+        with django_capture_on_commit_callbacks(execute=True):
+            self._move('PENDING_REVIEW', self.reviewer, self.author)
+
+        task = WorkflowInboxTask.objects.get(assignee=self.reviewer, status='PENDING')
+        assert task.task_type == 'REVIEW'
+        assert task.assigned_by == self.author
+        assert task.due_date is not None
+        assert not WorkflowInboxTask.objects.filter(assignee=self.author).exists()
+
+    def test_sync_is_idempotent_and_keeps_due_date(self):
+        """Re-syncing and same-assignee steps update the task in place"""
+        self._move('PENDING_REVIEW', self.reviewer, self.author)
+        first = task_inbox.sync_workflow(self.workflow.id)
+        task_inbox.sync_workflow(self.workflow.id)
+
+        self._move('UNDER_REVIEW', self.reviewer, self.reviewer)
+        task = task_inbox.sync_workflow(self.workflow.id)
+
+        assert task.pk == first.pk
+        assert task.state_code == 'UNDER_REVIEW'
+        assert task.due_date == first.due_date
+        assert WorkflowInboxTask.objects.filter(workflow=self.workflow).count() == 1
+
+    def test_reassignment_closes_previous_task(self):
+        """Handing the workflow on completes the previous assignee's task"""
+        self._move('PENDING_REVIEW', self.reviewer, self.author)
+        review = task_inbox.sync_workflow(self.workflow.id)
+
+        self._move('PENDING_APPROVAL', self.approver, self.reviewer)
+        approval = task_inbox.sync_workflow(self.workflow.id)
+
+        review.refresh_from_db()
+        assert review.status == 'COMPLETED'
+        assert review.completed_at is not None
+        assert approval.task_type == 'APPROVE'
+        assert approval.priority == 'HIGH'
+
+    def test_termination_cancels_pending_tasks(self):
+        """Terminating the document cancels tasks still waiting"""
+        self._move('PENDING_REVIEW', self.reviewer, self.author)
+        task = task_inbox.sync_workflow(self.workflow.id)
+
+        self.document.terminate_document(terminated_by=self.author, reason='No longer needed')
+
+        task.refresh_from_db()
+        assert task.status == 'CANCELLED'
+
+    def test_summary_is_single_query(self, django_assert_num_queries):
+        """Badge counts are one aggregate over the user's pending tasks"""
+        self._move('PENDING_REVIEW', self.reviewer, self.author)
+        task = task_inbox.sync_workflow(self.workflow.id)
+        WorkflowInboxTask.objects.filter(pk=task.pk).update(due_date=timezone.now() - timedelta(days=1))
+
+        with django_assert_num_queries(1):
+            summary = task_inbox.summary(self.reviewer)
+
+        assert summary == {
+            'total_tasks': 1,
+            'overdue_tasks': 1,
+            'upcoming_due_count': 0,
+            'high_priority_tasks': 0,
+            'task_types': {'REVIEW': 1},
+        }
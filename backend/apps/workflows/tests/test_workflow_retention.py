@@ -0,0 +1,152 @@
+"""
+Workflow Retention Tests
+
+Completed workflows past the retention period are archived and deleted:
+- Archive rows carry the workflow's transitions and notifications
+- Active and recently completed workflows are kept
+- Each batch writes one summarized audit event
+- An interrupted run resumes with its original cutoff
+- Queries per batch do not grow with the batch size
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from apps.audit.models import SystemEvent
+from apps.documents.models import Document, DocumentSource, DocumentType
+from apps.workflows.models import (
+    WorkflowArchive, WorkflowInstance, WorkflowNotification, WorkflowRetentionRun,
+    WorkflowTransition, WorkflowType,
+)
+from apps.workflows.retention import workflow_retention
+from apps.workflows.tasks import cleanup_completed_workflows
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestWorkflowRetention:
+    """Test suite for workflow retention and archival"""
+
+    def setup_method(self):
+        """Setup test data"""
+        self.author = User.objects.create_user(username='author_retention', password='test123')
+        self.reviewer = User.objects.create_user(username='reviewer_retention', password='test123')
+        self.workflow_type = WorkflowType.objects.create(
+            name='Document Review', workflow_type='REVIEW', created_by=self.author
+        )
+        doc_type = DocumentType.objects.create(name='Procedure', code='PROC', created_by=self.author)
+        doc_source = DocumentSource.objects.create(name='Original Digital Draft', source_type='original_digital')
+        self.document = Document.objects.create(
+            title='Retention Procedure',
+            document_type=doc_type,
+            document_source=doc_source,
+            author=self.author,
+        )
+
+    def _workflow(self, completed_days_ago=None, transitions=1, notifications=1):
+        workflow = WorkflowInstance.objects.create(
+            workflow_type=self.workflow_type,
+            state='APPROVED' if completed_days_ago is not None else 'UNDER_REVIEW',
+            content_type=ContentType.objects.get_for_model(Document),
+            object_id=str(self.document.pk),
+            initiated_by=self.author,
+            workflow_data={'comment_count': 2},
+        )
+        for index in range(transitions):
+            WorkflowTransition.objects.create(
+                workflow_instance=workflow, from_state='UNDER_REVIEW', to_state='APPROVED',
+                transition_name=f'approve_{index}', transitioned_by=self.reviewer, comment='Looks good',
+            )
+        for _ in range(notifications):
+            WorkflowNotification.objects.create(
+                workflow_instance=workflow, notification_type='COMPLETION', recipient=self.author,
+                subject='Review complete', message='Your document was approved.', status='SENT',
+            )
+        if completed_days_ago is not None:
+            WorkflowInstance.objects.filter(pk=workflow.pk).update(
+                is_completed=True, is_active=False,
+                completed_at=timezone.now() - timedelta(days=completed_days_ago),
+            )
+        return workflow
+
+    def test_archives_expired_workflows_with_transitions_and_notifications(self):
+        expired = self._workflow(completed_days_ago=400, transitions=2)
+        recent = self._workflow(completed_days_ago=30)
+        active = self._workflow()
+
+        result = workflow_retention.run()
+
+        assert result['archived'] == 1 and result['completed']
+        assert set(WorkflowInstance.objects.values_list('pk', flat=True)) == {recent.pk, active.pk}
+        assert not WorkflowTransition.objects.filter(workflow_instance_id=expired.pk).exists()
+        assert not WorkflowNotification.objects.filter(workflow_instance_id=expired.pk).exists()
+
+        archive = WorkflowArchive.objects.get()
+        assert archive.workflow_uuid == expired.uuid
+        assert archive.workflow_type == 'Document Review'
+        assert archive.state == 'APPROVED'
+        assert archive.object_type == 'documents.document'
+        assert archive.object_id == str(self.document.pk)
+        assert archive.initiated_by == 'author_retention'
+        assert archive.workflow_data == {'data': {'comment_count': 2}, 'metadata': {}}
+        assert [t['transition_name'] for t in archive.transitions] == ['approve_0', 'approve_1']
+        assert archive.transitions[0]['transitioned_by'] == 'reviewer_retention'
+        assert archive.notifications[0]['recipient'] == 'author_retention'
+        assert archive.notifications[0]['status'] == 'SENT'
+
+    def test_one_summarized_audit_event_per_batch(self, settings):
+        settings.WORKFLOW_RETENTION_BATCH_SIZE = 2
+        for _ in range(3):
+            self._workflow(completed_days_ago=400)
+
+        workflow_retention.run()
+
+        events = list(SystemEvent.objects.filter(event_type='WORKFLOW_ARCHIVED').order_by('timestamp', 'pk'))
+        assert [event.details['workflows'] for event in events] == [2, 1]
+        assert [event.details['transitions'] for event in events] == [2, 1]
+        assert [event.details['notifications'] for event in events] == [2, 1]
+        assert events[0].details['workflow_types'] == {'Document Review': 2}
+
+    def test_interrupted_run_resumes_with_original_cutoff(self, settings):
+        settings.WORKFLOW_RETENTION_BATCH_SIZE = 2
+        workflows = [self._workflow(completed_days_ago=400) for _ in range(3)]
+
+        first = cleanup_completed_workflows.apply(kwargs={'max_batches': 1}).get()
+        run = WorkflowRetentionRun.objects.get()
+        assert first == {'run': run.pk, 'archived': 2, 'batches': 1, 'completed': False}
+        assert run.last_workflow_id == workflows[1].pk
+
+        # Completed just after the run's cutoff: left for a later run
+        late = self._workflow(completed_days_ago=400)
+        WorkflowInstance.objects.filter(pk=late.pk).update(completed_at=run.cutoff + timedelta(minutes=1))
+
+        second = cleanup_completed_workflows.apply().get()
+        run.refresh_from_db()
+        assert second == {'run': run.pk, 'archived': 1, 'batches': 1, 'completed': True}
+        assert run.workflows_archived == 3 and run.batches == 2
+        assert list(WorkflowInstance.objects.values_list('pk', flat=True)) == [late.pk]
+
+        # The next pass starts a new run
+        workflow_retention.run()
+        assert WorkflowRetentionRun.objects.filter(completed_at__isnull=True).count() == 0
+        assert WorkflowRetentionRun.objects.count() == 2
+
+    def test_batch_queries_do_not_grow_with_batch_size(self, settings):
+        def batch_queries(count):
+            for _ in range(count):
+                self._workflow(completed_days_ago=400, transitions=3, notifications=2)
+            settings.WORKFLOW_RETENTION_BATCH_SIZE = count
+            run = workflow_retention.current_run()
+            with CaptureQueriesContext(connection) as queries:
+                assert workflow_retention.archive_batch(run) == count
+            workflow_retention.archive_batch(run)
+            return len(queries)
+
+        assert batch_queries(2) == batch_queries(20)
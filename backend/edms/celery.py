@@ -105,6 +105,26 @@ app.conf.beat_schedule = {
         }
     },
     
+    # Hourly task execution summaries for the scheduler dashboard
+    'rollup-task-statistics': {
+        'task': 'apps.scheduler.tasks.rollup_task_statistics',
+        'schedule': crontab(minute=5),  # Every hour at minute 5
+        'options': {
+            'expires': 3600,
+            'priority': 4,    # Low priority maintenance
+        }
+    },
+    
+    # Materialized dashboard statistics - runs every 5 minutes
+    'reconcile-dashboard-stats': {
+        'task': 'apps.api.tasks.reconcile_dashboard_stats',
+        'schedule': crontab(minute='*/5'),  # Every 5 minutes
+        'options': {
+            'expires': 300,
+            'priority': 5,
+        }
+    },
+    
     # S2 Data Integrity Checks - runs daily at 2 AM
     'run-daily-integrity-check': {
         'task': 'apps.audit.integrity_tasks.run_daily_integrity_check',
@@ -125,6 +145,36 @@ app.conf.beat_schedule = {
         }
     },
     
+    # Resumable upload cleanup - runs hourly
+    'cleanup-expired-upload-sessions': {
+        'task': 'apps.documents.tasks.cleanup_expired_upload_sessions',
+        'schedule': crontab(minute=45),  # Every hour at minute 45
+        'options': {
+            'expires': 3600,
+            'priority': 4,    # Low priority maintenance
+        }
+    },
+    
+    # Content blob garbage collection - runs daily at 4 AM
+    'collect-blob-garbage': {
+        'task': 'apps.documents.tasks.collect_blob_garbage',
+        'schedule': crontab(minute=0, hour=4),  # Daily at 04:00
+        'options': {
+            'expires': 3600,
+            'priority': 4,    # Low priority maintenance
+        }
+    },
+    
+    # Autocomplete term pruning - runs daily at 4:30 AM
+    'prune-search-terms': {
+        'task': 'apps.documents.tasks.prune_search_terms',
+        'schedule': crontab(minute=30, hour=4),  # Daily at 04:30
+        'options': {
+            'expires': 3600,
+            'priority': 4,    # Low priority maintenance
+        }
+    },
+    
     # Note: Backup tasks removed - handled by host-level cron jobs
     # See: crontab -l for active backup schedule (daily, weekly, monthly)
 }
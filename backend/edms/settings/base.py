@@ -50,11 +50,13 @@ LOCAL_APPS = [
     'apps.scheduler',
     'apps.settings',
     'apps.admin_pages',
+    'apps.api',  # Change feed and dashboard statistics (signals, Celery tasks)
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    'apps.scheduler.metrics.RequestMetricsMiddleware',  # Outermost: measures full request latency
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -186,6 +188,45 @@ OFFICIAL_PDF_CONFIG = {
 # Document storage
 DOCUMENT_STORAGE_ROOT = BASE_DIR / 'storage' / 'documents'
 
+# Incremental backups (python manage.py incremental_backup)
+INCREMENTAL_BACKUP = {
+    'REPOSITORY': os.environ.get('EDMS_BACKUP_REPOSITORY', str(BASE_DIR / 'backups' / 'repository')),
+    'SOURCE_ROOT': str(BASE_DIR / 'storage'),
+    'EXCLUDE': ['tmp', 'uploads'],  # Transient upload parts and scratch files
+    'CHUNK_SIZE': 4 * 1024 * 1024,  # 4MB
+    'WORKERS': 4,
+    'COMPRESSION_LEVEL': 6,
+    'KEEP_LAST': 30,
+}
+
+# Runtime performance metrics (health checks and the /metrics endpoint)
+PERFORMANCE_METRICS = {
+    'AUTH_TOKEN': config('METRICS_AUTH_TOKEN', default=''),  # Bearer token for Prometheus scrapes
+    'SLOW_QUERY_MS': 500,
+    'STORAGE_PATHS': {
+        'media': str(MEDIA_ROOT),
+        'documents': str(DOCUMENT_STORAGE_ROOT),
+    },
+    # Capacity thresholds feeding health checks and the health score
+    'DISK_WARNING_PERCENT': 80,
+    'DISK_CRITICAL_PERCENT': 90,
+    'STORAGE_FULL_WARNING_DAYS': 30,
+    'MEMORY_WARNING_PERCENT': 85,
+    'DB_CONNECTIONS_WARNING_PERCENT': 80,
+    'DB_LATENCY_WARNING_MS': 100,
+    'REDIS_LATENCY_WARNING_MS': 50,
+    'REQUEST_P95_WARNING_MS': 2000,
+    'QUEUE_DEPTH_WARNING': 100,
+    'QUEUE_DEPTH_CRITICAL': 1000,
+}
+
+# Change feed for polling clients (apps.api.change_feed)
+CHANGE_FEED = {
+    'MAX_WAIT_SECONDS': 25,  # Longest long-poll, well under the gunicorn timeout
+    'POLL_INTERVAL_SECONDS': 1.0,
+    'MAX_WAITERS': 4,  # Long-polls held at once per gunicorn worker (see --threads)
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
@@ -234,6 +275,9 @@ CELERY_TASK_TRACK_STARTED = True
 CELERY_TASK_TIME_LIMIT = 30 * 60  # 30 minutes
 CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60  # 25 minutes
 CELERY_WORKER_STATE_DB = '/tmp/celery_worker_state'
+# Task events feed the cached worker state (python manage.py monitor_celery_events)
+CELERY_WORKER_SEND_TASK_EVENTS = True
+CELERY_TASK_SEND_SENT_EVENT = True
 CELERY_BEAT_SCHEDULE_FILENAME = '/tmp/celerybeat-schedule'
 CELERY_ACCEPT_CONTENT = ['json']
 CELERY_TASK_SERIALIZER = 'json'
@@ -290,8 +334,14 @@ CSRF_TRUSTED_ORIGINS = [
 ]
 
 # File Upload Configuration
-FILE_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100MB
+# Uploads above FILE_UPLOAD_MAX_MEMORY_SIZE are spooled to a temporary file
+# instead of memory; both handlers compute the SHA-256 checksum on the fly.
+FILE_UPLOAD_MAX_MEMORY_SIZE = 5 * 1024 * 1024  # 5MB
 DATA_UPLOAD_MAX_MEMORY_SIZE = 100 * 1024 * 1024  # 100MB
+FILE_UPLOAD_HANDLERS = [
+    'apps.documents.uploads.ChecksumMemoryFileUploadHandler',
+    'apps.documents.uploads.ChecksumTemporaryFileUploadHandler',
+]
 
 # Document Processing Configuration
 DOCUMENT_PROCESSING = {
@@ -299,6 +349,12 @@ DOCUMENT_PROCESSING = {
     'MAX_FILE_SIZE': 100 * 1024 * 1024,  # 100MB
     'ENABLE_OCR': True,
     'TESSERACT_CMD': config('TESSERACT_CMD', default='/usr/bin/tesseract'),
+    # Resumable chunked uploads
+    'UPLOAD_CHUNK_SIZE': 8 * 1024 * 1024,  # 8MB default part size
+    'UPLOAD_MAX_FILE_SIZE': 2 * 1024 * 1024 * 1024,  # 2GB
+    'UPLOAD_SESSION_TTL_HOURS': 24,
+    # Content-addressed blob store
+    'BLOB_GC_GRACE_HOURS': 24,
 }
 
 # Audit Configuration
@@ -10,6 +10,7 @@ AUTH_USER_MODEL = 'users.User'
 
 # Override middleware to remove problematic ones
 MIDDLEWARE = [
+    'apps.scheduler.metrics.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -7,6 +7,7 @@ from sentry_sdk.integrations.celery import CeleryIntegration
 
 # Add JWT session fix middleware for API endpoints
 MIDDLEWARE = [
+    'apps.scheduler.metrics.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,16 +38,50 @@ SECURE_HSTS_PRELOAD = True
 # CSRF_COOKIE_SECURE = True
 
 # Database connection pooling for production
+#   pool:       bounded connection pool per process (apps.core.db); Django
+#               closing a connection returns it to the pool
+#   pgbouncer:  connect through a transaction-mode pgbouncer at DB_HOST
+#   persistent: one persistent connection per thread (CONN_MAX_AGE)
+# The statement timeout is set per transaction (SET LOCAL) in the first two
+# modes; the pool also keeps it as the session default for statements run
+# outside transactions. pgbouncer cannot pass it as a startup option, so in
+# that mode the role must carry it (ALTER ROLE <DB_USER> SET
+# statement_timeout = <DB_STATEMENT_TIMEOUT_MS>); the backend logs an error
+# when it is missing.
+# Stays on persistent until `manage.py benchmark_connection_pool` has passed
+# against the production database.
+DB_POOL_MODE = config('DB_POOL_MODE', default='persistent')
+DB_STATEMENT_TIMEOUT_MS = config('DB_STATEMENT_TIMEOUT_MS', default=30000, cast=int)
+
 DATABASES['default'].update({
     'CONN_MAX_AGE': 60,
     'OPTIONS': {
         'connect_timeout': 10,
-        'options': '-c statement_timeout=30000',
+        'options': f'-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}',
         # SSL mode disabled for internal Docker network deployment
         # 'sslmode': 'require',  # Enable for external database
     }
 })
 
+if DB_POOL_MODE in ('pool', 'pgbouncer'):
+    DATABASES['default'].update({
+        'ENGINE': 'apps.core.db',
+        'CONN_MAX_AGE': 0,
+        'STATEMENT_TIMEOUT': DB_STATEMENT_TIMEOUT_MS,
+    })
+if DB_POOL_MODE == 'pool':
+    DATABASES['default']['POOL'] = {
+        'MIN_SIZE': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+        'MAX_SIZE': config('DB_POOL_MAX_SIZE', default=10, cast=int),
+        'TIMEOUT': config('DB_POOL_TIMEOUT', default=10, cast=int),
+        'MAX_LIFETIME': config('DB_POOL_MAX_LIFETIME', default=1800, cast=int),
+        'MAX_IDLE': config('DB_POOL_MAX_IDLE', default=300, cast=int),
+    }
+elif DB_POOL_MODE == 'pgbouncer':
+    DATABASES['default']['OPTIONS'] = {'connect_timeout': 10}
+    # Server-side cursors do not survive transaction pooling
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
 # Static files storage for production
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
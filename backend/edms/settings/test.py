@@ -51,4 +51,7 @@ LOGGING = {
 # Faster tests
 DEBUG = False
 
+# Fixed key so file encryption can be exercised without production secrets
+EDMS_MASTER_KEY = 'edms-test-master-key-not-for-production'
+
 print("✅ Using test settings (scheduler disabled, test URLs, fast password hashing)")
@@ -16,6 +16,7 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 from apps.api.dashboard_stats import DashboardStatsView
+from apps.api.change_feed import changes
 from apps.api.system_info_views import system_info_view
 from apps.api.system_config_views import (
     get_system_config,
@@ -23,6 +24,7 @@ from apps.api.system_config_views import (
     delete_logo,
     update_company_name
 )
+from apps.scheduler.metrics import prometheus_metrics_view
 
 # API URL patterns
 api_urlpatterns = [
@@ -42,6 +44,9 @@ api_urlpatterns = [
     # Dashboard statistics
     path('dashboard/stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
     
+    # Change feed for polling clients (ETag / long-poll)
+    path('changes/', changes, name='change-feed'),
+    
     # System information
     path('system/info/', system_info_view, name='system-info'),
     
@@ -80,6 +85,9 @@ urlpatterns = [
     # Health check endpoint (unauthenticated)
     path('health/', include('edms.health_urls')),
     
+    # Prometheus metrics (bearer token or staff session)
+    path('metrics/', prometheus_metrics_view, name='prometheus-metrics'),
+    
     # Handle favicon.ico requests to prevent 404 errors
     path('favicon.ico', lambda request: HttpResponse(status=204)),  # No Content
 ]
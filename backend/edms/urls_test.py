@@ -14,6 +14,7 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 from apps.api.dashboard_stats import DashboardStatsView
+from apps.api.change_feed import changes
 
 # API URL patterns (without scheduler)
 api_urlpatterns = [
@@ -33,6 +34,9 @@ api_urlpatterns = [
     # Dashboard statistics
     path('dashboard/stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
     
+    # Change feed for polling clients (ETag / long-poll)
+    path('changes/', changes, name='change-feed'),
+    
     # Core modules
     path('documents/', include('apps.documents.urls')),
     path('workflows/', include('apps.workflows.urls')),
@@ -1,4 +1,4 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import { DashboardStats } from '../types/api';
 
 interface UseDashboardUpdatesOptions {
@@ -11,6 +11,9 @@ interface UseDashboardUpdatesOptions {
 /**
  * Dashboard updates hook using HTTP polling
  * Supports admin dashboard with proper stats structure
+ *
+ * Polls are conditional: the ETag of the last response is sent back as
+ * If-None-Match and the backend answers 304 until the stats change.
  */
 export const useDashboardUpdates = (options: UseDashboardUpdatesOptions = {}) => {
   const {
@@ -25,6 +28,7 @@ export const useDashboardUpdates = (options: UseDashboardUpdatesOptions = {}) =>
   const [error, setError] = useState<string | null>(null);
   const [isPaused, setIsPaused] = useState(false);
   const [isRefreshing, setIsRefreshing] = useState(false);
+  const etagRef = useRef<string | null>(null);
 
   const fetchDashboardStats = useCallback(async () => {
     if (!enabled || isPaused) return;
@@ -39,21 +43,27 @@ export const useDashboardUpdates = (options: UseDashboardUpdatesOptions = {}) =>
         throw new Error('No authentication token found');
       }
 
-      const response = await fetch(`/api/v1/dashboard/stats/?_=${Date.now()}`, {
-        headers: {
-          'Authorization': `Bearer ${token}`,
-          'Content-Type': 'application/json',
-          'Cache-Control': 'no-cache, no-store, must-revalidate',
-          'Pragma': 'no-cache',
-          'Expires': '0'
-        }
-      });
+      const headers: Record<string, string> = {
+        'Authorization': `Bearer ${token}`,
+        'Content-Type': 'application/json'
+      };
+      if (etagRef.current) {
+        headers['If-None-Match'] = etagRef.current;
+      }
+
+      // 'no-store' keeps the browser cache out of it; revalidation is done explicitly
+      const response = await fetch('/api/v1/dashboard/stats/', { headers, cache: 'no-store' });
+
+      if (response.status === 304) {
+        return;
+      }
 
       if (!response.ok) {
         throw new Error(`Failed to fetch dashboard stats: ${response.statusText}`);
       }
 
       const data = await response.json();
+      etagRef.current = response.headers.get('ETag');
       
       console.log('📊 Dashboard API Data:', {
         has_stat_cards: !!data.stat_cards,